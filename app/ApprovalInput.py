@@ -0,0 +1,7 @@
+from pydantic import BaseModel
+
+class ApprovalInput(BaseModel):
+    approved: bool = True
+    # Replaces the drafted reply when set
+    reply: str | None = None
+    approver: str | None = None
@@ -1,5 +1,9 @@
+from typing import Literal
+
 from pydantic import BaseModel
 
 class TriageInput(BaseModel):
     ticket_text: str
-    order_id: str | None = None
\ No newline at end of file
+    order_id: str | None = None
+    # Partial pipelines skip the nodes (and backend calls) the caller does not need
+    mode: Literal["full", "classify_only", "lookup_only"] = "full"
@@ -1,17 +1,59 @@
 import os
+import time
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
-from fastapi import FastAPI
+from fastapi import FastAPI, Header
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 
+from app.ApprovalInput import ApprovalInput
 from app.TriageInput import TriageInput
-from graph.builder import build_graph
+from app.profiling import profiling_enabled, run_profiled, try_acquire_profile
+from app.scheduler import fair_slot, get_scheduler, scheduler_enabled
+from graph import metrics
+from graph.approvals import resume_approval
+from graph.checkpoints import CheckpointRetrier, auto_retry_enabled, retry_checkpoint
+from graph.builder import MODES, build_runners
+from graph.health import get_prober, readiness_probe_enabled
+from graph.OrderEvidence import state_payload
+from graph.templates import get_template_engine, reply_templates_enabled
+from graph.tracing import get_tracer
+from graph.warmup import cache_warmth, load_warm_caches, save_warm_caches, warm_cache_enabled
 
 # Load environment variables from graph/.env
 load_dotenv("graph/.env")
 
-app = FastAPI()
+# Build the graph of every mode once at startup (TRIAGE_EXECUTOR selects LangGraph or the direct executor)
+triage_graphs = build_runners()
+# Compile the reply templates up front, so a broken template fails startup (TRIAGE_REPLY_TEMPLATES=true)
+if reply_templates_enabled():
+    get_template_engine()
+# /triage/invoke requests in progress, including those waiting for a scheduler slot
+in_flight = 0
 
-# Build the graph once at startup
-triage_graph = build_graph()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Reload the caches saved at the last shutdown before serving (TRIAGE_WARM_CACHE=true)
+    if warm_cache_enabled():
+        load_warm_caches()
+    # Retries checkpointed runs with backoff (TRIAGE_CHECKPOINTS=true)
+    retrier = CheckpointRetrier().start() if auto_retry_enabled() else None
+    # Probes the backend in the background for /triage/ready (TRIAGE_READINESS_PROBE=true)
+    prober = get_prober().start() if readiness_probe_enabled() else None
+    yield
+    if prober is not None:
+        prober.stop()
+    if retrier is not None:
+        retrier.stop()
+    if warm_cache_enabled():
+        save_warm_caches()
+    # Flush buffered trace spans before the worker exits
+    get_tracer().shutdown()
+
+
+app = FastAPI(lifespan=lifespan)
 
 @app.get("/triage")
 async def triage():
@@ -20,19 +62,120 @@ async def triage():
     """
     return {"status": "triage service is running"}
 
+@app.get("/triage/ready")
+async def ready():
+    """
+    Readiness for the load balancer: 200 when the worker can serve good results, else 503.
+    Reads the background prober's last backend check, so it never calls the backend itself.
+    """
+    report = readiness()
+    return JSONResponse(report, status_code=200 if report["ready"] else 503)
+
+
+def readiness() -> dict:
+    if readiness_probe_enabled():
+        backend = get_prober().status()
+    else:
+        backend = {"ready": True, "reason": "not probed (TRIAGE_READINESS_PROBE=false)"}
+    graph = {
+        "ready": set(triage_graphs) == set(MODES),
+        "runners": {mode: type(runner).__name__ for mode, runner in triage_graphs.items()},
+    }
+    # 0 = no limit; above the limit the load balancer should send new tickets elsewhere
+    max_in_flight = int(os.getenv("TRIAGE_READINESS_MAX_IN_FLIGHT", "0"))
+    queue = {
+        "ready": not max_in_flight or in_flight < max_in_flight,
+        "in_flight": in_flight,
+        "queued": get_scheduler().stats()["queued"] if scheduler_enabled() else 0,
+        "max_in_flight": max_in_flight or None,
+    }
+    return {
+        "ready": backend["ready"] and graph["ready"] and queue["ready"],
+        "backend": backend,
+        "graph": graph,
+        "queue": queue,
+        # Informational: a cold worker is slower, not wrong
+        "caches": cache_warmth(),
+    }
+
+@app.get("/triage/metrics")
+async def triage_metrics():
+    """
+    Counters, histograms and component stats (e.g. near-duplicate clusters).
+    """
+    return metrics.snapshot()
+
 @app.post("/triage/invoke")
-async def invoke(body: TriageInput):
+async def invoke(body: TriageInput, x_triage_profile: str | None = Header(default=None),
+                 x_triage_tenant: str | None = Header(default=None)):
     """
     Invoke the triage workflow with the provided ticket.
+    `mode` selects a partial pipeline: "classify_only" (issue_type only) or "lookup_only"
+    (order evidence only) skip the reply draft and the other nodes they do not need.
+    Send `X-Triage-Profile: 1` to profile this request (requires TRIAGE_PROFILING=true).
+    With TRIAGE_SCHEDULER=true, runs are admitted fairly per tenant (`X-Triage-Tenant`,
+    else the email domain in the ticket).
     """
     initial_state = {
         "ticket_text": body.ticket_text,
         "order_id": body.order_id,
+        "mode": body.mode,
         "messages": [],
         "issue_type": None,
         "evidence": None,
         "recommendation": None
     }
 
-    result = triage_graph.invoke(initial_state)
-    return result
+    global in_flight
+    in_flight += 1
+    try:
+        # The workflow blocks on backend calls, so it runs on the threadpool: tickets run
+        # concurrently and their order fetches can be coalesced (TRIAGE_ORDER_LOADER)
+        async with fair_slot(x_triage_tenant, body.ticket_text):
+            if x_triage_profile and profiling_enabled():
+                if try_acquire_profile():
+                    result, profile_id = await run_in_threadpool(
+                        run_profiled, lambda: jsonable_encoder(run_triage(initial_state))
+                    )
+                    return JSONResponse(result, headers={"X-Triage-Profile-Id": profile_id})
+                print("Profiling rate limit reached, running request without profiler")
+
+            return await run_in_threadpool(run_triage, initial_state)
+    finally:
+        in_flight -= 1
+
+
+def run_triage(initial_state: dict) -> dict:
+    mode = initial_state["mode"]
+    start = time.perf_counter()
+    # Looked up per run, so a tracer installed with set_tracer takes effect
+    with get_tracer().trace("triage/invoke", ticket_chars=len(initial_state["ticket_text"]), mode=mode):
+        result = triage_graphs[mode].invoke(initial_state)
+    # Per-mode run counts and latency show what the partial pipelines save
+    metrics.incr(f"triage.mode.{mode}")
+    metrics.observe(f"triage.mode.{mode}_ms", (time.perf_counter() - start) * 1000)
+    return state_payload(result)
+
+
+@app.post("/triage/{approval_id}/approve")
+async def approve(approval_id: str, body: ApprovalInput):
+    """
+    Resume a run paused for approval (TRIAGE_APPROVAL=true) with the admin's decision.
+    Works on any worker: the paused state is loaded from the shared approval store.
+    """
+    result = await run_in_threadpool(resume_approval, approval_id, body.approved, body.reply, body.approver)
+    if result is None:
+        return JSONResponse({"detail": f"No pending approval {approval_id}"}, status_code=404)
+    return state_payload(result)
+
+
+@app.post("/triage/{retry_id}/retry")
+async def retry(retry_id: str):
+    """
+    Retry a checkpointed run (TRIAGE_CHECKPOINTS=true) from the node that failed,
+    reusing its stored evidence and classification.
+    """
+    result = await run_in_threadpool(retry_checkpoint, retry_id)
+    if result is None:
+        return JSONResponse({"detail": f"No retryable checkpoint {retry_id}"}, status_code=404)
+    return state_payload(result)
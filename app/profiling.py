@@ -0,0 +1,177 @@
+import json
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter, deque
+
+from graph.tracing import get_tracer
+
+
+# Samples are attributed to the first category whose marker appears in the stack (innermost frame first),
+# up to the innermost frame of this repo's graph/ package; samples in repo code are attributed to the
+# enclosing node ("node.<name>"), or "other" outside the nodes
+SAMPLE_CATEGORIES = [
+    ("regex_extraction", ("extract_order_id", "extract_email", "/re/__init__.py", "/re/_")),
+    ("json_encoding", ("/json/", "jsonable_encoder", "json_encoder")),
+    ("backend_wait", ("socket.py", "ssl.py", "/http/client.py", "/urllib3/", "/requests/")),
+    ("langgraph", ("/langgraph/", "/langchain_core/")),
+]
+
+
+class SamplingProfiler:
+    """
+    Stdlib-only sampling profiler. A background thread snapshots the stack of
+    one target thread at a fixed interval and aggregates the folded stacks.
+    """
+
+    def __init__(self, thread_id: int, interval: float = 0.001):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stopped.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({code.co_filename}:{frame.f_lineno})")
+                frame = frame.f_back
+            # Folded stacks are outermost first
+            self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def folded(self) -> str:
+        """
+        Returns the profile in the folded-stack format read by flamegraph tools.
+        """
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def categories(self) -> dict:
+        """
+        Splits samples into coarse buckets (regex, JSON, backend waits, node code, LangGraph, other).
+        """
+        totals = Counter()
+        for stack, count in self.stacks.items():
+            frames = stack.split(";")[::-1]
+            totals[_categorize(frames)] += count
+        return dict(totals)
+
+
+# A frame in this repo's graph/ package (not site-packages/langgraph/), with the node module if any
+_REPO_FRAME = re.compile(r"[(/\\]graph[/\\](?:nodes[/\\](\w+)\.py)?")
+
+
+def _categorize(frames: list[str]) -> str:
+    for i, frame in enumerate(frames):
+        for category, markers in SAMPLE_CATEGORIES:
+            if any(marker in frame for marker in markers):
+                return category
+        if _REPO_FRAME.search(frame):
+            # Frames further out (the runner, LangGraph) only called into repo code
+            for outer in frames[i:]:
+                match = _REPO_FRAME.search(outer)
+                if match and match.group(1) and match.group(1) != "__init__":
+                    return f"node.{match.group(1)}"
+            return "other"
+    return "other"
+
+
+class ProfileRateLimiter:
+    """
+    Sliding-window limit on how many requests may be profiled.
+    """
+
+    def __init__(self, max_profiles: int, window: float):
+        self.max_profiles = max_profiles
+        self.window = window
+        self._started = deque()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            while self._started and now - self._started[0] > self.window:
+                self._started.popleft()
+            if len(self._started) >= self.max_profiles:
+                return False
+            self._started.append(now)
+            return True
+
+
+def profiling_enabled() -> bool:
+    return os.getenv("TRIAGE_PROFILING", "false").lower() == "true"
+
+
+_rate_limiter = None
+
+
+def try_acquire_profile() -> bool:
+    """
+    Takes a slot from the process-wide profiling budget (TRIAGE_PROFILE_MAX_PER_WINDOW
+    profiles per TRIAGE_PROFILE_WINDOW_SECONDS).
+    """
+    global _rate_limiter
+    if _rate_limiter is None:
+        _rate_limiter = ProfileRateLimiter(
+            int(os.getenv("TRIAGE_PROFILE_MAX_PER_WINDOW", "5")),
+            float(os.getenv("TRIAGE_PROFILE_WINDOW_SECONDS", "600")),
+        )
+    return _rate_limiter.acquire()
+
+
+def run_profiled(fn, profile_dir: str | None = None):
+    """
+    Runs fn() on the current thread under the sampling profiler with a forced trace,
+    then writes the folded profile and a per-node wall/CPU breakdown to profile_dir.
+
+    Returns (result, profile_id).
+    """
+    profile_dir = profile_dir or os.getenv("TRIAGE_PROFILE_DIR", "profiles")
+    interval = float(os.getenv("TRIAGE_PROFILE_INTERVAL_MS", "1")) / 1000
+
+    tracer = get_tracer()
+    with SamplingProfiler(threading.get_ident(), interval) as profiler:
+        with tracer.trace("triage/profile", force=True) as trace:
+            result = fn()
+        spans = trace.finish()
+
+    profile_id = f"{time.strftime('%Y%m%dT%H%M%S')}-{trace.trace_id[:12]}"
+    os.makedirs(profile_dir, exist_ok=True)
+
+    with open(os.path.join(profile_dir, f"{profile_id}.folded"), "w", encoding="utf-8") as f:
+        f.write(profiler.folded())
+
+    root, node_spans = spans[0], spans[1:]
+    summary = {
+        "profile_id": profile_id,
+        "total_wall_ms": root["wall_ms"],
+        "total_cpu_ms": root["cpu_ms"],
+        "nodes": [
+            {"node": span["name"], "wall_ms": span["wall_ms"], "cpu_ms": span["cpu_ms"], "error": span["error"]}
+            for span in node_spans
+        ],
+        "framework_overhead_ms": round(root["wall_ms"] - sum(span["wall_ms"] for span in node_spans), 3),
+        "samples": profiler.samples,
+        "sample_interval_ms": interval * 1000,
+        "sample_categories": profiler.categories(),
+    }
+    with open(os.path.join(profile_dir, f"{profile_id}.json"), "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2)
+
+    return result, profile_id
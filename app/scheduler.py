@@ -0,0 +1,236 @@
+import asyncio
+import contextlib
+import os
+import threading
+import time
+from collections import deque
+
+from graph import metrics
+from graph.nodes.ingest import extract_email
+
+
+ANONYMOUS = "anonymous"
+# The tenant is looked up on the event loop, so only the head of a (possibly huge) ticket is scanned
+TENANT_SCAN_CHARS = 8192
+# Idle tenants beyond this many are forgotten (with their stats)
+MAX_TENANTS = 1024
+
+
+class Tenant:
+    def __init__(self, name: str, weight: float):
+        self.name = name
+        self.weight = weight
+        self.waiters = deque()
+        self.running = 0
+        self.deficit = 0.0
+        self.has_turn = False
+        self.started = 0
+        self.wait_ms_total = 0.0
+        self.wait_ms_max = 0.0
+        self.last_active = 0.0
+
+
+class FairScheduler:
+    """
+    Admits triage runs across tenants with deficit round robin: tenants with queued
+    tickets take turns, and on each turn a tenant earns `weight` credits and starts
+    one ticket per credit. At most `concurrency` tickets run at once and at most
+    `tenant_concurrency` of them belong to the same tenant, so a tenant that submits
+    thousands of tickets only queues behind itself.
+
+    Waiting happens on the event loop (not on a threadpool thread), so queued tickets
+    hold no thread. All methods must be called from the event loop.
+    """
+
+    def __init__(self, concurrency: int = 16, tenant_concurrency: int = 4, weights: dict | None = None,
+                 clock=time.monotonic):
+        self.concurrency = concurrency
+        self.tenant_concurrency = tenant_concurrency
+        self.weights = weights or {}
+        for name, weight in self.weights.items():
+            check_weight(name, weight)
+        self.clock = clock
+        self._tenants = {}
+        self._active = deque()
+        self._running = 0
+
+    @contextlib.asynccontextmanager
+    async def slot(self, tenant: str):
+        """
+        Waits for this tenant's turn, then holds a run slot while the block runs.
+        """
+        tenant = self._tenant(tenant)
+        queued_at = self.clock()
+        future = asyncio.get_running_loop().create_future()
+        tenant.waiters.append((future, queued_at))
+        if len(tenant.waiters) == 1:
+            self._active.append(tenant)
+        self._dispatch()
+
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self._release(tenant)
+            else:
+                self._forget(tenant, future)
+            raise
+
+        wait_ms = (self.clock() - queued_at) * 1000
+        tenant.started += 1
+        tenant.wait_ms_total += wait_ms
+        tenant.wait_ms_max = max(tenant.wait_ms_max, wait_ms)
+        metrics.observe("scheduler.wait_ms", wait_ms)
+        try:
+            yield
+        finally:
+            self._release(tenant)
+
+    def _tenant(self, name: str) -> Tenant:
+        tenant = self._tenants.get(name)
+        if tenant is None:
+            if len(self._tenants) >= MAX_TENANTS:
+                self._evict_idle()
+            tenant = self._tenants[name] = Tenant(name, float(self.weights.get(name, 1)))
+        tenant.last_active = self.clock()
+        return tenant
+
+    def _evict_idle(self) -> None:
+        idle = [t for t in self._tenants.values() if not t.waiters and not t.running]
+        idle.sort(key=lambda t: t.last_active)
+        for tenant in idle[:max(1, len(idle) // 2)]:
+            del self._tenants[tenant.name]
+
+    def _dispatch(self) -> None:
+        # Tenants at their cap are skipped; stop once every queued tenant is at its cap
+        capped = 0
+        while self._running < self.concurrency and self._active and capped < len(self._active):
+            tenant = self._active[0]
+            if tenant.running >= self.tenant_concurrency:
+                self._end_turn(tenant)
+                capped += 1
+                continue
+            if not tenant.has_turn:
+                tenant.deficit += tenant.weight
+                tenant.has_turn = True
+            if tenant.deficit < 1:
+                self._end_turn(tenant)
+                continue
+
+            future, _ = tenant.waiters.popleft()
+            tenant.deficit -= 1
+            tenant.running += 1
+            self._running += 1
+            capped = 0
+            future.set_result(None)
+            if not tenant.waiters:
+                # An emptied queue keeps no credit for later (standard DRR)
+                self._active.popleft()
+                tenant.deficit = 0.0
+                tenant.has_turn = False
+
+    def _end_turn(self, tenant: Tenant) -> None:
+        tenant.has_turn = False
+        self._active.rotate(-1)
+
+    def _release(self, tenant: Tenant) -> None:
+        tenant.running -= 1
+        self._running -= 1
+        tenant.last_active = self.clock()
+        self._dispatch()
+
+    def _forget(self, tenant: Tenant, future) -> None:
+        tenant.waiters = deque(waiter for waiter in tenant.waiters if waiter[0] is not future)
+        if not tenant.waiters:
+            self._active.remove(tenant)
+            tenant.deficit = 0.0
+            tenant.has_turn = False
+
+    def stats(self) -> dict:
+        now = self.clock()
+        return {
+            "running": self._running,
+            "queued": sum(len(t.waiters) for t in self._tenants.values()),
+            "concurrency": self.concurrency,
+            "tenant_concurrency": self.tenant_concurrency,
+            "tenants": {
+                t.name: {
+                    "queued": len(t.waiters),
+                    "running": t.running,
+                    "started": t.started,
+                    "wait_ms_mean": round(t.wait_ms_total / t.started, 3) if t.started else None,
+                    "wait_ms_max": round(t.wait_ms_max, 3),
+                    "oldest_wait_ms": round((now - t.waiters[0][1]) * 1000, 3) if t.waiters else None,
+                }
+                for t in list(self._tenants.values())
+            },
+        }
+
+
+def scheduler_enabled() -> bool:
+    return os.getenv("TRIAGE_SCHEDULER", "false").lower() == "true"
+
+
+def tenant_key(header: str | None, ticket_text: str) -> str:
+    """
+    The X-Triage-Tenant header if sent, else the domain of the first email in the ticket.
+    """
+    if header and header.strip():
+        return header.strip().lower()
+    email = extract_email(ticket_text[:TENANT_SCAN_CHARS])
+    if email:
+        return email.rsplit("@", 1)[1].lower()
+    return ANONYMOUS
+
+
+def check_weight(name: str, weight) -> None:
+    # A tenant earning no credits per turn would never start a ticket, and _dispatch would spin
+    if not (0 < float(weight) < float("inf")):
+        raise ValueError(f"Scheduler weight for {name} must be a positive number, got {weight}")
+
+
+def parse_weights(spec: str) -> dict:
+    """
+    Parses TRIAGE_SCHEDULER_WEIGHTS, e.g. "bigco.com=4,smallco.com=0.5".
+    """
+    weights = {}
+    for item in spec.split(","):
+        name, _, weight = item.partition("=")
+        if name.strip() and weight.strip():
+            check_weight(name.strip(), float(weight))
+            weights[name.strip().lower()] = float(weight)
+    return weights
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> FairScheduler:
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = FairScheduler(
+                    concurrency=int(os.getenv("TRIAGE_SCHEDULER_CONCURRENCY", "16")),
+                    tenant_concurrency=int(os.getenv("TRIAGE_SCHEDULER_TENANT_CONCURRENCY", "4")),
+                    weights=parse_weights(os.getenv("TRIAGE_SCHEDULER_WEIGHTS", "")),
+                )
+                metrics.register("scheduler", _scheduler.stats)
+    return _scheduler
+
+
+def set_scheduler(scheduler: FairScheduler | None) -> None:
+    global _scheduler
+    _scheduler = scheduler
+    if scheduler is not None:
+        metrics.register("scheduler", scheduler.stats)
+
+
+def fair_slot(header: str | None, ticket_text: str):
+    """
+    The ticket's tenant slot with TRIAGE_SCHEDULER=true, otherwise a no-op.
+    """
+    if not scheduler_enabled():
+        return contextlib.nullcontext()
+    return get_scheduler().slot(tenant_key(header, ticket_text))
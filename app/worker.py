@@ -0,0 +1,140 @@
+import os
+import signal
+import threading
+import time
+
+from fastapi.encoders import jsonable_encoder
+
+from graph import metrics
+from graph.builder import MODES, build_runners
+from graph.OrderEvidence import state_payload
+from graph.templates import get_template_engine, reply_templates_enabled
+from graph.ticket_queue import Job, TicketQueue
+from graph.tracing import get_tracer
+from graph.warmup import load_warm_caches, save_warm_caches, warm_cache_enabled
+
+
+def initial_state(payload: dict) -> dict:
+    return {
+        "ticket_text": payload["ticket_text"],
+        "order_id": payload.get("order_id"),
+        "mode": payload.get("mode", "full"),
+        "messages": [],
+        "issue_type": None,
+        "evidence": None,
+        "recommendation": None
+    }
+
+
+class QueueWorker:
+    """
+    Pulls tickets from a TicketQueue and runs them through the triage workflow (in the
+    job's `mode`, default "full") on `concurrency` threads, writing each final state
+    back as the job result.
+    Run one per process; any number of processes can share the same queue file.
+    """
+
+    def __init__(self, queue: TicketQueue, runner=None, concurrency: int = 4, poll_interval: float = 0.5):
+        self.queue = queue
+        # A given runner serves every mode; otherwise each mode gets its partial pipeline
+        self.runners = {mode: runner for mode in MODES} if runner is not None else build_runners()
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.stopping = threading.Event()
+        self._lock = threading.Lock()
+        self._stats = {"completed": 0, "failed": 0, "lost_leases": 0}
+
+    def run(self, max_jobs: int | None = None) -> None:
+        """
+        Processes jobs until stop() is called (or, with max_jobs, until that many
+        jobs were handled or the queue is empty).
+        """
+        threads = [
+            threading.Thread(target=self._loop, args=(max_jobs,), name=f"queue-worker-{i}")
+            for i in range(self.concurrency)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def stop(self) -> None:
+        """
+        Stops claiming new jobs; jobs in progress are finished.
+        """
+        self.stopping.set()
+
+    def _loop(self, max_jobs: int | None) -> None:
+        while not self.stopping.is_set():
+            if max_jobs is not None and self._handled() >= max_jobs:
+                return
+            jobs = self.queue.claim()
+            if not jobs:
+                if max_jobs is not None:
+                    return
+                self.stopping.wait(self.poll_interval)
+                continue
+            self.process(jobs[0])
+
+    def process(self, job: Job) -> None:
+        start = time.perf_counter()
+        tracer = get_tracer()
+        try:
+            with tracer.trace("triage/queue", job_id=job.id, attempt=job.attempts):
+                state = initial_state(job.payload)
+                if state["mode"] not in self.runners:
+                    raise ValueError(f"Unknown mode: {state['mode']}")
+                result = jsonable_encoder(state_payload(self.runners[state["mode"]].invoke(state)))
+        except Exception as e:
+            print(f"Job {job.id} failed (attempt {job.attempts}): {e}")
+            self._count("failed")
+            metrics.incr("queue.failed")
+            if not self.queue.fail(job, f"{type(e).__name__}: {e}"):
+                self._count("lost_leases")
+            return
+
+        metrics.observe("queue.job_ms", (time.perf_counter() - start) * 1000)
+        if self.queue.complete(job, result):
+            self._count("completed")
+            metrics.incr("queue.completed")
+        else:
+            # The visibility timeout expired and another worker got the job; its result wins
+            print(f"Lease on job {job.id} expired before it completed")
+            self._count("lost_leases")
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._stats[name] += 1
+
+    def _handled(self) -> int:
+        with self._lock:
+            return self._stats["completed"] + self._stats["failed"] + self._stats["lost_leases"]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self._stats)
+
+
+def run_until_signalled(worker: QueueWorker) -> None:
+    """
+    Runs the worker until SIGINT/SIGTERM, then drains the jobs in progress.
+    With TRIAGE_WARM_CACHE=true, caches are reloaded before the first job and saved on exit.
+    """
+    def handle_signal(signum, frame):
+        print("Stopping worker after the jobs in progress...")
+        worker.stop()
+
+    signal.signal(signal.SIGINT, handle_signal)
+    signal.signal(signal.SIGTERM, handle_signal)
+    if reply_templates_enabled():
+        get_template_engine()
+    if warm_cache_enabled():
+        load_warm_caches()
+    worker.run()
+    if warm_cache_enabled():
+        save_warm_caches()
+    get_tracer().shutdown()
+
+
+def worker_concurrency() -> int:
+    return int(os.getenv("TRIAGE_WORKER_CONCURRENCY", "4"))
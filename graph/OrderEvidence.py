@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import json
+import os
+from collections.abc import Mapping
+
+# The order fields the triage workflow and the reply drafter actually use.
+# Everything else the backend returns is either dropped or packed into a raw JSON blob.
+ORDER_FIELDS = ("order_id", "customer_name", "email", "product", "status", "order_date", "total")
+
+
+class OrderEvidence(Mapping):
+    """
+    Compact, slotted representation of one order returned by /orders/get or /orders/search.
+
+    Behaves as a read-only mapping over the known fields, so code that treats evidence as
+    a dict keeps working. Unknown fields are kept as a compact JSON blob that is only
+    decoded when `extras` is accessed.
+    """
+
+    __slots__ = ORDER_FIELDS + ("_extras_raw",)
+
+    def __init__(self, order_id=None, customer_name=None, email=None, product=None,
+                 status=None, order_date=None, total=None, extras_raw: bytes | None = None):
+        self.order_id = order_id
+        self.customer_name = customer_name
+        self.email = email
+        self.product = product
+        self.status = status
+        self.order_date = order_date
+        self.total = total
+        self._extras_raw = extras_raw
+
+    @classmethod
+    def from_dict(cls, data: dict, keep_extras: bool | None = None) -> OrderEvidence:
+        """
+        Builds evidence from a decoded backend order, reading only ORDER_FIELDS.
+        keep_extras defaults to TRIAGE_EVIDENCE_KEEP_EXTRAS (true).
+        """
+        if keep_extras is None:
+            keep_extras = os.getenv("TRIAGE_EVIDENCE_KEEP_EXTRAS", "true").lower() == "true"
+
+        extras_raw = None
+        if keep_extras:
+            extras = {k: v for k, v in data.items() if k not in ORDER_FIELDS}
+            if extras:
+                extras_raw = json.dumps(extras, separators=(",", ":")).encode("utf-8")
+
+        return cls(*(data.get(field) for field in ORDER_FIELDS), extras_raw=extras_raw)
+
+    @property
+    def extras(self) -> dict:
+        """
+        Fields outside ORDER_FIELDS, decoded on demand (empty if they were dropped).
+        """
+        if self._extras_raw is None:
+            return {}
+        return json.loads(self._extras_raw)
+
+    def to_dict(self, include_extras: bool = False) -> dict:
+        data = dict(self)
+        if include_extras:
+            data.update(self.extras)
+        return data
+
+    def __getitem__(self, key):
+        if key in ORDER_FIELDS:
+            value = getattr(self, key)
+            if value is not None:
+                return value
+        raise KeyError(key)
+
+    def __iter__(self):
+        return (field for field in ORDER_FIELDS if getattr(self, field) is not None)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def astuple(self) -> tuple:
+        """
+        The ORDER_FIELDS values followed by the raw extras blob, the positional arguments of the constructor.
+        """
+        return tuple(getattr(self, field) for field in ORDER_FIELDS) + (self._extras_raw,)
+
+    def __reduce__(self):
+        # Pickle as a plain positional tuple (compact for paused runs)
+        return (OrderEvidence, self.astuple())
+
+    def __repr__(self) -> str:
+        return f"OrderEvidence({dict(self)!r})"
+
+
+def to_order_evidence(order: dict) -> dict | OrderEvidence:
+    """
+    Converts a backend order into OrderEvidence. Error payloads are passed through unchanged.
+    """
+    if "error" in order:
+        return order
+    return OrderEvidence.from_dict(order)
+
+
+def evidence_payload(evidence):
+    """
+    Converts state evidence into plain JSON-serializable data for backend requests
+    and API responses, with the fields outside ORDER_FIELDS the backend returned.
+    """
+    if isinstance(evidence, OrderEvidence):
+        return evidence.to_dict(include_extras=True)
+    if isinstance(evidence, dict):
+        for key in ("multiple_orders", "orders"):
+            if key in evidence:
+                return {**evidence, key: [evidence_payload(order) for order in evidence[key]]}
+    return evidence
+
+
+def state_payload(state: dict | None) -> dict | None:
+    """
+    A final run state as returned to callers (the API and queue job results): evidence
+    as plain data, with the order fields outside ORDER_FIELDS (OrderEvidence alone
+    would be encoded without them).
+    """
+    if state is None or "evidence" not in state:
+        return state
+    return {**state, "evidence": evidence_payload(state["evidence"])}
@@ -1,13 +1,39 @@
 from __future__ import annotations
 
-from typing import TypedDict
+import operator
+from typing import Annotated, TypedDict
+
+from graph.OrderEvidence import OrderEvidence
 
 
 class TriageState(TypedDict):
-    messages: list
+    # Nodes return only the keys they change; messages are appended, not replaced
+    messages: Annotated[list, operator.add]
     ticket_text: str
+    # Pipeline the run was invoked with: "full", "classify_only" or "lookup_only" (see graph/builder.py)
+    mode: str | None
+    # Ticket text with HTML, quoted replies and signatures removed (see graph/preprocess.py)
+    clean_text: str | None
     order_id: str | None
+    # All distinct order ids of a multi-order ticket (order_id is the first one)
+    order_ids: list[str] | None
     customer_email: str | None
     issue_type: str | None
-    evidence: dict | None
+    # OrderEvidence for a single order, {"orders": [...], "count": n} for a multi-order ticket,
+    # {"multiple_orders": [...], "count": n} for an ambiguous email search, or {"error": ...}
+    evidence: OrderEvidence | dict | None
+    # Orders served from the stale-while-revalidate cache: {order_id: age_seconds}
+    stale_orders: dict | None
     recommendation: str | None
+    # Set by the pre-filter for tickets that need no triage (auto_reply, bounce, spam, empty); the run ends
+    ticket_tag: str | None
+    # Set by the pre-filter when only the ticket body looks like one of those; the run continues
+    suspected_tag: str | None
+    # Near-duplicate cluster the ticket was assigned to (see graph/dedup.py)
+    cluster_id: str | None
+    # Set when the run paused for admin approval (TRIAGE_APPROVAL=true, see graph/approvals.py)
+    approval_id: str | None
+    # "pending" while paused, then "approved" or "rejected"
+    approval_status: str | None
+    # Set when a node failed and the run was checkpointed for retry (TRIAGE_CHECKPOINTS=true, see graph/checkpoints.py)
+    retry_id: str | None
@@ -0,0 +1,139 @@
+import os
+import pickle
+import threading
+import time
+import uuid
+import zlib
+
+from graph import metrics
+from graph.TriageState import TriageState
+from graph.dedup import record_cluster_result
+from graph.executor import apply_update, state_reducers
+from graph.sqlite_connections import SQLiteConnections
+
+PENDING = "pending"
+APPROVED = "approved"
+REJECTED = "rejected"
+# A run with a failed node: its reply is withheld until the checkpoint retry reaches the gate again
+PENDING_RETRY = "pending_retry"
+
+
+def approval_required() -> bool:
+    return os.getenv("TRIAGE_APPROVAL", "false").lower() == "true"
+
+
+def encode_state(state: dict) -> bytes:
+    """
+    Compact encoding of a paused run: pickled (OrderEvidence pickles as a plain tuple)
+    and zlib-compressed. Only ever read back by this service.
+    """
+    return zlib.compress(pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def decode_state(data: bytes) -> dict:
+    return pickle.loads(zlib.decompress(data))
+
+
+class ApprovalStore:
+    """
+    Paused runs awaiting admin approval, in a SQLite file shared by all workers.
+    Nothing is kept in memory: a pending ticket costs one row on disk until it is decided.
+    """
+
+    def __init__(self, path: str, clock=time.time):
+        self.path = path
+        self.clock = clock
+        self._connections = SQLiteConnections(self.path)
+        self._connections.get().execute(
+            "CREATE TABLE IF NOT EXISTS approvals ("
+            " id TEXT PRIMARY KEY, state BLOB NOT NULL, created_at REAL NOT NULL)"
+        )
+
+    def save(self, state: dict) -> str:
+        approval_id = uuid.uuid4().hex
+        self._connections.get().execute(
+            "INSERT INTO approvals (id, state, created_at) VALUES (?, ?, ?)",
+            (approval_id, encode_state(state), self.clock()),
+        )
+        return approval_id
+
+    def get(self, approval_id: str) -> dict | None:
+        row = self._connections.get().execute("SELECT state FROM approvals WHERE id = ?", (approval_id,)).fetchone()
+        return decode_state(row[0]) if row else None
+
+    def take(self, approval_id: str) -> dict | None:
+        """
+        Removes and returns a paused run. Only one caller (on any worker) gets it.
+        """
+        row = self._connections.get().execute(
+            "DELETE FROM approvals WHERE id = ? RETURNING state", (approval_id,)
+        ).fetchone()
+        return decode_state(row[0]) if row else None
+
+    def stats(self) -> dict:
+        count, total, oldest = self._connections.get().execute(
+            "SELECT count(*), coalesce(sum(length(state)), 0), min(created_at) FROM approvals"
+        ).fetchone()
+        return {
+            "pending": count,
+            "state_bytes": total,
+            "bytes_per_pending": round(total / count, 1) if count else 0.0,
+            "oldest_age_seconds": round(self.clock() - oldest, 1) if oldest is not None else None,
+        }
+
+    def close(self) -> None:
+        self._connections.close()
+
+
+_approval_store = None
+_approval_store_lock = threading.Lock()
+
+
+def get_approval_store() -> ApprovalStore:
+    """
+    Returns the process-wide approval store at TRIAGE_APPROVAL_DB.
+    """
+    global _approval_store
+    if _approval_store is None:
+        with _approval_store_lock:
+            if _approval_store is None:
+                _approval_store = ApprovalStore(os.getenv("TRIAGE_APPROVAL_DB", "triage_approvals.sqlite3"))
+                metrics.register("approvals", _approval_store.stats)
+    return _approval_store
+
+
+def set_approval_store(store: ApprovalStore | None) -> None:
+    global _approval_store
+    _approval_store = store
+    if store is not None:
+        metrics.register("approvals", store.stats)
+
+
+_reducers = state_reducers(TriageState)
+
+
+def resume_approval(approval_id: str, approved: bool = True, reply: str | None = None,
+                    approver: str | None = None) -> dict | None:
+    """
+    Resumes a paused run with the admin's decision and returns its final state,
+    or None if there is no pending approval with this id (unknown or already decided).
+    An edited reply replaces the drafted recommendation. An approved reply is saved on the
+    ticket's near-duplicate cluster, so later duplicates reuse it.
+    """
+    state = get_approval_store().take(approval_id)
+    if state is None:
+        return None
+
+    by = f" by {approver}" if approver else ""
+    update = {
+        "approval_id": approval_id,
+        "approval_status": APPROVED if approved else REJECTED,
+        "messages": [{"role": "assistant", "content": f"Reply {'approved' if approved else 'rejected'}{by}"}]
+    }
+    if approved and reply:
+        update["recommendation"] = reply
+    apply_update(state, update, _reducers)
+    if approved and state.get("recommendation"):
+        record_cluster_result(state.get("cluster_id"), reply=state["recommendation"])
+    metrics.incr(f"approvals.{update['approval_status']}")
+    return state
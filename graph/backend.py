@@ -0,0 +1,258 @@
+import gzip
+import json
+import os
+import random
+import statistics
+import threading
+import time
+
+import requests
+
+from graph import metrics
+from graph.recording import get_recorder
+
+POLICIES = ("least_outstanding", "p2c")
+
+
+class Endpoint:
+    """
+    One backend replica and what the pool knows about it.
+    """
+
+    def __init__(self, url: str):
+        self.url = url.rstrip("/")
+        self.outstanding = 0
+        self.requests = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        # Exponentially weighted moving average of successful response times, in seconds
+        self.latency = None
+        self.samples = 0
+        self.ejected_until = None
+        self.ejections = 0
+
+    def reset_health(self) -> None:
+        self.consecutive_failures = 0
+        self.latency = None
+        self.samples = 0
+        self.ejected_until = None
+
+
+class BackendPool:
+    """
+    Client-side load balancing over backend replicas.
+
+    Each request goes to the available replica with the fewest outstanding requests
+    (policy "least_outstanding"), or to the less loaded of two random replicas ("p2c");
+    ties go to the lower average latency. Outlier detection ejects a replica for
+    eject_seconds after eject_errors consecutive failures (connection errors or 5xx), or
+    when its average latency is eject_latency_factor times the median of the others.
+    At most max_ejected_fraction of the replicas are ejected at once.
+    """
+
+    def __init__(self, urls: list[str], policy: str = "least_outstanding", eject_errors: int = 3,
+                 eject_latency_factor: float = 3.0, eject_latency_min: float = 0.05, eject_seconds: float = 10.0,
+                 max_ejected_fraction: float = 0.5, min_samples: int = 10, retries: int = 1,
+                 clock=time.monotonic, rng=None):
+        if not urls:
+            raise ValueError("BackendPool needs at least one backend URL")
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown backend policy: {policy}")
+        self.endpoints = [Endpoint(url) for url in urls]
+        self.policy = policy
+        self.eject_errors = eject_errors
+        self.eject_latency_factor = eject_latency_factor
+        self.eject_latency_min = eject_latency_min
+        self.eject_seconds = eject_seconds
+        self.max_ejected_fraction = max_ejected_fraction
+        self.min_samples = min_samples
+        self.retries = retries
+        self.clock = clock
+        self.rng = rng or random.Random()
+        self._lock = threading.Lock()
+
+    def request(self, method: str, path: str, **kwargs):
+        """
+        Sends the request to a replica picked by the policy and returns the response.
+        Requests that could not connect are retried once on another replica.
+        """
+        tried = []
+        while True:
+            endpoint = self.acquire(exclude=tried)
+            start = time.perf_counter()
+            try:
+                response = getattr(requests, method)(f"{endpoint.url}{path}", **kwargs)
+            except requests.exceptions.RequestException as e:
+                self.release(endpoint, time.perf_counter() - start, failed=True)
+                tried.append(endpoint)
+                if not isinstance(e, requests.exceptions.ConnectionError) or len(tried) > self.retries \
+                        or len(tried) >= len(self.endpoints):
+                    raise
+                print(f"Backend {endpoint.url} unreachable, retrying on another replica: {e}")
+                continue
+            elapsed = time.perf_counter() - start
+            self.release(endpoint, elapsed, failed=response.status_code >= 500)
+            recorder = get_recorder()
+            if recorder is not None:
+                try:
+                    recorder.record(method, path, kwargs, response, elapsed)
+                except Exception as e:
+                    print(f"Failed to record backend call {path}: {e}")
+            return response
+
+    def acquire(self, exclude=()) -> Endpoint:
+        with self._lock:
+            candidates = [e for e in self._available() if e not in exclude] \
+                or [e for e in self.endpoints if e not in exclude] or self.endpoints
+            if self.policy == "p2c" and len(candidates) > 2:
+                candidates = self.rng.sample(candidates, 2)
+            endpoint = min(candidates, key=lambda e: (e.outstanding, e.latency or 0.0, self.rng.random()))
+            endpoint.outstanding += 1
+            endpoint.requests += 1
+            return endpoint
+
+    def release(self, endpoint: Endpoint, elapsed: float, failed: bool = False) -> None:
+        with self._lock:
+            endpoint.outstanding -= 1
+            if failed:
+                endpoint.failures += 1
+                endpoint.consecutive_failures += 1
+                if endpoint.consecutive_failures >= self.eject_errors:
+                    self._eject(endpoint, f"{endpoint.consecutive_failures} consecutive failures")
+                return
+
+            endpoint.consecutive_failures = 0
+            endpoint.latency = elapsed if endpoint.latency is None else 0.8 * endpoint.latency + 0.2 * elapsed
+            endpoint.samples += 1
+            if endpoint.samples >= self.min_samples and endpoint.latency >= self.eject_latency_min:
+                others = [e.latency for e in self._available()
+                          if e is not endpoint and e.samples >= self.min_samples]
+                if others and endpoint.latency > self.eject_latency_factor * statistics.median(others):
+                    self._eject(endpoint, f"average latency {endpoint.latency * 1000:.0f} ms")
+
+    def _available(self) -> list[Endpoint]:
+        now = self.clock()
+        available = []
+        for endpoint in self.endpoints:
+            if endpoint.ejected_until is not None and now >= endpoint.ejected_until:
+                # Cooldown over: the replica gets traffic again and is re-measured from scratch
+                endpoint.reset_health()
+            if endpoint.ejected_until is None:
+                available.append(endpoint)
+        return available
+
+    def _eject(self, endpoint: Endpoint, reason: str) -> None:
+        if endpoint.ejected_until is not None:
+            return
+        ejected = len(self.endpoints) - len(self._available())
+        if ejected + 1 > int(len(self.endpoints) * self.max_ejected_fraction):
+            return
+        print(f"Ejecting backend {endpoint.url} for {self.eject_seconds:.0f}s: {reason}")
+        endpoint.ejected_until = self.clock() + self.eject_seconds
+        endpoint.ejections += 1
+        metrics.incr("backend_pool.ejections")
+
+    def stats(self) -> dict:
+        with self._lock:
+            now = self.clock()
+            return {
+                "policy": self.policy,
+                "endpoints": {
+                    e.url: {
+                        "outstanding": e.outstanding,
+                        "requests": e.requests,
+                        "failures": e.failures,
+                        "latency_ms": round(e.latency * 1000, 3) if e.latency is not None else None,
+                        "ejected": e.ejected_until is not None and now < e.ejected_until,
+                        "ejections": e.ejections,
+                    }
+                    for e in self.endpoints
+                },
+            }
+
+
+def backend_urls() -> list[str]:
+    """
+    Backend replicas from BACKEND_URLS (comma-separated), else the single BACKEND_URL.
+    """
+    urls = os.getenv("BACKEND_URLS") or os.getenv("BACKEND_URL", "http://localhost:8000")
+    return [url.strip() for url in urls.split(",") if url.strip()]
+
+
+def _pool_config() -> tuple:
+    return tuple(backend_urls()), os.getenv("TRIAGE_BACKEND_POLICY", "least_outstanding").lower()
+
+
+_backend_pool = None
+_backend_pool_config = None
+_backend_pool_lock = threading.Lock()
+
+
+def get_backend_pool() -> BackendPool:
+    """
+    Returns the process-wide pool for the configured replicas (rebuilt when
+    BACKEND_URLS / BACKEND_URL / TRIAGE_BACKEND_POLICY change).
+    """
+    global _backend_pool, _backend_pool_config
+    config = _pool_config()
+    if _backend_pool is None or _backend_pool_config != config:
+        with _backend_pool_lock:
+            if _backend_pool is None or _backend_pool_config != config:
+                urls, policy = config
+                _backend_pool = BackendPool(
+                    list(urls),
+                    policy=policy,
+                    eject_errors=int(os.getenv("TRIAGE_BACKEND_EJECT_ERRORS", "3")),
+                    eject_latency_factor=float(os.getenv("TRIAGE_BACKEND_EJECT_LATENCY_FACTOR", "3")),
+                    eject_latency_min=float(os.getenv("TRIAGE_BACKEND_EJECT_LATENCY_MIN_MS", "50")) / 1000,
+                    eject_seconds=float(os.getenv("TRIAGE_BACKEND_EJECT_SECONDS", "10")),
+                    max_ejected_fraction=float(os.getenv("TRIAGE_BACKEND_MAX_EJECTED_FRACTION", "0.5")),
+                )
+                _backend_pool_config = config
+                metrics.register("backend_pool", _backend_pool.stats)
+    return _backend_pool
+
+
+def set_backend_pool(pool: BackendPool | None) -> None:
+    """
+    Replaces the process-wide pool until the backend configuration changes
+    (None rebuilds it from the environment on next use).
+    """
+    global _backend_pool, _backend_pool_config
+    _backend_pool = pool
+    _backend_pool_config = _pool_config() if pool is not None else None
+    if pool is not None:
+        metrics.register("backend_pool", pool.stats)
+
+
+def backend_get(path: str, params: dict | None = None):
+    """
+    GETs path (e.g. "/orders/get") from one of the backend replicas.
+    """
+    return get_backend_pool().request("get", path, params=params)
+
+
+def post_json(path: str, payload: dict):
+    """
+    POSTs payload as JSON to path on one of the backend replicas. Bodies of at least
+    TRIAGE_GZIP_MIN_BYTES are gzip-compressed when TRIAGE_GZIP_REQUESTS=true (the backend
+    must accept Content-Encoding: gzip). Counts raw and sent body bytes per endpoint.
+    """
+    body = json.dumps(payload).encode("utf-8")
+    name = path.strip("/").replace("/", ".")
+    metrics.incr(f"backend.{name}.bytes_raw", len(body))
+
+    if os.getenv("TRIAGE_GZIP_REQUESTS", "false").lower() == "true" \
+            and len(body) >= int(os.getenv("TRIAGE_GZIP_MIN_BYTES", "1024")):
+        compressed = gzip.compress(body, compresslevel=5)
+        metrics.incr(f"backend.{name}.bytes_sent", len(compressed))
+        metrics.incr(f"backend.{name}.gzipped")
+        return get_backend_pool().request(
+            "post",
+            path,
+            data=compressed,
+            headers={"Content-Type": "application/json", "Content-Encoding": "gzip"},
+        )
+
+    metrics.incr(f"backend.{name}.bytes_sent", len(body))
+    return get_backend_pool().request("post", path, json=payload)
@@ -0,0 +1 @@
+# Benchmarks for the triage workflow (run with python -m graph.benchmarks.<name>)
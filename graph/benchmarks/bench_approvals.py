@@ -0,0 +1,90 @@
+"""
+Cost of tickets paused for admin approval: process memory when each paused run is held
+in memory (a request or task waiting per ticket) vs saved to the SQLite approval store,
+plus bytes on disk and save/resume throughput.
+
+Usage: python -m graph.benchmarks.bench_approvals [pending_tickets]
+"""
+import gc
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from graph.OrderEvidence import to_order_evidence
+from graph.approvals import ApprovalStore, set_approval_store, resume_approval
+from graph.benchmarks.bench_evidence_memory import realistic_order
+
+
+def paused_state(i: int) -> dict:
+    """
+    State of a run at the approval gate, for a ticket with a realistic order document.
+    """
+    ticket_text = f"Hi, my Bluetooth speaker from ORD{1000 + i % 9000} stopped charging after a week. " * 6
+    return {
+        "ticket_text": ticket_text,
+        "clean_text": None,
+        "order_id": f"ORD{1000 + i % 9000}",
+        "customer_email": f"customer{i}@example.com",
+        "issue_type": "defective",
+        "evidence": to_order_evidence(json.loads(realistic_order(i))),
+        "recommendation": f"Hi Customer {i}, we're sorry your speaker stopped working. " * 4,
+        "messages": [
+            {"role": "user", "content": ticket_text},
+            {"role": "assistant", "content": f"Extracted order_id: ORD{1000 + i % 9000}"},
+            {"role": "assistant", "content": f"Fetched order ORD{1000 + i % 9000}"},
+            {"role": "assistant", "content": "Classified as: defective"},
+            {"role": "assistant", "content": "Generated reply recommendation"},
+        ],
+        "approval_status": "pending",
+    }
+
+
+def traced_bytes(fn) -> tuple[float, object]:
+    gc.collect()
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    kept = fn()
+    gc.collect()
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return after - before, kept
+
+
+def main(pending: int = 20000) -> None:
+    # Held in memory: every paused run keeps its state alive
+    held_bytes, held = traced_bytes(lambda: [paused_state(i) for i in range(pending)])
+    del held
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "approvals.sqlite3")
+        store = ApprovalStore(path)
+        set_approval_store(store)
+
+        start = time.perf_counter()
+        stored_bytes, ids = traced_bytes(lambda: [store.save(paused_state(i)) for i in range(pending)])
+        save_seconds = time.perf_counter() - start
+        # The approval ids are kept by the caller, not the store
+        id_bytes = sum(sys.getsizeof(approval_id) for approval_id in ids) + sys.getsizeof(ids)
+
+        stats = store.stats()
+        disk = sum(os.path.getsize(os.path.join(directory, name)) for name in os.listdir(directory))
+
+        start = time.perf_counter()
+        for approval_id in ids[:1000]:
+            resume_approval(approval_id, approver="bench")
+        resume_ms = (time.perf_counter() - start) * 1000 / min(1000, len(ids))
+        store.close()
+
+    print(f"{pending} tickets awaiting approval")
+    print(f"held in memory:       {held_bytes / pending:>9.0f} bytes/ticket of process memory")
+    print(f"approval store:       {(stored_bytes - id_bytes) / pending:>9.0f} bytes/ticket of process memory")
+    print(f"                      {stats['bytes_per_pending']:>9.0f} bytes/ticket of compressed state")
+    print(f"                      {disk / pending:>9.0f} bytes/ticket on disk (with index and WAL)")
+    print(f"save: {save_seconds * 1000 / pending:.3f} ms/ticket, resume: {resume_ms:.3f} ms/ticket")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
@@ -0,0 +1,79 @@
+"""
+Memory per in-flight ticket with untyped order dicts vs OrderEvidence.
+
+Builds realistic order documents (addresses, line items, payment and tracking history),
+keeps the evidence of many tickets alive at once, as a busy worker would, and reports
+the retained bytes per ticket.
+
+Usage: python -m graph.benchmarks.bench_evidence_memory [tickets]
+"""
+import gc
+import json
+import sys
+import tracemalloc
+
+from graph.OrderEvidence import OrderEvidence
+
+
+def realistic_order(i: int) -> bytes:
+    """
+    Returns the raw JSON body /orders/get might send for one order.
+    """
+    order = {
+        "order_id": f"ORD{1000 + i % 9000}",
+        "customer_name": f"Customer {i}",
+        "email": f"customer{i}@example.com",
+        "product": "Bluetooth Speaker",
+        "status": "shipped",
+        "order_date": "2026-09-30T10:15:00Z",
+        "total": 129.99,
+        "currency": "USD",
+        "shipping_address": {"name": f"Customer {i}", "street": f"{i} Main St", "city": "Springfield",
+                             "state": "IL", "postal_code": "62701", "country": "US"},
+        "billing_address": {"name": f"Customer {i}", "street": f"{i} Main St", "city": "Springfield",
+                            "state": "IL", "postal_code": "62701", "country": "US"},
+        "line_items": [
+            {"sku": f"SKU-{j}", "name": f"Item {j}", "qty": 1, "unit_price": 25.99, "tax": 2.1}
+            for j in range(5)
+        ],
+        "payment": {"method": "card", "brand": "visa", "last4": "4242", "captured": True},
+        "tracking": [
+            {"carrier": "UPS", "event": f"Scan {j}", "location": "Chicago, IL", "at": "2026-10-01T08:00:00Z"}
+            for j in range(8)
+        ],
+        "notes": "Leave at the front door. " * 4,
+    }
+    return json.dumps(order).encode("utf-8")
+
+
+def retained_bytes_per_ticket(bodies: list[bytes], build) -> float:
+    gc.collect()
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    in_flight = [{"evidence": build(body)} for body in bodies]
+    gc.collect()
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del in_flight
+    return (after - before) / len(bodies)
+
+
+def main(tickets: int = 2000) -> None:
+    bodies = [realistic_order(i) for i in range(tickets)]
+
+    variants = {
+        "dict (before)": json.loads,
+        "OrderEvidence + raw extras": lambda body: OrderEvidence.from_dict(json.loads(body), keep_extras=True),
+        "OrderEvidence, extras dropped": lambda body: OrderEvidence.from_dict(json.loads(body), keep_extras=False),
+    }
+
+    print(f"order document: {len(bodies[0])} bytes of JSON, {tickets} tickets in flight")
+    baseline = None
+    for name, build in variants.items():
+        per_ticket = retained_bytes_per_ticket(bodies, build)
+        baseline = baseline or per_ticket
+        print(f"{name:<32} {per_ticket:>10.0f} bytes/ticket  ({per_ticket / baseline:.0%})")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
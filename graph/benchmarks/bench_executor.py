@@ -0,0 +1,54 @@
+"""
+Per-ticket overhead of the compiled StateGraph vs the direct executor.
+
+Both runners execute the same nodes against an in-process fake backend,
+so the difference between them is pure workflow-runtime overhead.
+
+Usage: python -m graph.benchmarks.bench_executor [iterations]
+"""
+import contextlib
+import os
+import sys
+import time
+
+from graph.benchmarks.fakes import fake_backend, initial_state
+from graph.builder import build_direct_executor, build_graph
+
+TICKETS = {
+    "order_id": "My speaker is not working ORD1002",
+    "email": "Where is my order? alice@example.com",
+    "neither": "My product is broken",
+}
+
+
+def time_runner(runner, ticket_text: str, iterations: int) -> float:
+    """
+    Returns the mean microseconds per ticket.
+    """
+    for _ in range(min(50, iterations)):
+        runner.invoke(initial_state(ticket_text))
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        runner.invoke(initial_state(ticket_text))
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main(iterations: int = 2000) -> None:
+    runners = {"langgraph": build_graph(), "direct": build_direct_executor()}
+    results = {}
+
+    with fake_backend(), open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for path, ticket_text in TICKETS.items():
+            for name, runner in runners.items():
+                results[(path, name)] = time_runner(runner, ticket_text, iterations)
+
+    print(f"{'path':<10} {'langgraph us':>14} {'direct us':>12} {'saved us':>10} {'speedup':>8}")
+    for path in TICKETS:
+        graph_us = results[(path, "langgraph")]
+        direct_us = results[(path, "direct")]
+        print(f"{path:<10} {graph_us:>14.1f} {direct_us:>12.1f} {graph_us - direct_us:>10.1f} {graph_us / direct_us:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
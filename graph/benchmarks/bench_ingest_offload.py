@@ -0,0 +1,120 @@
+"""
+Latency of small tickets through ingest while other threads on the same worker ingest
+multi-megabyte pasted tickets, with large-ticket parsing inline (off), on a thread pool
+or on a process pool.
+
+Usage: python -m graph.benchmarks.bench_ingest_offload [seconds_per_mode]
+"""
+import contextlib
+import os
+import random
+import statistics
+import string
+import sys
+import threading
+import time
+from unittest.mock import patch
+
+from graph.benchmarks.fakes import initial_state
+from graph.nodes import ingest
+
+SMALL_THREADS = 4
+LARGE_THREADS = 2
+
+
+def large_ticket(seed: int) -> str:
+    """
+    A ~4 MB pasted log with no order id, so both the order id and the email regex scan all of it.
+    """
+    rng = random.Random(seed)
+    words = ["".join(rng.choices(string.ascii_letters + string.digits, k=rng.randint(3, 12))) for _ in range(1000)]
+    return "My speaker app crashes, log below\n" + " ".join(rng.choice(words) for _ in range(400000))
+
+
+def run(mode: str, seconds: float, large: str) -> dict:
+    small_latencies = []
+    large_done = [0]
+    lock = threading.Lock()
+    stop = threading.Event()
+
+    def small_loop(i):
+        # A small ticket arrives every 2 ms; latency runs from its arrival, so time spent
+        # waiting for the GIL held by a large ticket's regex counts
+        state = initial_state(f"My speaker from ORD{1000 + i} is broken, contact me at user{i}@example.com")
+        arrival = time.perf_counter()
+        while not stop.is_set():
+            arrival += 0.002
+            time.sleep(max(0.0, arrival - time.perf_counter()))
+            ingest.ingest_node(state)
+            elapsed = (time.perf_counter() - arrival) * 1000
+            with lock:
+                small_latencies.append(elapsed)
+            arrival = max(arrival, time.perf_counter())
+
+    def large_loop():
+        state = initial_state(large)
+        while not stop.is_set():
+            ingest.ingest_node(state)
+            with lock:
+                large_done[0] += 1
+
+    env = {"TRIAGE_INGEST_POOL": mode, "TRIAGE_INGEST_POOL_SIZE": str(LARGE_THREADS)}
+    with patch.dict(os.environ, env), quiet():
+        ingest._parse_pool = None
+        # Start the pool (process start-up is a one-time cost, not part of the measurement)
+        ingest.parse_ticket_text(large[:ingest.offload_chars()], 5, True)
+
+        threads = [threading.Thread(target=small_loop, args=(i,)) for i in range(SMALL_THREADS)]
+        threads += [threading.Thread(target=large_loop) for _ in range(LARGE_THREADS)]
+        for thread in threads:
+            thread.start()
+        time.sleep(seconds)
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+        if ingest._parse_pool is not None:
+            ingest._parse_pool.shutdown()
+            ingest._parse_pool = None
+
+    small_latencies.sort()
+    return {
+        "small": len(small_latencies),
+        "p50": statistics.median(small_latencies),
+        "p99": small_latencies[int(len(small_latencies) * 0.99)],
+        "max": small_latencies[-1],
+        "large": large_done[0],
+    }
+
+
+@contextlib.contextmanager
+def quiet():
+    """
+    Silences the nodes' prints, including those of pool worker processes (which inherit fd 1).
+    """
+    sys.stdout.flush()
+    saved = os.dup(1)
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    os.dup2(devnull, 1)
+    try:
+        with open(os.devnull, "w") as sink, contextlib.redirect_stdout(sink):
+            yield
+    finally:
+        os.dup2(saved, 1)
+        os.close(saved)
+        os.close(devnull)
+
+
+def main(seconds: float = 3.0) -> None:
+    large = large_ticket(1)
+    print(f"{SMALL_THREADS} threads of small tickets, {LARGE_THREADS} threads of {len(large) / 1e6:.1f} MB tickets, "
+          f"{seconds:.0f}s per mode")
+    print("small ticket latency is from arrival (one every 2 ms per thread) to the end of ingest")
+    print(f"{'large parsing':<14} {'small tickets':>13} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8} {'large tickets':>14}")
+    for mode in ("off", "thread", "process"):
+        r = run(mode, seconds, large)
+        print(f"{mode:<14} {r['small']:>13} {r['p50']:>8.3f} {r['p99']:>8.2f} {r['max']:>8.2f} {r['large']:>14}")
+
+
+if __name__ == "__main__":
+    main(float(sys.argv[1]) if len(sys.argv) > 1 else 3.0)
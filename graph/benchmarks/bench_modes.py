@@ -0,0 +1,41 @@
+"""
+Latency and backend calls per ticket for each request mode (full, classify_only,
+lookup_only), against an in-process backend with a fixed latency per call.
+
+Usage: python -m graph.benchmarks.bench_modes [backend_latency_ms]
+"""
+import contextlib
+import io
+import statistics
+import sys
+import time
+
+from graph.benchmarks.fakes import fake_backend, initial_state
+from graph.builder import MODES, build_runners
+
+TICKETS = [
+    "My speaker is not working ORD1002",
+    "The headphones from ORD1005 arrived damaged",
+    "Where is my order? alice@example.com",
+]
+ROUNDS = 20
+
+
+def main(latency_ms: float = 20.0) -> None:
+    runners = build_runners()
+    print(f"backend latency {latency_ms:.0f} ms per call, {ROUNDS * len(TICKETS)} tickets per mode")
+    print(f"{'mode':<14} {'p50 ms':>8} {'mean ms':>8} {'backend calls/ticket':>21}")
+    for mode in MODES:
+        latencies = []
+        with fake_backend(latency=latency_ms / 1000) as backend, contextlib.redirect_stdout(io.StringIO()):
+            for _ in range(ROUNDS):
+                for ticket_text in TICKETS:
+                    start = time.perf_counter()
+                    runners[mode].invoke({**initial_state(ticket_text), "mode": mode})
+                    latencies.append((time.perf_counter() - start) * 1000)
+        print(f"{mode:<14} {statistics.median(latencies):>8.1f} {statistics.mean(latencies):>8.1f} "
+              f"{backend.calls / len(latencies):>21.2f}")
+
+
+if __name__ == "__main__":
+    main(float(sys.argv[1]) if len(sys.argv) > 1 else 20.0)
@@ -0,0 +1,60 @@
+"""
+End-to-end latency of multi-order tickets against a backend with per-call latency.
+
+Compares fetching each order in turn (the old behaviour) with concurrent fetches
+and with a backend that supports /orders/bulk.
+
+Usage: python -m graph.benchmarks.bench_multi_order [latency_ms]
+"""
+import contextlib
+import os
+import sys
+import time
+from unittest.mock import patch
+
+from graph.benchmarks.fakes import fake_backend, initial_state
+from graph.builder import build_direct_executor
+from graph.nodes import fetch_order
+
+ORDER_COUNTS = (1, 2, 4)
+
+
+def sequential_fetch_orders(order_ids: list[str]) -> dict:
+    return {order_id: fetch_order.fetch_order_tool.invoke({"order_id": order_id}) for order_id in order_ids}
+
+
+def time_ticket(runner, ticket_text: str, iterations: int) -> float:
+    """
+    Returns the mean milliseconds per ticket.
+    """
+    start = time.perf_counter()
+    for _ in range(iterations):
+        runner.invoke(initial_state(ticket_text))
+    return (time.perf_counter() - start) / iterations * 1e3
+
+
+def main(latency_ms: float = 20.0, iterations: int = 10) -> None:
+    runner = build_direct_executor()
+    modes = {
+        "sequential": ({"bulk": False}, patch.object(fetch_order, "fetch_orders", sequential_fetch_orders)),
+        "concurrent": ({"bulk": False}, contextlib.nullcontext()),
+        "bulk": ({"bulk": True}, contextlib.nullcontext()),
+    }
+    results = {}
+
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for mode, (backend_kwargs, fetch_patch) in modes.items():
+            fetch_order._bulk_supported.clear()
+            with fake_backend(latency=latency_ms / 1e3, **backend_kwargs), fetch_patch:
+                for count in ORDER_COUNTS:
+                    ticket = "Broken items: " + " ".join(f"ORD{1001 + i}" for i in range(count))
+                    results[(mode, count)] = time_ticket(runner, ticket, iterations)
+
+    print(f"backend latency: {latency_ms:.0f} ms per call")
+    print(f"{'orders':<8}" + "".join(f"{mode + ' ms':>16}" for mode in modes))
+    for count in ORDER_COUNTS:
+        print(f"{count:<8}" + "".join(f"{results[(mode, count)]:>16.1f}" for mode in modes))
+
+
+if __name__ == "__main__":
+    main(float(sys.argv[1]) if len(sys.argv) > 1 else 20.0)
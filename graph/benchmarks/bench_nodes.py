@@ -0,0 +1,237 @@
+"""
+Microbenchmarks of every node, the routing functions and both full runners against the
+in-process fake backend, across ticket sizes and evidence (order document) sizes, with a
+regression budget against a stored baseline.
+
+Timings are stored in units of a fixed pure-Python reference workload timed in the same
+run, so a baseline recorded on one machine can be checked on another. A case regresses when
+its time in units exceeds the baseline by more than the budget factor (TRIAGE_PERF_BUDGET,
+default 3). graph/tests/test_node_budgets.py runs the same check with the unit tests.
+
+Usage: python -m graph.benchmarks.bench_nodes [check|save] [budget]
+  check (default): print each case against the baseline, exit 1 on a regression
+  save: record the current timings as the new baseline (after an intended change)
+"""
+import contextlib
+import io
+import json
+import os
+import platform
+import re
+import sys
+import time
+from unittest.mock import patch
+
+from graph.benchmarks.fakes import fake_backend, initial_state
+from graph.builder import (
+    NODES, build_direct_executor, build_graph, route_after_dedupe, route_after_ingest, route_after_prefilter,
+    route_after_search,
+)
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "data", "node_baseline.json")
+
+ORDER_TICKET = "My Bluetooth speaker stopped working after two days, order ORD1002. Please help."
+EMAIL_TICKET = "Where is my order? I bought a speaker last week. alice@example.com"
+NO_ORDER_TICKET = "My product is broken"
+FILLER = "I have tried resetting it, charging it overnight and pairing it again with my phone. "
+# Characters of filler appended to the ticket text (below TRIAGE_INGEST_OFFLOAD_CHARS)
+TICKET_SIZES = {"short": 0, "long": 4 * 1024, "huge": 64 * 1024}
+# Extra fields per order document returned by the fake backend
+EVIDENCE_SIZES = {"small": 0, "large": 200}
+# Content features are off by default, which would make their nodes no-ops
+BENCH_ENV = {"TRIAGE_PREFILTER": "true", "TRIAGE_PREPROCESS": "true"}
+ORDER_CHAIN = ("prefilter", "ingest", "preprocess", "dedupe", "fetch_order", "classify", "draft_reply", "await_approval")
+EMAIL_CHAIN = ("prefilter", "ingest", "preprocess", "dedupe", "search_orders", "classify", "draft_reply")
+
+
+def ticket(text: str, size: str) -> str:
+    chars = TICKET_SIZES[size]
+    if not chars:
+        return text
+    return f"{text}\n{(FILLER * (chars // len(FILLER) + 1))[:chars]}"
+
+
+def state_before(node: str, chain: tuple, ticket_text: str) -> dict:
+    """
+    The state node receives in a run of chain: the upstream nodes applied in order.
+    """
+    state = initial_state(ticket_text)
+    for name in chain[:chain.index(node)]:
+        state = {**state, **NODES[name](state)}
+    return state
+
+
+def node_case(node: str, chain: tuple, ticket_text: str):
+    def setup():
+        state = state_before(node, chain, ticket_text)
+        return lambda: NODES[node](state)
+    return setup
+
+
+def route_case(route, node: str, chain: tuple, ticket_text: str):
+    def setup():
+        state = state_before(node, chain, ticket_text)
+        return lambda: route(state)
+    return setup
+
+
+def runner_case(build, ticket_text: str):
+    def setup():
+        runner = build()
+        return lambda: runner.invoke(initial_state(ticket_text))
+    return setup
+
+
+def cases() -> dict:
+    """
+    name -> (env, fake backend kwargs, setup), where setup() returns the function to time.
+    """
+    suite = {}
+    for size in TICKET_SIZES:
+        text = ticket(ORDER_TICKET, size)
+        for node in ("prefilter", "ingest", "preprocess", "classify"):
+            suite[f"node.{node}[{size}]"] = ({}, {}, node_case(node, ORDER_CHAIN, text))
+        suite[f"node.dedupe[{size}]"] = ({"TRIAGE_DEDUP": "true"}, {}, node_case("dedupe", ORDER_CHAIN, text))
+    for evidence, extra_fields in EVIDENCE_SIZES.items():
+        backend = {"extra_fields": extra_fields}
+        suite[f"node.fetch_order[{evidence}]"] = ({}, backend, node_case("fetch_order", ORDER_CHAIN, ORDER_TICKET))
+        suite[f"node.search_orders[{evidence}]"] = ({}, backend, node_case("search_orders", EMAIL_CHAIN, EMAIL_TICKET))
+        suite[f"node.draft_reply[{evidence}]"] = ({}, backend, node_case("draft_reply", ORDER_CHAIN, ORDER_TICKET))
+    suite["node.await_approval"] = ({}, {}, node_case("await_approval", ORDER_CHAIN, ORDER_TICKET))
+    suite["node.no_order_id"] = ({}, {}, node_case("no_order_id", ("ingest", "no_order_id"), NO_ORDER_TICKET))
+
+    suite["route.after_prefilter"] = ({}, {}, route_case(route_after_prefilter, "ingest", ORDER_CHAIN, ORDER_TICKET))
+    suite["route.after_ingest"] = ({}, {}, route_case(route_after_ingest, "preprocess", ORDER_CHAIN, ORDER_TICKET))
+    suite["route.after_dedupe"] = ({}, {}, route_case(route_after_dedupe, "fetch_order", ORDER_CHAIN, ORDER_TICKET))
+    suite["route.after_search"] = ({}, {}, route_case(route_after_search, "classify", EMAIL_CHAIN, EMAIL_TICKET))
+
+    for runner, build in (("langgraph", build_graph), ("direct", build_direct_executor)):
+        for size, evidence in (("short", "small"), ("long", "large")):
+            backend = {"extra_fields": EVIDENCE_SIZES[evidence]}
+            suite[f"graph.{runner}[{size},{evidence}]"] = (
+                {}, backend, runner_case(build, ticket(ORDER_TICKET, size))
+            )
+    return suite
+
+
+def measure(fn, min_time: float = 0.2, rounds: int = 5) -> float:
+    """
+    Best nanoseconds per call over `rounds` batches of calls, each batch at least
+    min_time / rounds long.
+    """
+    fn()
+    number = 1
+    while True:
+        start = time.perf_counter_ns()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter_ns() - start
+        if elapsed >= min_time / rounds * 1e9 or number >= 1 << 20:
+            break
+        number *= 2
+    best = elapsed
+    for _ in range(rounds - 1):
+        start = time.perf_counter_ns()
+        for _ in range(number):
+            fn()
+        best = min(best, time.perf_counter_ns() - start)
+    return best / number
+
+
+CALIBRATION_TEXT = ticket(ORDER_TICKET, "long")
+
+
+def reference_workload() -> list:
+    # Dict copies, string and regex work, like a node's
+    state = {"ticket_text": CALIBRATION_TEXT, "messages": []}
+    words = CALIBRATION_TEXT.lower().split()
+    for i in range(50):
+        state = {**state, f"key_{i}": words[i % len(words)]}
+    return re.findall(r"ORD\d+", CALIBRATION_TEXT)
+
+
+def run_suite(min_time: float = 0.2, names=None) -> dict:
+    """
+    Times every case (or those in names) and the reference workload.
+    """
+    results = {"calibration_ns": measure(reference_workload, min_time), "cases": {}}
+    with contextlib.redirect_stdout(io.StringIO()), patch.dict(os.environ, BENCH_ENV):
+        for name, (env, backend_kwargs, setup) in cases().items():
+            if names is not None and name not in names:
+                continue
+            with patch.dict(os.environ, env), fake_backend(**backend_kwargs):
+                ns = measure(setup(), min_time)
+            results["cases"][name] = {"us": round(ns / 1000, 3), "units": round(ns / results["calibration_ns"], 4)}
+    return results
+
+
+def load_baseline(path: str = BASELINE_PATH) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_baseline(results: dict, path: str = BASELINE_PATH) -> None:
+    baseline = {
+        "python": platform.python_version(),
+        "calibration_ns": round(results["calibration_ns"], 1),
+        "cases": results["cases"],
+    }
+    with open(path, "w") as f:
+        json.dump(baseline, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def budget() -> float:
+    return float(os.getenv("TRIAGE_PERF_BUDGET", "3"))
+
+
+def compare(results: dict, baseline: dict, budget_factor: float) -> list[tuple]:
+    """
+    (name, baseline units, current units, ratio) of every case slower than budget_factor
+    times its baseline. Cases without a baseline are not checked.
+    """
+    regressions = []
+    for name, current in results["cases"].items():
+        previous = baseline["cases"].get(name)
+        if previous is None:
+            continue
+        ratio = current["units"] / previous["units"]
+        if ratio > budget_factor:
+            regressions.append((name, previous["units"], current["units"], round(ratio, 2)))
+    return regressions
+
+
+def main(command: str = "check", budget_factor: float | None = None) -> int:
+    budget_factor = budget_factor if budget_factor is not None else budget()
+    results = run_suite()
+    if command == "save":
+        save_baseline(results)
+        print(f"Saved {len(results['cases'])} cases to {BASELINE_PATH}")
+        return 0
+
+    baseline = load_baseline()
+    scale = results["calibration_ns"] / baseline["calibration_ns"]
+    print(f"reference workload {results['calibration_ns'] / 1000:.1f} us "
+          f"({scale:.2f}x the baseline machine), budget {budget_factor:g}x")
+    print(f"{'case':<32} {'baseline us':>12} {'current us':>11} {'ratio':>6}")
+    for name, current in results["cases"].items():
+        previous = baseline["cases"].get(name)
+        if previous is None:
+            print(f"{name:<32} {'-':>12} {current['us']:>11.1f}   new")
+            continue
+        ratio = current["units"] / previous["units"]
+        flag = "  REGRESSION" if ratio > budget_factor else ""
+        print(f"{name:<32} {previous['us']:>12.1f} {current['us']:>11.1f} {ratio:>6.2f}{flag}")
+
+    regressions = compare(results, baseline, budget_factor)
+    if regressions:
+        print(f"{len(regressions)} case(s) over the {budget_factor:g}x budget")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(
+        sys.argv[1] if len(sys.argv) > 1 else "check",
+        float(sys.argv[2]) if len(sys.argv) > 2 else None,
+    ))
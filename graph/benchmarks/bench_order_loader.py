@@ -0,0 +1,78 @@
+"""
+Throughput of concurrent tickets with and without order-fetch coalescing.
+
+Runs tickets on a thread pool (as the API does) against the HTTP stub backend,
+started in a separate process with a fixed number of workers, so the backend
+saturates and every request saved is throughput gained.
+Ticket order ids are drawn from a small set of hot orders, so in-flight tickets
+overlap. Reports tickets/s and the number of order requests the backend served.
+
+Usage: python -m graph.benchmarks.bench_order_loader [concurrency] [latency_ms] [backend_workers]
+"""
+import contextlib
+import os
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+from graph.benchmarks.fakes import initial_state
+from graph.benchmarks.stub_backend import StubBackendProcess
+from graph.builder import build_direct_executor
+from graph.loader import BatchLoader
+from graph.nodes import fetch_order
+
+HOT_ORDERS = [f"ORD{1000 + i}" for i in range(20)]
+STUB_PORT = 8765
+
+
+def make_tickets(count: int, seed: int = 7) -> list[str]:
+    rng = random.Random(seed)
+    return [f"My item from {rng.choice(HOT_ORDERS)} arrived broken" for _ in range(count)]
+
+
+def run(tickets: list[str], concurrency: int, latency: float, workers: int, bulk: bool, loader: bool) -> dict:
+    runner = build_direct_executor()
+    fetch_order._bulk_supported.clear()
+    fetch_order.set_order_loader(BatchLoader(fetch_order.fetch_orders, key_fn=str.upper) if loader else None)
+
+    with StubBackendProcess(STUB_PORT, latency=latency, bulk=bulk, workers=workers) as backend, \
+            patch.dict(os.environ, {"BACKEND_URL": backend.url, "TRIAGE_ORDER_LOADER": str(loader).lower()}), \
+            ThreadPoolExecutor(max_workers=concurrency) as pool:
+        start = time.perf_counter()
+        list(pool.map(lambda text: runner.invoke(initial_state(text)), tickets))
+        elapsed = time.perf_counter() - start
+        stats = backend.stats()
+
+    fetch_order.set_order_loader(None)
+    order_requests = sum(n for path, n in stats.items() if path.startswith("/orders/"))
+    return {"tickets_per_s": len(tickets) / elapsed, "order_requests": order_requests}
+
+
+def main(concurrency: int = 32, latency_ms: float = 20.0, workers: int = 4, tickets: int = 400) -> None:
+    texts = make_tickets(tickets)
+    modes = {
+        "no loader": {"bulk": True, "loader": False},
+        "loader, single fetches": {"bulk": False, "loader": True},
+        "loader, bulk endpoint": {"bulk": True, "loader": True},
+    }
+
+    results = {}
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for mode, kwargs in modes.items():
+            results[mode] = run(texts, concurrency, latency_ms / 1000, workers, **kwargs)
+
+    print(f"{tickets} tickets, {concurrency} concurrent, {len(HOT_ORDERS)} hot orders, "
+          f"backend: {latency_ms:.0f} ms per request, {workers} workers")
+    print(f"{'mode':<24} {'tickets/s':>10} {'order requests':>15}")
+    for mode, result in results.items():
+        print(f"{mode:<24} {result['tickets_per_s']:>10.1f} {result['order_requests']:>15}")
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 32,
+        float(sys.argv[2]) if len(sys.argv) > 2 else 20.0,
+        int(sys.argv[3]) if len(sys.argv) > 3 else 4,
+    )
@@ -0,0 +1,75 @@
+"""
+Bytes sent to /classify/issue and kept in messages, for noisy tickets (email threads,
+HTML signatures, pasted logs), with and without preprocessing and request gzip.
+
+Usage: python -m graph.benchmarks.bench_payloads
+"""
+import contextlib
+import json
+import os
+from unittest.mock import patch
+
+from graph import metrics
+from graph.benchmarks.fakes import fake_backend, initial_state
+from graph.builder import build_direct_executor
+
+SIGNATURE = (
+    "<br>--<br><b>Alice Smith</b><br>Senior Buyer, ACME Corp<br>"
+    "<img src='https://acme.example/logo.png'><br><font size=1>This email and any attachments are "
+    "confidential and intended solely for the addressee.</font>"
+)
+
+
+def quoted_thread(depth: int) -> str:
+    parts = []
+    for i in range(depth):
+        parts.append(f"\nOn Mon, Jan {i + 1}, 2025 at 10:0{i} AM Support <support@shop.example> wrote:")
+        parts.extend(f"> Thanks for reaching out, we are checking order status line {j}." for j in range(8))
+    return "\n".join(parts)
+
+
+def pasted_log(lines: int) -> str:
+    return "\n".join(f"2025-01-0{i % 9 + 1}T10:00:{i % 60:02d}Z DEBUG speaker firmware: retry {i} ok" for i in range(lines))
+
+
+TICKETS = {
+    "short": "My speaker is not working ORD1002",
+    "thread": "It is still broken, please send a replacement for ORD1002\n" + quoted_thread(6),
+    "html": f"<html><body><p>The speaker ORD1002 arrived cracked.</p>{SIGNATURE}</body></html>",
+    "log": "Speaker ORD1002 keeps rebooting, log below:\n" + pasted_log(400),
+}
+
+MODES = {
+    "raw": {"TRIAGE_PREPROCESS": "false", "TRIAGE_GZIP_REQUESTS": "false"},
+    "preprocessed": {"TRIAGE_PREPROCESS": "true", "TRIAGE_GZIP_REQUESTS": "false"},
+    "preprocessed+gzip": {"TRIAGE_PREPROCESS": "true", "TRIAGE_GZIP_REQUESTS": "true", "TRIAGE_GZIP_MIN_BYTES": "512"},
+}
+
+
+def measure(ticket_text: str, env: dict) -> tuple[int, int]:
+    """
+    Returns (bytes sent to /classify/issue, bytes of messages in the final state).
+    """
+    metrics.reset()
+    with patch.dict(os.environ, env), fake_backend():
+        result = build_direct_executor().invoke(initial_state(ticket_text))
+    sent = int(metrics.counter("backend.classify.issue.bytes_sent"))
+    return sent, len(json.dumps(result["messages"]))
+
+
+def main() -> None:
+    results = {}
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for ticket, text in TICKETS.items():
+            for mode, env in MODES.items():
+                results[(ticket, mode)] = measure(text, env)
+
+    print("bytes sent to /classify/issue (bytes of messages in state)")
+    print(f"{'ticket':<8} {'chars':>6}" + "".join(f"{mode:>22}" for mode in MODES))
+    for ticket, text in TICKETS.items():
+        cells = "".join(f"{f'{sent} ({kept})':>22}" for sent, kept in (results[(ticket, mode)] for mode in MODES))
+        print(f"{ticket:<8} {len(text):>6}{cells}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Precision and recall of the pre-filter on a labeled sample, plus per-ticket cost.
+"ended" scores the tickets whose run ends (header evidence); "tagged" also counts
+tickets tagged from their body, which are still triaged.
+
+The sample is JSONL with {"label": ..., "text": ...}; label is "ticket" for real
+tickets, or the expected tag ("auto_reply", "bounce", "spam", "empty").
+
+Usage: python -m graph.benchmarks.bench_prefilter [sample.jsonl]
+"""
+import json
+import os
+import sys
+import time
+from collections import Counter
+
+from graph.prefilter import prefilter_ticket
+
+DEFAULT_SAMPLE = os.path.join(os.path.dirname(__file__), "data", "prefilter_sample.jsonl")
+
+
+def load_sample(path: str) -> list[dict]:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def evaluate(sample: list[dict]) -> dict:
+    """
+    Returns per-tag precision/recall, plus overall ("junk" vs "ticket") scores for
+    tagging ("tagged") and for ending the run ("ended", header evidence only).
+    """
+    results = [prefilter_ticket(item["text"]) for item in sample]
+    predicted = [tag or "ticket" for tag, _, _ in results]
+    ended = [ends for _, _, ends in results]
+    labels = [item["label"] for item in sample]
+
+    report = {}
+    for tag in sorted(set(labels) | set(predicted)):
+        if tag == "ticket":
+            continue
+        tp = sum(1 for p, l in zip(predicted, labels) if p == tag and l == tag)
+        fp = sum(1 for p, l in zip(predicted, labels) if p == tag and l != tag)
+        fn = sum(1 for p, l in zip(predicted, labels) if p != tag and l == tag)
+        report[tag] = _scores(tp, fp, fn)
+
+    # Tagged: did we mark junk as junk? Ended: did we end a ticket that needed triage?
+    for name, flagged in (("tagged", [p != "ticket" for p in predicted]), ("ended", ended)):
+        tp = sum(1 for f, l in zip(flagged, labels) if f and l != "ticket")
+        fp = sum(1 for f, l in zip(flagged, labels) if f and l == "ticket")
+        fn = sum(1 for f, l in zip(flagged, labels) if not f and l != "ticket")
+        report[name] = _scores(tp, fp, fn)
+    report["errors"] = [
+        {"label": l, "predicted": p, "ended": e, "text": item["text"][:80]}
+        for p, e, l, item in zip(predicted, ended, labels, sample) if p != l
+    ]
+    return report
+
+
+def _scores(tp: int, fp: int, fn: int) -> dict:
+    return {
+        "precision": tp / (tp + fp) if tp + fp else 1.0,
+        "recall": tp / (tp + fn) if tp + fn else 1.0,
+        "support": tp + fn,
+    }
+
+
+def cost_per_ticket_us(sample: list[dict], rounds: int = 200) -> float:
+    texts = [item["text"] for item in sample]
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for text in texts:
+            prefilter_ticket(text)
+    return (time.perf_counter() - start) / (rounds * len(texts)) * 1e6
+
+
+def main(path: str = DEFAULT_SAMPLE) -> None:
+    sample = load_sample(path)
+    report = evaluate(sample)
+
+    print(f"sample: {len(sample)} tickets {dict(Counter(item['label'] for item in sample))}")
+    print(f"{'tag':<12} {'precision':>10} {'recall':>8} {'support':>8}")
+    for tag, scores in report.items():
+        if tag == "errors":
+            continue
+        print(f"{tag:<12} {scores['precision']:>10.2f} {scores['recall']:>8.2f} {scores['support']:>8}")
+    for error in report["errors"]:
+        ended = " (ended)" if error["ended"] else ""
+        print(f"  miss: expected {error['label']}, got {error['predicted']}{ended}: {error['text']!r}")
+    print(f"cost: {cost_per_ticket_us(sample):.1f} us/ticket")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1] if len(sys.argv) > 1 else DEFAULT_SAMPLE)
@@ -0,0 +1,142 @@
+"""
+Replays a backend traffic capture against the current build: the tickets found in the
+capture (the ticket text of its /classify/issue calls) run through the workflow against the
+replay server, which answers with the recorded responses after their recorded latencies.
+Prints the recorded and the replayed latency per endpoint, and ticket latency.
+
+Without a capture, one is recorded first from an in-process backend with lognormal
+latencies and varied order sizes, to show the record -> replay loop.
+
+Usage: python -m graph.benchmarks.bench_replay [capture.jsonl.gz] [concurrency]
+"""
+import contextlib
+import io
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+from graph.benchmarks.fakes import FakeBackend, initial_state
+from graph.benchmarks.replay_backend import ReplayBackendProcess, summarize
+from graph.builder import build_direct_executor
+from graph.recording import TrafficRecorder, read_capture, set_recorder
+
+REPLAY_PORT = 8766
+# Median and spread of the demo backend's lognormal latency per path, in ms
+DEMO_LATENCY = {
+    "/orders/get": (15, 0.5),
+    "/orders/search": (40, 0.7),
+    "/classify/issue": (60, 0.4),
+    "/reply/draft": (250, 0.6),
+}
+
+
+class ShapedBackend(FakeBackend):
+    """
+    FakeBackend with a lognormal latency per path and orders of varying size.
+    """
+
+    def __init__(self, seed: int = 3):
+        super().__init__()
+        self.rng = random.Random(seed)
+
+    def _wait(self, url: str) -> None:
+        for path, (median, sigma) in DEMO_LATENCY.items():
+            if url.endswith(path):
+                time.sleep(median * self.rng.lognormvariate(0, sigma) / 1000)
+
+    def get(self, url, params=None, **kwargs):
+        self._wait(url)
+        self.extra_fields = self.rng.randint(0, 40)
+        return super().get(url, params=params, **kwargs)
+
+    def post(self, url, json=None, data=None, headers=None, **kwargs):
+        self._wait(url)
+        return super().post(url, json=json, data=data, headers=headers, **kwargs)
+
+
+def record_demo_capture(path: str, tickets: int = 60) -> None:
+    rng = random.Random(5)
+    texts = [
+        rng.choice([
+            f"My speaker from ORD{1000 + rng.randint(0, 30)} stopped working",
+            f"Where is my parcel? customer{rng.randint(0, 20)}@example.com, phone +1 415 555 0{rng.randint(100, 999)}",
+            f"Order ORD{1000 + rng.randint(0, 30)} arrived damaged, please refund",
+        ])
+        for _ in range(tickets)
+    ]
+    recorder = TrafficRecorder(path)
+    set_recorder(recorder)
+    backend = ShapedBackend()
+    runner = build_direct_executor()
+    try:
+        with patch("requests.get", backend.get), patch("requests.post", backend.post), \
+                ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(lambda text: runner.invoke(initial_state(text)), texts))
+    finally:
+        set_recorder(None)
+        recorder.close()
+
+
+def replay(path: str, concurrency: int) -> tuple[list[float], dict]:
+    capture = read_capture(path)
+    texts = [entry["body"]["ticket_text"] for entry in capture if entry["path"] == "/classify/issue"]
+    runner = build_direct_executor()
+    observed = defaultdict(list)
+
+    with ReplayBackendProcess(path, REPLAY_PORT) as backend, \
+            patch.dict(os.environ, {"BACKEND_URL": backend.url}), \
+            ThreadPoolExecutor(max_workers=concurrency) as pool:
+        # The replayed calls are recorded too, to compare their latencies with the capture
+        with tempfile.TemporaryDirectory() as directory:
+            replayed_path = os.path.join(directory, "replayed.jsonl.gz")
+            recorder = TrafficRecorder(replayed_path, redactors=())
+            set_recorder(recorder)
+
+            def run(text):
+                start = time.perf_counter()
+                runner.invoke(initial_state(text))
+                return (time.perf_counter() - start) * 1000
+
+            try:
+                latencies = list(pool.map(run, texts))
+            finally:
+                set_recorder(None)
+                recorder.close()
+            for entry in read_capture(replayed_path):
+                observed[entry["path"]].append(entry["elapsed_ms"])
+        stats = backend.stats()
+
+    return latencies, {"observed": observed, "server": stats, "recorded": summarize(capture)}
+
+
+def main(capture_path: str | None = None, concurrency: int = 8) -> None:
+    with tempfile.TemporaryDirectory() as directory, contextlib.redirect_stdout(io.StringIO()):
+        if capture_path is None:
+            capture_path = os.path.join(directory, "demo_capture.jsonl.gz")
+            record_demo_capture(capture_path)
+        size = os.path.getsize(capture_path)
+        calls = len(read_capture(capture_path))
+        latencies, result = replay(capture_path, concurrency)
+
+    print(f"capture: {calls} backend calls, {size / calls:.0f} bytes/call gzipped; "
+          f"{len(latencies)} tickets replayed on {concurrency} threads")
+    print(f"{'path':<16} {'recorded p50':>13} {'replayed p50':>13} {'recorded p99':>13} {'replayed p99':>13}")
+    for path, recorded in result["recorded"].items():
+        replayed = sorted(result["observed"].get(path, [0.0]))
+        print(f"{path:<16} {recorded['p50_ms']:>13.1f} {statistics.median(replayed):>13.1f} "
+              f"{recorded['p99_ms']:>13.1f} {replayed[int(len(replayed) * 0.99)]:>13.1f}")
+    exact = result["server"]["exact"]
+    served = sum(result["server"]["requests"].values())
+    latencies.sort()
+    print(f"ticket latency p50 {statistics.median(latencies):.1f} ms, p99 {latencies[int(len(latencies) * 0.99)]:.1f} ms; "
+          f"{exact}/{served} requests matched a recorded request exactly")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1] if len(sys.argv) > 1 else None, int(sys.argv[2]) if len(sys.argv) > 2 else 8)
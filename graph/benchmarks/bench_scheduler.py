@@ -0,0 +1,68 @@
+"""
+Wait time of tickets from quiet tenants while one tenant bulk-submits a backlog, with runs
+admitted first come first served (one shared queue) or by the per-tenant fair scheduler.
+Each run takes a fixed 20 ms on the event loop's executor, like a workflow waiting on the backend.
+
+Usage: python -m graph.benchmarks.bench_scheduler [noisy_tickets]
+"""
+import asyncio
+import statistics
+import sys
+import time
+
+from app.scheduler import FairScheduler
+
+CONCURRENCY = 16
+RUN_SECONDS = 0.02
+QUIET_TENANTS = 5
+QUIET_INTERVAL = 0.05
+QUIET_TICKETS = 20
+
+
+async def scenario(scheduler: FairScheduler, key, noisy_tickets: int) -> dict:
+    waits = {"noisy": [], "quiet": []}
+    loop = asyncio.get_running_loop()
+
+    async def ticket(kind: str, tenant: str):
+        queued = time.perf_counter()
+        async with scheduler.slot(key(tenant)):
+            waits[kind].append((time.perf_counter() - queued) * 1000)
+            await loop.run_in_executor(None, time.sleep, RUN_SECONDS)
+
+    async def quiet_tenant(i: int):
+        tasks = []
+        for _ in range(QUIET_TICKETS):
+            tasks.append(asyncio.create_task(ticket("quiet", f"quiet{i}.example")))
+            await asyncio.sleep(QUIET_INTERVAL)
+        await asyncio.gather(*tasks)
+
+    start = time.perf_counter()
+    noisy = [asyncio.create_task(ticket("noisy", "bulk.example")) for _ in range(noisy_tickets)]
+    await asyncio.gather(*(quiet_tenant(i) for i in range(QUIET_TENANTS)), *noisy)
+    elapsed = time.perf_counter() - start
+
+    result = {"elapsed": elapsed}
+    for kind, values in waits.items():
+        values.sort()
+        result[kind] = (statistics.median(values), values[int(len(values) * 0.99)])
+    return result
+
+
+def main(noisy_tickets: int = 2000) -> None:
+    modes = {
+        # One shared queue: every ticket is the same tenant
+        "fifo": (FairScheduler(concurrency=CONCURRENCY, tenant_concurrency=CONCURRENCY), lambda tenant: "all"),
+        "fair": (FairScheduler(concurrency=CONCURRENCY, tenant_concurrency=CONCURRENCY // 2), lambda tenant: tenant),
+    }
+    print(f"{noisy_tickets} tickets from one tenant at once, {QUIET_TENANTS} tenants sending one ticket every "
+          f"{QUIET_INTERVAL * 1000:.0f} ms, {CONCURRENCY} concurrent runs of {RUN_SECONDS * 1000:.0f} ms")
+    print(f"{'admission':<10} {'quiet p50 ms':>13} {'quiet p99 ms':>13} {'noisy p50 ms':>13} {'noisy p99 ms':>13} "
+          f"{'total s':>8}")
+    for mode, (scheduler, key) in modes.items():
+        r = asyncio.run(scenario(scheduler, key, noisy_tickets))
+        print(f"{mode:<10} {r['quiet'][0]:>13.1f} {r['quiet'][1]:>13.1f} {r['noisy'][0]:>13.1f} "
+              f"{r['noisy'][1]:>13.1f} {r['elapsed']:>8.2f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
@@ -0,0 +1,83 @@
+"""
+Backend calls and cross-worker hit rate with several worker processes, for each
+shared cache backend (none, per-process LRU, SQLite file, memcached stand-in).
+
+Each worker triages tickets drawn from the same set of repeat tickets, against
+the in-process fake backend, so every backend call avoided is a cache hit.
+
+Usage: python -m graph.benchmarks.bench_shared_cache [workers] [tickets_per_worker]
+"""
+import contextlib
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+
+from graph.benchmarks.fakes import fake_backend, initial_state
+from graph.benchmarks.memcached_stub import MemcachedStub
+
+DISTINCT_TICKETS = 50
+
+
+def worker(args) -> dict:
+    env, worker_index, tickets = args
+    os.environ.update(env)
+
+    from graph import shared_cache
+    from graph.builder import build_direct_executor
+
+    shared_cache.WORKER_ID = f"bench-worker-{worker_index}"
+    shared_cache.set_shared_cache(None)
+    runner = build_direct_executor()
+    rng = random.Random(worker_index)
+
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull), fake_backend() as backend:
+        start = time.perf_counter()
+        for _ in range(tickets):
+            order = 1000 + rng.randrange(DISTINCT_TICKETS)
+            runner.invoke(initial_state(f"My speaker from ORD{order} stopped working"))
+        elapsed = time.perf_counter() - start
+
+    cache = shared_cache.get_shared_cache()
+    stats = cache.stats() if cache else {"hits": 0, "cross_worker_hits": 0}
+    return {"calls": backend.calls, "elapsed": elapsed, **stats}
+
+
+def run(env: dict, workers: int, tickets: int) -> dict:
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(workers) as pool:
+        results = pool.map(worker, [(env, i, tickets) for i in range(workers)])
+    lookups = sum(r.get("hits", 0) + r.get("misses", 0) for r in results)
+    return {
+        "calls": sum(r["calls"] for r in results),
+        "hit_rate": sum(r["hits"] for r in results) / lookups if lookups else 0.0,
+        "cross_worker_hit_rate": sum(r["cross_worker_hits"] for r in results) / lookups if lookups else 0.0,
+        "ms_per_ticket": 1000 * sum(r["elapsed"] for r in results) / (workers * tickets),
+    }
+
+
+def main(workers: int = 4, tickets: int = 200) -> None:
+    with tempfile.TemporaryDirectory() as directory, MemcachedStub() as memcached:
+        host, port = memcached.address
+        modes = {
+            "none": {"TRIAGE_CACHE_BACKEND": "none"},
+            "local": {"TRIAGE_CACHE_BACKEND": "local"},
+            "sqlite": {"TRIAGE_CACHE_BACKEND": "sqlite",
+                       "TRIAGE_CACHE_SQLITE_PATH": os.path.join(directory, "cache.sqlite3")},
+            "memcached": {"TRIAGE_CACHE_BACKEND": "memcached", "TRIAGE_CACHE_MEMCACHED": f"{host}:{port}"},
+        }
+        results = {mode: run(env, workers, tickets) for mode, env in modes.items()}
+
+    print(f"{workers} workers x {tickets} tickets, {DISTINCT_TICKETS} distinct tickets")
+    print(f"{'backend':<10} {'backend calls':>14} {'hit rate':>9} {'cross-worker':>13} {'ms/ticket':>10}")
+    for mode, r in results.items():
+        print(f"{mode:<10} {r['calls']:>14} {r['hit_rate']:>9.2f} {r['cross_worker_hit_rate']:>13.2f} {r['ms_per_ticket']:>10.3f}")
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 4,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 200,
+    )
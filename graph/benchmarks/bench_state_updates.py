@@ -0,0 +1,102 @@
+"""
+Time and memory per ticket for full-state vs partial-update nodes, with large evidence payloads.
+
+"full-state" re-creates the old node contract: every node returns the whole TriageState
+(with the complete messages list), so the StateGraph re-writes every channel each step.
+"partial" is the current contract: nodes return only the keys they change and
+messages are appended by the reducer.
+
+Usage: python -m graph.benchmarks.bench_state_updates [iterations]
+"""
+import contextlib
+import os
+import sys
+import time
+import tracemalloc
+from typing import TypedDict
+
+from langgraph.graph import StateGraph
+
+from graph.benchmarks.fakes import fake_backend, initial_state
+from graph.builder import CONDITIONAL_EDGES, EDGES, ENTRY_POINT, NODES, build_graph
+
+SCENARIOS = {
+    # ticket text, fake backend settings
+    "order, 2k-field evidence": ("My speaker is not working ORD1002", {"extra_fields": 2000}),
+    "email, 50 matches": ("Where is my order? alice@example.com", {"orders_for_email": 50, "extra_fields": 200}),
+}
+
+
+class FullState(TypedDict):
+    messages: list
+    ticket_text: str
+    order_id: str | None
+    customer_email: str | None
+    issue_type: str | None
+    evidence: dict | None
+    recommendation: str | None
+
+
+def full_state_node(node):
+    """
+    Adapts a partial-update node to the old contract of returning the entire state.
+    """
+    def run(state):
+        full = dict(state)
+        for key, value in node(state).items():
+            full[key] = state["messages"] + value if key == "messages" else value
+        return full
+    return run
+
+
+def build_full_state_graph():
+    graph_agent = StateGraph(FullState)
+    for name, node in NODES.items():
+        graph_agent.add_node(name, full_state_node(node))
+    graph_agent.set_entry_point(ENTRY_POINT)
+    for source, (router, path_map) in CONDITIONAL_EDGES.items():
+        # Unannotated wrapper, so LangGraph does not pick up TriageState from the router's hints
+        graph_agent.add_conditional_edges(source, lambda state, router=router: router(state), path_map)
+    for source, target in EDGES.items():
+        graph_agent.add_edge(source, target)
+    return graph_agent.compile()
+
+
+def measure(graph, ticket_text: str, iterations: int) -> tuple[float, float]:
+    """
+    Returns (mean microseconds per ticket, mean peak KiB allocated per ticket).
+    """
+    for _ in range(min(20, iterations)):
+        graph.invoke(initial_state(ticket_text))
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        graph.invoke(initial_state(ticket_text))
+    elapsed_us = (time.perf_counter() - start) / iterations * 1e6
+
+    peaks = []
+    tracemalloc.start()
+    for _ in range(min(50, iterations)):
+        tracemalloc.reset_peak()
+        baseline, _ = tracemalloc.get_traced_memory()
+        graph.invoke(initial_state(ticket_text))
+        peaks.append(tracemalloc.get_traced_memory()[1] - baseline)
+    tracemalloc.stop()
+
+    return elapsed_us, sum(peaks) / len(peaks) / 1024
+
+
+def main(iterations: int = 300) -> None:
+    graphs = {"full-state": build_full_state_graph(), "partial": build_graph()}
+
+    print(f"{'scenario':<26} {'contract':<11} {'us/ticket':>10} {'peak KiB/ticket':>16}")
+    for scenario, (ticket_text, backend_kwargs) in SCENARIOS.items():
+        with fake_backend(**backend_kwargs), open(os.devnull, "w") as devnull:
+            for name, graph in graphs.items():
+                with contextlib.redirect_stdout(devnull):
+                    elapsed_us, peak_kib = measure(graph, ticket_text, iterations)
+                print(f"{scenario:<26} {name:<11} {elapsed_us:>10.1f} {peak_kib:>16.1f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 300)
@@ -0,0 +1,59 @@
+"""
+Reply latency and /reply/draft calls with and without local reply templates
+(TRIAGE_REPLY_TEMPLATES), on a ticket mix where shipping questions about delivered
+orders are formulaic and refunds (no shipped template) and defects still need a drafted reply.
+
+Usage: python -m graph.benchmarks.bench_templates [backend_latency_ms]
+"""
+import contextlib
+import io
+import os
+import statistics
+import sys
+import time
+from unittest.mock import patch
+
+from graph.benchmarks.fakes import fake_backend, initial_state
+from graph.builder import build_direct_executor
+from graph.templates import DEFAULT_DIRECTORY, TemplateEngine, set_template_engine
+
+# issue_type answered by the fake classifier -> tickets per round
+MIX = {"shipping": 5, "refund": 2, "defective": 3}
+ROUNDS = 10
+
+
+def run(enabled: bool, latency_ms: float) -> tuple[list[float], int, TemplateEngine]:
+    engine = TemplateEngine.from_directory(DEFAULT_DIRECTORY)
+    set_template_engine(engine)
+    runner = build_direct_executor()
+    latencies = []
+    drafts = 0
+    env = {"TRIAGE_REPLY_TEMPLATES": "true" if enabled else "false"}
+    with patch.dict(os.environ, env), contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(ROUNDS):
+            for issue_type, tickets in MIX.items():
+                with fake_backend(issue_type=issue_type, latency=latency_ms / 1000) as backend:
+                    for _ in range(tickets):
+                        start = time.perf_counter()
+                        runner.invoke(initial_state(f"Question about my order ORD1002 ({issue_type})"))
+                        latencies.append((time.perf_counter() - start) * 1000)
+                drafts += backend.paths["/reply/draft"]
+    set_template_engine(None)
+    return latencies, drafts, engine
+
+
+def main(latency_ms: float = 50.0) -> None:
+    print(f"backend latency {latency_ms:.0f} ms per call, {ROUNDS * sum(MIX.values())} tickets "
+          f"({', '.join(f'{issue} {n}' for issue, n in MIX.items())} per round)")
+    print(f"{'templates':<10} {'p50 ms':>8} {'mean ms':>8} {'/reply/draft calls':>19} {'hit rate':>9} {'saved ms':>9}")
+    for enabled in (False, True):
+        latencies, drafts, engine = run(enabled, latency_ms)
+        stats = engine.stats()
+        hit_rate = f"{stats['hit_rate']:.0%}" if enabled else "-"
+        saved = f"{stats['saved_ms_estimate']:.0f}" if enabled else "-"
+        print(f"{'on' if enabled else 'off':<10} {statistics.median(latencies):>8.1f} {statistics.mean(latencies):>8.1f} "
+              f"{drafts:>19} {hit_rate:>9} {saved:>9}")
+
+
+if __name__ == "__main__":
+    main(float(sys.argv[1]) if len(sys.argv) > 1 else 50.0)
@@ -0,0 +1,84 @@
+"""
+The first tickets after a restart, cold and with TRIAGE_WARM_CACHE: a warm-up run fills
+the caches, they are saved as on shutdown, and then the same ticket mix runs against
+empty caches (cold) and against caches loaded from the snapshot (warm). Prints latency
+and backend calls per ticket of the first tickets, and the snapshot save/load cost.
+
+Usage: python -m graph.benchmarks.bench_warmup [backend_latency_ms] [customers]
+"""
+import contextlib
+import io
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from unittest.mock import patch
+
+from graph.benchmarks.fakes import fake_backend, initial_state
+from graph.builder import build_direct_executor
+from graph.cache import set_email_cache
+from graph.nodes.fetch_order import set_order_cache
+from graph.shared_cache import LocalCacheBackend, SharedCache, set_shared_cache
+from graph.warmup import load_warm_caches, save_warm_caches
+
+ENV = {"TRIAGE_ORDER_SWR": "true", "TRIAGE_EMAIL_CACHE": "true"}
+TICKETS = 200
+
+
+def tickets(customers: int, seed: int) -> list[str]:
+    rng = random.Random(seed)
+    return [
+        rng.choice([
+            "My speaker from ORD{} stopped working",
+            "Order ORD{} arrived damaged, please refund",
+        ]).format(1000 + rng.randrange(customers))
+        for _ in range(TICKETS)
+    ]
+
+
+def empty_caches() -> None:
+    set_order_cache(None)
+    set_email_cache(None)
+    set_shared_cache(SharedCache(LocalCacheBackend()))
+
+
+def run(texts: list[str], latency_ms: float) -> tuple[list[float], int]:
+    runner = build_direct_executor()
+    latencies = []
+    with fake_backend(latency=latency_ms / 1000) as backend:
+        for ticket_text in texts:
+            start = time.perf_counter()
+            runner.invoke(initial_state(ticket_text))
+            latencies.append((time.perf_counter() - start) * 1000)
+    return latencies, backend.calls
+
+
+def main(latency_ms: float = 20.0, customers: int = 100) -> None:
+    with tempfile.TemporaryDirectory() as directory, patch.dict(os.environ, ENV), \
+            contextlib.redirect_stdout(io.StringIO()):
+        path = os.path.join(directory, "warm.bin")
+        empty_caches()
+        run(tickets(customers, seed=1), latency_ms)
+        saved = save_warm_caches(path)
+
+        empty_caches()
+        cold = run(tickets(customers, seed=2), latency_ms)
+        empty_caches()
+        loaded = load_warm_caches(path)
+        warm = run(tickets(customers, seed=2), latency_ms)
+        set_shared_cache(None)
+
+    print(f"backend latency {latency_ms:.0f} ms per call, first {TICKETS} tickets after a restart "
+          f"({customers} distinct orders)")
+    print(f"snapshot {saved['bytes']} bytes, saved in {saved['ms']:.1f} ms, "
+          f"loaded {sum(loaded['loaded'].values())} entries in {loaded['ms']:.1f} ms")
+    print(f"{'start':<6} {'p50 ms':>8} {'mean ms':>8} {'backend calls/ticket':>21}")
+    for name, (latencies, calls) in (("cold", cold), ("warm", warm)):
+        print(f"{name:<6} {statistics.median(latencies):>8.1f} {statistics.mean(latencies):>8.1f} "
+              f"{calls / len(latencies):>21.2f}")
+
+
+if __name__ == "__main__":
+    main(float(sys.argv[1]) if len(sys.argv) > 1 else 20.0, int(sys.argv[2]) if len(sys.argv) > 2 else 100)
@@ -0,0 +1,121 @@
+import gzip
+import json as jsonlib
+import time
+from collections import Counter
+from contextlib import contextmanager
+from urllib.parse import urlparse
+from unittest.mock import patch
+
+
+class FakeClock:
+    """
+    Clock for code that takes a clock callable; tests move time by setting `now`.
+    """
+
+    def __init__(self, now: float = 0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class FakeResponse:
+    """
+    Minimal stand-in for requests.Response.
+    """
+
+    def __init__(self, payload, status_code: int = 200):
+        self._payload = payload
+        self.status_code = status_code
+
+    def json(self):
+        return self._payload
+
+    def raise_for_status(self):
+        pass
+
+
+def make_order(order_id: str, extra_fields: int = 0) -> dict:
+    order = {
+        "order_id": order_id,
+        "customer_name": "Alice",
+        "email": "alice@example.com",
+        "product": "Bluetooth Speaker",
+        "status": "delivered",
+    }
+    for i in range(extra_fields):
+        order[f"field_{i}"] = f"value-{i}" * 4
+    return order
+
+
+class FakeBackend:
+    """
+    In-process backend that answers the four endpoints the nodes call,
+    with no network. Used to isolate workflow overhead; latency (seconds per call)
+    simulates a remote backend. bulk=False answers /orders/bulk with a 404.
+    """
+
+    def __init__(self, issue_type: str = "defective", orders_for_email: int = 1, extra_fields: int = 0,
+                 latency: float = 0.0, bulk: bool = False):
+        self.issue_type = issue_type
+        self.orders_for_email = orders_for_email
+        self.extra_fields = extra_fields
+        self.latency = latency
+        self.bulk = bulk
+        self.calls = 0
+        # Calls per endpoint path, e.g. paths["/orders/search"]
+        self.paths = Counter()
+
+    def get(self, url, params=None, **kwargs):
+        self.calls += 1
+        self.paths[urlparse(url).path] += 1
+        if self.latency:
+            time.sleep(self.latency)
+        params = params or {}
+        if url.endswith("/orders/bulk"):
+            if not self.bulk:
+                return FakeResponse({"detail": "Not Found"}, status_code=404)
+            orders = [make_order(order_id, self.extra_fields) for order_id in params["order_ids"].split(",")]
+            return FakeResponse({"orders": orders})
+        if url.endswith("/orders/get"):
+            return FakeResponse(make_order(params["order_id"], self.extra_fields))
+        if url.endswith("/orders/search"):
+            results = [make_order(f"ORD{1000 + i}", self.extra_fields) for i in range(self.orders_for_email)]
+            return FakeResponse({"results": results})
+        raise ValueError(f"Unexpected GET {url}")
+
+    def post(self, url, json=None, data=None, headers=None, **kwargs):
+        self.calls += 1
+        self.paths[urlparse(url).path] += 1
+        if json is None and data is not None:
+            if (headers or {}).get("Content-Encoding") == "gzip":
+                data = gzip.decompress(data)
+            json = jsonlib.loads(data)
+        if self.latency:
+            time.sleep(self.latency)
+        if url.endswith("/classify/issue"):
+            return FakeResponse({"issue_type": self.issue_type})
+        if url.endswith("/reply/draft"):
+            return FakeResponse({"reply_text": f"Reply for {json.get('issue_type')}"})
+        raise ValueError(f"Unexpected POST {url}")
+
+
+@contextmanager
+def fake_backend(**kwargs):
+    """
+    Patches requests.get/requests.post with a FakeBackend for the duration of the block.
+    """
+    backend = FakeBackend(**kwargs)
+    with patch("requests.get", backend.get), patch("requests.post", backend.post):
+        yield backend
+
+
+def initial_state(ticket_text: str) -> dict:
+    return {
+        "ticket_text": ticket_text,
+        "order_id": None,
+        "messages": [],
+        "issue_type": None,
+        "evidence": None,
+        "recommendation": None
+    }
@@ -0,0 +1,99 @@
+"""
+Local stand-in for memcached (get/set/delete of the text protocol, with expiry),
+for tests and benchmarks of MemcachedCacheBackend without a memcached install.
+
+Usage: python -m graph.benchmarks.memcached_stub [port]
+"""
+import socketserver
+import sys
+import threading
+import time
+
+
+class MemcachedStub:
+    """
+    Threaded TCP server speaking enough of the memcached text protocol for graph/shared_cache.py.
+    Use as a context manager; address is (host, port) once started.
+    """
+
+    def __init__(self, port: int = 0):
+        self._data = {}
+        self._lock = threading.Lock()
+        self._server = socketserver.ThreadingTCPServer(("127.0.0.1", port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def address(self) -> tuple[str, int]:
+        return self._server.server_address[:2]
+
+    def start(self) -> "MemcachedStub":
+        self._thread = threading.Thread(target=self._server.serve_forever, args=(0.05,), name="memcached-stub", daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self) -> None:
+        self._server.serve_forever()
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _handler(self):
+        stub = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                while True:
+                    line = self.rfile.readline()
+                    if not line:
+                        return
+                    parts = line.split()
+                    if not parts:
+                        continue
+                    command = parts[0]
+                    if command == b"get":
+                        self._get(parts[1:])
+                    elif command == b"set":
+                        key, _, ttl, size = parts[1:5]
+                        value = self.rfile.read(int(size) + 2)[:-2]
+                        with stub._lock:
+                            stub._data[key] = (time.time() + int(ttl) if int(ttl) else None, value)
+                        self.wfile.write(b"STORED\r\n")
+                    elif command == b"delete":
+                        with stub._lock:
+                            found = stub._data.pop(parts[1], None) is not None
+                        self.wfile.write(b"DELETED\r\n" if found else b"NOT_FOUND\r\n")
+                    else:
+                        self.wfile.write(b"ERROR\r\n")
+
+            def _get(self, keys):
+                out = []
+                with stub._lock:
+                    for key in keys:
+                        entry = stub._data.get(key)
+                        if entry is None:
+                            continue
+                        expires, value = entry
+                        if expires is not None and expires <= time.time():
+                            del stub._data[key]
+                            continue
+                        out.append(b"VALUE %s 0 %d\r\n%s\r\n" % (key, len(value), value))
+                self.wfile.write(b"".join(out) + b"END\r\n")
+
+        return Handler
+
+
+if __name__ == "__main__":
+    stub = MemcachedStub(int(sys.argv[1]) if len(sys.argv) > 1 else 11211)
+    print(f"Memcached stand-in on {stub.address[0]}:{stub.address[1]}")
+    try:
+        stub.serve_forever()
+    except KeyboardInterrupt:
+        stub.stop()
@@ -0,0 +1,192 @@
+"""
+Serves a backend traffic capture (recorded with TRIAGE_RECORD_PATH, see graph/recording.py)
+over HTTP, answering each request with a recorded response after its recorded latency.
+
+A request is answered by the capture entries with the same method, path and (redacted)
+params/body, in turn; a request that was never recorded gets the entries of its path in
+turn, so a new build that sends slightly different payloads still sees the recorded latency
+and payload-size distribution. `speed` divides the latencies (2 = twice as fast).
+GET /stats returns the number of requests served per path and how many matched exactly.
+
+Usage: python -m graph.benchmarks.replay_backend capture.jsonl.gz [port] [speed]
+"""
+import gzip
+import itertools
+import json
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import requests
+
+from graph.recording import read_capture
+
+
+def request_key(method: str, path: str, params, body) -> tuple:
+    return method.lower(), path, json.dumps(params or None, sort_keys=True), json.dumps(body, sort_keys=True)
+
+
+class ReplayBackend:
+    """
+    Threaded HTTP server replaying a capture. Use as a context manager; url is set once started.
+    """
+
+    def __init__(self, entries: list[dict], port: int = 0, speed: float = 1.0):
+        self.speed = speed
+        self.requests = Counter()
+        self.exact = 0
+        self._lock = threading.Lock()
+        by_key = defaultdict(list)
+        by_path = defaultdict(list)
+        for entry in entries:
+            by_key[request_key(entry["method"], entry["path"], entry["params"], entry["body"])].append(entry)
+            by_path[(entry["method"], entry["path"])].append(entry)
+        self._by_key = {key: itertools.cycle(matches) for key, matches in by_key.items()}
+        self._by_path = {key: itertools.cycle(matches) for key, matches in by_path.items()}
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "ReplayBackend":
+        self._thread = threading.Thread(target=self._server.serve_forever, args=(0.05,), name="replay-backend", daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self) -> None:
+        self._server.serve_forever()
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def match(self, method: str, path: str, params, body) -> dict | None:
+        """
+        The next recorded entry for this request (exact match first, then same path).
+        """
+        with self._lock:
+            self.requests[path] += 1
+            exact = self._by_key.get(request_key(method, path, params, body))
+            if exact is not None:
+                self.exact += 1
+                return next(exact)
+            same_path = self._by_path.get((method, path))
+            return next(same_path) if same_path is not None else None
+
+    def _handler(self):
+        replay = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                if url.path == "/stats":
+                    with replay._lock:
+                        return self._send(200, {"requests": dict(replay.requests), "exact": replay.exact})
+                params = {key: values[0] for key, values in parse_qs(url.query).items()}
+                self._replay(replay.match("get", url.path, params, None))
+
+            def do_POST(self):
+                data = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                if self.headers.get("Content-Encoding") == "gzip":
+                    data = gzip.decompress(data)
+                self._replay(replay.match("post", self.path, None, json.loads(data or b"null")))
+
+            def _replay(self, entry: dict | None):
+                if entry is None:
+                    return self._send(404, {"detail": "Not recorded"})
+                time.sleep(entry["elapsed_ms"] / 1000 / replay.speed)
+                self._send(entry["status"], entry["response"])
+
+            def _send(self, status: int, payload):
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+class ReplayBackendProcess:
+    """
+    Runs the replay server in a child process, so it does not share the GIL with the
+    client being measured. Use as a context manager; stats() returns requests per path.
+    """
+
+    def __init__(self, capture_path: str, port: int, speed: float = 1.0):
+        self.url = f"http://127.0.0.1:{port}"
+        self._args = [sys.executable, "-m", "graph.benchmarks.replay_backend", capture_path, str(port), str(speed)]
+        self._process = None
+
+    def __enter__(self):
+        self._process = subprocess.Popen(self._args, stdout=subprocess.DEVNULL)
+        for _ in range(100):
+            try:
+                requests.get(f"{self.url}/stats", timeout=1)
+                return self
+            except requests.exceptions.ConnectionError:
+                time.sleep(0.05)
+        self._process.kill()
+        raise RuntimeError(f"Replay backend did not start on {self.url}")
+
+    def __exit__(self, *exc):
+        self._process.terminate()
+        self._process.wait()
+
+    def stats(self) -> dict:
+        return requests.get(f"{self.url}/stats").json()
+
+
+def summarize(entries: list[dict]) -> dict:
+    """
+    Calls, latency and response-size distribution per endpoint path of a capture.
+    """
+    by_path = defaultdict(list)
+    for entry in entries:
+        by_path[entry["path"]].append(entry)
+    summary = {}
+    for path, calls in sorted(by_path.items()):
+        latencies = sorted(entry["elapsed_ms"] for entry in calls)
+        sizes = [entry["response_bytes"] for entry in calls]
+        summary[path] = {
+            "calls": len(calls),
+            "p50_ms": round(statistics.median(latencies), 3),
+            "p99_ms": round(latencies[int(len(latencies) * 0.99)], 3),
+            "mean_response_bytes": round(statistics.mean(sizes)),
+        }
+    return summary
+
+
+if __name__ == "__main__":
+    capture = read_capture(sys.argv[1])
+    port = int(sys.argv[2]) if len(sys.argv) > 2 else 8000
+    speed = float(sys.argv[3]) if len(sys.argv) > 3 else 1.0
+    for path, stats in summarize(capture).items():
+        print(f"{path:<18} {stats}")
+    backend = ReplayBackend(capture, port=port, speed=speed)
+    print(f"Replaying {len(capture)} backend calls on {backend.url} (speed x{speed:g})")
+    try:
+        backend.serve_forever()
+    except KeyboardInterrupt:
+        backend.stop()
@@ -0,0 +1,175 @@
+"""
+Stub of the backend service over real HTTP, for benchmarks that need concurrency
+and sockets (the in-process FakeBackend patches requests instead).
+
+Serves /orders/get, /orders/bulk, /orders/search, /classify/issue and /reply/draft
+with a fixed latency per request, and at most `workers` requests in service at once
+(0 = unlimited), to model a backend with limited capacity. /orders/bulk answers 404 when bulk=False.
+GET /stats returns the number of requests served per path.
+
+Usage: python -m graph.benchmarks.stub_backend [port] [latency_ms] [bulk|nobulk] [workers]
+"""
+import gzip
+import json
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import requests
+
+from graph.benchmarks.fakes import make_order
+
+
+class StubBackend:
+    """
+    Threaded HTTP stub of the backend. Use as a context manager; url is set once started.
+    """
+
+    def __init__(self, port: int = 0, latency: float = 0.0, bulk: bool = True, issue_type: str = "defective",
+                 workers: int = 0):
+        self.latency = latency
+        self.slots = threading.BoundedSemaphore(workers) if workers else None
+        self.bulk = bulk
+        self.issue_type = issue_type
+        self.requests = Counter()
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "StubBackend":
+        self._thread = threading.Thread(target=self._server.serve_forever, args=(0.05,), name="stub-backend", daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self) -> None:
+        self._server.serve_forever()
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def count(self, path: str) -> None:
+        with self._lock:
+            self.requests[path] += 1
+
+    def serve(self) -> None:
+        """
+        Simulates the time a request spends in service.
+        """
+        if self.slots is None:
+            time.sleep(self.latency)
+            return
+        with self.slots:
+            time.sleep(self.latency)
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                params = {key: values[0] for key, values in parse_qs(url.query).items()}
+                if url.path == "/stats":
+                    with stub._lock:
+                        return self._send(200, dict(stub.requests))
+                stub.count(url.path)
+                stub.serve()
+
+                if url.path == "/orders/get":
+                    self._send(200, make_order(params["order_id"]))
+                elif url.path == "/orders/bulk" and stub.bulk:
+                    self._send(200, {"orders": [make_order(order_id) for order_id in params["order_ids"].split(",")]})
+                elif url.path == "/orders/search":
+                    self._send(200, {"results": [make_order("ORD1000")]})
+                else:
+                    self._send(404, {"detail": "Not Found"})
+
+            def do_POST(self):
+                data = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                if self.headers.get("Content-Encoding") == "gzip":
+                    data = gzip.decompress(data)
+                body = json.loads(data or b"{}")
+                stub.count(self.path)
+                stub.serve()
+
+                if self.path == "/classify/issue":
+                    self._send(200, {"issue_type": stub.issue_type})
+                elif self.path == "/reply/draft":
+                    self._send(200, {"reply_text": f"Reply for {body.get('issue_type')}"})
+                else:
+                    self._send(404, {"detail": "Not Found"})
+
+            def _send(self, status: int, payload: dict):
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+class StubBackendProcess:
+    """
+    Runs the stub in a child process, so it does not share the GIL with the client
+    being measured. Use as a context manager; stats() returns requests per path.
+    """
+
+    def __init__(self, port: int, latency: float = 0.0, bulk: bool = True, workers: int = 0):
+        self.url = f"http://127.0.0.1:{port}"
+        self._args = [sys.executable, "-m", "graph.benchmarks.stub_backend",
+                      str(port), str(latency * 1000), "bulk" if bulk else "nobulk", str(workers)]
+        self._process = None
+
+    def __enter__(self):
+        self._process = subprocess.Popen(self._args, stdout=subprocess.DEVNULL)
+        for _ in range(100):
+            try:
+                requests.get(f"{self.url}/stats", timeout=1)
+                return self
+            except requests.exceptions.ConnectionError:
+                time.sleep(0.05)
+        self._process.kill()
+        raise RuntimeError(f"Stub backend did not start on {self.url}")
+
+    def __exit__(self, *exc):
+        self._process.terminate()
+        self._process.wait()
+
+    def stats(self) -> dict:
+        return requests.get(f"{self.url}/stats").json()
+
+
+if __name__ == "__main__":
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8000
+    latency_ms = float(sys.argv[2]) if len(sys.argv) > 2 else 0.0
+    bulk = sys.argv[3] != "nobulk" if len(sys.argv) > 3 else True
+    workers = int(sys.argv[4]) if len(sys.argv) > 4 else 0
+    backend = StubBackend(port=port, latency=latency_ms / 1000, bulk=bulk, workers=workers)
+    print(f"Stub backend on {backend.url} ({latency_ms:.0f} ms latency)")
+    try:
+        backend.serve_forever()
+    except KeyboardInterrupt:
+        backend.stop()
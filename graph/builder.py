@@ -1,12 +1,30 @@
+import os
+
 from langgraph.graph import StateGraph, END
 
 from graph.TriageState import TriageState
+from graph.checkpoints import CheckpointingRunner, checkpoints_enabled, checkpointed_node
+from graph.executor import DirectExecutor
+from graph.nodes.await_approval import await_approval_node
 from graph.nodes.ingest import ingest_node
 from graph.nodes.classify import classify_node
+from graph.nodes.dedupe import dedupe_node
 from graph.nodes.fetch_order import fetch_order_node
 from graph.nodes.draft_reply import draft_reply_node
 from graph.nodes.no_order_id import no_order_id_node
+from graph.nodes.prefilter import prefilter_node
+from graph.nodes.preprocess import preprocess_node
 from graph.nodes.search_orders import search_orders_node
+from graph.tracing import traced_node
+
+
+def route_after_prefilter(state: TriageState) -> str:
+    """
+    Route after the pre-filter: tagged tickets (auto-replies, bounces, spam) end here.
+    """
+    if state.get("ticket_tag"):
+        return "end"
+    return "ingest"
 
 
 def route_after_ingest(state: TriageState) -> str:
@@ -22,6 +40,16 @@ def route_after_ingest(state: TriageState) -> str:
         return "no_order_id"
 
 
+def route_after_dedupe(state: TriageState) -> str:
+    """
+    Route after near-duplicate detection. A duplicate that reused its cluster's reply
+    is finished; everything else continues as routed after ingest.
+    """
+    if state.get("recommendation"):
+        return "end"
+    return route_after_ingest(state)
+
+
 def route_after_search(state: TriageState) -> str:
     """
     Route after order search based on whether an order_id was found.
@@ -33,51 +61,161 @@ def route_after_search(state: TriageState) -> str:
         return "no_order_id"
 
 
-def build_graph():
+# WORKFLOW TOPOLOGY (shared by the LangGraph graph and the direct executor)
+ENTRY_POINT = "prefilter"
+
+NODES = {
+    "prefilter": prefilter_node,
+    "ingest": ingest_node,
+    "preprocess": preprocess_node,
+    "dedupe": dedupe_node,
+    "classify": classify_node,
+    "fetch_order": fetch_order_node,
+    "draft_reply": draft_reply_node,
+    "await_approval": await_approval_node,
+    "no_order_id": no_order_id_node,
+    "search_orders": search_orders_node,
+}
+
+CONDITIONAL_EDGES = {
+    # Conditional edge after the pre-filter
+    "prefilter": (route_after_prefilter, {
+        "ingest": "ingest",
+        "end": END
+    }),
+    # Conditional edge after near-duplicate detection (routes as after ingest)
+    "dedupe": (route_after_dedupe, {
+        "fetch_order": "fetch_order",
+        "search_orders": "search_orders",
+        "no_order_id": "no_order_id",
+        "end": END
+    }),
+    # Conditional edge after search_orders
+    "search_orders": (route_after_search, {
+        "classify": "classify",
+        "no_order_id": "no_order_id"
+    }),
+}
+
+EDGES = {
+    # Text cleanup and near-duplicate detection run right after ingest
+    "ingest": "preprocess",
+    "preprocess": "dedupe",
+    # Normal workflow: fetch_order -> classify -> draft_reply
+    "fetch_order": "classify",
+    "classify": "draft_reply",
+    # Pauses for admin approval when TRIAGE_APPROVAL=true (see graph/approvals.py)
+    "draft_reply": "await_approval",
+    "await_approval": END,
+    # Error path when no order_id
+    "no_order_id": END,
+}
+
+# PARTIAL PIPELINES (request-level mode): the nodes each mode keeps and how they are wired.
+# "full" is the whole workflow above.
+MODES = ("full", "classify_only", "lookup_only")
+
+MODE_TOPOLOGIES = {
+    # Only issue_type: no order lookup, no reply draft
+    "classify_only": (
+        ("prefilter", "ingest", "preprocess", "dedupe", "classify"),
+        {
+            "ingest": "preprocess",
+            "preprocess": "dedupe",
+            "dedupe": "classify",
+            "classify": END,
+        },
+        {"prefilter": CONDITIONAL_EDGES["prefilter"]},
+    ),
+    # Only the order evidence: no text cleanup, dedupe, classification or reply draft
+    "lookup_only": (
+        ("prefilter", "ingest", "fetch_order", "search_orders", "no_order_id"),
+        {
+            "fetch_order": END,
+            "search_orders": END,
+            "no_order_id": END,
+        },
+        {
+            "prefilter": CONDITIONAL_EDGES["prefilter"],
+            "ingest": (route_after_ingest, {
+                "fetch_order": "fetch_order",
+                "search_orders": "search_orders",
+                "no_order_id": "no_order_id"
+            }),
+        },
+    ),
+}
+
+
+def topology(mode: str = "full") -> tuple[dict, dict, dict]:
     """
-    Builds and compiles the triage workflow graph.
+    Returns the (nodes, edges, conditional_edges) tables of a mode.
     """
+    if mode == "full":
+        return NODES, EDGES, CONDITIONAL_EDGES
+    if mode not in MODE_TOPOLOGIES:
+        raise ValueError(f"Unknown triage mode: {mode}")
+    names, edges, conditional_edges = MODE_TOPOLOGIES[mode]
+    return {name: NODES[name] for name in names}, edges, conditional_edges
+
+
+def build_graph(mode: str = "full"):
+    """
+    Builds and compiles the triage workflow graph (or one of its partial pipelines).
+    """
+    nodes, edges, conditional_edges = topology(mode)
     graph_agent = StateGraph(TriageState)
 
-    # ADDING NODES
-    graph_agent.add_node("ingest", ingest_node)
-    graph_agent.add_node("classify", classify_node)
-    graph_agent.add_node("fetch_order", fetch_order_node)
-    graph_agent.add_node("draft_reply", draft_reply_node)
-    graph_agent.add_node("no_order_id", no_order_id_node)
-    graph_agent.add_node("search_orders", search_orders_node)
+    # ADDING NODES (wrapped so per-node timings land on the current trace and
+    # the input of each step is checkpointed in checkpointed runs)
+    for name, node in nodes.items():
+        graph_agent.add_node(name, traced_node(name, checkpointed_node(name, node)))
 
     # DEFINING EDGES (workflow flow)
-    graph_agent.set_entry_point("ingest")
+    graph_agent.set_entry_point(ENTRY_POINT)
 
-    # Conditional edge after ingest
-    graph_agent.add_conditional_edges(
-        "ingest",
-        route_after_ingest,
-        {
-            "fetch_order": "fetch_order",
-            "search_orders": "search_orders",
-            "no_order_id": "no_order_id"
-        }
-    )
+    for source, (router, path_map) in conditional_edges.items():
+        graph_agent.add_conditional_edges(source, router, path_map)
 
-    # Conditional edge after search_orders
-    graph_agent.add_conditional_edges(
-        "search_orders",
-        route_after_search,
-        {
-            "classify": "classify",
-            "no_order_id": "no_order_id"
-        }
+    for source, target in edges.items():
+        graph_agent.add_edge(source, target)
+
+    # Compile and return the graph
+    return graph_agent.compile()
+
+
+def build_direct_executor(mode: str = "full") -> DirectExecutor:
+    """
+    Builds the same workflow as a plain call pipeline, without the StateGraph runtime.
+    """
+    nodes, edges, conditional_edges = topology(mode)
+    return DirectExecutor(
+        {name: traced_node(name, checkpointed_node(name, node)) for name, node in nodes.items()},
+        ENTRY_POINT,
+        edges,
+        conditional_edges,
+        TriageState,
     )
 
-    # Normal workflow: fetch_order -> classify -> draft_reply
-    graph_agent.add_edge("fetch_order", "classify")
-    graph_agent.add_edge("classify", "draft_reply")
-    graph_agent.add_edge("draft_reply", END)
 
-    # Error path when no order_id
-    graph_agent.add_edge("no_order_id", END)
+def build_runner(mode: str = "full"):
+    """
+    Returns the workflow runner selected by TRIAGE_EXECUTOR ("langgraph" or "direct").
+    Both expose invoke(state) and produce identical results.
+    With TRIAGE_CHECKPOINTS=true, runs with a failed node are checkpointed for retry.
+    """
+    executor = os.getenv("TRIAGE_EXECUTOR", "langgraph").lower()
+    if executor == "direct":
+        runner = build_direct_executor(mode)
+    elif executor == "langgraph":
+        runner = build_graph(mode)
+    else:
+        raise ValueError(f"Unknown TRIAGE_EXECUTOR: {executor}")
+    return CheckpointingRunner(runner) if checkpoints_enabled() else runner
 
-    # Compile and return the graph
-    return graph_agent.compile()
\ No newline at end of file
+
+def build_runners() -> dict:
+    """
+    Builds the runner of every mode once, e.g. at startup: {mode: runner}.
+    """
+    return {mode: build_runner(mode) for mode in MODES}
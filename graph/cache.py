@@ -0,0 +1,190 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from graph import metrics
+from graph.OrderEvidence import ORDER_FIELDS
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    Thread-safe LRU cache whose entries expire ttl seconds after they were set.
+    Memory is bounded by max_entries (least recently used entries are evicted first).
+    """
+
+    def __init__(self, max_entries: int = 10000, ttl: float = 300.0, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.clock = clock
+        # key -> (expires_at, value)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "sets": 0, "expirations": 0, "evictions": 0, "invalidations": 0}
+
+    def get(self, key, default=None):
+        """
+        Returns the cached value, or default on a miss. Counts towards the hit rate.
+        """
+        value = self._lookup(key)
+        with self._lock:
+            if value is _MISSING:
+                self._stats["misses"] += 1
+                return default
+            self._stats["hits"] += 1
+            return value
+
+    def peek(self, key, default=None):
+        """
+        Like get, but does not count towards the hit rate or refresh recency.
+        """
+        value = self._lookup(key, touch=False)
+        return default if value is _MISSING else value
+
+    def set(self, key, value, ttl: float | None = None) -> None:
+        with self._lock:
+            self._entries[key] = (self.clock() + (self.ttl if ttl is None else ttl), value)
+            self._entries.move_to_end(key)
+            self._stats["sets"] += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def invalidate(self, key) -> bool:
+        with self._lock:
+            if self._entries.pop(key, None) is None:
+                return False
+            self._stats["invalidations"] += 1
+            return True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def snapshot(self, limit: int | None = None) -> list[tuple]:
+        """
+        Returns up to limit live entries as (key, remaining_ttl, value), most recently used first.
+        """
+        now = self.clock()
+        entries = []
+        with self._lock:
+            for key, (expires_at, value) in reversed(self._entries.items()):
+                if limit is not None and len(entries) >= limit:
+                    break
+                if expires_at > now:
+                    entries.append((key, expires_at - now, value))
+        return entries
+
+    def restore(self, key, value, ttl: float) -> bool:
+        """
+        Adds an entry from a snapshot as the least recently used one, so restoring a
+        snapshot hottest-first keeps its order. Keys already cached are left alone, and
+        nothing is evicted to make room. Returns whether the entry was added.
+        """
+        with self._lock:
+            if key in self._entries or len(self._entries) >= self.max_entries:
+                return False
+            self._entries[key] = (self.clock() + ttl, value)
+            self._entries.move_to_end(key, last=False)
+            return True
+
+    def _lookup(self, key, touch: bool = True):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return _MISSING
+            expires_at, value = entry
+            if self.clock() >= expires_at:
+                del self._entries[key]
+                self._stats["expirations"] += 1
+                return _MISSING
+            if touch:
+                self._entries.move_to_end(key)
+            return value
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return {
+                **self._stats,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hit_rate": round(self._stats["hits"] / lookups, 4) if lookups else 0.0,
+            }
+
+
+def normalize_email(email: str, fold_plus: bool = False) -> str:
+    """
+    Lowercases and trims an email address. With fold_plus, "alice+shop@x.com" becomes "alice@x.com".
+    """
+    email = email.strip().lower()
+    if fold_plus and "@" in email:
+        local, domain = email.rsplit("@", 1)
+        email = f"{local.split('+', 1)[0]}@{domain}"
+    return email
+
+
+def email_cache_enabled() -> bool:
+    return os.getenv("TRIAGE_EMAIL_CACHE", "false").lower() == "true"
+
+
+def email_cache_key(email: str) -> str:
+    return normalize_email(email, os.getenv("TRIAGE_EMAIL_CACHE_FOLD_PLUS", "false").lower() == "true")
+
+
+_email_cache = None
+_email_cache_lock = threading.Lock()
+
+
+def get_email_cache() -> TTLCache:
+    """
+    Returns the process-wide normalized email -> (fetched_at, [evidence, ...]) cache of search
+    results, configured from TRIAGE_EMAIL_CACHE_* on first use.
+    """
+    global _email_cache
+    if _email_cache is None:
+        with _email_cache_lock:
+            if _email_cache is None:
+                _email_cache = TTLCache(
+                    max_entries=int(os.getenv("TRIAGE_EMAIL_CACHE_MAX_ENTRIES", "10000")),
+                    ttl=float(os.getenv("TRIAGE_EMAIL_CACHE_TTL_SECONDS", "300")),
+                )
+                metrics.register("email_cache", _email_cache.stats)
+    return _email_cache
+
+
+def set_email_cache(cache: TTLCache | None) -> None:
+    global _email_cache
+    _email_cache = cache
+    if cache is not None:
+        metrics.register("email_cache", cache.stats)
+
+
+def note_order_seen(order) -> None:
+    """
+    Drops the cached search results for the order's email when they do not include this
+    order (the customer has placed an order since) or hold an older copy of it.
+    """
+    if not email_cache_enabled() or "error" in order:
+        return
+    email, order_id = order.get("email"), order.get("order_id")
+    if not email or not order_id:
+        return
+
+    cache = get_email_cache()
+    key = email_cache_key(email)
+    entry = cache.peek(key)
+    if entry is None:
+        return
+    cached = {cached["order_id"].upper(): cached for cached in entry[1] if cached.get("order_id")}.get(order_id.upper())
+    if cached is None:
+        print(f"New order {order_id} for {key}, invalidating cached search results")
+        cache.invalidate(key)
+    elif any(cached.get(field) != order.get(field) for field in ORDER_FIELDS):
+        print(f"Order {order_id} changed, invalidating cached search results for {key}")
+        cache.invalidate(key)
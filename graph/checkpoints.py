@@ -0,0 +1,367 @@
+import contextvars
+import functools
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from graph import metrics
+from graph.approvals import decode_state, encode_state
+from graph.sqlite_connections import SQLiteConnections
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+_current_run = contextvars.ContextVar("triage_checkpoint_run", default=None)
+
+
+def checkpoints_enabled() -> bool:
+    return os.getenv("TRIAGE_CHECKPOINTS", "false").lower() == "true"
+
+
+class RunRecorder:
+    """
+    Per-run step checkpoints, kept in memory: the input state of the running node.
+    The first node that fails (mark_error or an exception) freezes its checkpoint,
+    which is persisted when the run ends.
+    """
+
+    def __init__(self):
+        self.node = None
+        self.state = None
+        self.steps = 0
+        # (node, state before the node, reason, steps completed before the node)
+        self.failure = None
+
+    def step(self, node: str, state: dict) -> None:
+        self.steps += 1
+        if self.failure is None:
+            self.node = node
+            # Nodes return partial updates and reducers build new values, so a shallow copy is a snapshot
+            self.state = dict(state)
+
+    def fail(self, reason: str) -> None:
+        if self.failure is None and self.node is not None:
+            self.failure = (self.node, self.state, reason, self.steps - 1)
+
+
+def note_failure(reason: str) -> None:
+    """
+    Marks the running node as failed in the current checkpointed run (no-op outside one).
+    """
+    run = _current_run.get()
+    if run is not None:
+        run.fail(reason)
+
+
+def run_failed() -> bool:
+    """
+    True if a node of the current checkpointed run has failed (it will be retried).
+    """
+    run = _current_run.get()
+    return run is not None and run.failure is not None
+
+
+def checkpointed_node(name: str, node):
+    """
+    Wraps a graph node so that its input state is checkpointed before it runs.
+    Costs nothing when no checkpointed run is active.
+    """
+
+    @functools.wraps(node)
+    def wrapper(state):
+        run = _current_run.get()
+        if run is None:
+            return node(state)
+
+        run.step(name, state)
+        try:
+            return node(state)
+        except Exception as e:
+            run.fail(f"{type(e).__name__}: {e}")
+            raise
+
+    return wrapper
+
+
+class CheckpointStore:
+    """
+    Checkpoints of failed or degraded runs in a SQLite file shared by all workers:
+    the failing node and the state before it, so a retry reruns only that node and
+    the ones after it. Automatic retries back off exponentially; after max_attempts
+    the checkpoint is "failed" and only a manual retry runs it again.
+    """
+
+    def __init__(self, path: str, max_attempts: int = 3, retry_delay: float = 5.0,
+                 lease_seconds: float = 120.0, clock=time.time):
+        self.path = path
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.lease_seconds = lease_seconds
+        self.clock = clock
+        self._connections = SQLiteConnections(self.path)
+        self._connections.get().execute(
+            "CREATE TABLE IF NOT EXISTS checkpoints ("
+            " id TEXT PRIMARY KEY,"
+            " node TEXT NOT NULL,"
+            " reason TEXT,"
+            " state BLOB NOT NULL,"
+            " steps_done INTEGER NOT NULL,"
+            " attempts INTEGER NOT NULL DEFAULT 0,"
+            " status TEXT NOT NULL,"
+            " next_retry_at REAL NOT NULL,"
+            " result BLOB,"
+            " created_at REAL NOT NULL,"
+            " updated_at REAL NOT NULL)"
+        )
+        self._connections.get().execute("CREATE INDEX IF NOT EXISTS checkpoints_due ON checkpoints (status, next_retry_at)")
+
+    def save(self, node: str, reason: str, state: dict, steps_done: int) -> str:
+        checkpoint_id = uuid.uuid4().hex
+        now = self.clock()
+        self._connections.get().execute(
+            "INSERT INTO checkpoints (id, node, reason, state, steps_done, status, next_retry_at, created_at, updated_at)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (checkpoint_id, node, reason, encode_state(state), steps_done, PENDING, now + self.retry_delay, now, now),
+        )
+        return checkpoint_id
+
+    def get(self, checkpoint_id: str) -> dict | None:
+        row = self._connections.get().execute(
+            "SELECT node, reason, state, steps_done, attempts, status, result FROM checkpoints WHERE id = ?",
+            (checkpoint_id,),
+        ).fetchone()
+        if row is None:
+            return None
+        node, reason, state, steps_done, attempts, status, result = row
+        return {
+            "id": checkpoint_id,
+            "node": node,
+            "reason": reason,
+            "state": decode_state(state),
+            "steps_done": steps_done,
+            "attempts": attempts,
+            "status": status,
+            "result": decode_state(result) if result is not None else None,
+        }
+
+    def claim(self, checkpoint_id: str) -> dict | None:
+        """
+        Leases a checkpoint for a retry (pending or failed, or running with an expired lease).
+        Returns None if it does not exist, already succeeded or is being retried elsewhere.
+        """
+        now = self.clock()
+        cursor = self._connections.get().execute(
+            "UPDATE checkpoints SET status = ?, next_retry_at = ?, attempts = attempts + 1, updated_at = ?"
+            " WHERE id = ? AND (status IN (?, ?) OR (status = ? AND next_retry_at <= ?))",
+            (RUNNING, now + self.lease_seconds, now, checkpoint_id, PENDING, FAILED, RUNNING, now),
+        )
+        return self.get(checkpoint_id) if cursor.rowcount == 1 else None
+
+    def due(self, limit: int = 10) -> list[str]:
+        """
+        Ids of checkpoints whose automatic retry is due.
+        """
+        rows = self._connections.get().execute(
+            "SELECT id FROM checkpoints WHERE status IN (?, ?) AND next_retry_at <= ? ORDER BY next_retry_at LIMIT ?",
+            (PENDING, RUNNING, self.clock(), limit),
+        ).fetchall()
+        return [checkpoint_id for checkpoint_id, in rows]
+
+    def succeeded(self, checkpoint_id: str, result: dict) -> None:
+        self._connections.get().execute(
+            "UPDATE checkpoints SET status = ?, result = ?, updated_at = ? WHERE id = ?",
+            (DONE, encode_state(result), self.clock(), checkpoint_id),
+        )
+
+    def failed_again(self, checkpoint_id: str, attempts: int, node: str, reason: str, state: dict,
+                     steps_done: int) -> None:
+        """
+        Stores the new failing node and schedules the next automatic retry,
+        or marks the checkpoint failed after max_attempts.
+        """
+        now = self.clock()
+        status = FAILED if attempts >= self.max_attempts else PENDING
+        self._connections.get().execute(
+            "UPDATE checkpoints SET node = ?, reason = ?, state = ?, steps_done = ?, status = ?, next_retry_at = ?,"
+            " updated_at = ? WHERE id = ?",
+            (node, reason, encode_state(state), steps_done, status, now + self.retry_delay * 2 ** attempts, now,
+             checkpoint_id),
+        )
+
+    def stats(self) -> dict:
+        counts = dict(self._connections.get().execute(
+            "SELECT status, count(*) FROM checkpoints GROUP BY status"
+        ).fetchall())
+        return {status: counts.get(status, 0) for status in (PENDING, RUNNING, DONE, FAILED)}
+
+    def close(self) -> None:
+        self._connections.close()
+
+
+_checkpoint_store = None
+_checkpoint_store_lock = threading.Lock()
+
+
+def get_checkpoint_store() -> CheckpointStore:
+    """
+    Returns the process-wide checkpoint store at TRIAGE_CHECKPOINT_DB.
+    """
+    global _checkpoint_store
+    if _checkpoint_store is None:
+        with _checkpoint_store_lock:
+            if _checkpoint_store is None:
+                _checkpoint_store = CheckpointStore(
+                    os.getenv("TRIAGE_CHECKPOINT_DB", "triage_checkpoints.sqlite3"),
+                    max_attempts=int(os.getenv("TRIAGE_CHECKPOINT_MAX_ATTEMPTS", "3")),
+                    retry_delay=float(os.getenv("TRIAGE_CHECKPOINT_RETRY_DELAY_SECONDS", "5")),
+                )
+                metrics.register("checkpoints", _checkpoint_store.stats)
+    return _checkpoint_store
+
+
+def set_checkpoint_store(store: CheckpointStore | None) -> None:
+    global _checkpoint_store
+    _checkpoint_store = store
+    if store is not None:
+        metrics.register("checkpoints", store.stats)
+
+
+class CheckpointingRunner:
+    """
+    Wraps a workflow runner: each run records step checkpoints, and a run in which a
+    node failed (or raised) is saved to the checkpoint store; the result carries its id as retry_id.
+    """
+
+    def __init__(self, runner):
+        self.runner = runner
+
+    def invoke(self, state: dict) -> dict:
+        run = RunRecorder()
+        try:
+            with recording(run):
+                result = self.runner.invoke(state)
+        finally:
+            checkpoint_id = self._save(run)
+        return {**result, "retry_id": checkpoint_id} if checkpoint_id else result
+
+    @staticmethod
+    def _save(run: RunRecorder) -> str | None:
+        if run.failure is None:
+            return None
+        node, before, reason, steps_done = run.failure
+        metrics.incr("checkpoint.saved")
+        metrics.incr(f"checkpoint.saved.{node}")
+        return get_checkpoint_store().save(node, reason, before, steps_done)
+
+
+@contextmanager
+def recording(run: RunRecorder):
+    token = _current_run.set(run)
+    try:
+        yield run
+    finally:
+        _current_run.reset(token)
+
+
+_retry_executors = {}
+
+
+def _get_retry_executor(mode: str):
+    executor = _retry_executors.get(mode)
+    if executor is None:
+        # Imported here: the builder wraps every node with checkpointed_node
+        from graph.builder import build_direct_executor
+        executor = _retry_executors[mode] = build_direct_executor(mode)
+    return executor
+
+
+def retry_checkpoint(checkpoint_id: str) -> dict | None:
+    """
+    Reruns a checkpointed run from its failing node, reusing the stored evidence and
+    classification. Returns the final state (the stored result if a retry already
+    succeeded), or None if the checkpoint is unknown or being retried elsewhere.
+    """
+    store = get_checkpoint_store()
+    checkpoint = store.claim(checkpoint_id)
+    if checkpoint is None:
+        existing = store.get(checkpoint_id)
+        return existing["result"] if existing and existing["status"] == DONE else None
+
+    node, attempt = checkpoint["node"], checkpoint["attempts"]
+    print(f"Retrying checkpoint {checkpoint_id} from {node} (attempt {attempt})")
+    metrics.incr("checkpoint.retries")
+    metrics.incr("checkpoint.nodes_skipped", checkpoint["steps_done"])
+    run = RunRecorder()
+    start = time.perf_counter()
+    try:
+        with recording(run):
+            # A partial-pipeline run continues in the same mode
+            executor = _get_retry_executor(checkpoint["state"].get("mode") or "full")
+            result = executor.invoke(checkpoint["state"], start=node)
+    except Exception as e:
+        run.fail(f"{type(e).__name__}: {e}")
+        raise
+    finally:
+        metrics.observe("checkpoint.retry_ms", (time.perf_counter() - start) * 1000)
+        metrics.incr("checkpoint.nodes_rerun", run.steps)
+        if run.failure is not None:
+            failed_node, before, reason, steps = run.failure
+            store.failed_again(checkpoint_id, attempt, failed_node, reason, before, checkpoint["steps_done"] + steps)
+            metrics.incr("checkpoint.retry_failed")
+
+    if run.failure is not None:
+        return {**result, "retry_id": checkpoint_id}
+
+    result = {**result, "retry_id": checkpoint_id}
+    result["messages"] = result["messages"] + [
+        {"role": "assistant", "content": f"Retried from {node} (attempt {attempt})"}
+    ]
+    store.succeeded(checkpoint_id, result)
+    metrics.incr("checkpoint.retry_succeeded")
+    return result
+
+
+class CheckpointRetrier:
+    """
+    Background thread that retries due checkpoints with exponential backoff.
+    """
+
+    def __init__(self, interval: float = 1.0):
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self) -> "CheckpointRetrier":
+        self._thread = threading.Thread(target=self._run, name="checkpoint-retrier", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def run_once(self) -> int:
+        due = get_checkpoint_store().due()
+        for checkpoint_id in due:
+            try:
+                retry_checkpoint(checkpoint_id)
+            except Exception as e:
+                print(f"Retry of checkpoint {checkpoint_id} failed: {e}")
+        return len(due)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                print(f"Checkpoint retrier error: {e}")
+            self._stop.wait(self.interval)
+
+
+def auto_retry_enabled() -> bool:
+    return checkpoints_enabled() and os.getenv("TRIAGE_CHECKPOINT_AUTO_RETRY", "true").lower() == "true"
@@ -0,0 +1,246 @@
+import hashlib
+import os
+import random
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from graph import metrics
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def shingles(text: str, size: int = 3) -> set[int]:
+    """
+    Hashes of the overlapping word n-grams of the normalized ticket text.
+    Short texts fall back to single words.
+    """
+    words = _WORD.findall(text.lower())
+    if len(words) < size:
+        grams = words
+    else:
+        grams = [" ".join(words[i:i + size]) for i in range(len(words) - size + 1)]
+    return {int.from_bytes(hashlib.blake2b(gram.encode(), digest_size=8).digest(), "big") for gram in grams}
+
+
+class MinHasher:
+    """
+    MinHash signatures with num_perm universal hash permutations.
+    """
+
+    def __init__(self, num_perm: int = 64, seed: int = 1):
+        rng = random.Random(seed)
+        self.num_perm = num_perm
+        self.params = [(rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME)) for _ in range(num_perm)]
+
+    def signature(self, hashed_shingles: set[int]) -> tuple:
+        if not hashed_shingles:
+            return ()
+        return tuple(
+            min((a * h + b) % _MERSENNE_PRIME for h in hashed_shingles)
+            for a, b in self.params
+        )
+
+
+def similarity(sig_a: tuple, sig_b: tuple) -> float:
+    """
+    Estimated Jaccard similarity of two MinHash signatures.
+    """
+    if not sig_a or len(sig_a) != len(sig_b):
+        return 0.0
+    return sum(1 for a, b in zip(sig_a, sig_b) if a == b) / len(sig_a)
+
+
+class TicketCluster:
+    """
+    A group of near-identical recent tickets sharing the same order/email context.
+    """
+
+    __slots__ = ("cluster_id", "context", "signature", "created", "last_seen", "size",
+                 "issue_type", "evidence", "reply", "reused")
+
+    def __init__(self, context: tuple, signature: tuple, now: float):
+        self.cluster_id = uuid.uuid4().hex[:12]
+        self.context = context
+        self.signature = signature
+        self.created = now
+        self.last_seen = now
+        self.size = 1
+        self.issue_type = None
+        self.evidence = None
+        self.reply = None
+        self.reused = 0
+
+
+class NearDuplicateIndex:
+    """
+    MinHash/LSH index over recent ticket texts.
+
+    Memory is bounded by max_clusters (least recently seen clusters are evicted first)
+    and clusters not seen within window seconds expire.
+    """
+
+    def __init__(self, threshold: float = 0.8, num_perm: int = 64, bands: int = 16,
+                 window: float = 900.0, max_clusters: int = 5000, clock=time.monotonic):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.window = window
+        self.max_clusters = max_clusters
+        self.clock = clock
+        self.hasher = MinHasher(num_perm)
+        self._clusters = OrderedDict()
+        self._buckets = {}
+        self._lock = threading.Lock()
+        self._stats = {"lookups": 0, "matches": 0, "classification_reuses": 0, "reply_reuses": 0, "evictions": 0}
+
+    def assign(self, text: str, context: tuple) -> tuple[TicketCluster, bool]:
+        """
+        Returns (cluster, is_duplicate). A new cluster is created when no recent
+        cluster with the same context is similar enough.
+        """
+        signature = self.hasher.signature(shingles(text))
+        now = self.clock()
+
+        with self._lock:
+            self._expire(now)
+            self._stats["lookups"] += 1
+
+            best, best_score = None, 0.0
+            for cluster_id in self._candidates(signature):
+                cluster = self._clusters[cluster_id]
+                if cluster.context != context:
+                    continue
+                score = similarity(signature, cluster.signature)
+                if score >= self.threshold and score > best_score:
+                    best, best_score = cluster, score
+
+            if best is not None:
+                best.size += 1
+                best.last_seen = now
+                self._clusters.move_to_end(best.cluster_id)
+                self._stats["matches"] += 1
+                return best, True
+
+            cluster = TicketCluster(context, signature, now)
+            self._clusters[cluster.cluster_id] = cluster
+            for key in self._band_keys(signature):
+                self._buckets.setdefault(key, set()).add(cluster.cluster_id)
+            while len(self._clusters) > self.max_clusters:
+                self._evict(next(iter(self._clusters)))
+            return cluster, False
+
+    def record(self, cluster_id: str, **results) -> None:
+        """
+        Stores the classification, evidence or reply produced for a cluster's ticket.
+        """
+        with self._lock:
+            cluster = self._clusters.get(cluster_id)
+            if cluster is None:
+                return
+            for key, value in results.items():
+                setattr(cluster, key, value)
+
+    def count_reuse(self, cluster: TicketCluster, reply: bool) -> None:
+        with self._lock:
+            cluster.reused += 1
+            self._stats["classification_reuses"] += 1
+            if reply:
+                self._stats["reply_reuses"] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            largest = sorted(self._clusters.values(), key=lambda c: c.size, reverse=True)[:5]
+            return {
+                **self._stats,
+                "clusters": len(self._clusters),
+                "match_rate": round(self._stats["matches"] / self._stats["lookups"], 4) if self._stats["lookups"] else 0.0,
+                "largest_clusters": [
+                    {"cluster_id": c.cluster_id, "size": c.size, "issue_type": c.issue_type,
+                     "reused": c.reused, "age_seconds": round(self.clock() - c.created, 1)}
+                    for c in largest
+                ],
+            }
+
+    def _band_keys(self, signature: tuple):
+        for band in range(self.bands):
+            yield band, signature[band * self.rows:(band + 1) * self.rows]
+
+    def _candidates(self, signature: tuple) -> set:
+        if not signature:
+            return set()
+        found = set()
+        for key in self._band_keys(signature):
+            found.update(self._buckets.get(key, ()))
+        return found
+
+    def _expire(self, now: float) -> None:
+        # Clusters are ordered by last_seen, so expired ones are at the front
+        while self._clusters:
+            cluster = next(iter(self._clusters.values()))
+            if now - cluster.last_seen <= self.window:
+                break
+            self._evict(cluster.cluster_id)
+
+    def _evict(self, cluster_id: str) -> None:
+        cluster = self._clusters.pop(cluster_id)
+        for key in self._band_keys(cluster.signature):
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket.discard(cluster_id)
+                if not bucket:
+                    del self._buckets[key]
+        self._stats["evictions"] += 1
+
+
+def dedup_enabled() -> bool:
+    return os.getenv("TRIAGE_DEDUP", "false").lower() == "true"
+
+
+def dedup_max_chars() -> int:
+    """
+    Characters of a ticket that are hashed (TRIAGE_DEDUP_MAX_CHARS). MinHash runs in pure
+    Python on the request thread, at about 4 ms per 1000 characters of varied text.
+    """
+    return int(os.getenv("TRIAGE_DEDUP_MAX_CHARS", "2048"))
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_dedup_index() -> NearDuplicateIndex:
+    """
+    Returns the process-wide index, configured from TRIAGE_DEDUP_* on first use.
+    """
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = NearDuplicateIndex(
+                    threshold=float(os.getenv("TRIAGE_DEDUP_THRESHOLD", "0.8")),
+                    window=float(os.getenv("TRIAGE_DEDUP_WINDOW_SECONDS", "900")),
+                    max_clusters=int(os.getenv("TRIAGE_DEDUP_MAX_CLUSTERS", "5000")),
+                )
+                metrics.register("dedup", _index.stats)
+    return _index
+
+
+def record_cluster_result(cluster_id: str | None, **results) -> None:
+    """
+    Saves a node's successful result on the ticket's cluster, for later duplicates.
+    """
+    if cluster_id and dedup_enabled():
+        get_dedup_index().record(cluster_id, **results)
+
+
+def set_dedup_index(index: NearDuplicateIndex | None) -> None:
+    global _index
+    _index = index
+    if index is not None:
+        metrics.register("dedup", index.stats)
@@ -0,0 +1,68 @@
+from typing import Annotated, get_args, get_origin, get_type_hints
+
+from langgraph.graph import END
+
+
+def state_reducers(schema) -> dict:
+    """
+    Returns {key: reducer} for the keys of a state TypedDict declared as Annotated[type, reducer].
+    """
+    reducers = {}
+    for key, hint in get_type_hints(schema, include_extras=True).items():
+        if get_origin(hint) is Annotated:
+            reducer = get_args(hint)[-1]
+            if callable(reducer):
+                reducers[key] = reducer
+    return reducers
+
+
+def apply_update(state: dict, update: dict | None, reducers: dict) -> None:
+    """
+    Merges a node's partial update into state, the way the StateGraph channels do:
+    keys with a reducer are combined with the current value, all others are replaced.
+    """
+    if not update:
+        return
+    for key, value in update.items():
+        reducer = reducers.get(key)
+        if reducer is not None and state.get(key) is not None:
+            state[key] = reducer(state[key], value)
+        else:
+            state[key] = value
+
+
+class DirectExecutor:
+    """
+    Runs the fixed triage DAG as a plain loop of function calls.
+
+    It takes the same node functions and routing functions as the StateGraph
+    and produces the same final state, but skips the Pregel runtime
+    (channel bookkeeping, per-step state merging, callback dispatch).
+    """
+
+    def __init__(self, nodes: dict, entry_point: str, edges: dict, conditional_edges: dict, schema=None):
+        self.nodes = nodes
+        self.entry_point = entry_point
+        self.edges = edges
+        self.conditional_edges = conditional_edges
+        self.reducers = state_reducers(schema) if schema is not None else {}
+
+    def invoke(self, state: dict, start: str | None = None) -> dict:
+        """
+        Runs the workflow from the entry point, or from node `start` (to resume a
+        checkpointed run from the node that failed).
+        """
+        state = dict(state)
+        node = start or self.entry_point
+
+        while node != END:
+            apply_update(state, self.nodes[node](state), self.reducers)
+            node = self._next(node, state)
+
+        return state
+
+    def _next(self, node: str, state: dict) -> str:
+        if node in self.conditional_edges:
+            router, path_map = self.conditional_edges[node]
+            return path_map[router(state)]
+        return self.edges[node]
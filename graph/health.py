@@ -0,0 +1,142 @@
+import os
+import threading
+import time
+
+import requests
+
+from graph import metrics
+from graph.backend import backend_urls
+
+
+class BackendProber:
+    """
+    Background thread that probes every backend replica each `interval` seconds, so
+    readiness checks read the last result instead of calling the backend themselves.
+
+    A replica is reachable when it answers the probe path with a status below 500 (a 404
+    still proves the service is up), and it is marked unreachable after `fail_after`
+    consecutive failed probes. The backend is healthy when at least one reachable replica
+    answered its last probe within max_latency seconds, and the probes are recent.
+    """
+
+    def __init__(self, urls=None, path: str = "/", interval: float = 5.0, timeout: float = 1.0,
+                 max_latency: float = 1.0, fail_after: int = 2, clock=time.monotonic):
+        self._urls = urls
+        self.path = path
+        self.interval = interval
+        self.timeout = timeout
+        self.max_latency = max_latency
+        self.fail_after = fail_after
+        self.clock = clock
+        self.probes = 0
+        self.last_probe_at = None
+        self._replicas = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def urls(self) -> list[str]:
+        return list(self._urls) if self._urls is not None else backend_urls()
+
+    def start(self) -> "BackendProber":
+        self._thread = threading.Thread(target=self._run, name="backend-prober", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def probe_once(self) -> None:
+        results = {}
+        for url in self.urls:
+            url = url.rstrip("/")
+            start = time.perf_counter()
+            try:
+                response = requests.get(f"{url}{self.path}", timeout=self.timeout)
+                error = f"status {response.status_code}" if response.status_code >= 500 else None
+            except requests.exceptions.RequestException as e:
+                error = type(e).__name__
+            elapsed = time.perf_counter() - start
+            metrics.observe("backend_health.probe_ms", elapsed * 1000)
+            results[url] = (elapsed, error)
+
+        with self._lock:
+            # Replicas removed from the configuration are forgotten
+            self._replicas = {url: self._replicas.get(url, {"consecutive_failures": 0}) for url in results}
+            for url, (elapsed, error) in results.items():
+                replica = self._replicas[url]
+                replica["consecutive_failures"] = replica["consecutive_failures"] + 1 if error else 0
+                replica["latency_ms"] = round(elapsed * 1000, 3)
+                replica["error"] = error
+                # A reachable replica tolerates fail_after - 1 failed probes before it is marked down
+                replica["reachable"] = error is None \
+                    or (replica.get("reachable", False) and replica["consecutive_failures"] < self.fail_after)
+            self.probes += 1
+            self.last_probe_at = self.clock()
+
+    def status(self) -> dict:
+        with self._lock:
+            replicas = {url: dict(replica) for url, replica in self._replicas.items()}
+            age = self.clock() - self.last_probe_at if self.last_probe_at is not None else None
+        healthy = [url for url, replica in replicas.items()
+                   if replica["reachable"] and replica["latency_ms"] <= self.max_latency * 1000]
+        if age is None:
+            reason = "not probed yet"
+        elif age > 3 * max(self.interval, self.timeout * len(replicas)):
+            reason = f"last probe {age:.0f}s ago"
+        elif not healthy:
+            reason = "no reachable backend replica within the latency limit"
+        else:
+            reason = None
+        return {
+            "ready": reason is None,
+            "reason": reason,
+            "probe_age_seconds": round(age, 3) if age is not None else None,
+            "healthy_replicas": len(healthy),
+            "replicas": replicas,
+        }
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.probe_once()
+            except Exception as e:
+                print(f"Backend prober error: {e}")
+            self._stop.wait(self.interval)
+
+
+def readiness_probe_enabled() -> bool:
+    return os.getenv("TRIAGE_READINESS_PROBE", "false").lower() == "true"
+
+
+_prober = None
+_prober_lock = threading.Lock()
+
+
+def get_prober() -> BackendProber:
+    """
+    Returns the process-wide prober, configured from TRIAGE_READINESS_* on first use (not started).
+    """
+    global _prober
+    if _prober is None:
+        with _prober_lock:
+            if _prober is None:
+                _prober = BackendProber(
+                    path=os.getenv("TRIAGE_READINESS_PROBE_PATH", "/"),
+                    interval=float(os.getenv("TRIAGE_READINESS_PROBE_INTERVAL_SECONDS", "5")),
+                    timeout=float(os.getenv("TRIAGE_READINESS_PROBE_TIMEOUT_SECONDS", "1")),
+                    max_latency=float(os.getenv("TRIAGE_READINESS_MAX_LATENCY_MS", "1000")) / 1000,
+                    fail_after=int(os.getenv("TRIAGE_READINESS_FAIL_AFTER", "2")),
+                )
+                metrics.register("backend_health", _prober.status)
+    return _prober
+
+
+def set_prober(prober: BackendProber | None) -> None:
+    global _prober
+    _prober = prober
+    if prober is not None:
+        metrics.register("backend_health", prober.status)
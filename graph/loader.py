@@ -0,0 +1,118 @@
+import threading
+import time
+from concurrent.futures import Future
+
+
+class _Batch:
+    __slots__ = ("keys", "dispatched")
+
+    def __init__(self):
+        self.keys = {}
+        self.dispatched = False
+
+
+class BatchLoader:
+    """
+    DataLoader-style coalescing for blocking code running on many threads.
+
+    load() calls made by concurrent tickets within one tick are de-duplicated
+    and passed to batch_fn as a single list. The first caller of a tick waits
+    for the tick to end and then runs the batch; the others wait for their
+    result. Keys already being fetched by an earlier batch join that fetch.
+    """
+
+    def __init__(self, batch_fn, tick: float = 0.002, max_batch: int = 100, key_fn=None):
+        """
+        batch_fn takes a list of keys and returns {key: result} for each of them.
+        key_fn normalizes keys for de-duplication (e.g. str.upper).
+        """
+        self.batch_fn = batch_fn
+        self.tick = tick
+        self.max_batch = max_batch
+        self.key_fn = key_fn or (lambda key: key)
+        self._lock = threading.Lock()
+        self._batch = None
+        # Normalized key -> Future, for keys queued or being fetched
+        self._pending = {}
+        self._stats = {"loads": 0, "coalesced": 0, "batches": 0, "fetched": 0, "errors": 0}
+
+    def load(self, key):
+        return self.load_many([key])[key]
+
+    def load_many(self, keys: list) -> dict:
+        """
+        Returns {key: result} for keys, fetched together with other in-flight tickets' keys.
+        """
+        futures = {}
+        lead = None
+        full = []
+
+        with self._lock:
+            for key in keys:
+                normalized = self.key_fn(key)
+                self._stats["loads"] += 1
+                future = self._pending.get(normalized)
+                if future is not None:
+                    self._stats["coalesced"] += 1
+                    futures[key] = future
+                    continue
+
+                if self._batch is None:
+                    self._batch = lead = _Batch()
+                future = Future()
+                self._batch.keys[key] = (normalized, future)
+                self._pending[normalized] = future
+                futures[key] = future
+
+                if len(self._batch.keys) >= self.max_batch:
+                    # Full batches are sent right away by the caller that filled them
+                    self._batch.dispatched = True
+                    full.append(self._batch)
+                    self._batch = None
+
+        for batch in full:
+            self._run(batch)
+
+        if lead is not None and not lead.dispatched:
+            time.sleep(self.tick)
+            with self._lock:
+                if lead.dispatched:
+                    lead = None
+                else:
+                    lead.dispatched = True
+                    if self._batch is lead:
+                        self._batch = None
+            if lead is not None:
+                self._run(lead)
+
+        return {key: future.result() for key, future in futures.items()}
+
+    def _run(self, batch: _Batch) -> None:
+        keys = list(batch.keys)
+        try:
+            results = self.batch_fn(keys)
+            error = None
+        except Exception as e:
+            results, error = {}, e
+
+        with self._lock:
+            self._stats["batches"] += 1
+            self._stats["fetched"] += len(keys)
+            if error is not None:
+                self._stats["errors"] += 1
+            for key, (normalized, _) in batch.keys.items():
+                self._pending.pop(normalized, None)
+
+        for key, (_, future) in batch.keys.items():
+            if error is not None:
+                future.set_exception(error)
+            elif key in results:
+                future.set_result(results[key])
+            else:
+                future.set_exception(KeyError(key))
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+        stats["mean_batch_size"] = round(stats["fetched"] / stats["batches"], 2) if stats["batches"] else 0.0
+        return stats
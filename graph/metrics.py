@@ -0,0 +1,99 @@
+import threading
+from collections import defaultdict
+
+
+# Upper bounds of the histogram buckets (same unit as the observed values)
+DEFAULT_BUCKETS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+_lock = threading.Lock()
+_counters = defaultdict(float)
+_histograms = {}
+_providers = {}
+
+
+class Histogram:
+    """
+    Count, sum, min, max and cumulative bucket counts of observed values.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.bucket_counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.bucket_counts[i] += 1
+                return
+        self.bucket_counts[-1] += 1
+
+    def snapshot(self) -> dict:
+        labels = [f"le_{bound}" for bound in self.buckets] + ["inf"]
+        return {
+            "count": self.count,
+            "sum": round(self.total, 3),
+            "mean": round(self.total / self.count, 3) if self.count else None,
+            "min": self.min,
+            "max": self.max,
+            "buckets": dict(zip(labels, self.bucket_counts)),
+        }
+
+
+def incr(name: str, value: float = 1) -> None:
+    with _lock:
+        _counters[name] += value
+
+
+def observe(name: str, value: float, buckets=DEFAULT_BUCKETS) -> None:
+    with _lock:
+        histogram = _histograms.get(name)
+        if histogram is None:
+            histogram = _histograms[name] = Histogram(buckets)
+        histogram.observe(value)
+
+
+def register(name: str, provider) -> None:
+    """
+    Registers a callable whose return value is included under `name` in every snapshot
+    (used by components that keep their own stats, e.g. caches and indexes).
+    """
+    with _lock:
+        _providers[name] = provider
+
+
+def counter(name: str) -> float:
+    with _lock:
+        return _counters.get(name, 0)
+
+
+def snapshot() -> dict:
+    with _lock:
+        data = {
+            "counters": dict(_counters),
+            "histograms": {name: histogram.snapshot() for name, histogram in _histograms.items()},
+        }
+        providers = dict(_providers)
+
+    for name, provider in providers.items():
+        try:
+            data[name] = provider()
+        except Exception as e:
+            data[name] = {"error": str(e)}
+    return data
+
+
+def reset() -> None:
+    """
+    Clears counters and histograms (registered providers are kept).
+    """
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
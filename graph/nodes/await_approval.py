@@ -0,0 +1,34 @@
+from graph import metrics
+from graph.TriageState import TriageState
+from graph.approvals import PENDING, PENDING_RETRY, approval_required, get_approval_store
+from graph.checkpoints import run_failed
+
+
+def await_approval_node(state: TriageState) -> dict:
+    """
+    Node after draft_reply. With TRIAGE_APPROVAL=true the run pauses here: its state is
+    saved to the approval store and the run ends, holding no request or memory until
+    POST /triage/{approval_id}/approve resumes it (on any worker). The drafted reply is
+    kept in the store only: the paused run's response has no recommendation.
+    """
+    if not approval_required() or not state.get("recommendation"):
+        return {}
+
+    # A run with a failed node is checkpointed instead; its retry reaches this gate again,
+    # so the reply drafted from the failed run is withheld rather than paused
+    if run_failed():
+        metrics.incr("approvals.withheld")
+        return {
+            "approval_status": PENDING_RETRY,
+            "recommendation": None,
+            "messages": [{"role": "assistant", "content": "Reply withheld until the failed run is retried"}]
+        }
+
+    approval_id = get_approval_store().save({**state, "approval_status": PENDING})
+    metrics.incr("approvals.paused")
+    return {
+        "approval_id": approval_id,
+        "approval_status": PENDING,
+        "recommendation": None,
+        "messages": [{"role": "assistant", "content": f"Reply awaiting approval: {approval_id}"}]
+    }
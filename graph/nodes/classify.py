@@ -1,30 +1,57 @@
-import os
 import requests
 
 from graph.TriageState import TriageState
+from graph.backend import post_json
+from graph.dedup import record_cluster_result
+from graph.shared_cache import content_key, get_shared_cache
+from graph.tracing import mark_error
 
 
-def classify_node(state: TriageState) -> TriageState:
-    backend_url = os.getenv("BACKEND_URL", "http://localhost:8000")
-    endpoint = f"{backend_url}/classify/issue"
+def classify_node(state: TriageState) -> dict:
+    """
+    Node that calls the backend classify/issue endpoint. Multi-order tickets
+    also send every order id, so the whole ticket is classified together.
+    """
+    # Already classified (reused from a near-duplicate ticket cluster)
+    if state.get("issue_type"):
+        return {}
 
     payload = {
-        "ticket_text": state["ticket_text"]
+        "ticket_text": state.get("clean_text") or state["ticket_text"]
     }
+    if state.get("order_ids"):
+        payload["order_ids"] = state["order_ids"]
+
+    # Identical tickets already classified by any worker (TRIAGE_CACHE_BACKEND)
+    cache = get_shared_cache()
+    cache_key = content_key(payload["ticket_text"], *payload.get("order_ids", ()))
+    issue_type = cache.get("classify", cache_key) if cache else None
+    if issue_type is not None:
+        record_cluster_result(state.get("cluster_id"), issue_type=issue_type)
+        return {
+            "issue_type": issue_type,
+            "messages": [{"role": "assistant", "content": f"Classified as: {issue_type} (cached)"}]
+        }
 
     try:
-        response = requests.post(endpoint, json=payload)
+        response = post_json("/classify/issue", payload)
         response.raise_for_status()
         result = response.json()
 
         # Updating state with classified issue type
-        state["issue_type"] = result.get("issue_type")
-        state["messages"].append({"role": "assistant", "content": f"Classified as: {state['issue_type']}"})
-
-        return state
+        issue_type = result.get("issue_type")
+        record_cluster_result(state.get("cluster_id"), issue_type=issue_type)
+        if cache and issue_type:
+            cache.set("classify", cache_key, issue_type)
+        return {
+            "issue_type": issue_type,
+            "messages": [{"role": "assistant", "content": f"Classified as: {issue_type}"}]
+        }
 
     except requests.exceptions.RequestException as e:
         print(f"Error calling classify endpoint: {e}")
-        state["issue_type"] = "unknown"
-        state["messages"].append({"role": "assistant", "content": "Classification failed, set to unknown"})
-        return state
+        mark_error(f"classify failed: {e}")
+        return {
+            "issue_type": "unknown",
+            "messages": [{"role": "assistant", "content": "Classification failed, set to unknown"}]
+        }
@@ -0,0 +1,44 @@
+from graph.TriageState import TriageState
+from graph.dedup import dedup_enabled, dedup_max_chars, get_dedup_index
+
+
+def ticket_context(state: TriageState) -> tuple:
+    """
+    Order/email context a ticket must share with a cluster to reuse its results.
+    """
+    order_ids = state.get("order_ids")
+    order_id = ",".join(sorted(o.upper() for o in order_ids)) if order_ids else state.get("order_id")
+    customer_email = state.get("customer_email")
+    return (order_id.upper() if order_id else None, customer_email.lower() if customer_email else None)
+
+
+def dedupe_node(state: TriageState) -> dict:
+    """
+    Node that runs after ingest and matches the ticket against recent near-duplicates.
+    A duplicate reuses its cluster's classification and, when one was drafted for the
+    same order/email context, its evidence and reply.
+    """
+    if not dedup_enabled():
+        return {}
+
+    index = get_dedup_index()
+    # Near-duplicates share their opening; hashing a long paste in full would hold the GIL
+    text = (state.get("clean_text") or state["ticket_text"])[:dedup_max_chars()]
+    cluster, is_duplicate = index.assign(text, ticket_context(state))
+    update = {"cluster_id": cluster.cluster_id}
+
+    if not is_duplicate or cluster.issue_type is None:
+        return update
+
+    reuse_reply = cluster.reply is not None
+    index.count_reuse(cluster, reuse_reply)
+
+    update["issue_type"] = cluster.issue_type
+    content = f"Matched ticket cluster {cluster.cluster_id} ({cluster.size} similar tickets), reused classification"
+    if reuse_reply:
+        update["evidence"] = cluster.evidence
+        update["recommendation"] = cluster.reply
+        content += " and reply"
+    update["messages"] = [{"role": "assistant", "content": content}]
+    return update
+
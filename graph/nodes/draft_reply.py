@@ -1,34 +1,93 @@
-import os
+import json
+import time
+
 import requests
 
+from graph.OrderEvidence import evidence_payload
 from graph.TriageState import TriageState
+from graph.approvals import approval_required
+from graph.backend import post_json
+from graph.dedup import record_cluster_result
+from graph.shared_cache import content_key, get_shared_cache
+from graph.templates import get_template_engine, reply_templates_enabled
+from graph.tracing import mark_error
 
 
-def draft_reply_node(state: TriageState) -> TriageState:
+def draft_reply_node(state: TriageState) -> dict:
     """
     Node that calls the backend reply/draft endpoint to generate a response.
+    With TRIAGE_REPLY_TEMPLATES=true, formulaic replies are rendered from a local template
+    instead, when one matches the issue type and the evidence has every field it uses.
     """
-    backend_url = os.getenv("BACKEND_URL", "http://localhost:8000")
-    endpoint = f"{backend_url}/reply/draft"
+    engine = get_template_engine() if reply_templates_enabled() else None
+    if engine is not None:
+        reply_text = engine.draft(state.get("issue_type"), state.get("evidence"), state.get("order_id"))
+        if reply_text is not None:
+            record_reply(state, reply_text)
+            return {
+                "recommendation": reply_text,
+                "messages": [{"role": "assistant", "content": "Generated reply recommendation (template)"}]
+            }
+
+    evidence = evidence_payload(state.get("evidence", {}))
+    if isinstance(evidence, dict) and "orders" in evidence:
+        # Multi-order ticket: the first order keeps the single-order contract, all orders go in "orders"
+        payload = {
+            "issue_type": state.get("issue_type"),
+            "order": evidence["orders"][0],
+            "orders": evidence["orders"]
+        }
+    else:
+        payload = {
+            "issue_type": state.get("issue_type"),
+            "order": evidence
+        }
 
-    payload = {
-        "issue_type": state.get("issue_type"),
-        "order": state.get("evidence", {})
-    }
+    # Replies already drafted by any worker for the same issue and order (TRIAGE_CACHE_BACKEND)
+    cache = get_shared_cache()
+    cache_key = content_key(json.dumps(payload, sort_keys=True, default=str))
+    reply_text = cache.get("reply", cache_key) if cache else None
+    if reply_text is not None:
+        record_reply(state, reply_text)
+        return {
+            "recommendation": reply_text,
+            "messages": [{"role": "assistant", "content": "Generated reply recommendation (cached)"}]
+        }
 
     try:
-        response = requests.post(endpoint, json=payload)
+        start = time.perf_counter()
+        response = post_json("/reply/draft", payload)
         response.raise_for_status()
         result = response.json()
+        if engine is not None:
+            engine.record_backend((time.perf_counter() - start) * 1000)
 
         # Update state with drafted reply
-        state["recommendation"] = result.get("reply_text")
-        state["messages"].append({"role": "assistant", "content": "Generated reply recommendation"})
-
-        return state
+        reply_text = result.get("reply_text")
+        record_reply(state, reply_text)
+        if cache and reply_text:
+            cache.set("reply", cache_key, reply_text)
+        return {
+            "recommendation": reply_text,
+            "messages": [{"role": "assistant", "content": "Generated reply recommendation"}]
+        }
 
     except requests.exceptions.RequestException as e:
         print(f"Error calling reply/draft endpoint: {e}")
-        state["recommendation"] = "Unable to generate response at this time."
-        state["messages"].append({"role": "assistant", "content": "Failed to generate reply"})
-        return state
+        mark_error(f"reply/draft failed: {e}")
+        return {
+            "recommendation": "Unable to generate response at this time.",
+            "messages": [{"role": "assistant", "content": "Failed to generate reply"}]
+        }
+
+
+def record_reply(state: TriageState, reply_text: str) -> None:
+    """
+    Saves the drafted reply on the ticket's cluster for later duplicates. A reply that
+    needs approval is saved by resume_approval once an admin approves it, so duplicates
+    never skip the gate.
+    """
+    if approval_required():
+        record_cluster_result(state.get("cluster_id"), evidence=state.get("evidence"))
+    else:
+        record_cluster_result(state.get("cluster_id"), evidence=state.get("evidence"), reply=reply_text)
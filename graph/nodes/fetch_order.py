@@ -1,9 +1,20 @@
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import requests
 from langchain_core.tools import tool
 from langgraph.prebuilt import ToolNode
 
+from graph import metrics
+from graph.OrderEvidence import to_order_evidence
+from graph.backend import backend_get, backend_urls
 from graph.TriageState import TriageState
+from graph.cache import TTLCache, note_order_seen
+from graph.loader import BatchLoader
+from graph.shared_cache import get_shared_cache
+from graph.tracing import mark_error
 
 
 @tool
@@ -15,16 +26,12 @@ def fetch_order_tool(order_id: str) -> dict:
         order_id: The order ID to fetch details for
 
     Returns:
-        dict: Order details or error information
+        OrderEvidence with the order details, or a dict with error information
     """
-    backend_url = os.getenv("BACKEND_URL", "http://localhost:8000")
-    endpoint = f"{backend_url}/orders/get"
-
     try:
-        response = requests.get(endpoint, params={"order_id": order_id})
+        response = backend_get("/orders/get", params={"order_id": order_id})
         response.raise_for_status()
-        order_data = response.json()
-        return order_data
+        return to_order_evidence(response.json())
 
     except requests.exceptions.HTTPError as e:
         if e.response.status_code == 404:
@@ -36,28 +43,325 @@ def fetch_order_tool(order_id: str) -> dict:
         return {"error": f"Request failed: {str(e)}"}
 
 
-def fetch_order_node(state: TriageState) -> TriageState:
+# Backend URLs -> whether they have /orders/bulk, learned from the first bulk call
+_bulk_supported = {}
+_fetch_pool = None
+_fetch_pool_lock = threading.Lock()
+
+
+def _get_fetch_pool() -> ThreadPoolExecutor:
+    global _fetch_pool
+    if _fetch_pool is None:
+        with _fetch_pool_lock:
+            if _fetch_pool is None:
+                _fetch_pool = ThreadPoolExecutor(
+                    max_workers=int(os.getenv("TRIAGE_FETCH_CONCURRENCY", "8")),
+                    thread_name_prefix="fetch-order",
+                )
+    return _fetch_pool
+
+
+def fetch_orders_bulk(order_ids: list[str]) -> dict | None:
+    """
+    Fetches several orders with one call to /orders/bulk.
+    Returns {order_id: evidence}, or None if the backend has no bulk endpoint or the call failed.
+    """
+    backend = ",".join(backend_urls())
+    if _bulk_supported.get(backend) is False or os.getenv("TRIAGE_ORDERS_BULK", "auto").lower() == "off":
+        return None
+
+    try:
+        response = backend_get("/orders/bulk", params={"order_ids": ",".join(order_ids)})
+        if response.status_code in (404, 405, 501):
+            print("Backend has no bulk order endpoint, falling back to concurrent single fetches")
+            _bulk_supported[backend] = False
+            return None
+        response.raise_for_status()
+        _bulk_supported[backend] = True
+        found = {order["order_id"].upper(): order for order in response.json().get("orders", [])}
+
+    except requests.exceptions.RequestException as e:
+        print(f"Error calling orders/bulk endpoint: {e}")
+        return None
+
+    return {
+        order_id: to_order_evidence(found[order_id.upper()]) if order_id.upper() in found else {"error": "Order not found"}
+        for order_id in order_ids
+    }
+
+
+def fetch_orders(order_ids: list[str]) -> dict:
+    """
+    Fetches several orders at once: one bulk call where the backend supports it,
+    otherwise concurrent /orders/get calls. Returns {order_id: evidence}, in input order.
+    """
+    results = fetch_orders_bulk(order_ids)
+    if results is not None:
+        return results
+
+    pool = _get_fetch_pool()
+    futures = [pool.submit(fetch_order_tool.invoke, {"order_id": order_id}) for order_id in order_ids]
+    return {order_id: future.result() for order_id, future in zip(order_ids, futures)}
+
+
+def order_loader_enabled() -> bool:
+    return os.getenv("TRIAGE_ORDER_LOADER", "false").lower() == "true"
+
+
+_order_loader = None
+
+
+def get_order_loader() -> BatchLoader:
+    """
+    Returns the process-wide loader that coalesces order fetches across in-flight tickets.
+    """
+    global _order_loader
+    if _order_loader is None:
+        with _fetch_pool_lock:
+            if _order_loader is None:
+                _order_loader = BatchLoader(
+                    fetch_orders,
+                    tick=float(os.getenv("TRIAGE_ORDER_LOADER_TICK_MS", "2")) / 1000,
+                    max_batch=int(os.getenv("TRIAGE_ORDER_LOADER_MAX_BATCH", "100")),
+                    key_fn=str.upper,
+                )
+                metrics.register("order_loader", _order_loader.stats)
+    return _order_loader
+
+
+def set_order_loader(loader: BatchLoader | None) -> None:
+    global _order_loader
+    _order_loader = loader
+    if loader is not None:
+        metrics.register("order_loader", loader.stats)
+
+
+def load_orders(order_ids: list[str]) -> dict:
+    """
+    Fetches orders for one ticket. Returns {order_id: evidence}, in input order.
+    """
+    return load_orders_with_age(order_ids)[0]
+
+
+def load_orders_with_age(order_ids: list[str]) -> tuple[dict, dict]:
+    """
+    Like load_orders, but with TRIAGE_ORDER_SWR=true cached orders may be served stale.
+    Returns ({order_id: evidence}, {order_id: age_seconds} for the orders served stale).
+    """
+    if not order_swr_enabled():
+        results, stale = _fetch_fresh(order_ids), {}
+    else:
+        results, stale = _load_stale_while_revalidate(order_ids)
+
+    for result in results.values():
+        note_order_seen(result)
+    return results, stale
+
+
+def _fetch_fresh(order_ids: list[str], read_shared: bool = True) -> dict:
+    """
+    Fetches orders from the shared cache (TRIAGE_CACHE_BACKEND) or, on a miss, from the backend.
+    Fetched orders are written back to the shared cache for the other workers.
+    """
+    cache = get_shared_cache()
+    if cache is None:
+        return _fetch_from_backend(order_ids)
+
+    results, missing = {}, []
+    for order_id in order_ids:
+        evidence = cache.get("order", order_id.upper()) if read_shared else None
+        if evidence is None:
+            missing.append(order_id)
+        else:
+            results[order_id] = evidence
+
+    if missing:
+        for order_id, evidence in _fetch_from_backend(missing).items():
+            results[order_id] = evidence
+            if "error" not in evidence:
+                cache.set("order", order_id.upper(), evidence)
+
+    return {order_id: results[order_id] for order_id in order_ids}
+
+
+def _fetch_from_backend(order_ids: list[str]) -> dict:
+    """
+    Fetches orders from the backend, through the shared loader when TRIAGE_ORDER_LOADER=true.
+    """
+    if not order_loader_enabled():
+        if len(order_ids) == 1:
+            return {order_ids[0]: fetch_order_tool.invoke({"order_id": order_ids[0]})}
+        return fetch_orders(order_ids)
+
+    results = get_order_loader().load_many(order_ids)
+    # OrderEvidence is read-only and can be shared between tickets; error dicts are copied
+    return {order_id: dict(result) if isinstance(result, dict) else result for order_id, result in results.items()}
+
+
+def order_swr_enabled() -> bool:
+    return os.getenv("TRIAGE_ORDER_SWR", "false").lower() == "true"
+
+
+# Upper bounds (seconds) for the age of order data served from the cache
+STALENESS_BUCKETS = (1, 2, 5, 10, 15, 30, 60, 120, 300, 600)
+
+_order_cache = None
+_refresh_pool = None
+_refreshing = set()
+_refresh_lock = threading.Lock()
+
+
+def get_order_cache() -> TTLCache:
+    """
+    Returns the process-wide order_id -> (fetched_at, evidence) cache used in stale-while-revalidate mode.
+    Entries expire at TRIAGE_ORDER_MAX_STALE_SECONDS, beyond which orders are always refetched.
+    """
+    global _order_cache
+    if _order_cache is None:
+        with _refresh_lock:
+            if _order_cache is None:
+                _order_cache = TTLCache(
+                    max_entries=int(os.getenv("TRIAGE_ORDER_CACHE_MAX_ENTRIES", "10000")),
+                    ttl=float(os.getenv("TRIAGE_ORDER_MAX_STALE_SECONDS", "60")),
+                )
+                metrics.register("order_cache", _order_cache.stats)
+    return _order_cache
+
+
+def set_order_cache(cache: TTLCache | None) -> None:
+    global _order_cache
+    _order_cache = cache
+    if cache is not None:
+        metrics.register("order_cache", cache.stats)
+
+
+def _load_stale_while_revalidate(order_ids: list[str]) -> tuple[dict, dict]:
+    """
+    Serves cached orders younger than TRIAGE_ORDER_FRESH_SECONDS as is, and older ones
+    (up to the cache expiry) immediately while a background refresh runs for the next ticket.
+    Missing and expired orders are fetched synchronously.
+    """
+    cache = get_order_cache()
+    fresh_seconds = float(os.getenv("TRIAGE_ORDER_FRESH_SECONDS", "5"))
+    now = cache.clock()
+
+    results, stale, missing = {}, {}, []
+    for order_id in order_ids:
+        entry = cache.get(order_id.upper())
+        if entry is None:
+            missing.append(order_id)
+            metrics.incr("order_cache.miss")
+            continue
+
+        fetched_at, evidence = entry
+        age = now - fetched_at
+        metrics.observe("order_cache.age_seconds", age, STALENESS_BUCKETS)
+        results[order_id] = evidence
+        if age <= fresh_seconds:
+            metrics.incr("order_cache.fresh")
+        else:
+            stale[order_id] = round(age, 3)
+            metrics.incr("order_cache.stale")
+
+    if stale:
+        _refresh_in_background(list(stale))
+
+    if missing:
+        # Entries are stamped with the current time, so they must not come from another worker's older copy
+        for order_id, evidence in _fetch_fresh(missing, read_shared=False).items():
+            results[order_id] = evidence
+            _cache_order(cache, order_id, evidence)
+
+    return {order_id: results[order_id] for order_id in order_ids}, stale
+
+
+def _cache_order(cache: TTLCache, order_id: str, evidence) -> None:
+    # Errors are never cached, so a failing backend is retried on the next ticket
+    if "error" not in evidence:
+        cache.set(order_id.upper(), (cache.clock(), evidence))
+
+
+def _refresh_in_background(order_ids: list[str]) -> None:
+    global _refresh_pool
+    with _refresh_lock:
+        order_ids = [order_id for order_id in order_ids if order_id.upper() not in _refreshing]
+        if not order_ids:
+            return
+        _refreshing.update(order_id.upper() for order_id in order_ids)
+        if _refresh_pool is None:
+            _refresh_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="order-refresh")
+    _refresh_pool.submit(_refresh, order_ids)
+
+
+def _refresh(order_ids: list[str]) -> None:
+    cache = get_order_cache()
+    start = time.perf_counter()
+    try:
+        # A refresh must reach the backend, not another worker's copy of the same data
+        for order_id, evidence in _fetch_fresh(order_ids, read_shared=False).items():
+            _cache_order(cache, order_id, evidence)
+            note_order_seen(evidence)
+        metrics.incr("order_cache.refreshes", len(order_ids))
+        metrics.observe("order_cache.refresh_ms", (time.perf_counter() - start) * 1000)
+    except Exception as e:
+        print(f"Background order refresh failed: {e}")
+        metrics.incr("order_cache.refresh_errors")
+    finally:
+        with _refresh_lock:
+            _refreshing.difference_update(order_id.upper() for order_id in order_ids)
+
+
+def fetch_order_node(state: TriageState) -> dict:
     """
     Node that uses the fetch_order tool to get order details.
+    Multi-order tickets fetch all their orders concurrently.
     """
     order_id = state.get("order_id")
+    order_ids = state.get("order_ids") or []
+
+    if len(order_ids) > 1:
+        return _fetch_multiple(order_ids)
 
     if not order_id:
         print("No order_id found in state, skipping order fetch")
-        state["messages"].append({"role": "assistant", "content": "Skipped order fetch: no order_id"})
-        return state
+        return {"messages": [{"role": "assistant", "content": "Skipped order fetch: no order_id"}]}
 
-    # Call the tool
-    result = fetch_order_tool.invoke({"order_id": order_id})
+    results, stale = load_orders_with_age([order_id])
+    result = results[order_id]
 
     if "error" in result:
-        state["evidence"] = result
-        state["messages"].append({"role": "assistant", "content": f"Error: {result['error']}"})
+        if result["error"] != "Order not found":
+            mark_error(f"fetch_order failed: {result['error']}")
+        message = {"role": "assistant", "content": f"Error: {result['error']}"}
     else:
-        state["evidence"] = result
-        state["messages"].append({"role": "assistant", "content": f"Fetched order details: {order_id}"})
+        message = {"role": "assistant", "content": f"Fetched order details: {order_id}{_stale_note(order_id, stale)}"}
+
+    update = {"evidence": result, "messages": [message]}
+    if stale:
+        update["stale_orders"] = stale
+    return update
+
+
+def _fetch_multiple(order_ids: list[str]) -> dict:
+    results, stale = load_orders_with_age(order_ids)
+
+    messages = []
+    for order_id, result in results.items():
+        if "error" in result:
+            if result["error"] != "Order not found":
+                mark_error(f"fetch_order failed: {result['error']}")
+            messages.append({"role": "assistant", "content": f"Error for {order_id}: {result['error']}"})
+        else:
+            messages.append({"role": "assistant", "content": f"Fetched order details: {order_id}{_stale_note(order_id, stale)}"})
+
+    update = {"evidence": {"orders": list(results.values()), "count": len(results)}, "messages": messages}
+    if stale:
+        update["stale_orders"] = stale
+    return update
+
 
-    return state
+def _stale_note(order_id: str, stale: dict) -> str:
+    return f" (cached, {stale[order_id]:.1f}s old)" if order_id in stale else ""
 
 
 # Create ToolNode for use in graph
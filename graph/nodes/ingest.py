@@ -1,34 +1,120 @@
+import multiprocessing
+import os
 import re
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 
+from graph import metrics
 from graph.TriageState import TriageState
+from graph.preprocess import preprocess_enabled
 
 
-def ingest_node(state: TriageState) -> TriageState:
+def ingest_node(state: TriageState) -> dict:
     ticket_text = state["ticket_text"]
 
-    state["messages"] = [
-        {"role": "user", "content": ticket_text}
-    ]
+    # With preprocessing on, the (possibly huge) original is referenced rather than copied
+    if preprocess_enabled():
+        messages = [{"role": "user", "content": f"[ticket_text: {len(ticket_text)} chars]"}]
+    else:
+        messages = [{"role": "user", "content": ticket_text}]
+    update = {"messages": messages}
 
     # If order_id is not already in state, try to extract it from ticket_text
     if not state.get("order_id"):
-        order_id = extract_order_id(ticket_text)
-        if order_id:
-            state["order_id"] = order_id
-            state["messages"].append({"role": "assistant", "content": f"Extracted order_id: {order_id}"})
+        order_ids, customer_email = parse_ticket_text(ticket_text, max_order_ids(), not state.get("customer_email"))
+        if order_ids:
+            update["order_id"] = order_ids[0]
+            if len(order_ids) > 1:
+                # Multi-order ticket: every order is fetched and used as context
+                update["order_ids"] = order_ids
+                messages.append({"role": "assistant", "content": f"Extracted order_ids: {', '.join(order_ids)}"})
+            else:
+                messages.append({"role": "assistant", "content": f"Extracted order_id: {order_ids[0]}"})
         else:
-            state["messages"].append({"role": "assistant", "content": "No order_id found in ticket"})
+            messages.append({"role": "assistant", "content": "No order_id found in ticket"})
 
             # Only extract email if order_id is not found
-            if not state.get("customer_email"):
-                customer_email = extract_email(ticket_text)
-                if customer_email:
-                    state["customer_email"] = customer_email
-                    state["messages"].append({"role": "assistant", "content": f"Extracted email: {customer_email}"})
+            if customer_email:
+                update["customer_email"] = customer_email
+                messages.append({"role": "assistant", "content": f"Extracted email: {customer_email}"})
     else:
-        state["messages"].append({"role": "assistant", "content": f"Order_id provided: {state['order_id']}"})
+        messages.append({"role": "assistant", "content": f"Order_id provided: {state['order_id']}"})
+
+    return update
+
+
+def parse_ticket(text: str, limit: int, want_email: bool) -> tuple[list[str], str | None]:
+    """
+    The regex work of ingest: order ids, and the customer email when there are none
+    (and want_email). A top-level function so it can run in a worker process.
+    """
+    order_ids = extract_order_ids(text, limit)
+    if order_ids or not want_email:
+        return order_ids, None
+    return order_ids, extract_email(text)
+
+
+def parse_ticket_text(text: str, limit: int, want_email: bool) -> tuple[list[str], str | None]:
+    """
+    Runs parse_ticket inline for normal tickets. Tickets of at least
+    TRIAGE_INGEST_OFFLOAD_CHARS characters are parsed on the ingest pool
+    (TRIAGE_INGEST_POOL=process|thread|off), so a multi-megabyte paste does not hold
+    the GIL for tens of milliseconds while other tickets on this worker wait.
+    """
+    pool = _get_parse_pool() if len(text) >= offload_chars() else None
+    if pool is None:
+        return parse_ticket(text, limit, want_email)
+
+    start = time.perf_counter()
+    try:
+        result = pool.submit(parse_ticket, text, limit, want_email).result()
+    except BrokenProcessPool as e:
+        print(f"Ingest pool failed, parsing inline: {e}")
+        _reset_parse_pool(pool)
+        return parse_ticket(text, limit, want_email)
+    metrics.incr("ingest.offloaded")
+    metrics.observe("ingest.offloaded_ms", (time.perf_counter() - start) * 1000)
+    return result
+
+
+_parse_pool = None
+_parse_pool_lock = threading.Lock()
+
 
-    return state
+def offload_chars() -> int:
+    """
+    Ticket length from which parsing runs on the ingest pool (TRIAGE_INGEST_OFFLOAD_CHARS).
+    """
+    return int(os.getenv("TRIAGE_INGEST_OFFLOAD_CHARS", "262144"))
+
+
+def _get_parse_pool():
+    global _parse_pool
+    kind = os.getenv("TRIAGE_INGEST_POOL", "process").lower()
+    if kind == "off":
+        return None
+    if _parse_pool is None:
+        with _parse_pool_lock:
+            if _parse_pool is None:
+                size = int(os.getenv("TRIAGE_INGEST_POOL_SIZE", "2"))
+                if kind == "process":
+                    # spawn, not fork: the server process has running threads
+                    _parse_pool = ProcessPoolExecutor(size, mp_context=multiprocessing.get_context("spawn"))
+                elif kind == "thread":
+                    _parse_pool = ThreadPoolExecutor(size, thread_name_prefix="ingest-parse")
+                else:
+                    raise ValueError(f"Unknown TRIAGE_INGEST_POOL: {kind}")
+    return _parse_pool
+
+
+def _reset_parse_pool(pool) -> None:
+    global _parse_pool
+    with _parse_pool_lock:
+        if _parse_pool is pool:
+            _parse_pool = None
+    pool.shutdown(wait=False)
 
 
 def extract_order_id(text: str) -> str | None:
@@ -43,6 +129,31 @@ def extract_order_id(text: str) -> str | None:
     return None
 
 
+def extract_order_ids(text: str, limit: int = 5) -> list[str]:
+    """
+    Extracts every distinct order_id from ticket text, in order of appearance, up to limit.
+    Same format as extract_order_id; ids differing only in case are the same order.
+    """
+    print("Extracting order IDs from text...")
+    order_ids = []
+    seen = set()
+    for match in re.finditer(r"(ORD\d{4})", text, re.IGNORECASE):
+        order_id = match.group(1)
+        if order_id.upper() not in seen:
+            seen.add(order_id.upper())
+            order_ids.append(order_id)
+            if len(order_ids) >= limit:
+                break
+    return order_ids
+
+
+def max_order_ids() -> int:
+    """
+    Cap on the number of orders triaged for one ticket (TRIAGE_MAX_ORDER_IDS).
+    """
+    return max(1, int(os.getenv("TRIAGE_MAX_ORDER_IDS", "5")))
+
+
 def extract_email(text: str) -> str | None:
     """
     Extracts email address from ticket text using regex pattern.
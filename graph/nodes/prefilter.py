@@ -0,0 +1,34 @@
+import os
+
+from graph import metrics
+from graph.TriageState import TriageState
+from graph.prefilter import prefilter_ticket
+
+
+def prefilter_node(state: TriageState) -> dict:
+    """
+    Node at the head of the graph that tags out-of-office replies, delivery-failure
+    bounces, spam and empty tickets. Tickets with header evidence (or no text) end
+    without any backend call; tickets tagged from body wording only are marked with
+    suspected_tag and triaged as usual.
+    """
+    if os.getenv("TRIAGE_PREFILTER", "false").lower() != "true":
+        return {}
+
+    tag, reason, ends = prefilter_ticket(state["ticket_text"])
+    if tag is None:
+        metrics.incr("prefilter.passed")
+        return {}
+    if not ends:
+        metrics.incr(f"prefilter.suspected_{tag}")
+        return {"suspected_tag": tag}
+
+    metrics.incr(f"prefilter.{tag}")
+    return {
+        "ticket_tag": tag,
+        "recommendation": f"No reply needed: ticket was identified as {tag.replace('_', ' ')}.",
+        "messages": [
+            {"role": "user", "content": state["ticket_text"]},
+            {"role": "system", "content": f"Workflow stopped: ticket tagged as {tag} ({reason})"}
+        ]
+    }
@@ -0,0 +1,25 @@
+import os
+
+from graph.TriageState import TriageState
+from graph.preprocess import clean_ticket_text, configured_rules, preprocess_enabled
+
+
+def preprocess_node(state: TriageState) -> dict:
+    """
+    Node that runs after ingest and cleans the ticket text sent to the backend:
+    strips HTML, quoted replies and signatures and truncates very long text.
+    The original stays in ticket_text.
+    """
+    if not preprocess_enabled():
+        return {}
+
+    ticket_text = state["ticket_text"]
+    clean_text = clean_ticket_text(
+        ticket_text,
+        max_chars=int(os.getenv("TRIAGE_PREPROCESS_MAX_CHARS", "4000")),
+        rules=configured_rules(),
+    )
+    return {
+        "clean_text": clean_text,
+        "messages": [{"role": "assistant", "content": f"Preprocessed ticket text: {len(ticket_text)} -> {len(clean_text)} chars"}]
+    }
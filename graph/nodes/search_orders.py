@@ -1,9 +1,12 @@
-import os
 import requests
 from langchain_core.tools import tool
 from langgraph.prebuilt import ToolNode
 
+from graph.OrderEvidence import OrderEvidence
 from graph.TriageState import TriageState
+from graph.backend import backend_get
+from graph.cache import email_cache_enabled, email_cache_key, get_email_cache
+from graph.tracing import mark_error
 
 
 @tool
@@ -18,9 +21,6 @@ def search_orders_tool(customer_email: str = None, query: str = None) -> dict:
     Returns:
         dict: Search results with list of matching orders
     """
-    backend_url = os.getenv("BACKEND_URL", "http://localhost:8000")
-    endpoint = f"{backend_url}/orders/search"
-
     params = {}
     if customer_email:
         params["customer_email"] = customer_email
@@ -28,7 +28,7 @@ def search_orders_tool(customer_email: str = None, query: str = None) -> dict:
         params["q"] = query
 
     try:
-        response = requests.get(endpoint, params=params)
+        response = backend_get("/orders/search", params=params)
         response.raise_for_status()
         return response.json()
 
@@ -36,40 +36,72 @@ def search_orders_tool(customer_email: str = None, query: str = None) -> dict:
         return {"error": f"Search failed: {str(e)}", "results": []}
 
 
-def search_orders_node(state: TriageState) -> TriageState:
+def search_orders_node(state: TriageState) -> dict:
     """
     Node that uses the search_orders tool to find orders by customer email.
+    With TRIAGE_EMAIL_CACHE=true, repeat customers reuse the results of an earlier search.
     """
     customer_email = state.get("customer_email")
 
     if not customer_email:
         print("No customer_email found in state, cannot search orders")
-        state["messages"].append({"role": "assistant", "content": "No customer email found for order search"})
-        return state
+        return {"messages": [{"role": "assistant", "content": "No customer email found for order search"}]}
+
+    cached = _cached_results(customer_email) if email_cache_enabled() else None
+    results, stale = cached if cached is not None else (None, {})
 
-    # Call the tool
-    result = search_orders_tool.invoke({"customer_email": customer_email})
+    if results is None:
+        # Call the tool
+        result = search_orders_tool.invoke({"customer_email": customer_email})
 
-    if "error" in result:
-        state["messages"].append({"role": "assistant", "content": f"Error: {result['error']}"})
-        return state
+        if "error" in result:
+            mark_error(f"search_orders failed: {result['error']}")
+            return {"messages": [{"role": "assistant", "content": f"Error: {result['error']}"}]}
 
-    results = result.get("results", [])
+        results = [OrderEvidence.from_dict(order) for order in result.get("results", [])]
+        if email_cache_enabled():
+            cache = get_email_cache()
+            cache.set(email_cache_key(customer_email), (cache.clock(), results))
 
     if len(results) == 0:
-        state["messages"].append({"role": "assistant", "content": f"No orders found for email: {customer_email}"})
+        return {"messages": [{"role": "assistant", "content": f"No orders found for email: {customer_email}"}]}
     elif len(results) == 1:
         # Single match - use this order
         order = results[0]
-        state["order_id"] = order.get("order_id")
-        state["evidence"] = order
-        state["messages"].append({"role": "assistant", "content": f"Found order {state['order_id']} for email {customer_email}"})
+        order_id = order.get("order_id")
+        update = {
+            "order_id": order_id,
+            "evidence": order if isinstance(order, OrderEvidence) else OrderEvidence.from_dict(order),
+            "messages": [{"role": "assistant", "content": f"Found order {order_id} for email {customer_email}"}]
+        }
     else:
         # Multiple matches - store all in evidence
-        state["evidence"] = {"multiple_orders": results, "count": len(results)}
-        state["messages"].append({"role": "assistant", "content": f"Found {len(results)} orders for email {customer_email}"})
+        update = {
+            "evidence": {
+                "multiple_orders": [order if isinstance(order, OrderEvidence) else OrderEvidence.from_dict(order) for order in results],
+                "count": len(results)
+            },
+            "messages": [{"role": "assistant", "content": f"Found {len(results)} orders for email {customer_email}"}]
+        }
+
+    if stale:
+        update["stale_orders"] = stale
+    return update
 
-    return state
+
+def _cached_results(customer_email: str) -> tuple[list, dict] | None:
+    """
+    (orders, {order_id: age_seconds}) from the cached search for this email, or None on a cache miss.
+    A hit makes no backend request; the ages report how old the cached orders are.
+    """
+    cache = get_email_cache()
+    entry = cache.get(email_cache_key(customer_email))
+    if entry is None:
+        return None
+
+    fetched_at, orders = entry
+    age = round(cache.clock() - fetched_at, 3)
+    return orders, {order["order_id"]: age for order in orders if order.get("order_id")}
 
 
 # Create ToolNode for use in graph
@@ -0,0 +1,203 @@
+import re
+from collections import deque
+
+
+class KeywordAutomaton:
+    """
+    Aho-Corasick automaton: finds every occurrence of a fixed set of keywords
+    in a single pass over the text, independent of the number of keywords.
+    """
+
+    def __init__(self, keywords: dict[str, str]):
+        """
+        keywords maps each (lowercase) keyword to the label reported when it matches.
+        """
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [[]]
+
+        for keyword, label in keywords.items():
+            state = 0
+            for char in keyword:
+                if char not in self._goto[state]:
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                    self._goto[state][char] = len(self._goto) - 1
+                state = self._goto[state][char]
+            self._output[state].append((keyword, label))
+
+        # Breadth-first construction of failure links
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in self._goto[state].items():
+                queue.append(child)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(char, 0)
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+
+    def find(self, text: str) -> list[tuple[str, str]]:
+        """
+        Returns (keyword, label) for every match in text (case-insensitive).
+        """
+        matches = []
+        state = 0
+        goto, fail, output = self._goto, self._fail, self._output
+        for char in text.lower():
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                matches.extend(output[state])
+        return matches
+
+
+# Header-like lines that mail systems add to automatic messages, matched in the leading header block only
+HEADER_PATTERNS = [
+    (re.compile(r"^auto-submitted:\s*auto-(replied|generated)", re.IGNORECASE | re.MULTILINE), "auto_reply"),
+    (re.compile(r"^x-autoreply:|^x-autorespond:|^x-auto-response-suppress:", re.IGNORECASE | re.MULTILINE), "auto_reply"),
+    (re.compile(r"^precedence:\s*(auto_reply|bulk|junk)", re.IGNORECASE | re.MULTILINE), "auto_reply"),
+    # Subjects only as mail systems write them: the phrase, then ":" (before the original subject) or nothing
+    (re.compile(r"^subject:\s*(out of (the )?office|automatic reply|auto(matic)?[- ]?reply|autoreply)\s*(:|$)", re.IGNORECASE | re.MULTILINE), "auto_reply"),
+    (re.compile(r"^subject:\s*(undeliverable|undelivered mail( returned to sender)?|delivery status notification( \((failure|delay)\))?|mail delivery failed|returned mail|failure notice)\s*(:|$)", re.IGNORECASE | re.MULTILINE), "bounce"),
+    (re.compile(r"^from:\s*\"?(mailer-daemon|postmaster|mail delivery (subsystem|system))", re.IGNORECASE | re.MULTILINE), "bounce"),
+]
+
+# Body wording is only a hint: customers quote auto-replies and complain about spam. A ticket
+# tagged from its body (see prefilter_ticket) still goes through triage.
+KEYWORDS = {
+    # Out-of-office and other automatic replies (full phrases, so customers mentioning being away do not match)
+    "i am currently out of the office": "auto_reply",
+    "i am out of the office until": "auto_reply",
+    "i'm out of the office until": "auto_reply",
+    "this is an automated response": "auto_reply",
+    "this is an automatic reply": "auto_reply",
+    "i am currently on vacation": "auto_reply",
+    "i'm currently on vacation": "auto_reply",
+    "limited access to email": "auto_reply",
+    "limited access to my email": "auto_reply",
+    "will respond to your message when i return": "auto_reply",
+    "i will be back in the office": "auto_reply",
+    "thank you for your email. i am away": "auto_reply",
+    # Delivery-failure bounces: wording only mail systems use
+    "mailer-daemon": "bounce",
+    "mail delivery subsystem": "bounce",
+    "this is the mail system at host": "bounce",
+    "delivery has failed to these recipients": "bounce",
+    "permanent fatal errors": "bounce",
+    "550 5.1.1": "bounce",
+    "recipient address rejected": "bounce",
+    # Bounce wording customers also write (needs two distinct hits, see BOUNCE_MIN_PHRASES)
+    "message could not be delivered": "bounce_phrase",
+    "your message wasn't delivered": "bounce_phrase",
+    "delivery status notification": "bounce_phrase",
+    "address couldn't be found": "bounce_phrase",
+    "address not found": "bounce_phrase",
+    # Spam vocabulary (needs two distinct hits, see SPAM_MIN_HITS)
+    "viagra": "spam",
+    "casino": "spam",
+    "you have won": "spam",
+    "you've won": "spam",
+    "claim your prize": "spam",
+    "lottery": "spam",
+    "crypto investment": "spam",
+    "bitcoin": "spam",
+    "guaranteed returns": "spam",
+    "wire transfer": "spam",
+    "seo services": "spam",
+    "rank your website": "spam",
+    "work from home": "spam",
+    "100% free": "spam",
+    "limited time offer": "spam",
+    "act now": "spam",
+    "click here": "spam",
+    "unsubscribe": "spam",
+    "cheap meds": "spam",
+    "weight loss": "spam",
+    "http://": "link",
+    "https://": "link",
+}
+
+SPAM_MIN_HITS = 2
+BOUNCE_MIN_PHRASES = 2
+# Only the start of the text is scanned: headers and bounce/auto-reply wording come
+# first, and the keyword automaton walks the text one character at a time
+PREFILTER_SCAN_CHARS = 8192
+# Length heuristics: link-heavy messages with little text around the links are spam
+LINK_SPAM_MIN_LINKS = 3
+LINK_SPAM_MAX_WORDS_PER_LINK = 25
+
+_automaton = KeywordAutomaton(KEYWORDS)
+_WORD = re.compile(r"\w+")
+_LINK = re.compile(r"https?://", re.IGNORECASE)
+# Same pattern as extract_order_id in graph/nodes/ingest.py
+_ORDER_ID = re.compile(r"ORD\d{4}", re.IGNORECASE)
+# Same pattern as extract_email in graph/nodes/ingest.py
+_EMAIL = re.compile(r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b")
+_HEADER_LINE = re.compile(r"[A-Za-z][\w-]*:[ \t]")
+
+
+def header_block(text: str) -> str:
+    """
+    The leading "Name: value" lines of the text, where mail systems put their headers.
+    """
+    lines = []
+    for line in text.splitlines():
+        if not _HEADER_LINE.match(line):
+            break
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def prefilter_ticket(text: str) -> tuple[str | None, str | None, bool]:
+    """
+    Tags tickets that may need no triage. Returns (tag, reason, ends) where tag is
+    "empty", "auto_reply", "bounce" or "spam", or (None, None, False) for a real ticket.
+    Only tickets without text or with header evidence end (ends=True); body wording
+    tags a ticket without ending it, and not at all when the ticket names an order
+    (or, for spam, a customer email address). Only the first PREFILTER_SCAN_CHARS
+    characters are scanned.
+    """
+    head = text[:PREFILTER_SCAN_CHARS]
+    words = _WORD.findall(head)
+    if not words and not _WORD.search(text, PREFILTER_SCAN_CHARS):
+        return "empty", "no text", True
+
+    headers = header_block(head)
+    for pattern, tag in HEADER_PATTERNS:
+        match = pattern.search(headers)
+        if match:
+            return tag, f"header: {match.group(0).strip()}", True
+
+    # A real order reference is a strong sign of a genuine ticket
+    if _ORDER_ID.search(head):
+        return None, None, False
+
+    hits = {}
+    for keyword, label in _automaton.find(head):
+        hits.setdefault(label, set()).add(keyword)
+
+    bounce_phrases = hits.get("bounce_phrase", set())
+    if "bounce" in hits:
+        return "bounce", f"keyword: {sorted(hits['bounce'])[0]}", False
+    if len(bounce_phrases) >= BOUNCE_MIN_PHRASES:
+        return "bounce", f"keywords: {', '.join(sorted(bounce_phrases))}", False
+    if "auto_reply" in hits:
+        return "auto_reply", f"keyword: {sorted(hits['auto_reply'])[0]}", False
+
+    # Bounces quote the failed recipient, but spam does not carry the sender's own address
+    if _EMAIL.search(head):
+        return None, None, False
+
+    spam_hits = hits.get("spam", set())
+    if len(spam_hits) >= SPAM_MIN_HITS:
+        return "spam", f"keywords: {', '.join(sorted(spam_hits))}", False
+
+    links = len(_LINK.findall(head)) if "link" in hits else 0
+    if links >= LINK_SPAM_MIN_LINKS and len(words) / links <= LINK_SPAM_MAX_WORDS_PER_LINK:
+        return "spam", f"{links} links in {len(words)} words", False
+
+    return None, None, False
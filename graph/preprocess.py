@@ -0,0 +1,114 @@
+import html
+import os
+import re
+
+# Lines that start the quoted part of an email thread; everything from there on is dropped
+REPLY_HEADERS = [
+    re.compile(r"^\s*On .{1,200}wrote:\s*$", re.IGNORECASE),
+    re.compile(r"^\s*-{2,}\s*Original Message\s*-{2,}\s*$", re.IGNORECASE),
+    re.compile(r"^\s*-{2,}\s*Forwarded message\s*-{2,}\s*$", re.IGNORECASE),
+    re.compile(r"^\s*_{10,}\s*$"),
+]
+# An Outlook-style "From: ... / Sent: ..." header block also starts a quoted reply
+_OUTLOOK_FROM = re.compile(r"^\s*From:\s*\S", re.IGNORECASE)
+_OUTLOOK_SENT = re.compile(r"^\s*(Sent|Date):\s*\S", re.IGNORECASE)
+
+# Lines that start a signature; only honoured in the last SIGNATURE_MAX_LINES lines
+SIGNATURE_MARKERS = [
+    re.compile(r"^--\s*$"),
+    re.compile(r"^\s*Sent from my (iPhone|iPad|Android|mobile|Galaxy|phone)", re.IGNORECASE),
+    re.compile(r"^\s*Get Outlook for (iOS|Android)", re.IGNORECASE),
+]
+SIGNATURE_MAX_LINES = 12
+
+_HTML_HINT = re.compile(r"<(html|body|div|p|br|span|table|td|font|a)\b", re.IGNORECASE)
+_HTML_DROP = re.compile(r"<(script|style|head)\b.*?</\1\s*>", re.IGNORECASE | re.DOTALL)
+_HTML_BREAK = re.compile(r"<(br|/p|/div|/tr|/li|/h[1-6])\b[^>]*>", re.IGNORECASE)
+_HTML_TAG = re.compile(r"<[^>]+>")
+_BLANK_LINES = re.compile(r"\n{3,}")
+_SPACES = re.compile(r"[ \t]+")
+
+
+def preprocess_enabled() -> bool:
+    return os.getenv("TRIAGE_PREPROCESS", "false").lower() == "true"
+
+
+def strip_html(text: str) -> str:
+    """
+    Converts an HTML body to plain text (no-op for text without HTML tags).
+    """
+    if not _HTML_HINT.search(text):
+        return text
+    text = _HTML_DROP.sub("", text)
+    text = _HTML_BREAK.sub("\n", text)
+    text = _HTML_TAG.sub("", text)
+    return html.unescape(text)
+
+
+def strip_quoted_replies(text: str) -> str:
+    """
+    Drops the quoted thread below the customer's message: "> " lines and everything
+    after a reply header ("On ... wrote:", "-----Original Message-----", "From:/Sent:").
+    """
+    lines = text.split("\n")
+    kept = []
+    for i, line in enumerate(lines):
+        if any(pattern.match(line) for pattern in REPLY_HEADERS):
+            break
+        if _OUTLOOK_FROM.match(line) and i + 1 < len(lines) and _OUTLOOK_SENT.match(lines[i + 1]) and kept:
+            break
+        if line.lstrip().startswith(">"):
+            continue
+        kept.append(line)
+    return "\n".join(kept)
+
+
+def strip_signature(text: str) -> str:
+    lines = text.rstrip().split("\n")
+    for i in range(max(0, len(lines) - SIGNATURE_MAX_LINES), len(lines)):
+        if i > 0 and any(pattern.match(lines[i]) for pattern in SIGNATURE_MARKERS):
+            return "\n".join(lines[:i])
+    return text
+
+
+def truncate(text: str, max_chars: int) -> str:
+    """
+    Keeps the head and the tail of overlong text (pasted logs usually end with the error).
+    """
+    if max_chars <= 0 or len(text) <= max_chars:
+        return text
+    head = max_chars * 3 // 4
+    tail = max_chars - head
+    omitted = len(text) - head - tail
+    return f"{text[:head]}\n[... {omitted} characters omitted ...]\n{text[-tail:]}"
+
+
+RULES = {
+    "html": strip_html,
+    "quotes": strip_quoted_replies,
+    "signature": strip_signature,
+}
+
+
+def clean_ticket_text(text: str, max_chars: int = 4000, rules=tuple(RULES)) -> str:
+    """
+    Applies the named RULES in order and truncates the result to max_chars.
+    Falls back to the (truncated) original when cleaning would leave nothing.
+    """
+    cleaned = text
+    for rule in rules:
+        cleaned = RULES[rule](cleaned)
+    cleaned = _BLANK_LINES.sub("\n\n", _SPACES.sub(" ", cleaned)).strip()
+    return truncate(cleaned or text.strip(), max_chars)
+
+
+def configured_rules() -> list[str]:
+    """
+    Rules from TRIAGE_PREPROCESS_RULES (comma-separated, default: all of RULES).
+    """
+    value = os.getenv("TRIAGE_PREPROCESS_RULES", ",".join(RULES))
+    rules = [rule.strip() for rule in value.split(",") if rule.strip()]
+    unknown = [rule for rule in rules if rule not in RULES]
+    if unknown:
+        raise ValueError(f"Unknown TRIAGE_PREPROCESS_RULES: {', '.join(unknown)}")
+    return rules
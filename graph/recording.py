@@ -0,0 +1,238 @@
+import atexit
+import gzip
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+
+from graph import metrics
+
+_EMAIL = re.compile(r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b")
+# Whole digit runs only (not inside tracking numbers or ids), and not ISO dates
+_PHONE = re.compile(r"(?<!\w)(?!\d{4}-\d{2}-\d{2}(?!\w))\+?\d[\d\s().-]{7,}\d(?!\w)")
+# Calls between sync flushes of the capture file
+FLUSH_EVERY = 100
+# Order fields whose values are personal data
+NAME_FIELDS = ("customer_name", "name", "first_name", "last_name", "address", "shipping_address", "phone")
+# Free-text fields of request and response bodies (phone numbers in order fields are covered by NAME_FIELDS)
+FREE_TEXT_FIELDS = ("ticket_text", "reply_text")
+
+
+def pseudonym(value: str, length: int = 10) -> str:
+    """
+    Stable stand-in for a personal value: the same customer maps to the same pseudonym
+    in every capture, so replays keep the original repeat (and cache hit) pattern.
+    """
+    return hashlib.sha1(value.lower().encode("utf-8")).hexdigest()[:length]
+
+
+def _map_strings(value, fn):
+    if isinstance(value, str):
+        return fn(value)
+    if isinstance(value, dict):
+        return {key: _map_strings(item, fn) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_map_strings(item, fn) for item in value]
+    return value
+
+
+def redact_emails(value):
+    """
+    Replaces email addresses (in ticket text, search params and order documents).
+    """
+    return _map_strings(value, lambda text: _EMAIL.sub(lambda m: f"user-{pseudonym(m.group(0))}@example.com", text))
+
+
+def _mask_phones(text: str) -> str:
+    return _PHONE.sub(lambda m: re.sub(r"\d", "5", m.group(0)), text)
+
+
+def _redact_phone_fields(value):
+    if isinstance(value, dict):
+        return {
+            key: _mask_phones(item) if key in FREE_TEXT_FIELDS and isinstance(item, str)
+            else _redact_phone_fields(item)
+            for key, item in value.items()
+        }
+    if isinstance(value, list):
+        return [_redact_phone_fields(item) for item in value]
+    return value
+
+
+def redact_phones(value):
+    """
+    Replaces the digits of phone-number-like sequences in free text (a plain-text body
+    or FREE_TEXT_FIELDS), keeping their length. Order fields such as dates, amounts and
+    tracking numbers are left alone.
+    """
+    if isinstance(value, str):
+        return _mask_phones(value)
+    return _redact_phone_fields(value)
+
+
+def redact_names(value):
+    """
+    Replaces the values of NAME_FIELDS in order documents.
+    """
+    if isinstance(value, dict):
+        return {
+            key: f"Customer {pseudonym(item, 6)}" if key in NAME_FIELDS and isinstance(item, str)
+            else redact_names(item)
+            for key, item in value.items()
+        }
+    if isinstance(value, list):
+        return [redact_names(item) for item in value]
+    return value
+
+
+# Redaction hooks applied to request and response bodies before they are written.
+# Add an entry here to plug in another hook and name it in TRIAGE_RECORD_REDACT.
+REDACTORS = {
+    "emails": redact_emails,
+    "phones": redact_phones,
+    "names": redact_names,
+}
+
+
+def configured_redactors() -> list[str]:
+    """
+    Redactors from TRIAGE_RECORD_REDACT (comma-separated, default: all of REDACTORS).
+    """
+    value = os.getenv("TRIAGE_RECORD_REDACT", ",".join(REDACTORS))
+    names = [name.strip() for name in value.split(",") if name.strip()]
+    unknown = [name for name in names if name not in REDACTORS]
+    if unknown:
+        raise ValueError(f"Unknown TRIAGE_RECORD_REDACT: {', '.join(unknown)}")
+    return names
+
+
+def request_body(kwargs: dict):
+    """
+    The JSON body of a backend request as passed to requests (json= or gzipped data=).
+    """
+    if kwargs.get("json") is not None:
+        return kwargs["json"]
+    data = kwargs.get("data")
+    if data is None:
+        return None
+    if (kwargs.get("headers") or {}).get("Content-Encoding") == "gzip":
+        data = gzip.decompress(data)
+    return json.loads(data)
+
+
+class TrafficRecorder:
+    """
+    Appends backend request/response pairs with their timings to a gzipped JSON-lines
+    capture, after running the redaction hooks over both bodies. One line per call:
+
+        {"ts": seconds since recording started, "method", "path", "params", "body",
+         "status", "elapsed_ms", "response", "response_bytes"}
+
+    Serve a capture with graph/benchmarks/replay_backend.py.
+    """
+
+    def __init__(self, path: str, redactors=tuple(REDACTORS), sample_rate: float = 1.0, rng=None):
+        self.path = path
+        self.redactors = [REDACTORS[name] for name in redactors]
+        self.sample_rate = sample_rate
+        self.rng = rng or random.Random()
+        self.recorded = 0
+        self._started = time.monotonic()
+        self._lock = threading.Lock()
+        # Appending starts a new gzip member; readers see one continuous stream
+        self._file = gzip.open(path, "at", encoding="utf-8", compresslevel=6)
+
+    def record(self, method: str, path: str, kwargs: dict, response, elapsed: float) -> None:
+        if self.sample_rate < 1.0 and self.rng.random() >= self.sample_rate:
+            return
+        try:
+            payload = response.json()
+        except ValueError:
+            payload = response.text
+        content = getattr(response, "content", None)
+        entry = {
+            "ts": round(time.monotonic() - self._started, 6),
+            "method": method,
+            "path": path,
+            "params": self._redact(kwargs.get("params")),
+            "body": self._redact(request_body(kwargs)),
+            "status": response.status_code,
+            "elapsed_ms": round(elapsed * 1000, 3),
+            "response": self._redact(payload),
+            "response_bytes": len(content) if isinstance(content, bytes) else len(json.dumps(payload)),
+        }
+        line = json.dumps(entry, separators=(",", ":"))
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.write(line + "\n")
+            self.recorded += 1
+            # Sync-flush now and then so a killed process loses at most the last few calls
+            if self.recorded % FLUSH_EVERY == 0:
+                self._file.flush()
+        metrics.incr("recording.recorded")
+
+    def _redact(self, value):
+        for redactor in self.redactors:
+            value = redactor(value)
+        return value
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def stats(self) -> dict:
+        return {"path": self.path, "recorded": self.recorded, "sample_rate": self.sample_rate}
+
+
+def read_capture(path: str) -> list[dict]:
+    """
+    Loads every entry of a capture file (up to a truncated tail, if the recording
+    process was killed).
+    """
+    entries = []
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        try:
+            for line in f:
+                if line.endswith("\n"):
+                    entries.append(json.loads(line))
+        except EOFError:
+            pass
+    return entries
+
+
+_recorder = None
+_recorder_lock = threading.Lock()
+
+
+def get_recorder() -> TrafficRecorder | None:
+    """
+    Returns the process-wide recorder, or None unless TRIAGE_RECORD_PATH is set.
+    """
+    global _recorder
+    if _recorder is None:
+        path = os.getenv("TRIAGE_RECORD_PATH")
+        if not path:
+            return None
+        with _recorder_lock:
+            if _recorder is None:
+                _recorder = TrafficRecorder(
+                    path,
+                    redactors=configured_redactors(),
+                    sample_rate=float(os.getenv("TRIAGE_RECORD_SAMPLE_RATE", "1.0")),
+                )
+                atexit.register(_recorder.close)
+                metrics.register("recording", _recorder.stats)
+    return _recorder
+
+
+def set_recorder(recorder: TrafficRecorder | None) -> None:
+    global _recorder
+    _recorder = recorder
+    if recorder is not None:
+        metrics.register("recording", recorder.stats)
@@ -0,0 +1,363 @@
+import hashlib
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import zlib
+
+from graph import metrics
+from graph.cache import TTLCache
+from graph.OrderEvidence import OrderEvidence
+from graph.sqlite_connections import SQLiteConnections
+
+# Identifies the worker process that wrote an entry, to count cross-worker hits
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+# Values at least this large (serialized) are zlib-compressed
+COMPRESS_MIN_BYTES = 512
+
+# Default time-to-live per namespace, overridable with TRIAGE_CACHE_<NAMESPACE>_TTL_SECONDS
+NAMESPACE_TTLS = {"order": 60.0, "classify": 3600.0, "reply": 600.0}
+
+
+# Key of the JSON object that stands for an OrderEvidence (its fields as a positional list)
+ORDER_EVIDENCE_TAG = "__order_evidence__"
+
+
+def _encode(value):
+    if isinstance(value, OrderEvidence):
+        *fields, extras_raw = value.astuple()
+        return {ORDER_EVIDENCE_TAG: fields + [extras_raw.decode("utf-8") if extras_raw is not None else None]}
+    raise TypeError(f"Cannot cache a {type(value).__name__}")
+
+
+def _decode(obj: dict):
+    if len(obj) == 1 and ORDER_EVIDENCE_TAG in obj:
+        *fields, extras = obj[ORDER_EVIDENCE_TAG]
+        return OrderEvidence(*fields, extras_raw=extras.encode("utf-8") if extras is not None else None)
+    return obj
+
+
+def serialize(value, writer: str = WORKER_ID) -> bytes:
+    """
+    Compact encoding of a cached value: JSON (OrderEvidence as a positional list),
+    zlib-compressed above COMPRESS_MIN_BYTES, with a one-byte format marker.
+    """
+    body = json.dumps([writer, value], default=_encode, separators=(",", ":")).encode("utf-8")
+    if len(body) >= COMPRESS_MIN_BYTES:
+        return b"z" + zlib.compress(body)
+    return b"j" + body
+
+
+def deserialize(data: bytes) -> tuple[str, object]:
+    """
+    Returns (writer, value). Entries are plain JSON, so reading one never runs code,
+    whoever wrote it.
+    """
+    marker, body = data[:1], data[1:]
+    if marker == b"z":
+        body = zlib.decompress(body)
+    elif marker != b"j":
+        raise ValueError(f"Unknown cache entry format: {marker!r}")
+    writer, value = json.loads(body, object_hook=_decode)
+    return writer, value
+
+
+class CacheBackend:
+    """
+    Byte store behind SharedCache. Implementations must be safe to use from many threads.
+    """
+
+    name = "base"
+
+    def get(self, key: str) -> bytes | None:
+        raise NotImplementedError
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class LocalCacheBackend(CacheBackend):
+    """
+    In-process LRU. Fast, but every worker has its own copy.
+    """
+
+    name = "local"
+
+    def __init__(self, max_entries: int = 10000):
+        # Public so its entries can be snapshotted across restarts (see graph/warmup.py)
+        self.cache = TTLCache(max_entries=max_entries)
+
+    def get(self, key: str) -> bytes | None:
+        return self.cache.get(key)
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        self.cache.set(key, value, ttl=ttl)
+
+    def delete(self, key: str) -> None:
+        self.cache.invalidate(key)
+
+
+class SQLiteCacheBackend(CacheBackend):
+    """
+    Cache file shared by all workers on one host (WAL mode, one connection per thread).
+    Expired rows are purged on a fraction of writes; max_entries bounds the table size.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path: str, max_entries: int = 100000):
+        self.path = path
+        self.max_entries = max_entries
+        self._connections = SQLiteConnections(self.path, timeout=5.0)
+        self._writes = 0
+        with self._connections.get() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value BLOB NOT NULL, expires REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS cache_expires ON cache (expires)")
+
+    def get(self, key: str) -> bytes | None:
+        row = self._connections.get().execute(
+            "SELECT value FROM cache WHERE key = ? AND expires > ?", (key, time.time())
+        ).fetchone()
+        return row[0] if row else None
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        conn = self._connections.get()
+        conn.execute(
+            "INSERT OR REPLACE INTO cache (key, value, expires) VALUES (?, ?, ?)", (key, value, time.time() + ttl)
+        )
+        self._writes += 1
+        if self._writes % 100 == 0:
+            self._purge(conn)
+
+    def delete(self, key: str) -> None:
+        self._connections.get().execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    def _purge(self, conn: sqlite3.Connection) -> None:
+        conn.execute("DELETE FROM cache WHERE expires <= ?", (time.time(),))
+        conn.execute(
+            "DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY expires LIMIT "
+            "max(0, (SELECT count(*) FROM cache) - ?))",
+            (self.max_entries,),
+        )
+
+    def close(self) -> None:
+        self._connections.close()
+
+
+class MemcachedCacheBackend(CacheBackend):
+    """
+    Minimal client for the memcached text protocol (get/set/delete), one socket per thread.
+    Works with memcached and compatible servers; network errors count as misses.
+    """
+
+    name = "memcached"
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 11211, timeout: float = 0.5):
+        self.address = (host, port)
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _socket(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            sock = socket.create_connection(self.address, timeout=self.timeout)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            conn = self._local.conn = (sock, sock.makefile("rb"))
+        return conn
+
+    def _call(self, request: bytes, read):
+        try:
+            sock, reader = self._socket()
+            sock.sendall(request)
+            return read(reader)
+        except OSError as e:
+            print(f"Memcached error: {e}")
+            self.close()
+            return None
+
+    @staticmethod
+    def _key(key: str) -> bytes:
+        # Memcached keys are at most 250 bytes without spaces or control characters
+        encoded = key.encode("utf-8")
+        if len(encoded) > 250 or any(c <= 32 or c == 127 for c in encoded):
+            raise ValueError(f"Invalid memcached key: {key!r}")
+        return encoded
+
+    def get(self, key: str) -> bytes | None:
+        def read(reader):
+            header = reader.readline()
+            if header.startswith(b"VALUE "):
+                size = int(header.split()[3])
+                value = reader.read(size + 2)[:-2]
+                reader.readline()  # END
+                return value
+            return None
+
+        return self._call(b"get " + self._key(key) + b"\r\n", read)
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        header = b"set %s 0 %d %d\r\n" % (self._key(key), max(1, int(ttl)), len(value))
+        self._call(header + value + b"\r\n", lambda reader: reader.readline())
+
+    def delete(self, key: str) -> None:
+        self._call(b"delete " + self._key(key) + b"\r\n", lambda reader: reader.readline())
+
+    def close(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            sock, reader = conn
+            reader.close()
+            sock.close()
+            self._local.conn = None
+
+
+class SharedCache:
+    """
+    Namespaced object cache over a CacheBackend, with hit-rate stats. A hit on an entry
+    written by another worker counts as a cross-worker hit.
+    """
+
+    def __init__(self, backend: CacheBackend, prefix: str = "triage"):
+        self.backend = backend
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "cross_worker_hits": 0, "sets": 0, "errors": 0,
+                       "bytes_read": 0, "bytes_written": 0}
+
+    def _key(self, namespace: str, key: str) -> str:
+        return f"{self.prefix}:{namespace}:{key}"
+
+    def get(self, namespace: str, key: str):
+        try:
+            data = self.backend.get(self._key(namespace, key))
+            entry = deserialize(data) if data is not None else None
+        except Exception as e:
+            print(f"Shared cache read failed: {e}")
+            self._count("errors")
+            entry = None
+
+        if entry is None:
+            self._count("misses")
+            return None
+
+        writer, value = entry
+        with self._lock:
+            self._stats["hits"] += 1
+            self._stats["bytes_read"] += len(data)
+            if writer != WORKER_ID:
+                self._stats["cross_worker_hits"] += 1
+        return value
+
+    def set(self, namespace: str, key: str, value, ttl: float | None = None) -> None:
+        if ttl is None:
+            ttl = namespace_ttl(namespace)
+        try:
+            data = serialize(value)
+            self.backend.set(self._key(namespace, key), data, ttl)
+        except Exception as e:
+            print(f"Shared cache write failed: {e}")
+            self._count("errors")
+            return
+        with self._lock:
+            self._stats["sets"] += 1
+            self._stats["bytes_written"] += len(data)
+
+    def delete(self, namespace: str, key: str) -> None:
+        try:
+            self.backend.delete(self._key(namespace, key))
+        except Exception as e:
+            print(f"Shared cache delete failed: {e}")
+            self._count("errors")
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._stats[name] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats["backend"] = self.backend.name
+        stats["worker"] = WORKER_ID
+        stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        stats["cross_worker_hit_rate"] = round(stats["cross_worker_hits"] / lookups, 4) if lookups else 0.0
+        return stats
+
+
+def content_key(*parts) -> str:
+    """
+    Short stable key for content-addressed entries (e.g. ticket text, reply payloads).
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(str(part).encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()[:32]
+
+
+def namespace_ttl(namespace: str) -> float:
+    default = NAMESPACE_TTLS.get(namespace, 300.0)
+    return float(os.getenv(f"TRIAGE_CACHE_{namespace.upper()}_TTL_SECONDS", str(default)))
+
+
+def build_cache_backend_from_env() -> CacheBackend | None:
+    """
+    TRIAGE_CACHE_BACKEND selects "none" (default), "local", "sqlite" or "memcached".
+    """
+    kind = os.getenv("TRIAGE_CACHE_BACKEND", "none").lower()
+    if kind == "none":
+        return None
+    if kind == "local":
+        return LocalCacheBackend(int(os.getenv("TRIAGE_CACHE_MAX_ENTRIES", "10000")))
+    if kind == "sqlite":
+        return SQLiteCacheBackend(
+            os.getenv("TRIAGE_CACHE_SQLITE_PATH", "triage_cache.sqlite3"),
+            int(os.getenv("TRIAGE_CACHE_MAX_ENTRIES", "100000")),
+        )
+    if kind == "memcached":
+        host, _, port = os.getenv("TRIAGE_CACHE_MEMCACHED", "127.0.0.1:11211").rpartition(":")
+        return MemcachedCacheBackend(host or "127.0.0.1", int(port))
+    raise ValueError(f"Unknown TRIAGE_CACHE_BACKEND: {kind}")
+
+
+_shared_cache = None
+_shared_cache_lock = threading.Lock()
+_shared_cache_loaded = False
+
+
+def get_shared_cache() -> SharedCache | None:
+    """
+    Returns the process-wide shared cache, or None when TRIAGE_CACHE_BACKEND=none.
+    """
+    global _shared_cache, _shared_cache_loaded
+    if not _shared_cache_loaded:
+        with _shared_cache_lock:
+            if not _shared_cache_loaded:
+                backend = build_cache_backend_from_env()
+                if backend is not None:
+                    _shared_cache = SharedCache(backend)
+                    metrics.register("shared_cache", _shared_cache.stats)
+                _shared_cache_loaded = True
+    return _shared_cache
+
+
+def set_shared_cache(cache: SharedCache | None) -> None:
+    """
+    Replaces the process-wide shared cache (None re-reads the environment on next use).
+    """
+    global _shared_cache, _shared_cache_loaded
+    _shared_cache = cache
+    _shared_cache_loaded = cache is not None
+    if cache is not None:
+        metrics.register("shared_cache", cache.stats)
@@ -0,0 +1,33 @@
+import sqlite3
+import threading
+
+
+class SQLiteConnections:
+    """
+    One connection per thread to a SQLite file shared by the workers on one host, in WAL
+    mode so readers do not block the writer. Connections are in autocommit mode: stores
+    open their own transactions where they need them.
+    """
+
+    def __init__(self, path: str, timeout: float = 30.0):
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def get(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def close(self) -> None:
+        """
+        Closes this thread's connection (others close when their thread's is garbage-collected).
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
@@ -0,0 +1,189 @@
+import os
+import string
+import threading
+from collections import Counter
+from collections.abc import Mapping
+
+from graph import metrics
+from graph.OrderEvidence import ORDER_FIELDS
+
+DEFAULT_DIRECTORY = os.path.join(os.path.dirname(__file__), "reply_templates")
+# Templates whose policy wording is made up; never loaded unless TRIAGE_REPLY_TEMPLATES_DIR points here
+EXAMPLE_DIRECTORY = os.path.join(os.path.dirname(__file__), "example_reply_templates")
+TEMPLATE_SUFFIX = ".txt"
+# issue_type of templates that apply to every issue type
+ANY_ISSUE = "*"
+# Whether a template is for a fetched order or for an order id the backend does not know
+ORDER_STATES = ("found", "not_found")
+HEADER_KEYS = ("issue_type", "status", "order")
+
+
+def reply_templates_enabled() -> bool:
+    return os.getenv("TRIAGE_REPLY_TEMPLATES", "false").lower() == "true"
+
+
+class ReplyTemplate:
+    """
+    A reply template compiled once: the literal text and the order fields between them.
+    Renders only when every field it uses is present in the evidence.
+    """
+
+    def __init__(self, name: str, issue_type: str, body: str, statuses: tuple = (), order: str = "found"):
+        if order not in ORDER_STATES:
+            raise ValueError(f"Template {name}: order must be one of {', '.join(ORDER_STATES)}, got {order!r}")
+        self.name = name
+        self.issue_type = issue_type
+        self.statuses = frozenset(status.lower() for status in statuses)
+        self.order = order
+        self.parts = []
+        for literal, field, format_spec, conversion in string.Formatter().parse(body):
+            if field is not None and (field not in ORDER_FIELDS or format_spec or conversion):
+                raise ValueError(f"Template {name}: unsupported placeholder {{{field}}} (use one of {', '.join(ORDER_FIELDS)})")
+            self.parts.append((literal, field))
+        self.fields = tuple(dict.fromkeys(field for _, field in self.parts if field))
+
+    def applies_to(self, order: str, status) -> bool:
+        return self.order == order and (not self.statuses or str(status or "").lower() in self.statuses)
+
+    def render(self, values: dict) -> str | None:
+        if any(values.get(field) in (None, "") for field in self.fields):
+            return None
+        return "".join(literal + (str(values[field]) if field else "") for literal, field in self.parts)
+
+
+def parse_template(name: str, text: str) -> ReplyTemplate:
+    """
+    Parses a template file: "key: value" header lines, a "---" line, then the body.
+    Header keys: issue_type (required, "*" for any), status (comma-separated order
+    statuses, default any) and order ("found" or "not_found", default found).
+    """
+    header, separator, body = text.partition("\n---\n")
+    if not separator:
+        raise ValueError(f"Template {name}: missing '---' line between header and body")
+    fields = {}
+    for line in header.splitlines():
+        if not line.strip():
+            continue
+        key, _, value = line.partition(":")
+        key = key.strip().lower()
+        if key not in HEADER_KEYS:
+            raise ValueError(f"Template {name}: unknown header {key!r}")
+        fields[key] = value.strip()
+    if not fields.get("issue_type"):
+        raise ValueError(f"Template {name}: missing issue_type")
+    statuses = tuple(status.strip() for status in fields.get("status", "").split(",") if status.strip())
+    return ReplyTemplate(name, fields["issue_type"], body.strip() + "\n", statuses, fields.get("order", "found"))
+
+
+def template_values(evidence, order_id: str | None) -> tuple[str, dict] | None:
+    """
+    (order state, placeholder values) for single-order evidence, or None for evidence
+    no template covers (multi-order tickets, failed fetches other than "Order not found").
+    """
+    if isinstance(evidence, Mapping) and evidence.get("error") == "Order not found":
+        return "not_found", {"order_id": order_id}
+    if not isinstance(evidence, Mapping) or "error" in evidence or "orders" in evidence \
+            or "multiple_orders" in evidence:
+        return None
+    values = {field: evidence.get(field) for field in ORDER_FIELDS}
+    values["order_id"] = values["order_id"] or order_id
+    return "found", values
+
+
+class TemplateEngine:
+    """
+    Per-issue_type reply templates, tried in file name order (templates for "*" last).
+    Counts hits per template, misses per reason, and the /reply/draft time of misses to
+    estimate the latency the hits saved.
+    """
+
+    def __init__(self, templates: list[ReplyTemplate]):
+        self.templates = list(templates)
+        self._by_issue = {}
+        for template in self.templates:
+            self._by_issue.setdefault(template.issue_type, []).append(template)
+        self._lock = threading.Lock()
+        self.hits = Counter()
+        self.misses = Counter()
+        self.backend_ms = 0.0
+        self.backend_calls = 0
+
+    @classmethod
+    def from_directory(cls, directory: str) -> "TemplateEngine":
+        templates = []
+        for filename in sorted(os.listdir(directory)):
+            if filename.endswith(TEMPLATE_SUFFIX):
+                with open(os.path.join(directory, filename), encoding="utf-8") as f:
+                    templates.append(parse_template(filename[:-len(TEMPLATE_SUFFIX)], f.read()))
+        return cls(templates)
+
+    def draft(self, issue_type: str | None, evidence, order_id: str | None = None) -> str | None:
+        """
+        The reply of the first matching template, or None when the backend has to draft it.
+        """
+        reply, outcome = self._draft(issue_type, evidence, order_id)
+        with self._lock:
+            if reply is not None:
+                self.hits[outcome] += 1
+            else:
+                self.misses[outcome] += 1
+        return reply
+
+    def _draft(self, issue_type, evidence, order_id) -> tuple[str | None, str]:
+        found = template_values(evidence, order_id)
+        if found is None:
+            return None, "unsupported_evidence"
+        order, values = found
+        candidates = [t for t in self._by_issue.get(issue_type, []) + self._by_issue.get(ANY_ISSUE, [])
+                      if t.applies_to(order, values.get("status"))]
+        if not candidates:
+            return None, "no_template"
+        for template in candidates:
+            reply = template.render(values)
+            if reply is not None:
+                return reply, template.name
+        return None, "incomplete_evidence"
+
+    def record_backend(self, elapsed_ms: float) -> None:
+        with self._lock:
+            self.backend_ms += elapsed_ms
+            self.backend_calls += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            hits = sum(self.hits.values())
+            total = hits + sum(self.misses.values())
+            backend_ms_mean = self.backend_ms / self.backend_calls if self.backend_calls else None
+            return {
+                "templates": len(self.templates),
+                "hits": dict(self.hits),
+                "misses": dict(self.misses),
+                "hit_rate": round(hits / total, 4) if total else None,
+                "backend_ms_mean": round(backend_ms_mean, 3) if backend_ms_mean is not None else None,
+                # Hits times the mean /reply/draft time of this worker's misses
+                "saved_ms_estimate": round(hits * backend_ms_mean, 1) if backend_ms_mean is not None else None,
+            }
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_template_engine() -> TemplateEngine:
+    """
+    Returns the process-wide engine, compiled from TRIAGE_REPLY_TEMPLATES_DIR on first use.
+    """
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = TemplateEngine.from_directory(os.getenv("TRIAGE_REPLY_TEMPLATES_DIR", DEFAULT_DIRECTORY))
+                metrics.register("reply_templates", _engine.stats)
+    return _engine
+
+
+def set_template_engine(engine: TemplateEngine | None) -> None:
+    global _engine
+    _engine = engine
+    if engine is not None:
+        metrics.register("reply_templates", engine.stats)
@@ -0,0 +1,145 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from graph.approvals import ApprovalStore, resume_approval, set_approval_store
+from graph.benchmarks.fakes import fake_backend, initial_state
+from graph.builder import build_direct_executor, build_graph
+from graph.dedup import NearDuplicateIndex, set_dedup_index
+from graph.OrderEvidence import OrderEvidence
+
+
+class ApprovalTestCase(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "approvals.sqlite3")
+        self.store = ApprovalStore(self.path)
+        self.addCleanup(self.store.close)
+        set_approval_store(self.store)
+        self.addCleanup(set_approval_store, None)
+        env = patch.dict(os.environ, {"TRIAGE_APPROVAL": "true"})
+        env.start()
+        self.addCleanup(env.stop)
+
+
+class TestApprovalStore(ApprovalTestCase):
+    """Test cases for the approval store"""
+
+    def test_save_and_take_once(self):
+        """Test that a paused run can only be taken once"""
+        evidence = OrderEvidence.from_dict({"order_id": "ORD1002", "status": "delivered"})
+        approval_id = self.store.save({"recommendation": "Sorry", "evidence": evidence})
+
+        state = self.store.take(approval_id)
+        self.assertEqual(state["evidence"]["order_id"], "ORD1002")
+        self.assertIsNone(self.store.take(approval_id))
+
+    def test_stats_report_bytes_per_pending(self):
+        """Test the pending count and on-disk size per pending ticket"""
+        for i in range(3):
+            self.store.save({"ticket_text": f"ticket {i}", "messages": []})
+
+        stats = self.store.stats()
+        self.assertEqual(stats["pending"], 3)
+        self.assertGreater(stats["bytes_per_pending"], 0)
+
+
+class TestApprovalPause(ApprovalTestCase):
+    """Test cases for pausing and resuming runs"""
+
+    def run_ticket(self, graph):
+        with fake_backend():
+            return graph.invoke(initial_state("My speaker is broken ORD1002"))
+
+    def test_graph_pauses_after_draft_reply(self):
+        """Test that both runners stop at the gate with a pending approval"""
+        for graph in (build_graph(), build_direct_executor()):
+            result = self.run_ticket(graph)
+
+            self.assertEqual(result["approval_status"], "pending")
+            # The draft stays in the store until it is approved
+            self.assertIsNone(result["recommendation"])
+            self.assertEqual(self.store.get(result["approval_id"])["recommendation"], "Reply for defective")
+
+    def test_resume_on_another_worker(self):
+        """Test that a second store on the same file resumes the run"""
+        paused = self.run_ticket(build_direct_executor())
+        other_worker = ApprovalStore(self.path)
+        self.addCleanup(other_worker.close)
+        set_approval_store(other_worker)
+
+        result = resume_approval(paused["approval_id"], approver="admin")
+
+        self.assertEqual(result["approval_status"], "approved")
+        self.assertEqual(result["approval_id"], paused["approval_id"])
+        self.assertEqual(result["evidence"]["order_id"], "ORD1002")
+        self.assertEqual(result["messages"][-1]["content"], "Reply approved by admin")
+        self.assertIsNone(resume_approval(paused["approval_id"]))
+
+    def test_edited_reply_and_rejection(self):
+        """Test that an approved edit replaces the draft and a rejection keeps it"""
+        edited = resume_approval(self.run_ticket(build_direct_executor())["approval_id"], reply="Edited reply")
+        rejected = resume_approval(self.run_ticket(build_direct_executor())["approval_id"], approved=False)
+
+        self.assertEqual(edited["recommendation"], "Edited reply")
+        self.assertEqual(rejected["approval_status"], "rejected")
+        self.assertEqual(rejected["recommendation"], "Reply for defective")
+
+    def test_no_pause_when_disabled(self):
+        """Test that the gate is a no-op by default"""
+        with patch.dict(os.environ, {"TRIAGE_APPROVAL": "false"}):
+            result = self.run_ticket(build_direct_executor())
+
+        self.assertNotIn("approval_status", result)
+        self.assertEqual(self.store.stats()["pending"], 0)
+
+    def test_approve_endpoint(self):
+        """Test POST /triage/{id}/approve"""
+        from fastapi.testclient import TestClient
+        from app.main import app
+
+        paused = self.run_ticket(build_direct_executor())
+        client = TestClient(app)
+
+        response = client.post(f"/triage/{paused['approval_id']}/approve", json={"approver": "admin"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["approval_status"], "approved")
+        self.assertEqual(client.post(f"/triage/{paused['approval_id']}/approve", json={}).status_code, 404)
+
+
+class TestApprovalWithDedup(ApprovalTestCase):
+    """Test cases for near-duplicate tickets behind the approval gate"""
+
+    def setUp(self):
+        super().setUp()
+        set_dedup_index(NearDuplicateIndex())
+        self.addCleanup(set_dedup_index, None)
+        env = patch.dict(os.environ, {"TRIAGE_DEDUP": "true"})
+        env.start()
+        self.addCleanup(env.stop)
+
+    def run_ticket(self):
+        with fake_backend():
+            return build_direct_executor().invoke(initial_state("My speaker is broken and will not turn on ORD1002"))
+
+    def test_duplicates_wait_for_approval(self):
+        """Test that duplicates of an unapproved or rejected reply pause too, and reuse it once approved"""
+        first = self.run_ticket()
+        duplicate = self.run_ticket()
+        self.assertEqual(duplicate["approval_status"], "pending")
+        self.assertIsNone(duplicate["recommendation"])
+
+        resume_approval(first["approval_id"], approved=False)
+        self.assertEqual(self.run_ticket()["approval_status"], "pending")
+
+        resume_approval(duplicate["approval_id"], reply="Approved reply")
+        reused = self.run_ticket()
+        self.assertEqual(reused["recommendation"], "Approved reply")
+        self.assertNotIn("approval_status", reused)
+
+
+if __name__ == "__main__":
+    unittest.main()
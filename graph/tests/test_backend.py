@@ -0,0 +1,183 @@
+import gzip
+import json
+import os
+import random
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import requests
+
+from graph import metrics
+from graph.benchmarks.fakes import FakeClock
+from graph.benchmarks.stub_backend import StubBackend
+from graph.backend import BackendPool, post_json, set_backend_pool
+
+
+class TestPostJson(unittest.TestCase):
+    """Test cases for the post_json helper"""
+
+    def setUp(self):
+        metrics.reset()
+        set_backend_pool(BackendPool(["http://backend"]))
+        self.addCleanup(set_backend_pool, None)
+
+    @patch('graph.backend.requests.post')
+    def test_small_body_is_sent_as_json(self, mock_post):
+        """Test that bodies below the threshold are sent uncompressed"""
+        mock_post.return_value.status_code = 200
+        with patch.dict(os.environ, {"TRIAGE_GZIP_REQUESTS": "true", "TRIAGE_GZIP_MIN_BYTES": "1024"}):
+            post_json("/classify/issue", {"ticket_text": "short"})
+
+        self.assertEqual(mock_post.call_args.kwargs["json"], {"ticket_text": "short"})
+        self.assertEqual(metrics.counter("backend.classify.issue.bytes_sent"), metrics.counter("backend.classify.issue.bytes_raw"))
+
+    @patch('graph.backend.requests.post')
+    def test_large_body_is_gzipped(self, mock_post):
+        """Test that large bodies are gzip-compressed with a Content-Encoding header"""
+        mock_post.return_value.status_code = 200
+        payload = {"ticket_text": "my speaker is broken " * 200}
+        with patch.dict(os.environ, {"TRIAGE_GZIP_REQUESTS": "true", "TRIAGE_GZIP_MIN_BYTES": "1024"}):
+            post_json("/classify/issue", payload)
+
+        kwargs = mock_post.call_args.kwargs
+        self.assertEqual(kwargs["headers"]["Content-Encoding"], "gzip")
+        self.assertEqual(json.loads(gzip.decompress(kwargs["data"])), payload)
+        self.assertLess(metrics.counter("backend.classify.issue.bytes_sent"), metrics.counter("backend.classify.issue.bytes_raw") / 10)
+
+    @patch('graph.backend.requests.post')
+    def test_gzip_off_by_default(self, mock_post):
+        """Test that compression is opt-in"""
+        mock_post.return_value.status_code = 200
+        with patch.dict(os.environ, {"TRIAGE_GZIP_REQUESTS": "false"}):
+            post_json("/reply/draft", {"ticket_text": "x" * 5000})
+
+        self.assertIn("json", mock_post.call_args.kwargs)
+
+
+class TestBackendPool(unittest.TestCase):
+    """Test cases for replica selection and outlier detection"""
+
+    def setUp(self):
+        self.clock = FakeClock()
+
+    def make_pool(self, n=3, **kwargs):
+        kwargs.setdefault("min_samples", 3)
+        kwargs.setdefault("eject_latency_min", 0.0)
+        return BackendPool([f"http://b{i}" for i in range(n)], clock=self.clock, rng=random.Random(1), **kwargs)
+
+    def test_least_outstanding(self):
+        """Test that busy replicas are skipped"""
+        pool = self.make_pool()
+        first, second = pool.acquire(), pool.acquire()
+
+        third = pool.acquire()
+        self.assertEqual(len({first.url, second.url, third.url}), 3)
+
+    def test_ties_go_to_lower_latency(self):
+        """Test that idle replicas are ranked by average latency"""
+        pool = self.make_pool(2)
+        for endpoint, elapsed in zip(pool.endpoints, (0.2, 0.01)):
+            endpoint.outstanding += 1
+            pool.release(endpoint, elapsed)
+
+        self.assertEqual(pool.acquire().url, "http://b1")
+
+    def test_p2c_picks_less_loaded_of_two(self):
+        """Test that power-of-two-choices never picks the busiest replica"""
+        pool = self.make_pool(3, policy="p2c")
+        busy = pool.endpoints[0]
+        busy.outstanding = 10
+
+        picks = [pool.acquire() for _ in range(20)]
+        self.assertNotIn(busy, picks)
+
+    def test_consecutive_failures_eject_until_cooldown(self):
+        """Test error-based ejection and return after the cooldown"""
+        pool = self.make_pool(3, eject_errors=3, eject_seconds=10)
+        bad = pool.endpoints[0]
+        for _ in range(3):
+            bad.outstanding += 1
+            pool.release(bad, 0.01, failed=True)
+
+        self.assertTrue(pool.stats()["endpoints"]["http://b0"]["ejected"])
+        self.assertNotIn(bad, [pool.acquire() for _ in range(6)])
+
+        self.clock.now = 11
+        self.assertIn(bad, pool._available())
+        self.assertEqual(bad.consecutive_failures, 0)
+
+    def test_slow_replica_is_ejected(self):
+        """Test latency-based ejection against the median of the other replicas"""
+        pool = self.make_pool(3, eject_latency_factor=3)
+        for _ in range(3):
+            for endpoint, elapsed in zip(pool.endpoints, (0.01, 0.012, 0.2)):
+                endpoint.outstanding += 1
+                pool.release(endpoint, elapsed)
+
+        self.assertIsNotNone(pool.endpoints[2].ejected_until)
+        self.assertIsNone(pool.endpoints[0].ejected_until)
+
+    def test_ejection_is_capped(self):
+        """Test that at most max_ejected_fraction of replicas are ejected"""
+        pool = self.make_pool(2, eject_errors=1, max_ejected_fraction=0.5)
+        for endpoint in pool.endpoints:
+            endpoint.outstanding += 1
+            pool.release(endpoint, 0.01, failed=True)
+
+        self.assertEqual(sum(e.ejected_until is not None for e in pool.endpoints), 1)
+
+
+class TestBackendPoolWithStubs(unittest.TestCase):
+    """Test cases for load balancing across local stub backends"""
+
+    def setUp(self):
+        self.fast = StubBackend(latency=0.002).start()
+        self.slow = StubBackend(latency=0.05).start()
+        self.addCleanup(self.fast.stop)
+        self.addCleanup(self.slow.stop)
+
+    def test_fast_replica_gets_most_requests(self):
+        """Test that least-outstanding routing favours the faster replica"""
+        pool = BackendPool([self.fast.url, self.slow.url])
+        with ThreadPoolExecutor(4) as executor:
+            list(executor.map(lambda i: pool.request("get", "/orders/get", params={"order_id": f"ORD{i}"}), range(80)))
+
+        fast, slow = self.fast.requests["/orders/get"], self.slow.requests["/orders/get"]
+        self.assertEqual(fast + slow, 80)
+        self.assertGreater(fast, 3 * slow)
+
+    def test_dead_replica_is_retried_and_ejected(self):
+        """Test that connection errors go to another replica and eject the dead one"""
+        dead = StubBackend().start()
+        dead.stop()
+        pool = BackendPool([dead.url, self.fast.url], eject_errors=2)
+
+        responses = [pool.request("get", "/orders/get", params={"order_id": "ORD1"}) for _ in range(5)]
+
+        self.assertTrue(all(response.status_code == 200 for response in responses))
+        self.assertTrue(pool.stats()["endpoints"][dead.url]["ejected"])
+        self.assertLessEqual(pool.stats()["endpoints"][dead.url]["failures"], 2)
+
+    def test_single_dead_backend_raises(self):
+        """Test that the error surfaces when no replica is reachable"""
+        dead = StubBackend().start()
+        dead.stop()
+        pool = BackendPool([dead.url])
+
+        self.assertRaises(requests.exceptions.ConnectionError, pool.request, "get", "/orders/get")
+
+    def test_env_configures_replicas(self):
+        """Test that BACKEND_URLS spreads node calls over the replicas"""
+        from graph.nodes.fetch_order import fetch_order_tool
+
+        self.addCleanup(set_backend_pool, None)
+        with patch.dict(os.environ, {"BACKEND_URLS": f"{self.fast.url}, {self.slow.url}"}):
+            results = [fetch_order_tool.invoke({"order_id": "ORD1002"}) for _ in range(4)]
+
+        self.assertEqual(results[0]["order_id"], "ORD1002")
+        self.assertEqual(self.fast.requests["/orders/get"] + self.slow.requests["/orders/get"], 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
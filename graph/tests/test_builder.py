@@ -1,6 +1,6 @@
 import unittest
 from unittest.mock import patch, Mock
-from graph.builder import build_graph, route_after_ingest, route_after_search
+from graph.builder import build_graph, route_after_dedupe, route_after_ingest, route_after_search
 from graph.TriageState import TriageState
 
 
@@ -97,6 +97,36 @@ class TestRoutingFunctions(unittest.TestCase):
         result = route_after_search(state)
         self.assertEqual(result, "no_order_id")
 
+    def test_route_after_dedupe_with_reused_reply(self):
+        """Test that a duplicate with a reused reply ends the workflow"""
+        state = {
+            "ticket_text": "Issue with ORD1002",
+            "order_id": "ORD1002",
+            "customer_email": None,
+            "messages": [],
+            "issue_type": "shipping",
+            "evidence": {"order_id": "ORD1002"},
+            "recommendation": "Your package is on its way"
+        }
+
+        result = route_after_dedupe(state)
+        self.assertEqual(result, "end")
+
+    def test_route_after_dedupe_without_reply(self):
+        """Test that other tickets are routed as after ingest"""
+        state = {
+            "ticket_text": "Issue with ORD1002",
+            "order_id": "ORD1002",
+            "customer_email": None,
+            "messages": [],
+            "issue_type": "shipping",
+            "evidence": None,
+            "recommendation": None
+        }
+
+        result = route_after_dedupe(state)
+        self.assertEqual(result, "fetch_order")
+
 
 class TestBuildGraph(unittest.TestCase):
     """Test cases for build_graph function"""
@@ -115,7 +145,7 @@ class TestBuildGraph(unittest.TestCase):
         nodes = graph_dict.nodes
 
         # Check that all expected nodes are present
-        expected_nodes = {"ingest", "classify", "fetch_order", "draft_reply", "no_order_id", "search_orders"}
+        expected_nodes = {"prefilter", "ingest", "preprocess", "dedupe", "classify", "fetch_order", "draft_reply", "await_approval", "no_order_id", "search_orders"}
 
         # nodes is a list of node IDs (strings)
         node_ids = set(nodes)
@@ -128,26 +158,30 @@ class TestBuildGraph(unittest.TestCase):
         graph = build_graph()
         graph_dict = graph.get_graph()
 
-        # The entry point should connect to 'ingest'
-        # Check that there's an edge from __start__ to ingest
+        # The entry point should connect to 'prefilter', which continues to 'ingest'
         edges = [(edge.source, edge.target) for edge in graph_dict.edges]
-        self.assertTrue(any(source == "__start__" and target == "ingest" for source, target in edges),
-                       "Graph should have entry point connecting to 'ingest'")
+        self.assertTrue(any(source == "__start__" and target == "prefilter" for source, target in edges),
+                       "Graph should have entry point connecting to 'prefilter'")
+        self.assertIn(("prefilter", "ingest"), edges)
+        self.assertIn(("prefilter", "__end__"), edges)
 
-    def test_graph_has_conditional_edges_from_ingest(self):
-        """Test that conditional edges exist from ingest node"""
+    def test_graph_has_conditional_edges_after_ingest(self):
+        """Test that ingest leads through preprocess to dedupe, which routes conditionally"""
         graph = build_graph()
         graph_dict = graph.get_graph()
 
         edges = [(edge.source, edge.target) for edge in graph_dict.edges]
+        self.assertIn(("ingest", "preprocess"), edges)
+        self.assertIn(("preprocess", "dedupe"), edges)
 
-        # Check edges from ingest node
-        ingest_targets = [target for source, target in edges if source == "ingest"]
+        # Check edges from dedupe node
+        dedupe_targets = [target for source, target in edges if source == "dedupe"]
 
-        # Should have conditional edges to fetch_order, search_orders, and no_order_id
-        self.assertIn("fetch_order", ingest_targets)
-        self.assertIn("search_orders", ingest_targets)
-        self.assertIn("no_order_id", ingest_targets)
+        # Should have conditional edges to fetch_order, search_orders, no_order_id and END
+        self.assertIn("fetch_order", dedupe_targets)
+        self.assertIn("search_orders", dedupe_targets)
+        self.assertIn("no_order_id", dedupe_targets)
+        self.assertIn("__end__", dedupe_targets)
 
     def test_graph_workflow_path_with_order_id(self):
         """Test the complete workflow path when order_id is present"""
@@ -155,10 +189,11 @@ class TestBuildGraph(unittest.TestCase):
         graph_dict = graph.get_graph()
         edges = [(edge.source, edge.target) for edge in graph_dict.edges]
 
-        # Check the happy path: ingest -> fetch_order -> classify -> draft_reply -> END
+        # Check the happy path: ingest -> fetch_order -> classify -> draft_reply -> await_approval -> END
         self.assertTrue(any(source == "fetch_order" and target == "classify" for source, target in edges))
         self.assertTrue(any(source == "classify" and target == "draft_reply" for source, target in edges))
-        self.assertTrue(any(source == "draft_reply" and target == "__end__" for source, target in edges))
+        self.assertTrue(any(source == "draft_reply" and target == "await_approval" for source, target in edges))
+        self.assertTrue(any(source == "await_approval" and target == "__end__" for source, target in edges))
 
     def test_graph_workflow_path_with_email(self):
         """Test the workflow path when using email search"""
@@ -167,7 +202,7 @@ class TestBuildGraph(unittest.TestCase):
         edges = [(edge.source, edge.target) for edge in graph_dict.edges]
 
         # Check search path: ingest -> search_orders -> fetch_order (if found)
-        self.assertTrue(any(source == "ingest" and target == "search_orders" for source, target in edges))
+        self.assertTrue(any(source == "dedupe" and target == "search_orders" for source, target in edges))
         self.assertTrue(any(source == "search_orders" and target == "classify" for source, target in edges))
 
     def test_graph_error_path(self):
@@ -210,14 +245,14 @@ class TestBuildGraph(unittest.TestCase):
         self.assertTrue(True)
 
     def test_graph_has_correct_node_count(self):
-        """Test that graph has exactly 6 nodes plus start/end"""
+        """Test that graph has exactly 10 nodes plus start/end"""
         graph = build_graph()
         graph_dict = graph.get_graph()
 
         # Count nodes (excluding __start__ and __end__)
         # nodes is a list of node ID strings
         user_nodes = [node for node in graph_dict.nodes if not node.startswith("__")]
-        self.assertEqual(len(user_nodes), 6, "Graph should have exactly 6 user-defined nodes")
+        self.assertEqual(len(user_nodes), 10, "Graph should have exactly 10 user-defined nodes")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,201 @@
+import os
+import unittest
+from unittest.mock import patch
+
+from graph.benchmarks.fakes import FakeClock, FakeResponse, fake_backend, initial_state, make_order
+from graph.builder import build_graph
+from graph.cache import TTLCache, get_email_cache, normalize_email, set_email_cache
+from graph.nodes.fetch_order import fetch_order_node
+from graph.nodes.search_orders import search_orders_node
+
+
+class TestTTLCache(unittest.TestCase):
+    """Test cases for the TTL LRU cache"""
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.cache = TTLCache(max_entries=2, ttl=10, clock=self.clock)
+
+    def test_get_and_hit_rate(self):
+        """Test hits, misses and the hit rate"""
+        self.cache.set("a", [1])
+        self.assertEqual(self.cache.get("a"), [1])
+        self.assertIsNone(self.cache.get("b"))
+
+        stats = self.cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 1))
+        self.assertEqual(stats["hit_rate"], 0.5)
+
+    def test_entries_expire(self):
+        """Test that entries are dropped after the TTL"""
+        self.cache.set("a", [1])
+        self.clock.now = 10
+        self.assertIsNone(self.cache.get("a"))
+        self.assertEqual(self.cache.stats()["expirations"], 1)
+
+    def test_memory_is_bounded(self):
+        """Test that the least recently used entry is evicted at capacity"""
+        self.cache.set("a", 1)
+        self.cache.set("b", 2)
+        self.cache.get("a")
+        self.cache.set("c", 3)
+
+        self.assertEqual(self.cache.peek("a"), 1)
+        self.assertIsNone(self.cache.peek("b"))
+        self.assertEqual(self.cache.stats()["evictions"], 1)
+
+    def test_peek_and_invalidate(self):
+        """Test that peek does not count as a lookup and invalidate removes the entry"""
+        self.cache.set("a", 1)
+        self.assertEqual(self.cache.peek("a"), 1)
+        self.assertTrue(self.cache.invalidate("a"))
+        self.assertFalse(self.cache.invalidate("a"))
+
+        stats = self.cache.stats()
+        self.assertEqual(stats["hits"] + stats["misses"], 0)
+        self.assertEqual(stats["invalidations"], 1)
+
+    def test_snapshot_and_restore(self):
+        """Test that a snapshot is hottest first and restoring it keeps that order"""
+        cache = TTLCache(max_entries=3, ttl=10, clock=self.clock)
+        cache.set("a", 1)
+        cache.set("b", 2, ttl=1)
+        self.clock.now = 5
+        cache.set("c", 3)
+        cache.get("a")
+
+        self.assertEqual(cache.snapshot(), [("a", 5, 1), ("c", 10, 3)])
+        self.assertEqual(cache.snapshot(limit=1), [("a", 5, 1)])
+
+        restored = TTLCache(max_entries=2, ttl=10, clock=self.clock)
+        restored.set("c", "live")
+        for key, ttl, value in cache.snapshot():
+            restored.restore(key, value, ttl)
+        self.assertFalse(restored.restore("d", 4, 10))
+
+        # The live entry is kept and stays the most recently used one
+        self.assertEqual(restored.snapshot(), [("c", 10, "live"), ("a", 5, 1)])
+
+
+class TestNormalizeEmail(unittest.TestCase):
+    """Test cases for the normalize_email function"""
+
+    def test_lowercase_and_trim(self):
+        """Test case and whitespace normalization"""
+        self.assertEqual(normalize_email("  Alice@Example.COM "), "alice@example.com")
+
+    def test_plus_folding(self):
+        """Test that plus addresses fold only when asked"""
+        self.assertEqual(normalize_email("alice+shop@example.com"), "alice+shop@example.com")
+        self.assertEqual(normalize_email("alice+shop@example.com", fold_plus=True), "alice@example.com")
+
+
+@patch.dict(os.environ, {"TRIAGE_EMAIL_CACHE": "true"})
+class TestEmailCache(unittest.TestCase):
+    """Test cases for the email -> order ids cache in search_orders"""
+
+    def setUp(self):
+        set_email_cache(TTLCache())
+        self.addCleanup(set_email_cache, None)
+
+    def state(self, email="alice@example.com"):
+        return {"customer_email": email, "messages": []}
+
+    def test_repeat_customer_skips_search(self):
+        """Test that a second ticket from the same customer reuses the cached order ids"""
+        with fake_backend() as backend:
+            first = search_orders_node(self.state())
+            second = search_orders_node(self.state(" Alice@Example.com"))
+
+        self.assertEqual(backend.paths["/orders/search"], 1)
+        self.assertEqual(first["order_id"], second["order_id"])
+        self.assertEqual(second["evidence"]["order_id"], "ORD1000")
+        self.assertEqual(get_email_cache().stats()["hits"], 1)
+
+    def test_hit_makes_no_backend_calls(self):
+        """Test that a hit serves the cached search results without any backend request"""
+        for count in (1, 3):
+            with self.subTest(orders=count):
+                set_email_cache(TTLCache())
+                with fake_backend(orders_for_email=count, bulk=True) as backend:
+                    search_orders_node(self.state())
+                    first = dict(backend.paths)
+                    result = search_orders_node(self.state())
+
+                self.assertEqual(first, {"/orders/search": 1})
+                self.assertEqual(dict(backend.paths), first)
+                self.assertEqual(get_email_cache().stats()["hits"], 1)
+                self.assertEqual(set(result["stale_orders"]), {f"ORD{1000 + i}" for i in range(count)})
+
+    def test_changed_order_invalidates(self):
+        """Test that fetching a cached order whose data changed drops the entry"""
+        with fake_backend():
+            search_orders_node(self.state())
+        with patch("requests.get", return_value=FakeResponse({**make_order("ORD1000"), "status": "refunded"})):
+            fetch_order_node({"order_id": "ORD1000", "messages": []})
+        with fake_backend() as backend:
+            search_orders_node(self.state())
+
+        self.assertEqual(backend.paths["/orders/search"], 1)
+        self.assertEqual(get_email_cache().stats()["invalidations"], 1)
+
+    def test_multiple_orders_from_cache(self):
+        """Test that a cached multi-order list is fetched and kept ambiguous"""
+        with fake_backend(orders_for_email=2) as backend:
+            search_orders_node(self.state())
+            result = search_orders_node(self.state())
+
+        self.assertEqual(backend.paths["/orders/search"], 1)
+        self.assertEqual(result["evidence"]["count"], 2)
+
+    def test_no_orders_is_cached(self):
+        """Test that an empty result is cached as well"""
+        with fake_backend(orders_for_email=0) as backend:
+            search_orders_node(self.state())
+            result = search_orders_node(self.state())
+
+        self.assertEqual(backend.paths["/orders/search"], 1)
+        self.assertIn("No orders found", result["messages"][0]["content"])
+
+    def test_newer_order_invalidates(self):
+        """Test that fetching an order missing from the cached list drops the entry"""
+        with fake_backend() as backend:
+            search_orders_node(self.state())
+            fetch_order_node({"order_id": "ORD1005", "messages": []})
+            search_orders_node(self.state())
+
+        self.assertEqual(backend.paths["/orders/search"], 2)
+        self.assertEqual(get_email_cache().stats()["invalidations"], 1)
+
+    def test_known_order_keeps_entry(self):
+        """Test that fetching a cached order does not invalidate"""
+        with fake_backend():
+            search_orders_node(self.state())
+            fetch_order_node({"order_id": "ORD1000", "messages": []})
+
+        self.assertIsNotNone(get_email_cache().peek("alice@example.com"))
+
+    @patch.dict(os.environ, {"TRIAGE_EMAIL_CACHE": "false"})
+    def test_disabled(self):
+        """Test that every ticket searches when the cache is off"""
+        with fake_backend() as backend:
+            search_orders_node(self.state())
+            search_orders_node(self.state())
+
+        self.assertEqual(backend.paths["/orders/search"], 2)
+
+    def test_graph_repeat_customer(self):
+        """Test that the full workflow routes cached results like a search"""
+        graph = build_graph()
+
+        with fake_backend() as backend:
+            graph.invoke(initial_state("Where is my order? alice@example.com"))
+            result = graph.invoke(initial_state("Still waiting, alice@example.com"))
+
+        self.assertEqual(backend.paths["/orders/search"], 1)
+        self.assertEqual(result["order_id"], "ORD1000")
+        self.assertEqual(result["recommendation"], "Reply for defective")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,189 @@
+import os
+import tempfile
+import unittest
+from contextlib import contextmanager
+from unittest.mock import patch
+
+import requests
+
+from graph import metrics
+from graph.approvals import ApprovalStore, set_approval_store
+from graph.benchmarks.fakes import FakeClock, fake_backend, initial_state
+from graph.builder import build_direct_executor, build_graph
+from graph.checkpoints import (
+    CheckpointingRunner, CheckpointRetrier, CheckpointStore, retry_checkpoint, set_checkpoint_store
+)
+
+
+@contextmanager
+def failing(path: str, backend):
+    """
+    Makes POSTs to path fail with a connection error while the block runs.
+    """
+    def post(url, *args, **kwargs):
+        if url.endswith(path):
+            raise requests.exceptions.ConnectionError("backend down")
+        return backend.post(url, *args, **kwargs)
+
+    with patch("requests.post", post):
+        yield
+
+
+class CheckpointTestCase(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.clock = FakeClock(1000.0)
+        self.store = CheckpointStore(os.path.join(directory.name, "checkpoints.sqlite3"), max_attempts=2,
+                                     retry_delay=5, clock=self.clock)
+        self.addCleanup(self.store.close)
+        set_checkpoint_store(self.store)
+        self.addCleanup(set_checkpoint_store, None)
+        metrics.reset()
+
+    def run_failing_ticket(self, runner=None):
+        runner = CheckpointingRunner(runner or build_direct_executor())
+        with fake_backend() as backend, failing("/reply/draft", backend):
+            return runner.invoke(initial_state("My speaker is broken ORD1002"))
+
+
+class TestCheckpointing(CheckpointTestCase):
+    """Test cases for checkpointing failed runs"""
+
+    def test_failed_node_is_checkpointed(self):
+        """Test that the state before the failing node is stored"""
+        for runner in (build_direct_executor(), build_graph()):
+            result = self.run_failing_ticket(runner)
+
+            self.assertEqual(result["recommendation"], "Unable to generate response at this time.")
+            checkpoint = self.store.get(result["retry_id"])
+            self.assertEqual(checkpoint["node"], "draft_reply")
+            self.assertEqual(checkpoint["state"]["issue_type"], "defective")
+            self.assertEqual(checkpoint["state"]["evidence"]["order_id"], "ORD1002")
+            self.assertIsNone(checkpoint["state"].get("recommendation"))
+            self.assertEqual(checkpoint["steps_done"], 6)
+
+    def test_successful_run_has_no_checkpoint(self):
+        """Test that healthy runs are not stored"""
+        with fake_backend():
+            result = CheckpointingRunner(build_direct_executor()).invoke(initial_state("My speaker is broken ORD1002"))
+
+        self.assertNotIn("retry_id", result)
+        self.assertEqual(self.store.stats()["pending"], 0)
+
+    def test_exception_is_checkpointed_and_raised(self):
+        """Test that a node raising still leaves a checkpoint"""
+        with fake_backend(), patch("graph.nodes.draft_reply.evidence_payload", side_effect=RuntimeError("bug")):
+            with self.assertRaises(RuntimeError):
+                CheckpointingRunner(build_direct_executor()).invoke(initial_state("My speaker is broken ORD1002"))
+
+        self.assertEqual(self.store.stats()["pending"], 1)
+
+
+class TestRetry(CheckpointTestCase):
+    """Test cases for retrying from the failing node"""
+
+    def test_retry_reruns_only_the_failing_node(self):
+        """Test that the retry reuses evidence and classification"""
+        paused = self.run_failing_ticket()
+
+        with fake_backend() as backend:
+            result = retry_checkpoint(paused["retry_id"])
+
+        self.assertEqual(dict(backend.paths), {"/reply/draft": 1})
+        self.assertEqual(result["recommendation"], "Reply for defective")
+        self.assertEqual(result["messages"][-1]["content"], "Retried from draft_reply (attempt 1)")
+        self.assertEqual(self.store.get(paused["retry_id"])["status"], "done")
+        self.assertEqual(metrics.counter("checkpoint.nodes_skipped"), 6)
+        self.assertEqual(metrics.counter("checkpoint.nodes_rerun"), 2)
+        self.assertEqual(metrics.counter("checkpoint.retry_succeeded"), 1)
+
+    def test_retry_continues_in_the_runs_mode(self):
+        """Test that a classify_only run is retried without the reply draft"""
+        runner = CheckpointingRunner(build_direct_executor("classify_only"))
+        with fake_backend() as backend, failing("/classify/issue", backend):
+            paused = runner.invoke({**initial_state("My speaker is broken ORD1002"), "mode": "classify_only"})
+
+        with fake_backend() as backend:
+            result = retry_checkpoint(paused["retry_id"])
+
+        self.assertEqual(dict(backend.paths), {"/classify/issue": 1})
+        self.assertEqual(result["issue_type"], "defective")
+        self.assertIsNone(result["recommendation"])
+
+    def test_repeated_retry_returns_stored_result(self):
+        """Test that a succeeded checkpoint is not run again"""
+        paused = self.run_failing_ticket()
+        with fake_backend() as backend:
+            first = retry_checkpoint(paused["retry_id"])
+            second = retry_checkpoint(paused["retry_id"])
+
+        self.assertEqual(backend.calls, 1)
+        self.assertEqual(second["recommendation"], first["recommendation"])
+        self.assertIsNone(retry_checkpoint("unknown"))
+
+    def test_failed_draft_waits_for_retry_before_approval(self):
+        """Test that only the retried reply is paused for approval"""
+        approvals = ApprovalStore(os.path.join(os.path.dirname(self.store.path), "approvals.sqlite3"))
+        self.addCleanup(approvals.close)
+        set_approval_store(approvals)
+        self.addCleanup(set_approval_store, None)
+
+        with patch.dict(os.environ, {"TRIAGE_APPROVAL": "true"}):
+            paused = self.run_failing_ticket()
+            self.assertEqual(paused["approval_status"], "pending_retry")
+            self.assertIsNone(paused["recommendation"])
+            with fake_backend():
+                result = retry_checkpoint(paused["retry_id"])
+
+        self.assertEqual(result["approval_status"], "pending")
+        self.assertEqual(approvals.get(result["approval_id"])["recommendation"], "Reply for defective")
+
+    def test_failed_classify_withholds_reply_for_approval(self):
+        """Test that a reply drafted after an earlier failed node is not returned unapproved"""
+        approvals = ApprovalStore(os.path.join(os.path.dirname(self.store.path), "approvals.sqlite3"))
+        self.addCleanup(approvals.close)
+        set_approval_store(approvals)
+        self.addCleanup(set_approval_store, None)
+
+        with patch.dict(os.environ, {"TRIAGE_APPROVAL": "true"}):
+            for runner in (build_direct_executor(), build_graph()):
+                with fake_backend() as backend, failing("/classify/issue", backend):
+                    result = CheckpointingRunner(runner).invoke(initial_state("My speaker is broken ORD1002"))
+
+                self.assertIsNone(result["recommendation"])
+                self.assertEqual(result["approval_status"], "pending_retry")
+                self.assertIn("retry_id", result)
+                self.assertEqual(approvals.stats()["pending"], 0)
+
+            with fake_backend():
+                retried = retry_checkpoint(result["retry_id"])
+
+        self.assertEqual(retried["approval_status"], "pending")
+        self.assertEqual(approvals.get(retried["approval_id"])["recommendation"], "Reply for defective")
+
+    def test_failed_retries_back_off_then_stop(self):
+        """Test exponential backoff and the failed status after max_attempts"""
+        paused = self.run_failing_ticket()
+        retrier = CheckpointRetrier()
+
+        self.assertEqual(retrier.run_once(), 0)
+        for attempt in (1, 2):
+            self.clock.now += 5 * 2 ** (attempt - 1)
+            with fake_backend() as backend, failing("/reply/draft", backend):
+                self.assertEqual(retrier.run_once(), 1)
+
+        checkpoint = self.store.get(paused["retry_id"])
+        self.assertEqual((checkpoint["status"], checkpoint["attempts"]), ("failed", 2))
+        self.clock.now += 3600
+        self.assertEqual(retrier.run_once(), 0)
+
+        # A manual retry still runs a failed checkpoint
+        with fake_backend():
+            self.assertEqual(retry_checkpoint(paused["retry_id"])["recommendation"], "Reply for defective")
+        self.assertEqual(metrics.counter("checkpoint.retry_failed"), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
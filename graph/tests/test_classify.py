@@ -31,8 +31,8 @@ class TestClassifyNode(unittest.TestCase):
         result = classify_node(self.base_state.copy())
 
         self.assertEqual(result["issue_type"], "defective")
-        self.assertEqual(len(result["messages"]), 2)
-        self.assertIn("Classified as: defective", result["messages"][1]["content"])
+        self.assertEqual(len(result["messages"]), 1)
+        self.assertIn("Classified as: defective", result["messages"][0]["content"])
 
     @patch('graph.nodes.classify.requests.post')
     def test_classify_shipping_issue(self, mock_post):
@@ -45,7 +45,7 @@ class TestClassifyNode(unittest.TestCase):
         result = classify_node(self.base_state.copy())
 
         self.assertEqual(result["issue_type"], "shipping")
-        self.assertIn("Classified as: shipping", result["messages"][1]["content"])
+        self.assertIn("Classified as: shipping", result["messages"][0]["content"])
 
     @patch('graph.nodes.classify.requests.post')
     def test_classify_refund_issue(self, mock_post):
@@ -67,7 +67,7 @@ class TestClassifyNode(unittest.TestCase):
         result = classify_node(self.base_state.copy())
 
         self.assertEqual(result["issue_type"], "unknown")
-        self.assertIn("Classification failed", result["messages"][1]["content"])
+        self.assertIn("Classification failed", result["messages"][0]["content"])
 
     @patch('graph.nodes.classify.requests.post')
     def test_classify_http_error(self, mock_post):
@@ -82,8 +82,8 @@ class TestClassifyNode(unittest.TestCase):
         self.assertEqual(result["issue_type"], "unknown")
 
     @patch('graph.nodes.classify.requests.post')
-    def test_classify_preserves_other_state(self, mock_post):
-        """Test that classification preserves other state fields"""
+    def test_classify_returns_only_changed_keys(self, mock_post):
+        """Test that classification does not echo back unrelated state fields"""
         mock_response = Mock()
         mock_response.status_code = 200
         mock_response.json.return_value = {"issue_type": "defective"}
@@ -95,9 +95,9 @@ class TestClassifyNode(unittest.TestCase):
 
         result = classify_node(state)
 
-        self.assertEqual(result["order_id"], "ORD1002")
-        self.assertEqual(result["evidence"], {"order_id": "ORD1002"})
-        self.assertEqual(result["recommendation"], "Test recommendation")
+        self.assertEqual(set(result), {"issue_type", "messages"})
+        self.assertEqual(state["evidence"], {"order_id": "ORD1002"})
+        self.assertEqual(state["recommendation"], "Test recommendation")
 
     @patch('graph.nodes.classify.requests.post')
     def test_classify_calls_correct_endpoint(self, mock_post):
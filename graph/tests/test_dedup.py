@@ -0,0 +1,186 @@
+import os
+import unittest
+from unittest.mock import patch
+
+from graph.benchmarks.fakes import FakeClock, fake_backend, initial_state
+from graph.builder import build_graph
+from graph.dedup import (
+    NearDuplicateIndex, dedup_max_chars, record_cluster_result, set_dedup_index, shingles, similarity
+)
+from graph.nodes.dedupe import dedupe_node, ticket_context
+
+STORM_TICKET = "Hi, my package hasn't arrived yet and the tracking page has not updated for three days. Please help"
+STORM_VARIANT = "Hello, my package hasn't arrived yet and the tracking page has not updated for three days. Please help!"
+OTHER_TICKET = "The speaker I received is cracked on the side and makes a buzzing noise when turned on"
+
+
+class TestNearDuplicateIndex(unittest.TestCase):
+    """Test cases for the MinHash/LSH index"""
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.index = NearDuplicateIndex(window=60, max_clusters=3, clock=self.clock)
+
+    def test_similarity_of_near_duplicates(self):
+        """Test that small variations keep a high estimated similarity"""
+        hasher = self.index.hasher
+        a = hasher.signature(shingles(STORM_TICKET))
+        b = hasher.signature(shingles(STORM_VARIANT))
+        c = hasher.signature(shingles(OTHER_TICKET))
+
+        self.assertGreater(similarity(a, b), 0.7)
+        self.assertLess(similarity(a, c), 0.2)
+
+    def test_near_duplicate_joins_cluster(self):
+        """Test that a variant is assigned to the existing cluster"""
+        first, first_dup = self.index.assign(STORM_TICKET, (None, None))
+        second, second_dup = self.index.assign(STORM_TICKET + " thanks", (None, None))
+
+        self.assertFalse(first_dup)
+        self.assertTrue(second_dup)
+        self.assertEqual(first.cluster_id, second.cluster_id)
+        self.assertEqual(second.size, 2)
+
+    def test_different_ticket_gets_new_cluster(self):
+        """Test that unrelated text does not match"""
+        self.index.assign(STORM_TICKET, (None, None))
+        _, is_duplicate = self.index.assign(OTHER_TICKET, (None, None))
+
+        self.assertFalse(is_duplicate)
+
+    def test_context_must_match(self):
+        """Test that the same text about a different order is not a duplicate"""
+        self.index.assign(STORM_TICKET, ("ORD1002", None))
+        _, is_duplicate = self.index.assign(STORM_TICKET, ("ORD1004", None))
+
+        self.assertFalse(is_duplicate)
+
+    def test_clusters_expire_after_window(self):
+        """Test the sliding time window"""
+        self.index.assign(STORM_TICKET, (None, None))
+        self.clock.now = 61
+        _, is_duplicate = self.index.assign(STORM_TICKET, (None, None))
+
+        self.assertFalse(is_duplicate)
+        self.assertEqual(self.index.stats()["evictions"], 1)
+
+    def test_memory_is_bounded(self):
+        """Test that the least recently seen clusters are evicted at capacity"""
+        for i in range(5):
+            self.index.assign(f"completely different ticket number {i} " * (i + 1) + str(i), (f"ORD100{i}", None))
+
+        stats = self.index.stats()
+        self.assertEqual(stats["clusters"], 3)
+        self.assertEqual(stats["evictions"], 2)
+        # LSH buckets only reference live clusters
+        live = set(self.index._clusters)
+        self.assertTrue(all(ids <= live for ids in self.index._buckets.values()))
+
+    def test_stats(self):
+        """Test that cluster stats are exposed"""
+        self.index.assign(STORM_TICKET, (None, None))
+        self.index.assign(STORM_TICKET, (None, None))
+
+        stats = self.index.stats()
+        self.assertEqual(stats["lookups"], 2)
+        self.assertEqual(stats["matches"], 1)
+        self.assertEqual(stats["largest_clusters"][0]["size"], 2)
+
+
+@patch.dict(os.environ, {"TRIAGE_DEDUP": "true"})
+class TestDedupeNode(unittest.TestCase):
+    """Test cases for the dedupe_node function"""
+
+    def setUp(self):
+        self.index = NearDuplicateIndex()
+        set_dedup_index(self.index)
+        self.addCleanup(set_dedup_index, None)
+
+    def state(self, text, order_id="ORD1002"):
+        state = initial_state(text)
+        state["order_id"] = order_id
+        state["customer_email"] = None
+        return state
+
+    @patch.dict(os.environ, {"TRIAGE_DEDUP": "false"})
+    def test_disabled(self):
+        """Test that the node is a no-op when dedup is off"""
+        self.assertEqual(dedupe_node(self.state(STORM_TICKET)), {})
+
+    def test_first_ticket_gets_cluster(self):
+        """Test that a new ticket is assigned a cluster and nothing is reused"""
+        result = dedupe_node(self.state(STORM_TICKET))
+
+        self.assertIn("cluster_id", result)
+        self.assertNotIn("issue_type", result)
+
+    def test_duplicate_reuses_classification_and_reply(self):
+        """Test that a duplicate picks up the cluster's results"""
+        first = dedupe_node(self.state(STORM_TICKET))
+        record_cluster_result(first["cluster_id"], issue_type="shipping",
+                              evidence={"order_id": "ORD1002"}, reply="It is on its way")
+
+        result = dedupe_node(self.state(STORM_VARIANT))
+
+        self.assertEqual(result["issue_type"], "shipping")
+        self.assertEqual(result["recommendation"], "It is on its way")
+        self.assertEqual(result["evidence"], {"order_id": "ORD1002"})
+        self.assertIn("reused classification and reply", result["messages"][0]["content"])
+
+    def test_duplicate_without_results_reuses_nothing(self):
+        """Test that a duplicate of a still-running ticket runs normally"""
+        dedupe_node(self.state(STORM_TICKET))
+        result = dedupe_node(self.state(STORM_VARIANT))
+
+        self.assertNotIn("issue_type", result)
+
+    @patch.dict(os.environ, {"TRIAGE_DEDUP_MAX_CHARS": "1000"})
+    def test_hashes_only_the_start_of_long_tickets(self):
+        """Test that text past TRIAGE_DEDUP_MAX_CHARS is not hashed"""
+        head = (STORM_TICKET + " ") * (1000 // len(STORM_TICKET) + 1)
+        first = dedupe_node(self.state(head + " ".join(f"log line {i}" for i in range(2000))))
+        second = dedupe_node(self.state(head + " ".join(f"trace {i * 7}" for i in range(2000))))
+
+        self.assertEqual(first["cluster_id"], second["cluster_id"])
+
+    def test_default_cap_is_small(self):
+        """Test that the hashing cap defaults to a few KB, independent of the ingest offload size"""
+        with patch.dict(os.environ, {"TRIAGE_INGEST_OFFLOAD_CHARS": "10"}):
+            self.assertEqual(dedup_max_chars(), 2048)
+        with patch.object(self.index, "assign", wraps=self.index.assign) as assign:
+            dedupe_node(self.state(STORM_TICKET + " filler" * 10000))
+
+        self.assertEqual(len(assign.call_args.args[0]), 2048)
+
+    def test_ticket_context_is_normalized(self):
+        """Test that order id and email case do not split clusters"""
+        self.assertEqual(
+            ticket_context({"order_id": "ord1002", "customer_email": "Alice@Example.com"}),
+            ("ORD1002", "alice@example.com"),
+        )
+
+    def test_ticket_context_uses_all_order_ids(self):
+        """Test that multi-order tickets are keyed by their sorted set of orders"""
+        self.assertEqual(
+            ticket_context({"order_id": "ORD1004", "order_ids": ["ORD1004", "ord1002"]}),
+            ("ORD1002,ORD1004", None),
+        )
+
+    def test_graph_storm_skips_backend_calls(self):
+        """Test that the second ticket of a storm makes no backend calls"""
+        graph = build_graph()
+
+        with fake_backend(issue_type="shipping") as backend:
+            first = graph.invoke(initial_state(STORM_TICKET + " ORD1002"))
+            calls_after_first = backend.calls
+            second = graph.invoke(initial_state(STORM_VARIANT + " ORD1002"))
+
+        self.assertEqual(calls_after_first, 3)
+        self.assertEqual(backend.calls, 3)
+        self.assertEqual(second["recommendation"], first["recommendation"])
+        self.assertEqual(second["issue_type"], "shipping")
+        self.assertEqual(self.index.stats()["reply_reuses"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,6 +2,7 @@ import unittest
 from unittest.mock import patch, Mock
 import requests
 from graph.nodes.draft_reply import draft_reply_node
+from graph.OrderEvidence import OrderEvidence
 from graph.TriageState import TriageState
 
 
@@ -40,7 +41,22 @@ class TestDraftReplyNode(unittest.TestCase):
         self.assertIsNotNone(result["recommendation"])
         self.assertIn("Alice", result["recommendation"])
         self.assertIn("ORD1002", result["recommendation"])
-        self.assertIn("Generated reply recommendation", result["messages"][1]["content"])
+        self.assertIn("Generated reply recommendation", result["messages"][0]["content"])
+
+    @patch('graph.nodes.draft_reply.requests.post')
+    def test_draft_reply_sends_order_extras(self, mock_post):
+        """Test that order fields outside ORDER_FIELDS are sent to /reply/draft"""
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = {"reply_text": "Hi Alice"}
+        mock_post.return_value = mock_response
+
+        state = self.base_state.copy()
+        state["evidence"] = OrderEvidence.from_dict({**state["evidence"], "tracking_number": "1Z999AA10123456784"},
+                                                    keep_extras=True)
+        draft_reply_node(state)
+
+        self.assertEqual(mock_post.call_args.kwargs["json"]["order"]["tracking_number"], "1Z999AA10123456784")
 
     @patch('graph.nodes.draft_reply.requests.post')
     def test_draft_reply_shipping_issue(self, mock_post):
@@ -67,7 +83,7 @@ class TestDraftReplyNode(unittest.TestCase):
         result = draft_reply_node(self.base_state.copy())
 
         self.assertEqual(result["recommendation"], "Unable to generate response at this time.")
-        self.assertIn("Failed to generate reply", result["messages"][1]["content"])
+        self.assertIn("Failed to generate reply", result["messages"][0]["content"])
 
     @patch('graph.nodes.draft_reply.requests.post')
     def test_draft_reply_http_error(self, mock_post):
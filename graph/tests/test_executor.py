@@ -0,0 +1,178 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from graph.benchmarks.fakes import fake_backend, initial_state
+from graph.builder import MODES, build_direct_executor, build_graph, build_runner, build_runners
+from graph.executor import DirectExecutor
+
+
+class TestDirectExecutor(unittest.TestCase):
+    """Test that the direct executor matches the compiled StateGraph"""
+
+    def assert_same_result(self, ticket_text, **backend_kwargs):
+        with fake_backend(**backend_kwargs):
+            expected = build_graph().invoke(initial_state(ticket_text))
+            actual = build_direct_executor().invoke(initial_state(ticket_text))
+        self.assertEqual(actual, expected)
+        return actual
+
+    def test_order_id_path(self):
+        """Test ingest -> fetch_order -> classify -> draft_reply"""
+        result = self.assert_same_result("My speaker is not working ORD1002")
+        self.assertEqual(result["recommendation"], "Reply for defective")
+        # One user message plus one message appended by each node
+        self.assertEqual(len(result["messages"]), 5)
+
+    def test_email_single_match_path(self):
+        """Test ingest -> search_orders -> classify -> draft_reply"""
+        result = self.assert_same_result("Where is my order? alice@example.com")
+        self.assertEqual(result["order_id"], "ORD1000")
+
+    def test_email_multiple_matches_path(self):
+        """Test ingest -> search_orders -> no_order_id"""
+        result = self.assert_same_result("Where is my order? alice@example.com", orders_for_email=3)
+        self.assertEqual(result["evidence"]["count"], 3)
+
+    def test_no_order_id_path(self):
+        """Test ingest -> no_order_id"""
+        result = self.assert_same_result("My product is broken")
+        self.assertIn("Please provide Order ID", result["recommendation"])
+
+    def test_does_not_mutate_input(self):
+        """Test that the caller's state dict is left untouched"""
+        state = initial_state("My product is broken")
+        with fake_backend():
+            build_direct_executor().invoke(state)
+        self.assertIsNone(state["recommendation"])
+
+    def test_reducer_appends_messages(self):
+        """Test that keys declared with a reducer are merged, not replaced"""
+        executor = build_direct_executor()
+        state = initial_state("My product is broken")
+        state["messages"] = [{"role": "system", "content": "earlier"}]
+
+        with fake_backend():
+            result = executor.invoke(state)
+
+        self.assertEqual(result["messages"][0]["content"], "earlier")
+        self.assertEqual(result["messages"][1]["role"], "user")
+
+    def test_routes_through_path_map(self):
+        """Test a minimal DAG with a conditional edge"""
+        executor = DirectExecutor(
+            {"a": lambda s: {"x": 1}, "b": lambda s: {"y": 2}},
+            "a",
+            {"b": "__end__"},
+            {"a": (lambda s: "go", {"go": "b"})},
+        )
+        self.assertEqual(executor.invoke({}), {"x": 1, "y": 2})
+
+
+class TestModes(unittest.TestCase):
+    """Test the partial pipelines selected by the request mode"""
+
+    def run_mode(self, mode, ticket_text, **backend_kwargs):
+        results = []
+        for runner in (build_graph(mode), build_direct_executor(mode)):
+            with fake_backend(**backend_kwargs) as backend:
+                results.append(runner.invoke({**initial_state(ticket_text), "mode": mode}))
+        self.assertEqual(results[0], results[1])
+        return results[1], backend.paths
+
+    def test_classify_only(self):
+        """Test that classify_only makes no order lookup and drafts no reply"""
+        result, paths = self.run_mode("classify_only", "My speaker is not working ORD1002")
+
+        self.assertEqual(dict(paths), {"/classify/issue": 1})
+        self.assertEqual(result["issue_type"], "defective")
+        self.assertIsNone(result["evidence"])
+        self.assertIsNone(result["recommendation"])
+
+    def test_lookup_only(self):
+        """Test that lookup_only fetches the order and stops"""
+        result, paths = self.run_mode("lookup_only", "My speaker is not working ORD1002")
+        self.assertEqual(dict(paths), {"/orders/get": 1})
+        self.assertEqual(result["evidence"]["order_id"], "ORD1002")
+        self.assertIsNone(result["issue_type"])
+
+        result, paths = self.run_mode("lookup_only", "Where is my order? alice@example.com")
+        self.assertEqual(dict(paths), {"/orders/search": 1})
+        self.assertEqual(result["order_id"], "ORD1000")
+        self.assertIsNone(result["recommendation"])
+
+    def test_invoke_endpoint_mode(self):
+        """Test the request-level mode of /triage/invoke and its per-mode metrics"""
+        from fastapi.testclient import TestClient
+        from app.main import app
+        from graph import metrics
+
+        metrics.reset()
+        client = TestClient(app)
+        with fake_backend() as backend:
+            response = client.post("/triage/invoke", json={"ticket_text": "Broken ORD1002", "mode": "classify_only"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["issue_type"], "defective")
+        self.assertEqual(dict(backend.paths), {"/classify/issue": 1})
+        self.assertEqual(metrics.counter("triage.mode.classify_only"), 1)
+        self.assertEqual(client.post("/triage/invoke", json={"ticket_text": "x", "mode": "bogus"}).status_code, 422)
+
+    def test_profiled_invoke_records_mode_metrics(self):
+        """Test that a profiled request is counted in the per-mode metrics like any other"""
+        from fastapi.testclient import TestClient
+        from app.main import app
+        from graph import metrics
+
+        metrics.reset()
+        with tempfile.TemporaryDirectory() as profile_dir, \
+                patch.dict(os.environ, {"TRIAGE_PROFILING": "true", "TRIAGE_PROFILE_DIR": profile_dir}), \
+                patch("app.main.try_acquire_profile", return_value=True), fake_backend():
+            response = TestClient(app).post("/triage/invoke", json={"ticket_text": "Broken ORD1002", "mode": "lookup_only"},
+                                            headers={"X-Triage-Profile": "1"})
+
+        self.assertIn("X-Triage-Profile-Id", response.headers)
+        self.assertEqual(response.json()["evidence"]["order_id"], "ORD1002")
+        self.assertEqual(metrics.counter("triage.mode.lookup_only"), 1)
+        self.assertEqual(metrics.snapshot()["histograms"]["triage.mode.lookup_only_ms"]["count"], 1)
+
+    def test_invoke_endpoint_keeps_order_extras(self):
+        """Test that order fields outside ORDER_FIELDS reach the API response"""
+        from fastapi.testclient import TestClient
+        from app.main import app
+
+        with fake_backend(extra_fields=2):
+            response = TestClient(app).post("/triage/invoke", json={"ticket_text": "Broken ORD1002", "mode": "lookup_only"})
+
+        self.assertEqual(response.json()["evidence"]["field_1"], "value-1" * 4)
+
+    def test_build_runners_covers_every_mode(self):
+        """Test that every mode is built once, and unknown modes are rejected"""
+        self.assertEqual(set(build_runners()), set(MODES))
+        with self.assertRaises(ValueError):
+            build_graph("draft_only")
+
+
+class TestBuildRunner(unittest.TestCase):
+    """Test executor selection by config"""
+
+    @patch.dict(os.environ, {"TRIAGE_EXECUTOR": "direct"})
+    def test_direct_executor_selected(self):
+        """Test TRIAGE_EXECUTOR=direct"""
+        self.assertIsInstance(build_runner(), DirectExecutor)
+
+    @patch.dict(os.environ, {"TRIAGE_EXECUTOR": "langgraph"})
+    def test_langgraph_selected(self):
+        """Test TRIAGE_EXECUTOR=langgraph"""
+        self.assertNotIsInstance(build_runner(), DirectExecutor)
+
+    @patch.dict(os.environ, {"TRIAGE_EXECUTOR": "bogus"})
+    def test_unknown_executor(self):
+        """Test that an unknown executor name is rejected"""
+        with self.assertRaises(ValueError):
+            build_runner()
+
+
+if __name__ == "__main__":
+    unittest.main()
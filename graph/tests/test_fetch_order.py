@@ -1,7 +1,16 @@
+import os
+import time
 import unittest
 from unittest.mock import patch, Mock
 import requests
-from graph.nodes.fetch_order import fetch_order_node, fetch_order_tool
+from graph.benchmarks.fakes import FakeClock, fake_backend, initial_state
+from graph import metrics
+from graph.builder import build_graph
+from graph.cache import TTLCache
+from graph.nodes import fetch_order
+from graph.nodes.fetch_order import fetch_order_node, fetch_order_tool, fetch_orders
+from graph.OrderEvidence import OrderEvidence
+from graph.shared_cache import LocalCacheBackend, SharedCache, set_shared_cache
 from graph.TriageState import TriageState
 
 
@@ -87,7 +96,7 @@ class TestFetchOrderNode(unittest.TestCase):
         self.assertIsNotNone(result["evidence"])
         self.assertEqual(result["evidence"]["order_id"], "ORD1002")
         self.assertEqual(result["evidence"]["customer_name"], "Alice")
-        self.assertIn("Fetched order details: ORD1002", result["messages"][1]["content"])
+        self.assertIn("Fetched order details: ORD1002", result["messages"][0]["content"])
 
     @patch('graph.nodes.fetch_order.requests.get')
     def test_fetch_order_not_found(self, mock_get):
@@ -102,7 +111,7 @@ class TestFetchOrderNode(unittest.TestCase):
         result = fetch_order_node(self.base_state.copy())
 
         self.assertIn("error", result["evidence"])
-        self.assertIn("Error:", result["messages"][1]["content"])
+        self.assertIn("Error:", result["messages"][0]["content"])
 
     def test_fetch_order_no_order_id(self):
         """Test when no order_id is in state"""
@@ -111,8 +120,8 @@ class TestFetchOrderNode(unittest.TestCase):
 
         result = fetch_order_node(state)
 
-        self.assertIsNone(result["evidence"])
-        self.assertIn("Skipped order fetch", result["messages"][1]["content"])
+        self.assertNotIn("evidence", result)
+        self.assertIn("Skipped order fetch", result["messages"][0]["content"])
 
     def test_fetch_order_empty_order_id(self):
         """Test with empty string order_id"""
@@ -121,7 +130,170 @@ class TestFetchOrderNode(unittest.TestCase):
 
         result = fetch_order_node(state)
 
-        self.assertIn("Skipped order fetch", result["messages"][1]["content"])
+        self.assertIn("Skipped order fetch", result["messages"][0]["content"])
+
+
+
+class TestFetchMultipleOrders(unittest.TestCase):
+    """Test cases for multi-order tickets"""
+
+    def setUp(self):
+        fetch_order._bulk_supported.clear()
+        self.addCleanup(fetch_order._bulk_supported.clear)
+
+    def test_bulk_endpoint(self):
+        """Test that a backend with /orders/bulk gets a single call"""
+        with fake_backend(bulk=True) as backend:
+            results = fetch_orders(["ORD1002", "ORD1004"])
+
+        self.assertEqual(backend.calls, 1)
+        self.assertEqual(list(results), ["ORD1002", "ORD1004"])
+        self.assertIsInstance(results["ORD1004"], OrderEvidence)
+
+    def test_falls_back_to_concurrent_fetches(self):
+        """Test the fallback to per-order fetches, and that it is remembered"""
+        with fake_backend(bulk=False) as backend:
+            fetch_orders(["ORD1002", "ORD1004"])
+            self.assertEqual(backend.calls, 3)
+            results = fetch_orders(["ORD1002", "ORD1004"])
+            self.assertEqual(backend.calls, 5)
+
+        self.assertEqual(results["ORD1002"]["order_id"], "ORD1002")
+
+    @patch.dict(os.environ, {"TRIAGE_ORDERS_BULK": "off"})
+    def test_bulk_disabled(self):
+        """Test that TRIAGE_ORDERS_BULK=off never calls the bulk endpoint"""
+        with fake_backend(bulk=True) as backend:
+            fetch_orders(["ORD1002", "ORD1004"])
+
+        self.assertEqual(backend.calls, 2)
+
+    def test_fetches_run_concurrently(self):
+        """Test that latency does not grow with the number of orders"""
+        with fake_backend(latency=0.05) as backend:
+            fetch_orders(["ORD1002"])  # learns that bulk is unsupported
+            start = time.perf_counter()
+            fetch_orders(["ORD1001", "ORD1002", "ORD1003", "ORD1004"])
+            elapsed = time.perf_counter() - start
+
+        self.assertLess(elapsed, 0.15)
+
+    def test_node_stores_per_order_evidence(self):
+        """Test that the node stores evidence for every order"""
+        state = {"order_id": "ORD1002", "order_ids": ["ORD1002", "ORD1004"], "messages": []}
+
+        with fake_backend(bulk=True):
+            result = fetch_order_node(state)
+
+        self.assertEqual(result["evidence"]["count"], 2)
+        self.assertEqual([o["order_id"] for o in result["evidence"]["orders"]], ["ORD1002", "ORD1004"])
+        self.assertEqual(len(result["messages"]), 2)
+
+    def test_graph_sends_combined_context(self):
+        """Test that classify and draft receive every order of the ticket"""
+        graph = build_graph()
+        payloads = {}
+
+        with fake_backend(bulk=True) as backend:
+            post = backend.post
+
+            def recording_post(url, json=None, **kwargs):
+                payloads[url.rsplit("/", 1)[-1]] = json
+                return post(url, json=json, **kwargs)
+
+            with patch("requests.post", recording_post):
+                graph.invoke(initial_state("ORD1002 and ORD1004 both arrived broken"))
+
+        self.assertEqual(payloads["issue"]["order_ids"], ["ORD1002", "ORD1004"])
+        self.assertEqual(payloads["draft"]["order"]["order_id"], "ORD1002")
+        self.assertEqual([o["order_id"] for o in payloads["draft"]["orders"]], ["ORD1002", "ORD1004"])
+
+
+@patch.dict(os.environ, {"TRIAGE_ORDER_SWR": "true", "TRIAGE_ORDER_FRESH_SECONDS": "5"})
+class TestStaleWhileRevalidate(unittest.TestCase):
+    """Test cases for the stale-while-revalidate order cache"""
+
+    def setUp(self):
+        self.clock = FakeClock()
+        fetch_order.set_order_cache(TTLCache(ttl=60, clock=self.clock))
+        self.addCleanup(fetch_order.set_order_cache, None)
+        metrics.reset()
+        self.state = {"order_id": "ORD1002", "messages": []}
+
+    def wait_for_refresh(self):
+        deadline = time.monotonic() + 2
+        while fetch_order._refreshing and time.monotonic() < deadline:
+            time.sleep(0.005)
+
+    def test_fresh_entry_is_served_without_backend_call(self):
+        """Test that a recently fetched order is reused as is"""
+        with fake_backend() as backend:
+            fetch_order_node(self.state)
+            self.clock.now = 3
+            result = fetch_order_node(self.state)
+
+        self.assertEqual(backend.calls, 1)
+        self.assertEqual(result["evidence"]["order_id"], "ORD1002")
+        self.assertNotIn("stale_orders", result)
+
+    def test_stale_entry_is_served_and_refreshed(self):
+        """Test that a moderately stale order is served, marked, and refreshed in the background"""
+        with fake_backend() as backend:
+            fetch_order_node(self.state)
+            self.clock.now = 20
+            result = fetch_order_node(self.state)
+            self.wait_for_refresh()
+
+        self.assertEqual(result["stale_orders"], {"ORD1002": 20.0})
+        self.assertIn("cached, 20.0s old", result["messages"][0]["content"])
+        self.assertEqual(backend.calls, 2)
+        fetched_at, _ = fetch_order.get_order_cache().peek("ORD1002")
+        self.assertEqual(fetched_at, 20)
+
+    def test_hard_expiry_forces_refetch(self):
+        """Test that orders older than the cache expiry are fetched synchronously"""
+        with fake_backend() as backend:
+            fetch_order_node(self.state)
+            self.clock.now = 61
+            result = fetch_order_node(self.state)
+
+        self.assertEqual(backend.calls, 2)
+        self.assertNotIn("stale_orders", result)
+
+    def test_miss_does_not_read_the_shared_cache(self):
+        """Test that an entry stamped as just fetched comes from the backend, not another worker's copy"""
+        shared = SharedCache(LocalCacheBackend())
+        shared.set("order", "ORD1002", OrderEvidence.from_dict({"order_id": "ORD1002", "status": "old"}))
+        set_shared_cache(shared)
+        self.addCleanup(set_shared_cache, None)
+        with fake_backend() as backend:
+            result = fetch_order_node(self.state)
+
+        self.assertEqual(backend.calls, 1)
+        self.assertNotEqual(result["evidence"]["status"], "old")
+
+    def test_errors_are_not_cached(self):
+        """Test that a failed fetch is retried on the next ticket"""
+        with patch('graph.nodes.fetch_order.requests.get', side_effect=requests.exceptions.ConnectionError("down")) as mock_get:
+            fetch_order_node(self.state)
+            fetch_order_node(self.state)
+
+        self.assertEqual(mock_get.call_count, 2)
+
+    def test_staleness_metrics(self):
+        """Test that the age of served cache entries is recorded"""
+        with fake_backend():
+            fetch_order_node(self.state)
+            self.clock.now = 1
+            fetch_order_node(self.state)
+            self.clock.now = 12
+            fetch_order_node(self.state)
+            self.wait_for_refresh()
+
+        snapshot = metrics.snapshot()
+        self.assertEqual(snapshot["counters"]["order_cache.fresh"], 1)
+        self.assertEqual(snapshot["counters"]["order_cache.stale"], 1)
+        self.assertEqual(snapshot["histograms"]["order_cache.age_seconds"]["count"], 2)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,150 @@
+import os
+import socket
+import time
+import unittest
+from unittest.mock import patch
+
+from graph.benchmarks.fakes import FakeClock
+from graph.benchmarks.stub_backend import StubBackend
+from graph.health import BackendProber, set_prober
+
+
+def closed_port_url() -> str:
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return f"http://127.0.0.1:{port}"
+
+
+class TestBackendProber(unittest.TestCase):
+    """Test cases for the background backend probes"""
+
+    def test_reachable_replica(self):
+        """Test that a replica answering the probe (even with a 404) is healthy"""
+        with StubBackend() as stub:
+            prober = BackendProber(urls=[stub.url])
+            self.assertEqual(prober.status()["reason"], "not probed yet")
+            prober.probe_once()
+
+        status = prober.status()
+        self.assertTrue(status["ready"])
+        self.assertEqual(status["healthy_replicas"], 1)
+        self.assertTrue(status["replicas"][stub.url]["reachable"])
+        self.assertIsNone(status["replicas"][stub.url]["error"])
+
+    def test_unreachable_after_consecutive_failures(self):
+        """Test that one failed probe is tolerated and the second marks the replica down"""
+        stub = StubBackend().start()
+        prober = BackendProber(urls=[stub.url], timeout=0.5, fail_after=2)
+        prober.probe_once()
+        stub.stop()
+
+        prober.probe_once()
+        self.assertTrue(prober.status()["ready"])
+        prober.probe_once()
+        status = prober.status()
+        self.assertFalse(status["ready"])
+        self.assertEqual(status["replicas"][stub.url]["error"], "ConnectionError")
+
+    def test_never_reached_replica_is_down(self):
+        """Test that a replica is not trusted before its first successful probe"""
+        prober = BackendProber(urls=[closed_port_url()], timeout=0.5)
+        prober.probe_once()
+        self.assertFalse(prober.status()["ready"])
+
+    def test_slow_backend_is_not_ready(self):
+        """Test the latency limit of a healthy replica"""
+        with StubBackend(latency=0.05) as stub:
+            prober = BackendProber(urls=[stub.url], max_latency=0.01)
+            prober.probe_once()
+
+        status = prober.status()
+        self.assertFalse(status["ready"])
+        self.assertTrue(status["replicas"][stub.url]["reachable"])
+        self.assertGreaterEqual(status["replicas"][stub.url]["latency_ms"], 50)
+
+    def test_stale_probes(self):
+        """Test that readiness fails when the prober stopped probing"""
+        clock = FakeClock(1000.0)
+        with StubBackend() as stub:
+            prober = BackendProber(urls=[stub.url], interval=5, clock=clock)
+            prober.probe_once()
+        clock.now += 60
+
+        status = prober.status()
+        self.assertFalse(status["ready"])
+        self.assertEqual(status["reason"], "last probe 60s ago")
+
+    def test_background_thread(self):
+        """Test that the started prober probes without being asked"""
+        with StubBackend() as stub:
+            prober = BackendProber(urls=[stub.url], interval=0.01).start()
+            try:
+                for _ in range(200):
+                    if prober.probes >= 2:
+                        break
+                    time.sleep(0.01)
+            finally:
+                prober.stop()
+
+        self.assertGreaterEqual(prober.probes, 2)
+        self.assertGreaterEqual(stub.requests["/"], 2)
+
+
+class TestReadyEndpoint(unittest.TestCase):
+    """Test cases for GET /triage/ready"""
+
+    def get_ready(self, prober, **env):
+        from fastapi.testclient import TestClient
+        from app.main import app
+
+        set_prober(prober)
+        self.addCleanup(set_prober, None)
+        with patch.dict(os.environ, {"TRIAGE_READINESS_PROBE": "true", **env}):
+            return TestClient(app).get("/triage/ready")
+
+    def test_ready(self):
+        """Test a worker with a reachable backend and every graph compiled"""
+        with StubBackend() as stub:
+            prober = BackendProber(urls=[stub.url])
+            prober.probe_once()
+            requests_before = sum(stub.requests.values())
+            response = self.get_ready(prober)
+            # Answered from the last probe, without calling the backend
+            self.assertEqual(sum(stub.requests.values()), requests_before)
+
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertTrue(body["ready"])
+        self.assertEqual(set(body["graph"]["runners"]), {"full", "classify_only", "lookup_only"})
+        self.assertEqual(body["queue"]["in_flight"], 0)
+        self.assertIn("entries", body["caches"])
+
+    def test_backend_down(self):
+        """Test that an unreachable backend takes the worker out of rotation"""
+        prober = BackendProber(urls=[closed_port_url()], timeout=0.5)
+        prober.probe_once()
+
+        response = self.get_ready(prober)
+
+        self.assertEqual(response.status_code, 503)
+        self.assertFalse(response.json()["backend"]["ready"])
+        self.assertTrue(response.json()["graph"]["ready"])
+
+    def test_in_flight_limit(self):
+        """Test that a worker at TRIAGE_READINESS_MAX_IN_FLIGHT reports not ready"""
+        import app.main
+
+        with StubBackend() as stub:
+            prober = BackendProber(urls=[stub.url])
+            prober.probe_once()
+        with patch.object(app.main, "in_flight", 3):
+            response = self.get_ready(prober, TRIAGE_READINESS_MAX_IN_FLIGHT="3")
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.json()["queue"]["in_flight"], 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
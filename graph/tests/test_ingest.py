@@ -1,5 +1,9 @@
+import os
 import unittest
-from graph.nodes.ingest import ingest_node, extract_order_id
+from unittest.mock import patch
+from graph import metrics
+from graph.nodes import ingest
+from graph.nodes.ingest import ingest_node, extract_order_id, extract_order_ids
 from graph.TriageState import TriageState
 
 
@@ -24,6 +28,26 @@ class TestExtractOrderId(unittest.TestCase):
         result = extract_order_id(text)
         self.assertIsNone(result)
 
+
+class TestExtractOrderIds(unittest.TestCase):
+    """Test cases for the extract_order_ids function"""
+
+    def test_extract_all_in_order(self):
+        """Test that every order ID is returned in order of appearance"""
+        text = "ORD1004 and ORD1002 both arrived broken"
+        self.assertEqual(extract_order_ids(text), ["ORD1004", "ORD1002"])
+
+    def test_duplicates_are_dropped(self):
+        """Test that repeated IDs (in any case) are returned once"""
+        text = "ORD1002 is broken, I said ord1002 already. Also ORD1004"
+        self.assertEqual(extract_order_ids(text), ["ORD1002", "ORD1004"])
+
+    def test_limit(self):
+        """Test that extraction stops at the cap"""
+        text = "ORD1001 ORD1002 ORD1003 ORD1004"
+        self.assertEqual(extract_order_ids(text, limit=2), ["ORD1001", "ORD1002"])
+
+
 class TestIngestNode(unittest.TestCase):
     """Test cases for the ingest_node function"""
 
@@ -60,7 +84,8 @@ class TestIngestNode(unittest.TestCase):
 
         result = ingest_node(state)
 
-        self.assertEqual(result["order_id"], "ORD1005")
+        # Provided order_id is left untouched, so it is not part of the update
+        self.assertNotIn("order_id", result)
         self.assertEqual(len(result["messages"]), 2)
         self.assertEqual(result["messages"][1]["role"], "assistant")
         self.assertIn("Order_id provided: ORD1005", result["messages"][1]["content"])
@@ -78,13 +103,13 @@ class TestIngestNode(unittest.TestCase):
 
         result = ingest_node(state)
 
-        self.assertIsNone(result["order_id"])
+        self.assertIsNone(result.get("order_id"))
         self.assertEqual(len(result["messages"]), 2)
         self.assertEqual(result["messages"][1]["role"], "assistant")
         self.assertIn("No order_id found in ticket", result["messages"][1]["content"])
 
-    def test_ingest_preserves_other_state(self):
-        """Test that ingest preserves other state fields"""
+    def test_ingest_returns_only_changed_keys(self):
+        """Test that ingest does not echo back unrelated state fields"""
         state = {
             "ticket_text": "Issue with ORD1002",
             "order_id": None,
@@ -96,9 +121,7 @@ class TestIngestNode(unittest.TestCase):
 
         result = ingest_node(state)
 
-        self.assertEqual(result["issue_type"], "defective")
-        self.assertEqual(result["evidence"], {"some": "data"})
-        self.assertEqual(result["recommendation"], "test")
+        self.assertEqual(set(result), {"messages", "order_id"})
 
     def test_ingest_message_format(self):
         """Test that messages are formatted correctly"""
@@ -141,7 +164,7 @@ class TestIngestNode(unittest.TestCase):
         # Order ID should be extracted
         self.assertEqual(result["order_id"], "ORD1002")
         # Email should NOT be extracted when order_id is found
-        self.assertIsNone(result["customer_email"])
+        self.assertIsNone(result.get("customer_email"))
         # Should have 2 messages: user message + order_id extracted message
         self.assertEqual(len(result["messages"]), 2)
 
@@ -160,12 +183,89 @@ class TestIngestNode(unittest.TestCase):
         result = ingest_node(state)
 
         # Order ID should not be found
-        self.assertIsNone(result["order_id"])
+        self.assertIsNone(result.get("order_id"))
         # Email should be extracted as fallback
         self.assertEqual(result["customer_email"], "alice@example.com")
         # Should have 3 messages: user message + no order_id + email extracted
         self.assertEqual(len(result["messages"]), 3)
 
+    def test_ingest_with_multiple_order_ids(self):
+        """Test that a multi-order ticket sets order_ids and the first order_id"""
+        state = {
+            "ticket_text": "ORD1002 and ORD1004 both arrived broken",
+            "order_id": None,
+            "messages": [],
+        }
+
+        result = ingest_node(state)
+
+        self.assertEqual(result["order_id"], "ORD1002")
+        self.assertEqual(result["order_ids"], ["ORD1002", "ORD1004"])
+        self.assertIn("Extracted order_ids: ORD1002, ORD1004", result["messages"][1]["content"])
+
+    def test_ingest_single_order_has_no_order_ids(self):
+        """Test that single-order tickets keep the single-order state"""
+        result = ingest_node({"ticket_text": "Broken ORD1002", "order_id": None, "messages": []})
+
+        self.assertNotIn("order_ids", result)
+
+    @patch.dict(os.environ, {"TRIAGE_MAX_ORDER_IDS": "1"})
+    def test_ingest_respects_cap(self):
+        """Test that TRIAGE_MAX_ORDER_IDS=1 restores single-order triage"""
+        result = ingest_node({"ticket_text": "ORD1002 and ORD1004", "order_id": None, "messages": []})
+
+        self.assertEqual(result["order_id"], "ORD1002")
+        self.assertNotIn("order_ids", result)
+
+
+class TestIngestOffload(unittest.TestCase):
+    """Test cases for parsing large tickets on the ingest pool"""
+
+    def setUp(self):
+        metrics.reset()
+        self.addCleanup(self.reset_pool)
+
+    def reset_pool(self):
+        if ingest._parse_pool is not None:
+            ingest._parse_pool.shutdown()
+        ingest._parse_pool = None
+
+    def ingest(self, text: str, pool: str) -> dict:
+        env = {"TRIAGE_INGEST_POOL": pool, "TRIAGE_INGEST_OFFLOAD_CHARS": "1000", "TRIAGE_INGEST_POOL_SIZE": "1"}
+        with patch.dict(os.environ, env):
+            return ingest_node({"ticket_text": text, "order_id": None, "messages": []})
+
+    def test_small_tickets_stay_inline(self):
+        """Test that tickets below the threshold are not offloaded"""
+        result = self.ingest("Broken ORD1002", "thread")
+
+        self.assertEqual(result["order_id"], "ORD1002")
+        self.assertEqual(metrics.counter("ingest.offloaded"), 0)
+        self.assertIsNone(ingest._parse_pool)
+
+    def test_large_ticket_on_thread_pool(self):
+        """Test that large tickets are parsed on the pool with the same result"""
+        text = "log line without ids\n" * 200 + "reach me at alice@example.com"
+        result = self.ingest(text, "thread")
+
+        self.assertEqual(result["customer_email"], "alice@example.com")
+        self.assertEqual(metrics.counter("ingest.offloaded"), 1)
+
+    def test_large_ticket_on_process_pool(self):
+        """Test that large tickets are parsed in a worker process"""
+        text = "x" * 2000 + " ORD1002 and ORD1004"
+        result = self.ingest(text, "process")
+
+        self.assertEqual(result["order_ids"], ["ORD1002", "ORD1004"])
+        self.assertEqual(metrics.counter("ingest.offloaded"), 1)
+
+    def test_offload_off(self):
+        """Test that TRIAGE_INGEST_POOL=off parses everything inline"""
+        result = self.ingest("x" * 2000 + " ORD1002", "off")
+
+        self.assertEqual(result["order_id"], "ORD1002")
+        self.assertEqual(metrics.counter("ingest.offloaded"), 0)
+
 
 if __name__ == "__main__":
     unittest.main()
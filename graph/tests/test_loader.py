@@ -0,0 +1,119 @@
+import os
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+from graph.benchmarks.fakes import fake_backend
+from graph.loader import BatchLoader
+from graph.nodes import fetch_order
+from graph.nodes.fetch_order import fetch_order_node, load_orders
+
+
+class RecordingBatchFn:
+    def __init__(self, fail: bool = False):
+        self.batches = []
+        self.fail = fail
+        self._lock = threading.Lock()
+
+    def __call__(self, keys):
+        with self._lock:
+            self.batches.append(list(keys))
+        if self.fail:
+            raise RuntimeError("backend down")
+        return {key: f"value-{key.upper()}" for key in keys}
+
+
+def load_concurrently(loader, key_lists):
+    barrier = threading.Barrier(len(key_lists))
+
+    def run(keys):
+        barrier.wait()
+        return loader.load_many(keys)
+
+    with ThreadPoolExecutor(max_workers=len(key_lists)) as pool:
+        return list(pool.map(run, key_lists))
+
+
+class TestBatchLoader(unittest.TestCase):
+    """Test cases for the coalescing BatchLoader"""
+
+    def test_single_load(self):
+        """Test that one caller gets its own result from a one-key batch"""
+        batch_fn = RecordingBatchFn()
+        loader = BatchLoader(batch_fn, tick=0.001)
+
+        self.assertEqual(loader.load("a"), "value-A")
+        self.assertEqual(batch_fn.batches, [["a"]])
+
+    def test_concurrent_loads_are_coalesced(self):
+        """Test that overlapping keys from concurrent callers become one de-duplicated batch"""
+        batch_fn = RecordingBatchFn()
+        loader = BatchLoader(batch_fn, tick=0.05, key_fn=str.upper)
+
+        results = load_concurrently(loader, [["a"], ["b", "a"], ["A"], ["c"]])
+
+        self.assertEqual(results, [{"a": "value-A"}, {"b": "value-B", "a": "value-A"}, {"A": "value-A"}, {"c": "value-C"}])
+        self.assertEqual(len(batch_fn.batches), 1)
+        self.assertEqual(sorted(k.upper() for k in batch_fn.batches[0]), ["A", "B", "C"])
+        self.assertEqual(loader.stats()["coalesced"], 2)
+
+    def test_max_batch(self):
+        """Test that full batches are sent without waiting for the tick"""
+        batch_fn = RecordingBatchFn()
+        loader = BatchLoader(batch_fn, tick=10, max_batch=2)
+
+        self.assertEqual(loader.load_many(["a", "b"]), {"a": "value-A", "b": "value-B"})
+        self.assertEqual(batch_fn.batches, [["a", "b"]])
+
+    def test_errors_reach_every_caller(self):
+        """Test that a failing batch raises in each waiting caller"""
+        loader = BatchLoader(RecordingBatchFn(fail=True), tick=0.001)
+
+        with self.assertRaises(RuntimeError):
+            loader.load("a")
+        self.assertEqual(loader.stats()["errors"], 1)
+        # Failed keys are not cached
+        self.assertEqual(loader._pending, {})
+
+
+@patch.dict(os.environ, {"TRIAGE_ORDER_LOADER": "true"})
+class TestOrderLoader(unittest.TestCase):
+    """Test cases for coalesced order fetches in fetch_order_node"""
+
+    def setUp(self):
+        fetch_order._bulk_supported.clear()
+        fetch_order.set_order_loader(BatchLoader(fetch_order.fetch_orders, tick=0.05, key_fn=str.upper))
+        self.addCleanup(fetch_order.set_order_loader, None)
+        self.addCleanup(fetch_order._bulk_supported.clear)
+
+    def test_concurrent_tickets_share_one_bulk_call(self):
+        """Test that concurrent tickets make one bulk call and each gets its own evidence"""
+        states = [{"order_id": order_id, "messages": []} for order_id in ("ORD1002", "ORD1004", "ord1002")]
+        barrier = threading.Barrier(len(states))
+
+        def run(state):
+            barrier.wait()
+            return fetch_order_node(state)
+
+        with fake_backend(bulk=True) as backend, ThreadPoolExecutor(max_workers=len(states)) as pool:
+            results = list(pool.map(run, states))
+
+        self.assertEqual(backend.calls, 1)
+        self.assertEqual([r["evidence"]["order_id"].upper() for r in results], ["ORD1002", "ORD1004", "ORD1002"])
+
+    def test_error_results_are_copied(self):
+        """Test that tickets do not share mutable error dicts"""
+        error = {"error": "Order not found"}
+        with patch.object(fetch_order, "fetch_orders", lambda ids: {i: error for i in ids}):
+            fetch_order.set_order_loader(BatchLoader(fetch_order.fetch_orders, tick=0.001))
+            first = load_orders(["ORD1002"])["ORD1002"]
+            second = load_orders(["ORD1002"])["ORD1002"]
+
+        self.assertEqual(first, error)
+        self.assertIsNot(first, error)
+        self.assertIsNot(first, second)
+
+
+if __name__ == "__main__":
+    unittest.main()
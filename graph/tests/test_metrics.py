@@ -0,0 +1,50 @@
+import unittest
+
+from graph import metrics
+
+
+class TestMetrics(unittest.TestCase):
+    """Test cases for the in-process metrics registry"""
+
+    def setUp(self):
+        metrics.reset()
+        self.addCleanup(metrics.reset)
+
+    def test_counters(self):
+        """Test that counters accumulate"""
+        metrics.incr("tickets")
+        metrics.incr("tickets", 2)
+
+        self.assertEqual(metrics.counter("tickets"), 3)
+        self.assertEqual(metrics.snapshot()["counters"]["tickets"], 3)
+
+    def test_histogram(self):
+        """Test that observations land in the right buckets"""
+        metrics.observe("latency_ms", 3)
+        metrics.observe("latency_ms", 30)
+        metrics.observe("latency_ms", 50000)
+
+        histogram = metrics.snapshot()["histograms"]["latency_ms"]
+        self.assertEqual(histogram["count"], 3)
+        self.assertEqual(histogram["min"], 3)
+        self.assertEqual(histogram["max"], 50000)
+        self.assertEqual(histogram["buckets"]["le_5"], 1)
+        self.assertEqual(histogram["buckets"]["le_50"], 1)
+        self.assertEqual(histogram["buckets"]["inf"], 1)
+
+    def test_providers(self):
+        """Test that registered providers are included in snapshots"""
+        metrics.register("test_component", lambda: {"size": 1})
+        self.assertEqual(metrics.snapshot()["test_component"], {"size": 1})
+
+    def test_failing_provider(self):
+        """Test that a failing provider does not break the snapshot"""
+        def broken():
+            raise RuntimeError("down")
+
+        metrics.register("test_broken", broken)
+        self.assertEqual(metrics.snapshot()["test_broken"], {"error": "down"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -31,10 +31,11 @@ class TestNoOrderIdNode(unittest.TestCase):
         """Test that system message is added"""
         result = no_order_id_node(self.base_state.copy())
 
-        self.assertEqual(len(result["messages"]), 2)
-        self.assertEqual(result["messages"][1]["role"], "system")
-        self.assertIn("Workflow stopped", result["messages"][1]["content"])
-        self.assertIn("missing order_id", result["messages"][1]["content"])
+        # Only the new message is returned; the reducer appends it to the history
+        self.assertEqual(len(result["messages"]), 1)
+        self.assertEqual(result["messages"][0]["role"], "system")
+        self.assertIn("Workflow stopped", result["messages"][0]["content"])
+        self.assertIn("missing order_id", result["messages"][0]["content"])
 
 if __name__ == "__main__":
     unittest.main()
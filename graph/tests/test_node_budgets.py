@@ -0,0 +1,45 @@
+import unittest
+from unittest.mock import patch
+
+from graph.benchmarks.bench_nodes import budget, cases, compare, load_baseline, run_suite
+from graph.builder import NODES
+
+
+class TestNodeBudgets(unittest.TestCase):
+    """Performance budgets of the nodes, routing functions and runners (see graph/benchmarks/bench_nodes.py)"""
+
+    @unittest.skipUnless(budget() > 0, "TRIAGE_PERF_BUDGET=0 disables the timing check")
+    def test_within_budget(self):
+        """Test that no case is slower than its baseline times TRIAGE_PERF_BUDGET"""
+        regressions = compare(run_suite(min_time=0.03), load_baseline(), budget())
+        self.assertEqual(regressions, [], "over budget (name, baseline, current, ratio); "
+                         "rerun `python -m graph.benchmarks.bench_nodes save` only if intended")
+
+    def test_every_case_has_a_baseline(self):
+        """Test that new cases are added to the stored baseline"""
+        self.assertEqual(set(load_baseline()["cases"]), set(cases()))
+
+    def test_slow_node_is_flagged(self):
+        """Test that a node made 10x slower exceeds the budget"""
+        ingest = NODES["ingest"]
+
+        def slow_ingest(state):
+            for _ in range(9):
+                ingest(state)
+            return ingest(state)
+
+        baseline = run_suite(min_time=0.03, names={"node.ingest[long]", "node.classify[long]"})
+        with patch.dict(NODES, ingest=slow_ingest):
+            current = run_suite(min_time=0.03, names={"node.ingest[long]", "node.classify[long]"})
+
+        self.assertEqual([name for name, *_ in compare(current, baseline, 3.0)], ["node.ingest[long]"])
+
+    def test_compare(self):
+        """Test the ratio in units and that cases without a baseline are skipped"""
+        baseline = {"cases": {"node.a": {"units": 1.0}, "node.b": {"units": 2.0}}}
+        results = {"cases": {"node.a": {"units": 3.5}, "node.b": {"units": 5.0}, "node.new": {"units": 100.0}}}
+        self.assertEqual(compare(results, baseline, 3.0), [("node.a", 1.0, 3.5, 3.5)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+import json
+import os
+import unittest
+from unittest.mock import patch
+
+from graph.OrderEvidence import OrderEvidence, evidence_payload, to_order_evidence
+
+
+ORDER = {
+    "order_id": "ORD1002",
+    "customer_name": "Alice",
+    "email": "alice@example.com",
+    "product": "Bluetooth Speaker",
+    "status": "delivered",
+    "shipping_address": {"street": "1 Main St", "city": "Springfield"},
+    "line_items": [{"sku": "SPK-1", "qty": 1}],
+}
+
+
+class TestOrderEvidence(unittest.TestCase):
+    """Test cases for the compact order representation"""
+
+    def test_known_fields(self):
+        """Test that known fields are read into slots"""
+        evidence = OrderEvidence.from_dict(ORDER)
+
+        self.assertEqual(evidence.order_id, "ORD1002")
+        self.assertEqual(evidence["customer_name"], "Alice")
+        self.assertIsNone(evidence.total)
+
+    def test_mapping_view_skips_missing_fields(self):
+        """Test that the mapping view only exposes fields that have values"""
+        evidence = OrderEvidence.from_dict(ORDER)
+
+        self.assertEqual(set(evidence), {"order_id", "customer_name", "email", "product", "status"})
+        self.assertNotIn("total", evidence)
+        self.assertNotIn("error", evidence)
+        with self.assertRaises(KeyError):
+            evidence["shipping_address"]
+
+    def test_extras_are_kept_raw_and_decoded_lazily(self):
+        """Test that unknown fields are stored as a JSON blob"""
+        evidence = OrderEvidence.from_dict(ORDER, keep_extras=True)
+
+        self.assertIsInstance(evidence._extras_raw, bytes)
+        self.assertEqual(evidence.extras["shipping_address"]["city"], "Springfield")
+        self.assertEqual(evidence.to_dict(include_extras=True)["line_items"], ORDER["line_items"])
+
+    def test_extras_can_be_dropped(self):
+        """Test that unknown fields are discarded when keep_extras is off"""
+        evidence = OrderEvidence.from_dict(ORDER, keep_extras=False)
+
+        self.assertIsNone(evidence._extras_raw)
+        self.assertEqual(evidence.extras, {})
+
+    @patch.dict(os.environ, {"TRIAGE_EVIDENCE_KEEP_EXTRAS": "false"})
+    def test_keep_extras_from_env(self):
+        """Test that TRIAGE_EVIDENCE_KEEP_EXTRAS controls the default"""
+        self.assertEqual(OrderEvidence.from_dict(ORDER).extras, {})
+
+    def test_is_slotted(self):
+        """Test that instances carry no per-instance __dict__"""
+        evidence = OrderEvidence.from_dict(ORDER)
+        self.assertFalse(hasattr(evidence, "__dict__"))
+
+    def test_equality_with_dict(self):
+        """Test that evidence compares equal to the dict of its known fields"""
+        evidence = OrderEvidence.from_dict({"order_id": "ORD1002", "product": "Speaker"})
+        self.assertEqual(evidence, {"order_id": "ORD1002", "product": "Speaker"})
+
+
+class TestEvidenceHelpers(unittest.TestCase):
+    """Test cases for conversion helpers"""
+
+    def test_error_payload_passes_through(self):
+        """Test that backend errors are not converted"""
+        self.assertEqual(to_order_evidence({"error": "Order not found"}), {"error": "Order not found"})
+
+    def test_payload_for_single_order(self):
+        """Test that a single order becomes a plain JSON-serializable dict"""
+        payload = evidence_payload(OrderEvidence.from_dict(ORDER))
+
+        self.assertIsInstance(payload, dict)
+        self.assertEqual(json.loads(json.dumps(payload))["order_id"], "ORD1002")
+        self.assertEqual(payload["shipping_address"], ORDER["shipping_address"])
+        self.assertNotIn("shipping_address", evidence_payload(OrderEvidence.from_dict(ORDER, keep_extras=False)))
+
+    def test_payload_for_multiple_orders(self):
+        """Test that multi-match evidence converts every order"""
+        evidence = {"multiple_orders": [OrderEvidence.from_dict(ORDER)] * 2, "count": 2}
+        payload = evidence_payload(evidence)
+
+        self.assertEqual(payload["count"], 2)
+        self.assertIsInstance(payload["multiple_orders"][0], dict)
+
+    def test_payload_for_plain_values(self):
+        """Test that plain dicts and None pass through"""
+        self.assertIsNone(evidence_payload(None))
+        self.assertEqual(evidence_payload({"order_id": "ORD1"}), {"order_id": "ORD1"})
+
+
+if __name__ == "__main__":
+    unittest.main()
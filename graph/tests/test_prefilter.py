@@ -0,0 +1,174 @@
+import os
+import unittest
+from unittest.mock import patch
+
+from graph.benchmarks.bench_prefilter import DEFAULT_SAMPLE, evaluate, load_sample
+from graph.benchmarks.fakes import fake_backend, initial_state
+from graph.builder import build_graph
+from graph.nodes.prefilter import prefilter_node
+from graph.prefilter import PREFILTER_SCAN_CHARS, KeywordAutomaton, prefilter_ticket
+
+
+class TestKeywordAutomaton(unittest.TestCase):
+    """Test cases for the Aho-Corasick keyword automaton"""
+
+    def test_finds_overlapping_keywords(self):
+        """Test the classic he/she/his/hers example"""
+        automaton = KeywordAutomaton({"he": "a", "she": "b", "his": "c", "hers": "d"})
+        found = {keyword for keyword, _ in automaton.find("ushers")}
+        self.assertEqual(found, {"she", "he", "hers"})
+
+    def test_case_insensitive(self):
+        """Test that matching ignores case"""
+        automaton = KeywordAutomaton({"mailer-daemon": "bounce"})
+        self.assertEqual(automaton.find("From: MAILER-DAEMON@host"), [("mailer-daemon", "bounce")])
+
+    def test_no_match(self):
+        """Test text without keywords"""
+        automaton = KeywordAutomaton({"casino": "spam"})
+        self.assertEqual(automaton.find("My speaker is broken"), [])
+
+
+class TestPrefilterTicket(unittest.TestCase):
+    """Test cases for the pre-filter rules"""
+
+    def test_real_ticket_passes(self):
+        """Test that a normal ticket is not tagged"""
+        self.assertEqual(prefilter_ticket("My speaker is not working ORD1002"), (None, None, False))
+
+    def test_auto_reply_header(self):
+        """Test auto-reply detection from header-like lines"""
+        tag, reason, ends = prefilter_ticket("Auto-Submitted: auto-replied\nI am away")
+        self.assertEqual(tag, "auto_reply")
+        self.assertIn("header", reason)
+        self.assertTrue(ends)
+
+    def test_bounce_keyword(self):
+        """Test bounce detection from body keywords"""
+        tag, _, ends = prefilter_ticket("This is the mail system at host mx.example.com. Your message could not be delivered.")
+        self.assertEqual(tag, "bounce")
+        self.assertFalse(ends)
+
+    def test_customer_wording_is_not_a_bounce(self):
+        """Test that bounce phrases in real tickets need header evidence or a second phrase"""
+        self.assertEqual(prefilter_ticket("I never got a delivery status notification for ORD1002"), (None, None, False))
+        self.assertEqual(prefilter_ticket("My reply bounced, the message could not be delivered"), (None, None, False))
+        tag, _, _ = prefilter_ticket("Your message wasn't delivered to jane@example.com because the address couldn't be found.")
+        self.assertEqual(tag, "bounce")
+
+    def test_customer_email_protects_from_spam_tag(self):
+        """Test that spam vocabulary does not end a ticket with the customer's address"""
+        text = "The casino chip set arrived but the bitcoin wallet did not. alice@example.com"
+        self.assertEqual(prefilter_ticket(text), (None, None, False))
+
+    def test_scans_only_the_start(self):
+        """Test that keywords past PREFILTER_SCAN_CHARS are not scanned"""
+        filler = "My speaker is broken. " * (PREFILTER_SCAN_CHARS // 22 + 1)
+        self.assertEqual(prefilter_ticket(filler + "mailer-daemon"), (None, None, False))
+        self.assertEqual(prefilter_ticket("mailer-daemon " + filler)[0], "bounce")
+        self.assertIsNone(prefilter_ticket(" " * PREFILTER_SCAN_CHARS + "help")[0])
+
+    def test_spam_needs_two_keywords(self):
+        """Test that a single spam word is not enough"""
+        self.assertIsNone(prefilter_ticket("How do I unsubscribe from the newsletter?")[0])
+        self.assertEqual(prefilter_ticket("You have won the lottery!")[0], "spam")
+
+    def test_order_id_protects_from_spam_tag(self):
+        """Test that spam vocabulary does not end a ticket with an order id"""
+        self.assertIsNone(prefilter_ticket("Click here and you have won? ORD1002 is still missing")[0])
+
+    def test_link_heavy_short_text_is_spam(self):
+        """Test the link density heuristic"""
+        tag, _, _ = prefilter_ticket("Deals http://a.example http://b.example http://c.example")
+        self.assertEqual(tag, "spam")
+
+    def test_empty_ticket(self):
+        """Test that tickets without any words are tagged empty"""
+        self.assertEqual(prefilter_ticket(" ... ")[0], "empty")
+
+    def test_only_anchored_subjects_end(self):
+        """Test that subjects merely starting with auto-reply words are not tagged"""
+        self.assertEqual(prefilter_ticket("Subject: Automatic reply settings\nHow do I turn them off?"), (None, None, False))
+        self.assertEqual(prefilter_ticket("Subject: Out of Office: Re: ORD1002")[0:3:2], ("auto_reply", True))
+        self.assertEqual(prefilter_ticket("Subject: Undeliverable\nalice@example.com")[0:3:2], ("bounce", True))
+
+    def test_quoted_headers_do_not_end(self):
+        """Test that header lines after the leading header block are not trusted"""
+        text = "Hi, this is what I got back:\nSubject: Out of Office: Re: refund\nStill no refund."
+        self.assertFalse(prefilter_ticket(text)[2])
+
+    def test_body_matches_do_not_end(self):
+        """Test that complaints using spam and auto-reply wording are tagged but not ended"""
+        complaints = [
+            "Your marketing emails say click here and the unsubscribe link does nothing. Stop sending them.",
+            "I tried to pay by wire transfer but checkout only offered bitcoin. What can I use?",
+            "My lamp arrived broken and your rep only answered \"I'm currently on vacation\". Who can help?",
+            "Your lottery promo said you have won a casino voucher. How do I claim it?",
+        ]
+        for text in complaints:
+            with self.subTest(text=text):
+                tag, _, ends = prefilter_ticket(text)
+                self.assertIsNotNone(tag)
+                self.assertFalse(ends)
+
+    def test_labeled_sample_quality(self):
+        """Test that no real ticket in the labeled sample is ended and junk is still tagged"""
+        report = evaluate(load_sample(DEFAULT_SAMPLE))
+        self.assertEqual(report["ended"]["precision"], 1.0)
+        self.assertGreaterEqual(report["tagged"]["recall"], 0.9)
+
+
+@patch.dict(os.environ, {"TRIAGE_PREFILTER": "true"})
+class TestPrefilterNode(unittest.TestCase):
+    """Test cases for the prefilter_node function"""
+
+    @patch.dict(os.environ, {"TRIAGE_PREFILTER": "false"})
+    def test_disabled(self):
+        """Test that the node is a no-op when the pre-filter is off"""
+        self.assertEqual(prefilter_node(initial_state("Subject: Out of Office")), {})
+
+    def test_tags_and_stops(self):
+        """Test that a tagged ticket gets a tag, recommendation and messages"""
+        result = prefilter_node(initial_state("Subject: Out of Office\nBack Monday"))
+
+        self.assertEqual(result["ticket_tag"], "auto_reply")
+        self.assertIn("No reply needed", result["recommendation"])
+        self.assertEqual(result["messages"][0]["role"], "user")
+        self.assertIn("tagged as auto_reply", result["messages"][1]["content"])
+
+    def test_body_match_is_suspected_only(self):
+        """Test that a body-only match sets suspected_tag and does not stop the run"""
+        self.assertEqual(prefilter_node(initial_state("You have won the lottery!")), {"suspected_tag": "spam"})
+
+    def test_passes_real_ticket(self):
+        """Test that a real ticket produces no update"""
+        self.assertEqual(prefilter_node(initial_state("My speaker is not working ORD1002")), {})
+
+    def test_graph_makes_no_backend_calls(self):
+        """Test that a bounce with an email address never reaches search_orders"""
+        graph = build_graph()
+        ticket = "From: Mail Delivery Subsystem <mailer-daemon@example.com>\nalice@example.com not delivered"
+
+        with fake_backend() as backend:
+            result = graph.invoke(initial_state(ticket))
+
+        self.assertEqual(backend.calls, 0)
+        self.assertEqual(result["ticket_tag"], "bounce")
+        self.assertIsNone(result.get("customer_email"))
+
+    def test_graph_triages_body_only_matches(self):
+        """Test that a damage report quoting an auto-reply is still triaged"""
+        graph = build_graph()
+        ticket = "My lamp arrived broken and your rep only answered \"I'm currently on vacation\". alice@example.com"
+
+        with fake_backend() as backend:
+            result = graph.invoke(initial_state(ticket))
+
+        self.assertGreater(backend.calls, 0)
+        self.assertEqual(result["suspected_tag"], "auto_reply")
+        self.assertIsNone(result.get("ticket_tag"))
+        self.assertTrue(result["recommendation"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,113 @@
+import os
+import unittest
+from unittest.mock import patch
+
+from graph.benchmarks.fakes import fake_backend, initial_state
+from graph.builder import build_graph
+from graph.nodes.ingest import ingest_node
+from graph.nodes.preprocess import preprocess_node
+from graph.preprocess import (
+    clean_ticket_text, configured_rules, strip_html, strip_quoted_replies, strip_signature, truncate
+)
+
+
+class TestCleaningRules(unittest.TestCase):
+    """Test cases for the ticket text cleaning rules"""
+
+    def test_strip_html(self):
+        """Test that tags, styles and entities are converted to plain text"""
+        text = "<html><head><style>p {color: red}</style></head><body><p>Broken &amp; cracked</p><br>ORD1002</body></html>"
+        self.assertEqual(strip_html(text).split(), ["Broken", "&", "cracked", "ORD1002"])
+
+    def test_plain_text_is_not_treated_as_html(self):
+        """Test that text with angle brackets but no HTML is unchanged"""
+        self.assertEqual(strip_html("size < 5 and > 2"), "size < 5 and > 2")
+
+    def test_strip_quoted_replies(self):
+        """Test that the quoted thread below a reply header is dropped"""
+        text = "Still broken\n\nOn Mon, Jan 6, 2025 at 9:00 AM Support <s@x.com> wrote:\n> Sorry to hear\n> Regards"
+        self.assertEqual(strip_quoted_replies(text).strip(), "Still broken")
+
+    def test_strip_outlook_reply(self):
+        """Test the Outlook From:/Sent: header block"""
+        text = "Any update?\nFrom: Support\nSent: Monday\nSubject: RE: order"
+        self.assertEqual(strip_quoted_replies(text), "Any update?")
+
+    def test_strip_signature(self):
+        """Test that a signature at the end is dropped"""
+        self.assertEqual(strip_signature("Broken speaker\n--\nAlice\nACME"), "Broken speaker")
+        self.assertEqual(strip_signature("Broken speaker\nSent from my iPhone"), "Broken speaker")
+
+    def test_truncate_keeps_head_and_tail(self):
+        """Test that long text keeps its start and end"""
+        text = "start " + "x" * 1000 + " end"
+        result = truncate(text, 100)
+        self.assertTrue(result.startswith("start"))
+        self.assertTrue(result.endswith("end"))
+        self.assertIn("characters omitted", result)
+
+    def test_clean_keeps_original_when_nothing_is_left(self):
+        """Test the fallback for tickets that are only quoted text"""
+        self.assertEqual(clean_ticket_text("> only quoted"), "> only quoted")
+
+    def test_rules_are_configurable(self):
+        """Test that only the configured rules run"""
+        text = "Broken\n> quoted"
+        self.assertEqual(clean_ticket_text(text, rules=["html"]), text)
+        with patch.dict(os.environ, {"TRIAGE_PREPROCESS_RULES": "quotes"}):
+            self.assertEqual(configured_rules(), ["quotes"])
+        with patch.dict(os.environ, {"TRIAGE_PREPROCESS_RULES": "quotes,emoji"}):
+            self.assertRaises(ValueError, configured_rules)
+
+
+@patch.dict(os.environ, {"TRIAGE_PREPROCESS": "true"})
+class TestPreprocessNode(unittest.TestCase):
+    """Test cases for the preprocess_node function"""
+
+    THREAD = "Still broken ORD1002\n\nOn Mon, Jan 6, 2025 Support wrote:\n" + "> earlier message\n" * 50
+
+    @patch.dict(os.environ, {"TRIAGE_PREPROCESS": "false"})
+    def test_disabled(self):
+        """Test that the node is a no-op when preprocessing is off"""
+        self.assertEqual(preprocess_node(initial_state(self.THREAD)), {})
+
+    def test_sets_clean_text(self):
+        """Test that the node returns the cleaned text and a message"""
+        result = preprocess_node(initial_state(self.THREAD))
+
+        self.assertEqual(result["clean_text"], "Still broken ORD1002")
+        self.assertIn("chars", result["messages"][0]["content"])
+
+    @patch.dict(os.environ, {"TRIAGE_PREPROCESS_MAX_CHARS": "10"})
+    def test_max_chars(self):
+        """Test TRIAGE_PREPROCESS_MAX_CHARS"""
+        result = preprocess_node(initial_state("a" * 50))
+        self.assertTrue(result["clean_text"].startswith("aaaaaaa\n[..."))
+
+    def test_ingest_references_original(self):
+        """Test that ingest does not copy the original text into messages"""
+        result = ingest_node({"ticket_text": self.THREAD, "messages": []})
+
+        self.assertEqual(result["messages"][0]["content"], f"[ticket_text: {len(self.THREAD)} chars]")
+
+    def test_classify_receives_clean_text(self):
+        """Test that the cleaned text is sent to the backend and the original is kept"""
+        graph = build_graph()
+        payloads = {}
+
+        with fake_backend() as backend:
+            post = backend.post
+
+            def recording_post(url, json=None, **kwargs):
+                payloads[url.rsplit("/", 1)[-1]] = json
+                return post(url, json=json, **kwargs)
+
+            with patch("requests.post", recording_post):
+                result = graph.invoke(initial_state(self.THREAD))
+
+        self.assertEqual(payloads["issue"]["ticket_text"], "Still broken ORD1002")
+        self.assertEqual(result["ticket_text"], self.THREAD)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+import json
+import os
+import re
+import tempfile
+import time
+import unittest
+
+from app.profiling import ProfileRateLimiter, SamplingProfiler, _categorize, run_profiled
+from graph.tracing import traced_node
+
+
+def busy_regex(state):
+    """Node that spends its time in regex extraction"""
+    deadline = time.perf_counter() + 0.05
+    while time.perf_counter() < deadline:
+        re.search(r"ORD\d{4}", "x" * 2000 + "ORD1002")
+    return state
+
+
+class TestSamplingProfiler(unittest.TestCase):
+    """Test cases for the sampling profiler"""
+
+    def test_collects_samples_from_target_thread(self):
+        """Test that samples are taken while the target thread is busy"""
+        import threading
+
+        with SamplingProfiler(threading.get_ident(), interval=0.001) as profiler:
+            busy_regex({})
+
+        self.assertGreater(profiler.samples, 0)
+        self.assertIn("busy_regex", profiler.folded())
+
+    def test_categorize_regex_frames(self):
+        """Test that regex frames are attributed to regex_extraction"""
+        frames = ["search (/usr/lib/python3.12/re/__init__.py:176)", "extract_email (graph/nodes/ingest.py:50)"]
+        self.assertEqual(_categorize(frames), "regex_extraction")
+
+    def test_categorize_backend_wait(self):
+        """Test that socket frames are attributed to backend_wait"""
+        frames = ["recv_into (/usr/lib/python3.12/socket.py:707)", "classify_node (graph/nodes/classify.py:17)"]
+        self.assertEqual(_categorize(frames), "backend_wait")
+
+    def test_categorize_node_code_under_langgraph(self):
+        """Test that node code called by LangGraph is attributed to the node, not to langgraph"""
+        frames = [
+            "minhash (/root/package/graph/dedup.py:40)",
+            "dedupe_node (/root/package/graph/nodes/dedupe.py:25)",
+            "run (/usr/lib/python3.12/site-packages/langgraph/utils/runnable.py:300)",
+            "invoke (/usr/lib/python3.12/site-packages/langgraph/pregel/__init__.py:1600)",
+        ]
+        self.assertEqual(_categorize(frames), "node.dedupe")
+        self.assertEqual(_categorize(frames[2:]), "langgraph")
+        self.assertEqual(_categorize(["run (/root/package/graph/executor.py:10)"] + frames[2:]), "other")
+
+    def test_categorize_other(self):
+        """Test fallback category"""
+        self.assertEqual(_categorize(["main (run.py:1)"]), "other")
+
+
+class TestProfileRateLimiter(unittest.TestCase):
+    """Test cases for the profiling rate limit"""
+
+    def test_limits_profiles_per_window(self):
+        """Test that only max_profiles are allowed inside the window"""
+        limiter = ProfileRateLimiter(max_profiles=2, window=60)
+
+        self.assertTrue(limiter.acquire())
+        self.assertTrue(limiter.acquire())
+        self.assertFalse(limiter.acquire())
+
+    def test_window_expires(self):
+        """Test that slots free up once the window has passed"""
+        limiter = ProfileRateLimiter(max_profiles=1, window=0.01)
+
+        self.assertTrue(limiter.acquire())
+        time.sleep(0.02)
+        self.assertTrue(limiter.acquire())
+
+
+class TestRunProfiled(unittest.TestCase):
+    """Test cases for writing profile artifacts"""
+
+    def test_writes_profile_and_node_breakdown(self):
+        """Test that the folded profile and per-node breakdown are saved"""
+        node = traced_node("ingest", busy_regex)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            result, profile_id = run_profiled(lambda: node({"ticket_text": "ORD1002"}), profile_dir=tmp)
+
+            self.assertEqual(result, {"ticket_text": "ORD1002"})
+            self.assertTrue(os.path.exists(os.path.join(tmp, f"{profile_id}.folded")))
+            with open(os.path.join(tmp, f"{profile_id}.json")) as f:
+                summary = json.load(f)
+
+        self.assertEqual(summary["nodes"][0]["node"], "ingest")
+        self.assertGreater(summary["nodes"][0]["wall_ms"], 0)
+        self.assertGreater(summary["nodes"][0]["cpu_ms"], 0)
+        self.assertGreater(summary["samples"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,172 @@
+import gzip
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from graph.backend import post_json
+from graph.benchmarks.fakes import fake_backend, initial_state
+from graph.benchmarks.replay_backend import ReplayBackend, summarize
+from graph.builder import build_direct_executor
+from graph.recording import (
+    TrafficRecorder, configured_redactors, read_capture, redact_emails, redact_names, redact_phones, set_recorder
+)
+
+
+class TestRedaction(unittest.TestCase):
+    """Test cases for the PII redaction hooks"""
+
+    def test_emails_get_stable_pseudonyms(self):
+        """Test that the same address always maps to the same pseudonym"""
+        redacted = redact_emails({"ticket_text": "From Alice@Shop.com", "params": ["alice@shop.com", 3]})
+
+        self.assertNotIn("shop.com", str(redacted))
+        self.assertEqual(redacted["ticket_text"], "From " + redacted["params"][0])
+        self.assertEqual(redacted["params"][1], 3)
+
+    def test_phones_keep_their_length(self):
+        """Test that phone digits are masked in place"""
+        self.assertEqual(redact_phones("call +1 415 555 0134 now"), "call +5 555 555 5555 now")
+        self.assertEqual(redact_phones("Order ORD1002"), "Order ORD1002")
+
+    def test_phones_only_in_free_text(self):
+        """Test that dates, tracking numbers and other order fields are not masked"""
+        order = {"order_id": "ORD1002", "order_date": "2024-01-15", "tracking_number": "1Z999AA10123456784",
+                 "total": 1234567.89, "notes": "Ship 2024-01-15"}
+        redacted = redact_phones({
+            "ticket_text": "Ordered 2024-01-15, tracking 1Z999AA10123456784, call 415-555-0134",
+            "evidence": order,
+            "results": [order],
+        })
+
+        self.assertEqual(redacted["ticket_text"], "Ordered 2024-01-15, tracking 1Z999AA10123456784, call 555-555-5555")
+        self.assertEqual(redacted["evidence"], order)
+        self.assertEqual(redacted["results"], [order])
+        self.assertEqual(redact_phones({"reply_text": "We will call +44 20 7946 0958"}),
+                         {"reply_text": "We will call +55 55 5555 5555"})
+
+    def test_name_fields(self):
+        """Test that name fields of order documents are replaced"""
+        redacted = redact_names({"results": [{"order_id": "ORD1002", "customer_name": "Alice Smith"}]})
+        self.assertEqual(redacted["results"][0]["order_id"], "ORD1002")
+        self.assertTrue(redacted["results"][0]["customer_name"].startswith("Customer "))
+
+    def test_configured_redactors(self):
+        """Test TRIAGE_RECORD_REDACT parsing"""
+        with patch.dict(os.environ, {"TRIAGE_RECORD_REDACT": "emails, names"}):
+            self.assertEqual(configured_redactors(), ["emails", "names"])
+        with patch.dict(os.environ, {"TRIAGE_RECORD_REDACT": "emails,ssn"}):
+            with self.assertRaises(ValueError):
+                configured_redactors()
+
+
+class RecordingTestCase(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "capture.jsonl.gz")
+
+    def record(self, tickets, **recorder_kwargs):
+        recorder = TrafficRecorder(self.path, **recorder_kwargs)
+        set_recorder(recorder)
+        try:
+            with fake_backend():
+                runner = build_direct_executor()
+                return [runner.invoke(initial_state(text)) for text in tickets]
+        finally:
+            set_recorder(None)
+            recorder.close()
+
+
+class TestTrafficRecorder(RecordingTestCase):
+    """Test cases for recording backend calls"""
+
+    def test_records_redacted_calls_with_timings(self):
+        """Test that every backend call of a run is captured, without the customer's email"""
+        self.record(["Where is my order? alice@example.com"])
+
+        capture = read_capture(self.path)
+        self.assertEqual([entry["path"] for entry in capture], ["/orders/search", "/classify/issue", "/reply/draft"])
+        search = capture[0]
+        self.assertEqual(search["method"], "get")
+        self.assertNotIn("alice", str(search))
+        self.assertEqual(search["status"], 200)
+        self.assertGreaterEqual(search["elapsed_ms"], 0)
+        self.assertGreater(search["response_bytes"], 0)
+        self.assertEqual(capture[2]["response"], {"reply_text": "Reply for defective"})
+
+    def test_gzipped_bodies_are_recorded_decoded(self):
+        """Test that request bodies sent with gzip are stored as JSON"""
+        recorder = TrafficRecorder(self.path, redactors=())
+        set_recorder(recorder)
+        self.addCleanup(set_recorder, None)
+        env = {"TRIAGE_GZIP_REQUESTS": "true", "TRIAGE_GZIP_MIN_BYTES": "0"}
+        with patch.dict(os.environ, env), fake_backend():
+            post_json("/classify/issue", {"ticket_text": "Broken speaker"})
+        recorder.close()
+
+        self.assertEqual(read_capture(self.path)[0]["body"], {"ticket_text": "Broken speaker"})
+
+    def test_sample_rate(self):
+        """Test that a sample rate of 0 records nothing"""
+        self.record(["My speaker is broken ORD1002"], sample_rate=0.0)
+        self.assertEqual(read_capture(self.path), [])
+
+    def test_truncated_capture_is_readable(self):
+        """Test that a capture cut off mid-write yields the complete entries"""
+        self.record(["My speaker is broken ORD1002", "Where is my order? alice@example.com"] * 20)
+        with open(self.path, "rb") as f:
+            data = f.read()
+        with open(self.path, "wb") as f:
+            f.write(data[:len(data) // 2])
+
+        with gzip.open(self.path, "rt") as f:
+            with self.assertRaises(EOFError):
+                f.read()
+        capture = read_capture(self.path)
+        self.assertTrue(0 < len(capture) < 120)
+        self.assertTrue(all("elapsed_ms" in entry for entry in capture))
+
+
+class TestReplayBackend(RecordingTestCase):
+    """Test cases for serving a capture"""
+
+    def test_replay_reproduces_the_recorded_run(self):
+        """Test that a replayed ticket gets the recorded responses"""
+        tickets = ["My speaker is broken ORD1002", "Where is my order? alice@example.com"]
+        recorded = self.record(tickets)
+        capture = read_capture(self.path)
+
+        with ReplayBackend(capture, speed=100) as replay, patch.dict(os.environ, {"BACKEND_URL": replay.url}):
+            runner = build_direct_executor()
+            replayed = [runner.invoke(initial_state(text)) for text in (tickets[0], capture[4]["body"]["ticket_text"])]
+
+        self.assertEqual(replayed[0]["recommendation"], recorded[0]["recommendation"])
+        self.assertEqual(replayed[0]["evidence"]["order_id"], "ORD1002")
+        self.assertEqual(replayed[1]["order_id"], recorded[1]["order_id"])
+        self.assertEqual(replay.exact, 6)
+
+    def test_unrecorded_request_gets_a_response_of_its_path(self):
+        """Test the same-path fallback and the 404 for paths never recorded"""
+        self.record(["My speaker is broken ORD1002"])
+
+        with ReplayBackend(read_capture(self.path), speed=100) as replay, \
+                patch.dict(os.environ, {"BACKEND_URL": replay.url}):
+            response = post_json("/classify/issue", {"ticket_text": "Something new"})
+            missing = post_json("/refunds/create", {"order_id": "ORD1002"})
+
+        self.assertEqual(response.json(), {"issue_type": "defective"})
+        self.assertEqual(missing.status_code, 404)
+        self.assertEqual(replay.exact, 0)
+
+    def test_summarize(self):
+        """Test per-path calls and latency of a capture"""
+        self.record(["My speaker is broken ORD1002"] * 3)
+        summary = summarize(read_capture(self.path))
+        self.assertEqual(summary["/orders/get"]["calls"], 3)
+        self.assertEqual(set(summary), {"/orders/get", "/classify/issue", "/reply/draft"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,158 @@
+import asyncio
+import os
+import unittest
+from unittest.mock import patch
+
+from app.scheduler import ANONYMOUS, FairScheduler, parse_weights, set_scheduler, tenant_key
+from graph import metrics
+from graph.benchmarks.fakes import fake_backend
+
+
+def start_order(scheduler: FairScheduler, tenants: list[str]) -> list[str]:
+    """
+    Submits one ticket per entry (in order) and returns the order in which they started.
+    """
+    started = []
+
+    async def ticket(tenant):
+        async with scheduler.slot(tenant):
+            started.append(tenant)
+            await asyncio.sleep(0)
+
+    async def main():
+        await asyncio.gather(*(ticket(tenant) for tenant in tenants))
+
+    asyncio.run(main())
+    return started
+
+
+class TestFairScheduler(unittest.TestCase):
+    """Test cases for per-tenant fair scheduling"""
+
+    def setUp(self):
+        metrics.reset()
+
+    def test_tenants_take_turns(self):
+        """Test that a quiet tenant is not queued behind a noisy tenant's backlog"""
+        scheduler = FairScheduler(concurrency=1)
+
+        started = start_order(scheduler, ["noisy"] * 5 + ["quiet"] * 2)
+
+        self.assertEqual(started, ["noisy", "noisy", "quiet", "noisy", "quiet", "noisy", "noisy"])
+        self.assertEqual(scheduler.stats()["tenants"]["quiet"]["started"], 2)
+        self.assertEqual(metrics.snapshot()["histograms"]["scheduler.wait_ms"]["count"], 7)
+
+    def test_weights_give_more_starts_per_turn(self):
+        """Test that a tenant with weight 2 starts two tickets per turn"""
+        started = start_order(FairScheduler(concurrency=1, weights={"big": 2}), ["big"] * 5 + ["small"] * 3)
+        self.assertEqual(started, ["big", "big", "big", "small", "big", "big", "small", "small"])
+
+        # A weight below 1 starts a ticket every other turn
+        started = start_order(FairScheduler(concurrency=1, weights={"slow": 0.5}), ["slow"] * 3 + ["other"] * 3)
+        self.assertEqual(started, ["slow", "other", "slow", "other", "other", "slow"])
+
+    def test_tenant_concurrency_cap(self):
+        """Test that one tenant cannot take every slot"""
+        scheduler = FairScheduler(concurrency=4, tenant_concurrency=2)
+
+        async def main():
+            release = asyncio.Event()
+
+            async def ticket(tenant):
+                async with scheduler.slot(tenant):
+                    await release.wait()
+
+            tasks = [asyncio.create_task(ticket("noisy")) for _ in range(6)]
+            await asyncio.sleep(0)
+            quiet = asyncio.create_task(ticket("quiet"))
+            await asyncio.sleep(0)
+
+            stats = scheduler.stats()
+            release.set()
+            await asyncio.gather(*tasks, quiet)
+            return stats
+
+        stats = asyncio.run(main())
+
+        self.assertEqual(stats["running"], 3)
+        self.assertEqual((stats["tenants"]["noisy"]["running"], stats["tenants"]["noisy"]["queued"]), (2, 4))
+        self.assertEqual(stats["tenants"]["quiet"]["running"], 1)
+        self.assertEqual(scheduler.stats()["running"], 0)
+        self.assertEqual(scheduler.stats()["tenants"]["noisy"]["started"], 6)
+
+    def test_cancelled_waiter_leaves_queue(self):
+        """Test that a cancelled request neither runs nor holds its place"""
+        scheduler = FairScheduler(concurrency=1)
+
+        async def main():
+            release = asyncio.Event()
+            started = []
+
+            async def ticket(tenant):
+                async with scheduler.slot(tenant):
+                    started.append(tenant)
+                    await release.wait()
+
+            first = asyncio.create_task(ticket("a"))
+            waiting = asyncio.create_task(ticket("b"))
+            await asyncio.sleep(0)
+            self.assertEqual(scheduler.stats()["queued"], 1)
+            waiting.cancel()
+            await asyncio.sleep(0)
+            self.assertEqual(scheduler.stats()["queued"], 0)
+            release.set()
+            await first
+            return started
+
+        self.assertEqual(asyncio.run(main()), ["a"])
+        self.assertEqual(scheduler.stats()["running"], 0)
+
+
+class TestTenantKey(unittest.TestCase):
+    """Test cases for choosing the tenant of a ticket"""
+
+    def test_header_wins(self):
+        """Test that X-Triage-Tenant is used when sent"""
+        self.assertEqual(tenant_key(" Acme ", "From bob@example.com"), "acme")
+
+    def test_email_domain(self):
+        """Test that the email domain is used without the header"""
+        self.assertEqual(tenant_key(None, "Broken again, bob@BigCo.com"), "bigco.com")
+        self.assertEqual(tenant_key("", "No email here"), ANONYMOUS)
+
+    def test_parse_weights(self):
+        """Test parsing TRIAGE_SCHEDULER_WEIGHTS"""
+        self.assertEqual(parse_weights("BigCo.com=4, small.io=0.5,,bad"), {"bigco.com": 4.0, "small.io": 0.5})
+
+    def test_rejects_non_positive_weights(self):
+        """Test that weights which would stall dispatch are rejected"""
+        for spec in ("bigco.com=0", "bigco.com=-1", "bigco.com=nan"):
+            with self.assertRaises(ValueError, msg=spec):
+                parse_weights(spec)
+        with self.assertRaises(ValueError):
+            FairScheduler(weights={"bigco.com": 0})
+
+
+class TestSchedulerEndpoint(unittest.TestCase):
+    """Test cases for the scheduler in front of /triage/invoke"""
+
+    def test_invoke_runs_in_tenant_slot(self):
+        """Test that invoke is admitted through the tenant's slot"""
+        from fastapi.testclient import TestClient
+        from app.main import app
+
+        scheduler = FairScheduler()
+        set_scheduler(scheduler)
+        self.addCleanup(set_scheduler, None)
+
+        with patch.dict(os.environ, {"TRIAGE_SCHEDULER": "true"}), fake_backend():
+            response = TestClient(app).post("/triage/invoke", json={"ticket_text": "My speaker is broken ORD1002"},
+                                            headers={"X-Triage-Tenant": "acme"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["issue_type"], "defective")
+        self.assertEqual(scheduler.stats()["tenants"]["acme"]["started"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -80,7 +80,7 @@ class TestSearchOrdersNode(unittest.TestCase):
         self.assertEqual(result["order_id"], "ORD1002")
         self.assertIsNotNone(result["evidence"])
         self.assertEqual(result["evidence"]["order_id"], "ORD1002")
-        self.assertIn("Found order ORD1002", result["messages"][1]["content"])
+        self.assertIn("Found order ORD1002", result["messages"][0]["content"])
 
     @patch('graph.nodes.search_orders.requests.get')
     def test_search_multiple_results(self, mock_get):
@@ -97,10 +97,10 @@ class TestSearchOrdersNode(unittest.TestCase):
 
         result = search_orders_node(self.base_state.copy())
 
-        self.assertIsNone(result["order_id"])
+        self.assertIsNone(result.get("order_id"))
         self.assertIn("multiple_orders", result["evidence"])
         self.assertEqual(result["evidence"]["count"], 2)
-        self.assertIn("Found 2 orders", result["messages"][1]["content"])
+        self.assertIn("Found 2 orders", result["messages"][0]["content"])
 
     @patch('graph.nodes.search_orders.requests.get')
     def test_search_no_results(self, mock_get):
@@ -112,8 +112,8 @@ class TestSearchOrdersNode(unittest.TestCase):
 
         result = search_orders_node(self.base_state.copy())
 
-        self.assertIsNone(result["order_id"])
-        self.assertIn("No orders found", result["messages"][1]["content"])
+        self.assertIsNone(result.get("order_id"))
+        self.assertIn("No orders found", result["messages"][0]["content"])
 
     def test_search_no_email(self):
         """Test when no customer_email is in state"""
@@ -122,7 +122,7 @@ class TestSearchOrdersNode(unittest.TestCase):
 
         result = search_orders_node(state)
 
-        self.assertIn("No customer email found", result["messages"][1]["content"])
+        self.assertIn("No customer email found", result["messages"][0]["content"])
 
     @patch('graph.nodes.search_orders.requests.get')
     def test_search_error(self, mock_get):
@@ -131,7 +131,7 @@ class TestSearchOrdersNode(unittest.TestCase):
 
         result = search_orders_node(self.base_state.copy())
 
-        self.assertIn("Error:", result["messages"][1]["content"])
+        self.assertIn("Error:", result["messages"][0]["content"])
 
 
 if __name__ == "__main__":
@@ -0,0 +1,178 @@
+import json
+import os
+import pickle
+import tempfile
+import time
+import unittest
+
+from graph.benchmarks.fakes import fake_backend, initial_state
+from graph.benchmarks.memcached_stub import MemcachedStub
+from graph.builder import build_graph
+from graph.OrderEvidence import OrderEvidence
+from graph.nodes.classify import classify_node
+from graph.nodes.fetch_order import fetch_order_node
+from graph.shared_cache import (
+    WORKER_ID, LocalCacheBackend, MemcachedCacheBackend, SharedCache, SQLiteCacheBackend,
+    deserialize, serialize, set_shared_cache
+)
+
+
+class TestSerialization(unittest.TestCase):
+    """Test cases for the cache entry encoding"""
+
+    def test_round_trip(self):
+        """Test that values and the writer survive encoding"""
+        evidence = OrderEvidence.from_dict({"order_id": "ORD1002", "email": "a@example.com", "gift": True})
+        writer, value = deserialize(serialize(evidence, writer="w1"))
+
+        self.assertEqual(writer, "w1")
+        self.assertEqual(dict(value), dict(evidence))
+        self.assertEqual(value.extras, {"gift": True})
+
+    def test_entries_are_json(self):
+        """Test that entries are plain JSON and that pickled entries are rejected"""
+        data = serialize({"issue_type": "refund", "orders": [OrderEvidence.from_dict({"order_id": "ORD1002"})]})
+
+        self.assertEqual(data[:1], b"j")
+        self.assertEqual(json.loads(data[1:])[0], WORKER_ID)
+        self.assertEqual(deserialize(data)[1]["orders"][0]["order_id"], "ORD1002")
+        with self.assertRaises(ValueError):
+            deserialize(b"p" + pickle.dumps(("w1", "value")))
+
+    def test_large_values_are_compressed(self):
+        """Test that big entries are zlib-compressed"""
+        data = serialize("reply " * 1000)
+
+        self.assertEqual(data[:1], b"z")
+        self.assertLess(len(data), 200)
+        self.assertEqual(deserialize(data)[1], "reply " * 1000)
+
+
+class BackendContract:
+    """Checks shared by every CacheBackend"""
+
+    # Shortest TTL the backend supports (memcached expiry has one-second resolution)
+    min_ttl = 0.05
+
+    def make_backend(self):
+        raise NotImplementedError
+
+    def setUp(self):
+        self.backend = self.make_backend()
+        self.addCleanup(self.backend.close)
+
+    def test_set_get_delete(self):
+        """Test the basic byte store operations"""
+        self.assertIsNone(self.backend.get("k"))
+        self.backend.set("k", b"\x00value\r\n", ttl=60)
+        self.assertEqual(self.backend.get("k"), b"\x00value\r\n")
+        self.backend.delete("k")
+        self.assertIsNone(self.backend.get("k"))
+
+    def test_entries_expire(self):
+        """Test that entries are gone after their TTL"""
+        self.backend.set("short", b"v", ttl=self.min_ttl)
+        time.sleep(self.min_ttl + 0.05)
+        self.assertIsNone(self.backend.get("short"))
+
+
+class TestLocalCacheBackend(BackendContract, unittest.TestCase):
+    """Test cases for the in-process backend"""
+
+    def make_backend(self):
+        return LocalCacheBackend()
+
+
+class TestSQLiteCacheBackend(BackendContract, unittest.TestCase):
+    """Test cases for the SQLite backend"""
+
+    def make_backend(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "cache.sqlite3")
+        return SQLiteCacheBackend(self.path)
+
+    def test_shared_between_workers(self):
+        """Test that a second worker sees entries and counts cross-worker hits"""
+        self.backend.set("triage:order:ORD1002", serialize("evidence", writer="other-worker"), 60)
+
+        other = SharedCache(SQLiteCacheBackend(self.path))
+        self.assertEqual(other.get("order", "ORD1002"), "evidence")
+        self.assertEqual(other.stats()["cross_worker_hits"], 1)
+        other.backend.close()
+
+
+class TestMemcachedCacheBackend(BackendContract, unittest.TestCase):
+    """Test cases for the memcached client against the local stand-in"""
+
+    min_ttl = 1
+
+    def make_backend(self):
+        stub = MemcachedStub().start()
+        self.addCleanup(stub.stop)
+        return MemcachedCacheBackend(*stub.address)
+
+    def test_unreachable_server_is_a_miss(self):
+        """Test that network errors do not raise"""
+        backend = MemcachedCacheBackend("127.0.0.1", 1, timeout=0.2)
+        self.assertIsNone(backend.get("k"))
+
+    def test_invalid_keys_are_rejected(self):
+        """Test that keys with spaces are refused"""
+        self.assertRaises(ValueError, self.backend.get, "bad key")
+
+
+class TestSharedCacheInNodes(unittest.TestCase):
+    """Test cases for the shared cache in the backend-calling nodes"""
+
+    def setUp(self):
+        self.cache = SharedCache(LocalCacheBackend())
+        set_shared_cache(self.cache)
+        self.addCleanup(set_shared_cache, None)
+
+    def test_hit_rate_stats(self):
+        """Test hit, miss and cross-worker counts"""
+        self.cache.get("order", "ORD1")
+        self.cache.set("order", "ORD1", "mine")
+        self.cache.get("order", "ORD1")
+
+        stats = self.cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["cross_worker_hits"]), (1, 1, 0))
+        self.assertEqual(stats["backend"], "local")
+
+    def test_fetch_order_uses_shared_cache(self):
+        """Test that a cached order needs no backend call"""
+        with fake_backend() as backend:
+            fetch_order_node({"order_id": "ORD1002", "messages": []})
+            result = fetch_order_node({"order_id": "ord1002", "messages": []})
+
+        self.assertEqual(backend.calls, 1)
+        self.assertEqual(result["evidence"]["order_id"], "ORD1002")
+
+    def test_classify_uses_shared_cache(self):
+        """Test that identical ticket text is classified once"""
+        state = {"ticket_text": "My speaker is broken ORD1002", "messages": []}
+        with fake_backend(issue_type="defective") as backend:
+            classify_node(state)
+            result = classify_node(state)
+
+        self.assertEqual(backend.paths["/classify/issue"], 1)
+        self.assertEqual(result["issue_type"], "defective")
+        self.assertIn("(cached)", result["messages"][0]["content"])
+
+    def test_graph_second_ticket_makes_no_backend_calls(self):
+        """Test that orders, classifications and replies are all reused"""
+        graph = build_graph()
+
+        with fake_backend() as backend:
+            first = graph.invoke(initial_state("My speaker is broken ORD1002"))
+            calls = backend.calls
+            second = graph.invoke(initial_state("My speaker is broken ORD1002"))
+
+        self.assertEqual(calls, 3)
+        self.assertEqual(backend.calls, 3)
+        self.assertEqual(second["recommendation"], first["recommendation"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,147 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from graph.OrderEvidence import OrderEvidence
+from graph.benchmarks.fakes import fake_backend, initial_state, make_order
+from graph.builder import build_direct_executor
+from graph.nodes.draft_reply import draft_reply_node
+from graph.templates import DEFAULT_DIRECTORY, EXAMPLE_DIRECTORY, TemplateEngine, parse_template, set_template_engine
+
+ORDER = OrderEvidence.from_dict(make_order("ORD1002"))
+
+
+class TestReplyTemplate(unittest.TestCase):
+    """Test cases for parsing and rendering reply templates"""
+
+    def test_render(self):
+        """Test that placeholders are filled from the evidence"""
+        template = parse_template("t", "issue_type: shipping\nstatus: Delivered, shipped\n---\nHi {customer_name}, {order_id} / {product}\n")
+
+        self.assertEqual(template.fields, ("customer_name", "order_id", "product"))
+        self.assertTrue(template.applies_to("found", "delivered"))
+        self.assertFalse(template.applies_to("found", "processing"))
+        self.assertEqual(template.render(ORDER), "Hi Alice, ORD1002 / Bluetooth Speaker\n")
+        self.assertIsNone(template.render({"customer_name": "Alice", "order_id": "ORD1002", "product": ""}))
+
+    def test_invalid_templates(self):
+        """Test that broken templates are rejected when compiled"""
+        for text in (
+            "issue_type: shipping\nHi {customer_name}",           # no separator
+            "issue_type: shipping\n---\nHi {password}",           # not an order field
+            "issue_type: shipping\n---\nTotal {total:.2f}",      # format specs are not supported
+            "issue_type: shipping\npriority: 1\n---\nHi",         # unknown header
+            "status: delivered\n---\nHi",                         # no issue_type
+            "issue_type: shipping\norder: maybe\n---\nHi",        # unknown order state
+        ):
+            with self.assertRaises(ValueError, msg=text):
+                parse_template("t", text)
+
+
+class TestTemplateEngine(unittest.TestCase):
+    """Test cases for choosing a template"""
+
+    def setUp(self):
+        self.engine = TemplateEngine.from_directory(DEFAULT_DIRECTORY)
+
+    def test_shipped_templates_compile(self):
+        """Test that every template in graph/reply_templates loads"""
+        self.assertEqual(len(self.engine.templates), len(os.listdir(DEFAULT_DIRECTORY)))
+
+    def test_refund_template_is_only_an_example(self):
+        """Test that the example refund policy compiles but is not loaded by default"""
+        example = TemplateEngine.from_directory(EXAMPLE_DIRECTORY)
+
+        self.assertIsNone(self.engine.draft("refund", ORDER))
+        self.assertIn("refund request", example.draft("refund", ORDER))
+
+    def test_match_by_issue_type_and_status(self):
+        """Test hits, and misses that go to the backend"""
+        in_transit = OrderEvidence.from_dict({**make_order("ORD1003"), "status": "in_transit"})
+
+        self.assertIn("was delivered", self.engine.draft("shipping", ORDER))
+        self.assertIn("on its way", self.engine.draft("shipping", in_transit))
+        self.assertIsNone(self.engine.draft("shipping", {**make_order("ORD1004"), "status": "processing"}))
+        self.assertIsNone(self.engine.draft("defective", ORDER))
+        self.assertIsNone(self.engine.draft("shipping", {**make_order("ORD1005"), "customer_name": None}))
+        self.assertIsNone(self.engine.draft("shipping", {"orders": [ORDER, ORDER], "count": 2}))
+
+        stats = self.engine.stats()
+        self.assertEqual(stats["hits"], {"shipping_delivered": 1, "shipping_in_transit": 1})
+        self.assertEqual(stats["misses"], {"no_template": 2, "incomplete_evidence": 1, "unsupported_evidence": 1})
+        self.assertEqual(stats["hit_rate"], round(2 / 6, 4))
+
+    def test_order_not_found(self):
+        """Test the not-found template for every issue type, using the ticket's order id"""
+        reply = self.engine.draft("defective", {"error": "Order not found"}, "ORD9999")
+        self.assertIn("ORD9999", reply)
+        self.assertIsNone(self.engine.draft("defective", {"error": "HTTP error: 500"}, "ORD9999"))
+
+    def test_templates_directory(self):
+        """Test loading only the .txt files of a directory, in name order"""
+        with tempfile.TemporaryDirectory() as directory:
+            for name, text in (("b", "issue_type: *\n---\nAny {order_id}"), ("a", "issue_type: refund\n---\nRefund {order_id}")):
+                with open(os.path.join(directory, f"{name}.txt"), "w") as f:
+                    f.write(text)
+            with open(os.path.join(directory, "README.md"), "w") as f:
+                f.write("not a template")
+            engine = TemplateEngine.from_directory(directory)
+
+        self.assertEqual([t.name for t in engine.templates], ["a", "b"])
+        self.assertEqual(engine.draft("refund", ORDER), "Refund ORD1002\n")
+        self.assertEqual(engine.draft("defective", ORDER), "Any ORD1002\n")
+
+
+class TestDraftReplyTemplates(unittest.TestCase):
+    """Test cases for templates in draft_reply_node"""
+
+    def setUp(self):
+        self.engine = TemplateEngine.from_directory(DEFAULT_DIRECTORY)
+        set_template_engine(self.engine)
+        self.addCleanup(set_template_engine, None)
+        env = patch.dict(os.environ, {"TRIAGE_REPLY_TEMPLATES": "true"})
+        env.start()
+        self.addCleanup(env.stop)
+
+    def test_template_skips_reply_draft(self):
+        """Test that a matching template answers without calling /reply/draft"""
+        runner = build_direct_executor()
+        with fake_backend(issue_type="shipping") as backend:
+            result = runner.invoke(initial_state("Where is my parcel? ORD1002"))
+
+        self.assertIn("Hi Alice", result["recommendation"])
+        self.assertEqual(dict(backend.paths), {"/orders/get": 1, "/classify/issue": 1})
+
+    def test_refund_uses_the_backend_reply(self):
+        """Test that refund tickets keep the drafted reply without a refund template"""
+        runner = build_direct_executor()
+        with fake_backend(issue_type="refund") as backend:
+            result = runner.invoke(initial_state("I want my money back for ORD1002"))
+
+        self.assertEqual(result["recommendation"], "Reply for refund")
+        self.assertEqual(backend.paths["/reply/draft"], 1)
+
+    def test_backend_drafts_the_rest(self):
+        """Test that unmatched replies are drafted by the backend and timed for the estimate"""
+        with fake_backend() as backend:
+            result = draft_reply_node({"issue_type": "defective", "evidence": ORDER, "order_id": "ORD1002"})
+            draft_reply_node({"issue_type": "shipping", "evidence": ORDER, "order_id": "ORD1002"})
+
+        self.assertEqual(result["recommendation"], "Reply for defective")
+        self.assertEqual(backend.paths["/reply/draft"], 1)
+        stats = self.engine.stats()
+        self.assertEqual(stats["hit_rate"], 0.5)
+        self.assertEqual(stats["saved_ms_estimate"], round(stats["backend_ms_mean"], 1))
+
+    def test_disabled(self):
+        """Test that templates are not consulted unless TRIAGE_REPLY_TEMPLATES=true"""
+        with patch.dict(os.environ, {"TRIAGE_REPLY_TEMPLATES": "false"}), fake_backend() as backend:
+            result = draft_reply_node({"issue_type": "shipping", "evidence": ORDER, "order_id": "ORD1002"})
+
+        self.assertEqual(result["recommendation"], "Reply for shipping")
+        self.assertEqual(backend.paths["/reply/draft"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
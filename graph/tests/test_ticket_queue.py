@@ -0,0 +1,161 @@
+import os
+import tempfile
+import threading
+import unittest
+
+from app.worker import QueueWorker
+from graph.benchmarks.fakes import FakeClock, fake_backend
+from graph.builder import build_direct_executor
+from graph.ticket_queue import TicketQueue
+
+
+class QueueTestCase(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "queue.sqlite3")
+        self.clock = FakeClock(1000.0)
+        self.queue = self.make_queue()
+
+    def make_queue(self, **kwargs):
+        kwargs.setdefault("visibility_timeout", 30)
+        kwargs.setdefault("max_attempts", 3)
+        kwargs.setdefault("retry_delay", 1)
+        queue = TicketQueue(self.path, clock=self.clock, **kwargs)
+        self.addCleanup(queue.close)
+        return queue
+
+
+class TestTicketQueue(QueueTestCase):
+    """Test cases for the durable ticket queue"""
+
+    def test_claim_and_complete(self):
+        """Test that a completed job stores its result and is not delivered again"""
+        job_id = self.queue.enqueue({"ticket_text": "hello"})
+        job, = self.queue.claim()
+
+        self.assertEqual((job.id, job.payload, job.attempts), (job_id, {"ticket_text": "hello"}, 1))
+        self.assertTrue(self.queue.complete(job, {"issue_type": "defective"}))
+        self.assertEqual(self.queue.get(job_id)["result"], {"issue_type": "defective"})
+        self.clock.now += 60
+        self.assertEqual(self.queue.claim(), [])
+
+    def test_claimed_job_is_invisible_until_timeout(self):
+        """Test at-least-once delivery after the visibility timeout"""
+        self.queue.enqueue({"ticket_text": "hello"})
+        first, = self.queue.claim()
+
+        self.assertEqual(self.queue.claim(), [])
+        self.clock.now += 31
+        second, = self.queue.claim()
+        self.assertEqual(second.attempts, 2)
+
+        # The first delivery's lease is gone, so its late result is ignored
+        self.assertFalse(self.queue.complete(first, {"late": True}))
+        self.assertTrue(self.queue.complete(second, {"late": False}))
+
+    def test_failures_back_off_then_dead_letter(self):
+        """Test retry backoff and dead-lettering after max_attempts"""
+        job_id = self.queue.enqueue({"ticket_text": "hello"})
+
+        for attempt in range(1, 4):
+            job, = self.queue.claim()
+            self.assertEqual(job.attempts, attempt)
+            self.queue.fail(job, "boom")
+            self.assertEqual(self.queue.claim(), [])
+            self.clock.now += 2 ** attempt
+
+        self.assertEqual(self.queue.get(job_id)["status"], "dead")
+        self.assertEqual(self.queue.dead_letters()[0]["error"], "boom")
+        self.assertEqual(self.queue.stats()["dead"], 1)
+
+    def test_expired_leases_dead_letter(self):
+        """Test that a job whose worker keeps dying ends up dead-lettered"""
+        job_id = self.queue.enqueue({"ticket_text": "crash"})
+        for _ in range(3):
+            self.assertEqual(len(self.queue.claim()), 1)
+            self.clock.now += 31
+
+        self.assertEqual(self.queue.claim(), [])
+        self.assertEqual(self.queue.get(job_id)["status"], "dead")
+
+    def test_requeue_dead(self):
+        """Test that dead-lettered jobs can be retried"""
+        self.queue.enqueue({"ticket_text": "hello"})
+        queue = self.make_queue(max_attempts=1)
+        queue.fail(queue.claim()[0], "boom")
+
+        self.assertEqual(queue.requeue_dead(), 1)
+        self.assertEqual(len(queue.claim()), 1)
+
+    def test_concurrent_claims_never_share_a_job(self):
+        """Test that workers on separate connections lease disjoint jobs"""
+        for i in range(200):
+            self.queue.enqueue({"ticket_text": f"ticket {i}"})
+        claimed = []
+        lock = threading.Lock()
+
+        def drain():
+            queue = self.make_queue()
+            while jobs := queue.claim(limit=5):
+                with lock:
+                    claimed.extend(job.id for job in jobs)
+
+        threads = [threading.Thread(target=drain) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(claimed), 200)
+        self.assertEqual(len(set(claimed)), 200)
+
+
+class TestQueueWorker(QueueTestCase):
+    """Test cases for the queue worker"""
+
+    def test_worker_runs_tickets_through_the_graph(self):
+        """Test that results are written back for every ticket"""
+        ids = [self.queue.enqueue({"ticket_text": f"My speaker is broken ORD{1000 + i}"}) for i in range(6)]
+        worker = QueueWorker(self.queue, runner=build_direct_executor(), concurrency=3)
+
+        with fake_backend():
+            worker.run(max_jobs=6)
+
+        results = [self.queue.get(job_id) for job_id in ids]
+        self.assertTrue(all(result["status"] == "done" for result in results))
+        self.assertEqual(results[0]["result"]["recommendation"], "Reply for defective")
+        self.assertEqual(worker.stats()["completed"], 6)
+
+    def test_worker_results_keep_order_extras_and_mode(self):
+        """Test that job results carry order fields outside ORDER_FIELDS and follow the job's mode"""
+        full = self.queue.enqueue({"ticket_text": "My speaker is broken ORD1002"})
+        lookup = self.queue.enqueue({"ticket_text": "My speaker is broken ORD1002", "mode": "lookup_only"})
+        worker = QueueWorker(self.queue, concurrency=1)
+
+        with fake_backend(extra_fields=2) as backend:
+            worker.run(max_jobs=2)
+
+        self.assertEqual(self.queue.get(full)["result"]["evidence"]["field_1"], "value-1" * 4)
+        result = self.queue.get(lookup)["result"]
+        self.assertEqual(result["mode"], "lookup_only")
+        self.assertIsNone(result["recommendation"])
+        self.assertEqual(backend.paths["/reply/draft"], 1)
+
+    def test_worker_failure_is_retried(self):
+        """Test that an exception in the workflow schedules a retry"""
+        class Exploding:
+            def invoke(self, state):
+                raise RuntimeError("backend exploded")
+
+        job_id = self.queue.enqueue({"ticket_text": "hello"})
+        QueueWorker(self.queue, runner=Exploding(), concurrency=1).run(max_jobs=1)
+
+        job = self.queue.get(job_id)
+        self.assertEqual((job["status"], job["attempts"]), ("pending", 1))
+        self.assertIn("backend exploded", job["error"])
+
+
+if __name__ == "__main__":
+    unittest.main()
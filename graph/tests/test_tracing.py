@@ -0,0 +1,200 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch, Mock
+
+from graph.benchmarks.fakes import fake_backend
+from graph.builder import build_graph
+from graph.tracing import (
+    BatchExporter, JsonlFileSink, Tracer, get_tracer, mark_error, set_tracer, traced_node
+)
+
+
+class ListSink:
+    """Sink that keeps exported spans in memory"""
+
+    def __init__(self):
+        self.batches = []
+
+    def export(self, spans):
+        self.batches.append(list(spans))
+
+    @property
+    def spans(self):
+        return [span for batch in self.batches for span in batch]
+
+
+class TestTracer(unittest.TestCase):
+    """Test cases for sampling and export decisions"""
+
+    def setUp(self):
+        self.sink = ListSink()
+        self.exporter = BatchExporter(self.sink, batch_size=1000, flush_interval=60)
+
+    def tearDown(self):
+        self.exporter.shutdown()
+
+    def test_sampled_trace_is_exported(self):
+        """Test that a sampled run exports root and node spans"""
+        tracer = Tracer(1.0, self.exporter)
+        node = traced_node("ingest", lambda state: state)
+
+        with tracer.trace("triage/invoke"):
+            node({})
+        self.exporter.flush()
+
+        names = [span["name"] for span in self.sink.spans]
+        self.assertEqual(names, ["triage/invoke", "ingest"])
+        self.assertIn("wall_ms", self.sink.spans[1])
+        self.assertIn("cpu_ms", self.sink.spans[1])
+
+    def test_unsampled_trace_is_dropped(self):
+        """Test that an unsampled, successful run is not exported"""
+        tracer = Tracer(0.0, self.exporter)
+
+        with tracer.trace("triage/invoke"):
+            traced_node("ingest", lambda state: state)({})
+        self.exporter.flush()
+
+        self.assertEqual(self.sink.spans, [])
+
+    def test_unsampled_trace_with_error_is_exported(self):
+        """Test that errors are always traced even when not sampled"""
+        tracer = Tracer(0.0, self.exporter)
+
+        with tracer.trace("triage/invoke"):
+            mark_error("classify failed")
+        self.exporter.flush()
+
+        self.assertEqual(self.sink.spans[0]["error"], "classify failed")
+
+    def test_node_exception_marks_trace(self):
+        """Test that an exception in a node is recorded and re-raised"""
+        tracer = Tracer(0.0, self.exporter)
+
+        def broken(state):
+            raise ValueError("boom")
+
+        with self.assertRaises(ValueError):
+            with tracer.trace("triage/invoke"):
+                traced_node("classify", broken)({})
+        self.exporter.flush()
+
+        self.assertEqual(self.sink.spans[1]["error"], "ValueError: boom")
+
+    def test_always_on_error_can_be_disabled(self):
+        """Test that errored runs follow sampling when always_on_error is off"""
+        tracer = Tracer(0.0, self.exporter, always_on_error=False)
+
+        with tracer.trace("triage/invoke"):
+            mark_error("classify failed")
+        self.exporter.flush()
+
+        self.assertEqual(self.sink.spans, [])
+
+    def test_disabled_tracer_yields_none(self):
+        """Test that a tracer without exporter does not record anything"""
+        tracer = Tracer(1.0, None)
+
+        with tracer.trace("triage/invoke") as trace:
+            self.assertIsNone(trace)
+
+    def test_traced_node_without_trace(self):
+        """Test that traced nodes run normally outside of a trace"""
+        node = traced_node("ingest", lambda state: {"seen": True})
+        self.assertEqual(node({}), {"seen": True})
+
+
+class TestBatchExporter(unittest.TestCase):
+    """Test cases for batching and the JSONL sink"""
+
+    def test_exports_in_batches(self):
+        """Test that spans are grouped into batches of batch_size"""
+        sink = ListSink()
+        exporter = BatchExporter(sink, batch_size=4, flush_interval=60)
+
+        for i in range(4):
+            exporter.submit([{"name": f"span-{i}"}])
+        exporter.flush()
+        exporter.shutdown()
+
+        self.assertEqual(len(sink.spans), 4)
+        self.assertEqual(exporter.exported, 4)
+
+    def test_drops_when_queue_full(self):
+        """Test that a full buffer drops spans instead of blocking"""
+        exporter = BatchExporter(ListSink(), max_queue=1)
+        exporter._ensure_started = lambda: None
+
+        exporter.submit([{"name": "a"}])
+        exporter.submit([{"name": "b"}, {"name": "c"}])
+
+        self.assertEqual(exporter.dropped, 2)
+
+    def test_jsonl_file_sink(self):
+        """Test that the file sink appends one JSON object per line"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "traces.jsonl")
+            sink = JsonlFileSink(path)
+            sink.export([{"name": "a"}, {"name": "b"}])
+            sink.export([{"name": "c"}])
+
+            with open(path) as f:
+                lines = [json.loads(line) for line in f]
+
+        self.assertEqual([line["name"] for line in lines], ["a", "b", "c"])
+
+
+class TestGraphTracing(unittest.TestCase):
+    """Test that a full graph run produces one span per executed node"""
+
+    @patch('graph.nodes.draft_reply.requests.post')
+    @patch('graph.nodes.classify.requests.post')
+    @patch('graph.nodes.fetch_order.requests.get')
+    def test_graph_run_records_every_node(self, mock_get, mock_classify, mock_draft):
+        """Test per-node spans for the order_id path"""
+        mock_get.return_value = Mock(status_code=200, json=Mock(return_value={"order_id": "ORD1002"}))
+        mock_classify.return_value = Mock(status_code=200, json=Mock(return_value={"issue_type": "defective"}))
+        mock_draft.return_value = Mock(status_code=200, json=Mock(return_value={"reply_text": "Sorry"}))
+
+        sink = ListSink()
+        exporter = BatchExporter(sink, flush_interval=60)
+        tracer = Tracer(1.0, exporter)
+
+        graph = build_graph()
+        with tracer.trace("triage/invoke"):
+            graph.invoke({
+                "ticket_text": "My speaker is not working ORD1002",
+                "order_id": None,
+                "messages": [],
+                "issue_type": None,
+                "evidence": None,
+                "recommendation": None
+            })
+        exporter.flush()
+        exporter.shutdown()
+
+        names = [span["name"] for span in sink.spans]
+        self.assertEqual(names, ["triage/invoke", "prefilter", "ingest", "preprocess", "dedupe", "fetch_order", "classify", "draft_reply", "await_approval"])
+
+    def test_invoke_endpoint_uses_installed_tracer(self):
+        """Test that a tracer installed with set_tracer traces /triage/invoke"""
+        from fastapi.testclient import TestClient
+        from app.main import app
+
+        sink = ListSink()
+        exporter = BatchExporter(sink, flush_interval=60)
+        self.addCleanup(set_tracer, get_tracer())
+        set_tracer(Tracer(1.0, exporter))
+        with fake_backend():
+            response = TestClient(app).post("/triage/invoke", json={"ticket_text": "Broken ORD1002"})
+        exporter.flush()
+        exporter.shutdown()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(sink.spans[0]["name"], "triage/invoke")
+
+
+if __name__ == "__main__":
+    unittest.main()
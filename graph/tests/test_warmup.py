@@ -0,0 +1,140 @@
+import os
+import pickle
+import tempfile
+import unittest
+import zlib
+from unittest.mock import patch
+
+from graph import metrics
+from graph.benchmarks.fakes import FakeClock, fake_backend, initial_state
+from graph.builder import build_direct_executor
+from graph.cache import TTLCache, set_email_cache
+from graph.nodes.fetch_order import set_order_cache
+from graph.shared_cache import LocalCacheBackend, SharedCache, set_shared_cache
+from graph.warmup import load_warm_caches, save_warm_caches
+
+WARM_ENV = {
+    "TRIAGE_ORDER_SWR": "true",
+    "TRIAGE_EMAIL_CACHE": "true",
+    "TRIAGE_ORDER_FRESH_SECONDS": "5",
+}
+
+
+def age_snapshot(path: str, seconds: float) -> None:
+    """
+    Makes the snapshot at path look as if it was saved `seconds` earlier.
+    """
+    with open(path, "rb") as f:
+        snapshot = pickle.loads(zlib.decompress(f.read()))
+    snapshot["saved_at"] -= seconds
+    with open(path, "wb") as f:
+        f.write(zlib.compress(pickle.dumps(snapshot)))
+
+
+class TestWarmCaches(unittest.TestCase):
+    """Test cases for persisting caches across restarts"""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "warm.bin")
+        env = patch.dict(os.environ, WARM_ENV)
+        env.start()
+        self.addCleanup(env.stop)
+        self.clock = FakeClock(1000.0)
+        self.restart()
+        self.addCleanup(set_order_cache, None)
+        self.addCleanup(set_email_cache, None)
+        self.addCleanup(set_shared_cache, None)
+        metrics.reset()
+
+    def restart(self):
+        """Replaces every cache with an empty one, as a new worker process starts with"""
+        self.clock = FakeClock(self.clock.now + 50000)
+        self.order_cache = TTLCache(ttl=60, clock=self.clock)
+        self.email_cache = TTLCache(ttl=300, clock=self.clock)
+        self.shared = SharedCache(LocalCacheBackend())
+        set_order_cache(self.order_cache)
+        set_email_cache(self.email_cache)
+        set_shared_cache(self.shared)
+
+    def run_tickets(self, *tickets):
+        runner = build_direct_executor()
+        with fake_backend() as backend:
+            for ticket_text in tickets:
+                runner.invoke(initial_state(ticket_text))
+        return backend
+
+    def test_restart_keeps_caches_warm(self):
+        """Test that tickets after a restart hit the caches saved at shutdown"""
+        tickets = ["My speaker is broken ORD1002", "Where is my order? alice@example.com"]
+        cold = self.run_tickets(*tickets)
+        # Without a restart; the fake search result's order is invalidated by ORD1002 each time
+        warm = self.run_tickets(*tickets)
+        report = save_warm_caches(self.path)
+        self.assertEqual(report["saved"], {"order_cache": 1, "email_cache": 1, "shared_cache": 5})
+
+        self.restart()
+        loaded = load_warm_caches(self.path)
+        backend = self.run_tickets(*tickets)
+
+        self.assertEqual(loaded["loaded"], {"order_cache": 1, "email_cache": 1, "shared_cache": 5})
+        self.assertEqual(backend.paths, warm.paths)
+        self.assertLess(backend.calls, cold.calls)
+        self.assertEqual(self.shared.stats()["cross_worker_hits"], 0)
+        self.assertEqual(metrics.snapshot()["warmup"]["loaded"]["email_cache"], 1)
+
+    def test_ttls_count_the_downtime(self):
+        """Test that entries expire as if the worker had never stopped"""
+        self.order_cache.set("ORD1002", (self.clock(), {"order_id": "ORD1002"}))
+        self.clock.now += 2
+        self.email_cache.set("alice@example.com", (self.clock(), [{"order_id": "ORD1002"}]))
+        save_warm_caches(self.path)
+        age_snapshot(self.path, 100)
+
+        self.restart()
+        report = load_warm_caches(self.path)
+
+        # The order (60s TTL) expired during the 100s downtime, the email entry (300s) did not
+        self.assertEqual(report["expired"], 1)
+        self.assertIsNone(self.order_cache.peek("ORD1002"))
+        [(key, ttl, value)] = self.email_cache.snapshot()
+        fetched_at, orders = value
+        self.assertEqual((key, orders), ("alice@example.com", [{"order_id": "ORD1002"}]))
+        self.assertAlmostEqual(ttl, 200, places=1)
+        self.assertAlmostEqual(self.clock() - fetched_at, 100, places=1)
+
+    def test_order_age_survives_restart(self):
+        """Test that a restored order keeps its age for stale-while-revalidate"""
+        self.order_cache.set("ORD1002", (self.clock() - 3, {"order_id": "ORD1002"}))
+        save_warm_caches(self.path)
+        age_snapshot(self.path, 4)
+
+        self.restart()
+        load_warm_caches(self.path)
+
+        fetched_at, _ = self.order_cache.peek("ORD1002")
+        self.assertAlmostEqual(self.clock() - fetched_at, 7, places=1)
+
+    def test_warmup_time_is_bounded(self):
+        """Test that loading stops at max_seconds and says so"""
+        self.run_tickets("My speaker is broken ORD1002")
+        save_warm_caches(self.path)
+
+        self.restart()
+        report = load_warm_caches(self.path, max_seconds=0)
+
+        self.assertTrue(report["truncated"])
+        self.assertEqual(sum(report["loaded"].values()), 0)
+
+    def test_missing_or_bad_snapshot_starts_cold(self):
+        """Test that startup goes on without a usable snapshot"""
+        self.assertTrue(load_warm_caches(self.path)["missing"])
+        with open(self.path, "wb") as f:
+            f.write(b"not a snapshot")
+        self.assertIn("error", load_warm_caches(self.path))
+        self.assertEqual(len(self.order_cache), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,186 @@
+import json
+import os
+import time
+import uuid
+from dataclasses import dataclass
+
+from graph.sqlite_connections import SQLiteConnections
+
+PENDING = "pending"
+DONE = "done"
+DEAD = "dead"
+
+
+@dataclass
+class Job:
+    """
+    A claimed ticket. lease identifies this delivery: completing or failing a job
+    whose visibility timeout has expired (and was re-delivered) is ignored.
+    """
+    id: int
+    payload: dict
+    attempts: int
+    lease: str
+
+
+class TicketQueue:
+    """
+    Durable ticket queue in a SQLite file, shared by any number of worker processes.
+
+    Delivery is at-least-once: a claimed job is invisible to other workers for
+    visibility_timeout seconds and is delivered again if it is not completed by then
+    (e.g. the worker crashed). Failed jobs are retried after retry_delay * 2**(attempts - 1)
+    seconds; after max_attempts deliveries they are dead-lettered (status "dead").
+    """
+
+    def __init__(self, path: str, visibility_timeout: float = 60.0, max_attempts: int = 5,
+                 retry_delay: float = 1.0, clock=time.time):
+        self.path = path
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.clock = clock
+        self._connections = SQLiteConnections(self.path)
+        conn = self._connections.get()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " payload TEXT NOT NULL,"
+            " status TEXT NOT NULL DEFAULT 'pending',"
+            " attempts INTEGER NOT NULL DEFAULT 0,"
+            " visible_at REAL NOT NULL,"
+            " lease TEXT,"
+            " result TEXT,"
+            " error TEXT,"
+            " created_at REAL NOT NULL,"
+            " updated_at REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (status, visible_at)")
+
+    def enqueue(self, payload: dict) -> int:
+        now = self.clock()
+        cursor = self._connections.get().execute(
+            "INSERT INTO jobs (payload, visible_at, created_at, updated_at) VALUES (?, ?, ?, ?)",
+            (json.dumps(payload), now, now, now),
+        )
+        return cursor.lastrowid
+
+    def claim(self, limit: int = 1) -> list[Job]:
+        """
+        Leases up to limit visible jobs, oldest first. Jobs whose lease expired
+        max_attempts times (the worker kept dying) are dead-lettered instead.
+        """
+        conn = self._connections.get()
+        now = self.clock()
+        jobs = []
+        # BEGIN IMMEDIATE takes the write lock, so two workers never lease the same job
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            rows = conn.execute(
+                "SELECT id, payload, attempts FROM jobs WHERE status = ? AND visible_at <= ? ORDER BY id LIMIT ?",
+                (PENDING, now, limit),
+            ).fetchall()
+            for job_id, payload, attempts in rows:
+                if attempts >= self.max_attempts:
+                    conn.execute(
+                        "UPDATE jobs SET status = ?, lease = NULL, error = coalesce(error, ?), updated_at = ? WHERE id = ?",
+                        (DEAD, "visibility timeout expired", now, job_id),
+                    )
+                    continue
+                lease = uuid.uuid4().hex
+                conn.execute(
+                    "UPDATE jobs SET attempts = attempts + 1, visible_at = ?, lease = ?, updated_at = ? WHERE id = ?",
+                    (now + self.visibility_timeout, lease, now, job_id),
+                )
+                jobs.append(Job(job_id, json.loads(payload), attempts + 1, lease))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return jobs
+
+    def complete(self, job: Job, result: dict) -> bool:
+        """
+        Stores the result. Returns False if the lease was lost (the job was re-delivered).
+        """
+        cursor = self._connections.get().execute(
+            "UPDATE jobs SET status = ?, result = ?, error = NULL, lease = NULL, updated_at = ? "
+            "WHERE id = ? AND lease = ?",
+            (DONE, json.dumps(result), self.clock(), job.id, job.lease),
+        )
+        return cursor.rowcount == 1
+
+    def fail(self, job: Job, error: str) -> bool:
+        """
+        Schedules a retry with exponential backoff, or dead-letters the job after max_attempts.
+        Returns False if the lease was lost.
+        """
+        now = self.clock()
+        if job.attempts >= self.max_attempts:
+            status, visible_at = DEAD, now
+        else:
+            status, visible_at = PENDING, now + self.retry_delay * 2 ** (job.attempts - 1)
+        cursor = self._connections.get().execute(
+            "UPDATE jobs SET status = ?, visible_at = ?, error = ?, lease = NULL, updated_at = ? "
+            "WHERE id = ? AND lease = ?",
+            (status, visible_at, error, now, job.id, job.lease),
+        )
+        return cursor.rowcount == 1
+
+    def get(self, job_id: int) -> dict | None:
+        row = self._connections.get().execute(
+            "SELECT status, attempts, result, error FROM jobs WHERE id = ?", (job_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        status, attempts, result, error = row
+        return {
+            "id": job_id,
+            "status": status,
+            "attempts": attempts,
+            "result": json.loads(result) if result is not None else None,
+            "error": error,
+        }
+
+    def dead_letters(self, limit: int = 100) -> list[dict]:
+        rows = self._connections.get().execute(
+            "SELECT id FROM jobs WHERE status = ? ORDER BY id LIMIT ?", (DEAD, limit)
+        ).fetchall()
+        return [self.get(job_id) for job_id, in rows]
+
+    def requeue_dead(self) -> int:
+        """
+        Moves every dead-lettered job back to the queue with a fresh attempt budget.
+        """
+        now = self.clock()
+        cursor = self._connections.get().execute(
+            "UPDATE jobs SET status = ?, attempts = 0, visible_at = ?, updated_at = ? WHERE status = ?",
+            (PENDING, now, now, DEAD),
+        )
+        return cursor.rowcount
+
+    def stats(self) -> dict:
+        conn = self._connections.get()
+        now = self.clock()
+        counts = dict(conn.execute("SELECT status, count(*) FROM jobs GROUP BY status").fetchall())
+        in_flight = conn.execute(
+            "SELECT count(*) FROM jobs WHERE status = ? AND lease IS NOT NULL AND visible_at > ?", (PENDING, now)
+        ).fetchone()[0]
+        return {
+            "pending": counts.get(PENDING, 0) - in_flight,
+            "in_flight": in_flight,
+            "done": counts.get(DONE, 0),
+            "dead": counts.get(DEAD, 0),
+        }
+
+    def close(self) -> None:
+        self._connections.close()
+
+
+def queue_from_env() -> TicketQueue:
+    return TicketQueue(
+        os.getenv("TRIAGE_QUEUE_PATH", "triage_queue.sqlite3"),
+        visibility_timeout=float(os.getenv("TRIAGE_QUEUE_VISIBILITY_TIMEOUT_SECONDS", "60")),
+        max_attempts=int(os.getenv("TRIAGE_QUEUE_MAX_ATTEMPTS", "5")),
+        retry_delay=float(os.getenv("TRIAGE_QUEUE_RETRY_DELAY_SECONDS", "1")),
+    )
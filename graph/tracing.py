@@ -0,0 +1,301 @@
+import atexit
+import contextvars
+import functools
+import json
+import os
+import queue
+import random
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from graph.checkpoints import note_failure
+
+
+# The trace of the ticket currently running in this context (None when not tracing)
+_current_trace = contextvars.ContextVar("triage_current_trace", default=None)
+
+
+class JsonlFileSink:
+    """
+    Default span sink. Appends every exported span as one JSON line to a local file.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, spans: list[dict]) -> None:
+        lines = "".join(json.dumps(span, default=str) + "\n" for span in spans)
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(lines)
+
+
+class BatchExporter:
+    """
+    Buffers finished traces in memory and hands them to a sink in batches
+    from a background thread, so the request path never waits on export.
+    """
+
+    def __init__(self, sink, batch_size: int = 200, flush_interval: float = 2.0, max_queue: int = 10000):
+        self.sink = sink
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self.exported = 0
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._stopped = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def submit(self, spans: list[dict]) -> None:
+        """
+        Queues the spans of one trace for export. Drops them when the buffer is full.
+        """
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(spans)
+        except queue.Full:
+            self.dropped += len(spans)
+
+    def flush(self, timeout: float = 5.0) -> None:
+        """
+        Blocks until everything queued so far has been handed to the sink.
+        """
+        if self._thread is None:
+            return
+        done = threading.Event()
+        try:
+            self._queue.put(done, timeout=timeout)
+        except queue.Full:
+            return
+        done.wait(timeout)
+
+    def shutdown(self, timeout: float = 5.0) -> None:
+        self.flush(timeout)
+        self._stopped.set()
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        while not self._stopped.is_set():
+            try:
+                item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                item = None
+
+            if isinstance(item, threading.Event):
+                self._export(batch)
+                batch = []
+                item.set()
+                continue
+            if item is not None:
+                batch.extend(item)
+
+            if len(batch) >= self.batch_size or time.monotonic() >= deadline:
+                self._export(batch)
+                batch = []
+                deadline = time.monotonic() + self.flush_interval
+
+    def _export(self, batch: list[dict]) -> None:
+        if not batch:
+            return
+        try:
+            self.sink.export(batch)
+            self.exported += len(batch)
+        except Exception as e:
+            print(f"Error exporting {len(batch)} trace spans: {e}")
+            self.dropped += len(batch)
+
+
+class Trace:
+    """
+    Spans recorded for a single ticket run.
+    """
+
+    def __init__(self, name: str, sampled: bool, attributes: dict | None = None):
+        self.trace_id = uuid.uuid4().hex
+        self.name = name
+        self.sampled = sampled
+        self.error = None
+        self.attributes = attributes or {}
+        self.spans = []
+        self.start_time = time.time()
+        self._start = time.perf_counter()
+        self._start_cpu = time.thread_time()
+
+    def add_span(self, name: str, start: float, wall_ms: float, cpu_ms: float, error: str | None = None) -> None:
+        self.spans.append({
+            "trace_id": self.trace_id,
+            "span_id": uuid.uuid4().hex[:16],
+            "name": name,
+            "start_time": start,
+            "wall_ms": round(wall_ms, 3),
+            "cpu_ms": round(cpu_ms, 3),
+            "error": error,
+        })
+
+    def finish(self) -> list[dict]:
+        """
+        Closes the root span and returns every span of the trace, root first.
+        """
+        root = {
+            "trace_id": self.trace_id,
+            "span_id": "root",
+            "name": self.name,
+            "start_time": self.start_time,
+            "wall_ms": round((time.perf_counter() - self._start) * 1000, 3),
+            "cpu_ms": round((time.thread_time() - self._start_cpu) * 1000, 3),
+            "error": self.error,
+            "sampled": self.sampled,
+            "attributes": self.attributes,
+        }
+        return [root] + self.spans
+
+
+class Tracer:
+    """
+    Head-sampled tracer. Every run keeps its node timings in memory, but only
+    sampled runs (and, optionally, runs that hit an error) are exported.
+    """
+
+    def __init__(self, sample_rate: float, exporter: BatchExporter | None, always_on_error: bool = True):
+        self.sample_rate = sample_rate
+        self.exporter = exporter
+        self.always_on_error = always_on_error
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+
+    @contextmanager
+    def trace(self, name: str = "triage", force: bool = False, **attributes):
+        """
+        Traces one ticket run. `force` bypasses sampling (used for debug runs).
+        """
+        if not self.enabled and not force:
+            yield None
+            return
+
+        sampled = force or random.random() < self.sample_rate
+        trace = Trace(name, sampled, attributes)
+        token = _current_trace.set(trace)
+        try:
+            yield trace
+        except Exception as e:
+            trace.error = trace.error or f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            _current_trace.reset(token)
+            spans = trace.finish()
+            if self.exporter is not None and (trace.sampled or (trace.error and self.always_on_error)):
+                self.exporter.submit(spans)
+
+    def shutdown(self) -> None:
+        if self.exporter is not None:
+            self.exporter.shutdown()
+
+
+def current_trace() -> Trace | None:
+    return _current_trace.get()
+
+
+def mark_error(reason: str) -> None:
+    """
+    Flags the running trace as errored so it is exported even if it was not sampled,
+    and the running node as failed so a checkpointed run can be retried from it.
+    Nodes call this when they fall back after a failed backend call.
+    """
+    note_failure(reason)
+    trace = _current_trace.get()
+    if trace is not None and trace.error is None:
+        trace.error = reason
+
+
+def traced_node(name: str, node):
+    """
+    Wraps a graph node so that its wall-clock and CPU time are recorded
+    as a span on the current trace. Costs nothing when no trace is active.
+    """
+
+    @functools.wraps(node)
+    def wrapper(state):
+        trace = _current_trace.get()
+        if trace is None:
+            return node(state)
+
+        start = time.time()
+        wall_start = time.perf_counter()
+        cpu_start = time.thread_time()
+        error = None
+        try:
+            return node(state)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            trace.error = trace.error or error
+            raise
+        finally:
+            trace.add_span(
+                name,
+                start,
+                (time.perf_counter() - wall_start) * 1000,
+                (time.thread_time() - cpu_start) * 1000,
+                error,
+            )
+
+    return wrapper
+
+
+def build_tracer_from_env() -> Tracer:
+    """
+    Builds a tracer from the TRIAGE_TRACE_* environment variables.
+    Tracing is off unless TRIAGE_TRACING=true.
+    """
+    sample_percent = float(os.getenv("TRIAGE_TRACE_SAMPLE_PERCENT", "10"))
+    always_on_error = os.getenv("TRIAGE_TRACE_ALWAYS_ON_ERROR", "true").lower() == "true"
+
+    exporter = None
+    if os.getenv("TRIAGE_TRACING", "false").lower() == "true":
+        sink = JsonlFileSink(os.getenv("TRIAGE_TRACE_FILE", "traces.jsonl"))
+        exporter = BatchExporter(
+            sink,
+            batch_size=int(os.getenv("TRIAGE_TRACE_BATCH_SIZE", "200")),
+            flush_interval=float(os.getenv("TRIAGE_TRACE_FLUSH_INTERVAL", "2.0")),
+        )
+
+    return Tracer(max(0.0, min(sample_percent, 100.0)) / 100.0, exporter, always_on_error)
+
+
+_tracer = None
+_tracer_lock = threading.Lock()
+
+
+def get_tracer() -> Tracer:
+    """
+    Returns the process-wide tracer, building it from the environment on first use.
+    """
+    global _tracer
+    if _tracer is None:
+        with _tracer_lock:
+            if _tracer is None:
+                _tracer = build_tracer_from_env()
+                atexit.register(_tracer.shutdown)
+    return _tracer
+
+
+def set_tracer(tracer: Tracer) -> None:
+    """
+    Replaces the process-wide tracer, e.g. to plug in a different sink.
+    """
+    global _tracer
+    _tracer = tracer
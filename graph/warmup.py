@@ -0,0 +1,196 @@
+import os
+import pickle
+import time
+import zlib
+
+from graph import metrics
+from graph.cache import email_cache_enabled, get_email_cache
+from graph.nodes.fetch_order import get_order_cache, order_swr_enabled
+from graph.shared_cache import LocalCacheBackend, deserialize, get_shared_cache, serialize
+
+SNAPSHOT_VERSION = 2
+
+
+def warm_cache_enabled() -> bool:
+    return os.getenv("TRIAGE_WARM_CACHE", "false").lower() == "true"
+
+
+def _order_cache():
+    return get_order_cache() if order_swr_enabled() else None
+
+
+def _email_cache():
+    return get_email_cache() if email_cache_enabled() else None
+
+
+def _local_shared_cache():
+    # Only the in-process shared cache is lost on restart; sqlite and memcached entries survive it
+    cache = get_shared_cache()
+    if cache is not None and isinstance(cache.backend, LocalCacheBackend):
+        return cache.backend.cache
+    return None
+
+
+def _dump_aged(cache, value):
+    # (fetched_at, evidence) with fetched_at on the monotonic clock, which restarts with the process
+    fetched_at, evidence = value
+    return cache.clock() - fetched_at, evidence
+
+
+def _load_aged(cache, value, elapsed: float):
+    age, evidence = value
+    return cache.clock() - age - elapsed, evidence
+
+
+def _dump_shared(cache, value):
+    return deserialize(value)[1]
+
+
+def _load_shared(cache, value, elapsed: float):
+    # Re-serialized as written by this worker, so warm hits are not counted as cross-worker hits
+    return serialize(value)
+
+
+# Caches snapshotted on shutdown and restored on startup:
+# name -> (get_cache, dump_value, load_value); get_cache returns the TTLCache, or None when it is off
+WARM_CACHES = {
+    # fetch_order_tool, stale-while-revalidate order data (TRIAGE_ORDER_SWR)
+    "order_cache": (_order_cache, _dump_aged, _load_aged),
+    # search_orders_tool, email -> search results (TRIAGE_EMAIL_CACHE)
+    "email_cache": (_email_cache, _dump_aged, _load_aged),
+    # orders, classifications and replies in the local shared cache (TRIAGE_CACHE_BACKEND=local)
+    "shared_cache": (_local_shared_cache, _dump_shared, _load_shared),
+}
+
+
+def _enabled_caches() -> dict:
+    caches = {}
+    for name, (get_cache, dump, load) in WARM_CACHES.items():
+        cache = get_cache()
+        if cache is not None:
+            caches[name] = (cache, dump, load)
+    return caches
+
+
+def snapshot_path() -> str:
+    return os.getenv("TRIAGE_WARM_CACHE_PATH", "triage_warm_cache.bin")
+
+
+def save_warm_caches(path: str | None = None, limit: int | None = None) -> dict:
+    """
+    Writes the hottest `limit` live entries of each enabled cache (TRIAGE_WARM_CACHE_MAX_ENTRIES)
+    to path, with their remaining TTLs. The file is replaced atomically.
+    """
+    path = path or snapshot_path()
+    limit = limit if limit is not None else int(os.getenv("TRIAGE_WARM_CACHE_MAX_ENTRIES", "5000"))
+    start = time.perf_counter()
+
+    snapshot = {}
+    for name, (cache, dump, _) in _enabled_caches().items():
+        entries = cache.snapshot(limit)
+        if dump is not None:
+            entries = [(key, ttl, dump(cache, value)) for key, ttl, value in entries]
+        snapshot[name] = entries
+
+    data = zlib.compress(pickle.dumps(
+        {"version": SNAPSHOT_VERSION, "saved_at": time.time(), "caches": snapshot},
+        protocol=pickle.HIGHEST_PROTOCOL,
+    ))
+    report = {"saved": {name: len(entries) for name, entries in snapshot.items()}, "bytes": len(data)}
+    temporary = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(temporary, "wb") as f:
+            f.write(data)
+        os.replace(temporary, path)
+    except OSError as e:
+        # Shutdown goes on; the next start is cold
+        print(f"Failed to save warm cache snapshot to {path}: {e}")
+        report["error"] = str(e)
+
+    report["ms"] = round((time.perf_counter() - start) * 1000, 3)
+    print(f"Saved warm cache snapshot to {path}: {report}")
+    return report
+
+
+def load_warm_caches(path: str | None = None, max_seconds: float | None = None) -> dict:
+    """
+    Restores a snapshot into the enabled caches, hottest entries first. Entries whose TTL
+    ran out while the worker was down are skipped, and loading stops after max_seconds
+    (TRIAGE_WARM_CACHE_MAX_SECONDS). Only load snapshots written by this service: they
+    are pickled. Returns (and reports under "warmup" in the metrics) what was loaded.
+    """
+    path = path or snapshot_path()
+    if max_seconds is None:
+        max_seconds = float(os.getenv("TRIAGE_WARM_CACHE_MAX_SECONDS", "5"))
+    start = time.perf_counter()
+    deadline = start + max_seconds
+    report = {"loaded": {}, "expired": 0, "skipped": 0, "truncated": False, "age_seconds": None}
+
+    try:
+        with open(path, "rb") as f:
+            snapshot = pickle.loads(zlib.decompress(f.read()))
+        if snapshot.get("version") != SNAPSHOT_VERSION:
+            raise ValueError(f"snapshot version {snapshot.get('version')}")
+    except FileNotFoundError:
+        snapshot = None
+        report["missing"] = True
+    except Exception as e:
+        # E.g. a snapshot from a build whose cached types changed: start cold
+        print(f"Ignoring warm cache snapshot {path}: {e}")
+        snapshot = None
+        report["error"] = str(e)
+
+    if snapshot is not None:
+        elapsed = max(0.0, time.time() - snapshot["saved_at"])
+        report["age_seconds"] = round(elapsed, 3)
+        caches = _enabled_caches()
+        for name, entries in snapshot["caches"].items():
+            if name not in caches:
+                continue
+            cache, _, load = caches[name]
+            loaded = 0
+            for key, ttl, value in entries:
+                if time.perf_counter() >= deadline:
+                    report["truncated"] = True
+                    break
+                if ttl - elapsed <= 0:
+                    report["expired"] += 1
+                    continue
+                if load is not None:
+                    value = load(cache, value, elapsed)
+                if cache.restore(key, value, ttl - elapsed):
+                    loaded += 1
+                else:
+                    report["skipped"] += 1
+            report["loaded"][name] = loaded
+            if report["truncated"]:
+                break
+
+    report["ms"] = round((time.perf_counter() - start) * 1000, 3)
+    _set_last_report(report)
+    metrics.observe("warmup.ms", report["ms"])
+    print(f"Warm cache load from {path}: {report}")
+    return report
+
+
+_last_report = {}
+
+
+def _set_last_report(report: dict) -> None:
+    global _last_report
+    _last_report = report
+    metrics.register("warmup", lambda: dict(_last_report))
+
+
+def cache_warmth() -> dict:
+    """
+    Entries per enabled in-process cache, and what the startup warm-up loaded (None when
+    no snapshot was loaded by this process).
+    """
+    warm_start = None
+    if _last_report.get("age_seconds") is not None:
+        warm_start = {key: _last_report[key] for key in ("loaded", "age_seconds", "truncated")}
+    return {
+        "entries": {name: len(cache) for name, (cache, _, _) in _enabled_caches().items()},
+        "warm_start": warm_start,
+    }
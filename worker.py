@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+Queue worker for the LangGraph Triage Application (no HTTP layer).
+Pulls tickets from the SQLite queue at TRIAGE_QUEUE_PATH; start one per core.
+
+Usage:
+    python worker.py [concurrency]            # run a worker
+    python worker.py enqueue < tickets.jsonl  # add tickets ({"ticket_text": ..., "order_id": ..., "mode": ...} per line)
+    python worker.py stats                    # queue depth, done and dead-lettered jobs
+    python worker.py requeue-dead             # retry dead-lettered jobs
+"""
+
+import json
+import sys
+
+from dotenv import load_dotenv
+
+from graph.ticket_queue import queue_from_env
+
+if __name__ == "__main__":
+    load_dotenv("graph/.env")
+    queue = queue_from_env()
+    command = sys.argv[1] if len(sys.argv) > 1 else None
+
+    if command == "enqueue":
+        ids = [queue.enqueue(json.loads(line)) for line in sys.stdin if line.strip()]
+        print(f"Enqueued {len(ids)} tickets")
+    elif command == "stats":
+        print(json.dumps(queue.stats()))
+    elif command == "requeue-dead":
+        print(f"Requeued {queue.requeue_dead()} dead-lettered tickets")
+    else:
+        from app.worker import QueueWorker, run_until_signalled, worker_concurrency
+
+        concurrency = int(command) if command else worker_concurrency()
+        print(f"Starting triage queue worker on {queue.path} with {concurrency} threads...")
+        run_until_signalled(QueueWorker(queue, concurrency=concurrency))